@@ -0,0 +1,193 @@
+"""Partition audit_logs by partition_date
+
+Revision ID: 5b1e7c9d3f20
+Revises: 744dd75d2a90
+Create Date: 2026-10-16 11:02:18.226904
+
+Databases whose audit_logs was created by ``Base.metadata.create_all`` have
+a plain heap table. It is converted in place: the heap is renamed to
+audit_logs_legacy and attached to a new range-partitioned audit_logs as the
+partition covering everything before the first monthly partition, so no
+rows are copied. Before the table is locked, the legacy partition's range
+is proven by a validated CHECK constraint and its (audit_id,
+partition_date) key is built with CREATE UNIQUE INDEX CONCURRENTLY; that
+index replaces the heap's (audit_id) primary key, so ATTACH PARTITION
+adopts it and neither scans nor builds anything under the ACCESS
+EXCLUSIVE lock. Databases created by 0001 are already partitioned.
+
+Both then get a default partition (so out-of-range rows are never
+rejected) and three monthly partitions starting after the legacy one (or
+at the current month for an already partitioned table); the
+application's PartitionManager keeps creating upcoming ones and moves any
+rows of a new range out of the default partition before creating it.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c9d3f20'
+down_revision = '744dd75d2a90'
+branch_labels = None
+depends_on = None
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+LEGACY_RANGE_CHECK = "audit_logs_legacy_range"
+LEGACY_KEY_INDEX = "audit_logs_legacy_key"
+
+
+def _validate_legacy_range(first_partition: date) -> None:
+    """
+    Prove every row fits the legacy partition, without blocking writes.
+
+    The CHECK is added NOT VALID (no scan) and then validated under a
+    SHARE UPDATE EXCLUSIVE lock, which lets reads and writes go on. Both
+    run outside the migration's transaction; inside it the rename would
+    already hold ACCESS EXCLUSIVE for the whole scan.
+    """
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS {LEGACY_RANGE_CHECK}")
+        op.execute(f"""
+            ALTER TABLE audit_logs ADD CONSTRAINT {LEGACY_RANGE_CHECK}
+            CHECK (partition_date IS NOT NULL AND partition_date < '{first_partition.isoformat()}') NOT VALID
+        """)
+        op.execute(f"ALTER TABLE audit_logs VALIDATE CONSTRAINT {LEGACY_RANGE_CHECK}")
+
+
+def _build_legacy_key(conn) -> None:
+    """
+    Build the partitioned primary key's index on the heap, without blocking writes.
+
+    The heap's primary key is (audit_id) alone; ATTACH PARTITION would
+    otherwise build the (audit_id, partition_date) index under the
+    rename's ACCESS EXCLUSIVE lock. An index left invalid by an earlier,
+    interrupted build is dropped and rebuilt.
+    """
+    invalid = conn.execute(sa.text("""
+        SELECT 1 FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace ns ON ns.oid = c.relnamespace
+        WHERE c.relname = :name AND ns.nspname = current_schema() AND NOT i.indisvalid
+    """), {"name": LEGACY_KEY_INDEX}).scalar()
+    with op.get_context().autocommit_block():
+        if invalid:
+            op.execute(f"DROP INDEX CONCURRENTLY {LEGACY_KEY_INDEX}")
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {LEGACY_KEY_INDEX}
+            ON audit_logs (audit_id, partition_date)
+        """)
+
+
+def _convert_heap(conn, first_partition: date) -> None:
+    """Turn a plain audit_logs table into a partitioned one without copying rows."""
+    index_defs = conn.execute(sa.text("""
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE tablename = 'audit_logs' AND schemaname = current_schema()
+    """)).fetchall()
+    primary_key = conn.execute(sa.text("""
+        SELECT con.conname, idx.relname FROM pg_constraint con
+        JOIN pg_class idx ON idx.oid = con.conindid
+        WHERE con.conrelid = 'audit_logs'::regclass AND con.contype = 'p'
+    """)).first()
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    # Swap the (audit_id) key for the prebuilt (audit_id, partition_date)
+    # one; both columns are NOT NULL, so this only changes the catalog
+    if primary_key:
+        op.execute(f'ALTER TABLE audit_logs_legacy DROP CONSTRAINT "{primary_key.conname}"')
+    op.execute(
+        f"ALTER TABLE audit_logs_legacy ADD CONSTRAINT audit_logs_legacy_pkey "
+        f"PRIMARY KEY USING INDEX {LEGACY_KEY_INDEX}"
+    )
+    index_defs = [
+        (index_name, index_def) for index_name, index_def in index_defs
+        if index_name != LEGACY_KEY_INDEX and (not primary_key or index_name != primary_key.relname)
+    ]
+    for index_name, _ in index_defs:
+        op.execute(f'ALTER INDEX "{index_name}" RENAME TO "{index_name[:56]}_legacy"')
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            LIKE audit_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (partition_date)
+    """)
+    # LIKE copied the legacy range check, which must not apply to new partitions
+    op.execute(f"ALTER TABLE audit_logs DROP CONSTRAINT {LEGACY_RANGE_CHECK}")
+    op.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (audit_id, partition_date)")
+
+    # Recreate the non-unique indexes on the parent; the renamed legacy
+    # indexes, and its new primary key, are reused for the legacy
+    # partition when it is attached.
+    for index_name, index_def in index_defs:
+        if index_def.startswith("CREATE UNIQUE"):
+            continue
+        op.execute(index_def)
+
+    op.execute(f"""
+        ALTER TABLE audit_logs ATTACH PARTITION audit_logs_legacy
+        FOR VALUES FROM (MINVALUE) TO ('{first_partition.isoformat()}')
+    """)
+    # The validated check let ATTACH skip its scan; the partition bound now enforces it
+    op.execute(f"ALTER TABLE audit_logs_legacy DROP CONSTRAINT {LEGACY_RANGE_CHECK}")
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    conn = op.get_bind()
+    relkind = conn.execute(sa.text("""
+        SELECT c.relkind FROM pg_class c
+        JOIN pg_namespace ns ON ns.oid = c.relnamespace
+        WHERE c.relname = 'audit_logs' AND ns.nspname = current_schema()
+    """)).scalar()
+
+    current_month = _month_start(date.today())
+
+    if relkind == 'r':
+        latest = conn.execute(sa.text("SELECT max(partition_date) FROM audit_logs")).scalar()
+        # The legacy partition also takes the current month, so the range
+        # check accepts the rows written while the migration runs
+        next_month = _month_start(current_month, 1)
+        first_partition = max(next_month, _month_start(latest, 1)) if latest else next_month
+        _validate_legacy_range(first_partition)
+        _build_legacy_key(conn)
+        _convert_heap(conn, first_partition)
+    else:
+        first_partition = current_month
+
+    for offset in range(3):
+        start = _month_start(first_partition, offset)
+        end = _month_start(first_partition, offset + 1)
+        name = f"audit_logs_{start.strftime('%Y_%m')}"
+        exists = conn.execute(sa.text("""
+            SELECT 1 FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'audit_logs' AND child.relname = :name
+        """), {"name": name}).scalar()
+        if exists:
+            continue
+        op.execute(f"""
+            CREATE TABLE {name} PARTITION OF audit_logs
+            FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+        """)
+        op.execute(f"""
+            INSERT INTO audit_log_partitions (id, partition_name, start_date, end_date, record_count, size_bytes, is_active)
+            VALUES (gen_random_uuid(), '{name}', '{start.isoformat()}', '{end.isoformat()}', 0, 0, true)
+            ON CONFLICT (partition_name) DO NOTHING
+        """)
+
+    op.execute("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    # Converting back to a heap would require copying every row; only the
+    # default partition is removed.
+    op.execute("DROP TABLE IF EXISTS audit_logs_default")
@@ -0,0 +1,55 @@
+"""Add audit_event_rollups table
+
+Revision ID: 744dd75d2a90
+Revises: 7d9c05c602ef
+Create Date: 2026-10-16 09:12:41.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '744dd75d2a90'
+down_revision = '7d9c05c602ef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('audit_event_rollups',
+    sa.Column('tenant_id', sa.String(length=255), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('service_name', sa.String(length=100), nullable=False),
+    sa.Column('event_count', sa.BigInteger(), nullable=False),
+    sa.CheckConstraint("granularity IN ('minute', 'hour')", name='ck_audit_event_rollups_granularity'),
+    sa.PrimaryKeyConstraint('tenant_id', 'granularity', 'bucket_start', 'event_type', 'status', 'service_name')
+    )
+    op.create_index('idx_audit_event_rollups_bucket', 'audit_event_rollups', ['granularity', 'bucket_start'], unique=False)
+
+    # Backfill from existing events; minute buckets only within their default retention
+    op.execute("""
+        INSERT INTO audit_event_rollups
+            (tenant_id, granularity, bucket_start, event_type, status, service_name, event_count)
+        SELECT tenant_id, 'hour', date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', event_type, status, service_name, count(*)
+        FROM audit_logs
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    op.execute("""
+        INSERT INTO audit_event_rollups
+            (tenant_id, granularity, bucket_start, event_type, status, service_name, event_count)
+        SELECT tenant_id, 'minute', date_trunc('minute', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', event_type, status, service_name, count(*)
+        FROM audit_logs
+        WHERE timestamp >= now() - interval '48 hours'
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('idx_audit_event_rollups_bucket', table_name='audit_event_rollups')
+    op.drop_table('audit_event_rollups')
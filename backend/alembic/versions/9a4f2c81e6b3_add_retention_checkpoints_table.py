@@ -0,0 +1,35 @@
+"""Add retention_checkpoints table
+
+Revision ID: 9a4f2c81e6b3
+Revises: 5b1e7c9d3f20
+Create Date: 2026-10-16 13:27:05.841372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f2c81e6b3'
+down_revision = '5b1e7c9d3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('retention_checkpoints',
+    sa.Column('policy_name', sa.String(length=100), nullable=False),
+    sa.Column('cutoff', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_partition_date', sa.Date(), nullable=False),
+    sa.Column('last_audit_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('deleted_count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('policy_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table('retention_checkpoints')
@@ -0,0 +1,33 @@
+"""Add archive_progress table
+
+Revision ID: b7e3d5a92c41
+Revises: a8c4e2f19d63
+Create Date: 2026-10-17 14:12:38.270914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d5a92c41'
+down_revision = 'a8c4e2f19d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('archive_progress',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('archived_until', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_run_id', sa.String(length=255), nullable=False),
+    sa.Column('archived_count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_table('archive_progress')
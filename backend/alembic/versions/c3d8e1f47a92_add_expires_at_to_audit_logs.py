@@ -0,0 +1,54 @@
+"""Add expires_at to audit_logs
+
+Revision ID: c3d8e1f47a92
+Revises: 9a4f2c81e6b3
+Create Date: 2026-10-16 15:04:51.117630
+
+The column is added empty so the migration does not rewrite audit_logs;
+new rows get it on insert and RetentionService backfills existing rows in
+chunks (see scripts/backfill-expires-at.py to run the backfill directly).
+The index is built without blocking writes: the parent index is created
+with ONLY and each partition's index is built concurrently and attached.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8e1f47a92'
+down_revision = '9a4f2c81e6b3'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'idx_audit_logs_expires_at'
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('audit_logs', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    conn = op.get_bind()
+    partitions = conn.execute(sa.text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+        WHERE parent.relname = 'audit_logs' AND ns.nspname = current_schema()
+    """)).scalars().all()
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY audit_logs (expires_at)")
+    with op.get_context().autocommit_block():
+        for name in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}_expires_at_idx" '
+                f'ON "{name}" (expires_at)'
+            )
+    # The parent index becomes valid once every partition's index is attached
+    for name in partitions:
+        op.execute(f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION "{name}_expires_at_idx"')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(INDEX_NAME, table_name='audit_logs')
+    op.drop_column('audit_logs', 'expires_at')
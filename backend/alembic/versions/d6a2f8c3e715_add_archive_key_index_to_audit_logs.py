@@ -0,0 +1,52 @@
+"""Add (partition_date, tenant_id, audit_id) index to audit_logs
+
+Revision ID: d6a2f8c3e715
+Revises: b7e3d5a92c41
+Create Date: 2026-10-17 16:05:12.418637
+
+Archive runs page through audit_logs in (partition_date, tenant_id,
+audit_id) order so each tenant-day lands in its own segments. The
+(partition_date, tenant_id) index cannot serve that order, so without
+this index every page re-sorts the rest of its tenant-day. As with the
+partition key index, the parent index is created with ONLY and each
+partition's index is built concurrently and then attached.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a2f8c3e715'
+down_revision = 'b7e3d5a92c41'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'idx_audit_logs_archive_key'
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    conn = op.get_bind()
+    partitions = conn.execute(sa.text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+        WHERE parent.relname = 'audit_logs' AND ns.nspname = current_schema()
+    """)).scalars().all()
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY audit_logs (partition_date, tenant_id, audit_id)")
+    with op.get_context().autocommit_block():
+        for name in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}_archive_key_idx" '
+                f'ON "{name}" (partition_date, tenant_id, audit_id)'
+            )
+    # The parent index becomes valid once every partition's index is attached
+    for name in partitions:
+        op.execute(f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION "{name}_archive_key_idx"')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(INDEX_NAME, table_name='audit_logs')
@@ -0,0 +1,49 @@
+"""Add backup_catalog table
+
+Revision ID: e5a1b7c04d19
+Revises: c3d8e1f47a92
+Create Date: 2026-10-16 20:41:12.503318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1b7c04d19'
+down_revision = 'c3d8e1f47a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('backup_catalog',
+    sa.Column('backup_id', sa.String(length=255), nullable=False),
+    sa.Column('config_name', sa.String(length=100), nullable=False),
+    sa.Column('backup_type', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('parent_id', sa.String(length=255), nullable=True),
+    sa.Column('chain_depth', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('window_end', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('file_path', sa.Text(), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('record_count', sa.BigInteger(), nullable=True),
+    sa.Column('checksum', sa.String(length=64), nullable=True),
+    sa.Column('parts', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['backup_catalog.backup_id'], ),
+    sa.PrimaryKeyConstraint('backup_id')
+    )
+    op.create_index('idx_backup_catalog_config_status_start', 'backup_catalog', ['config_name', 'status', 'start_time'], unique=False)
+    op.create_index('idx_backup_catalog_parent', 'backup_catalog', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('idx_backup_catalog_parent', table_name='backup_catalog')
+    op.drop_index('idx_backup_catalog_config_status_start', table_name='backup_catalog')
+    op.drop_table('backup_catalog')
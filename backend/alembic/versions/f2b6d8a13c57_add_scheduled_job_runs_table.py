@@ -0,0 +1,41 @@
+"""Add scheduled_job_runs table
+
+Revision ID: f2b6d8a13c57
+Revises: e5a1b7c04d19
+Create Date: 2026-10-16 23:12:40.281944
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8a13c57'
+down_revision = 'e5a1b7c04d19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('scheduled_job_runs',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('leader', sa.String(length=255), nullable=False),
+    sa.Column('scheduled_for', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration_seconds', sa.Float(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_scheduled_job_runs_job_started', 'scheduled_job_runs', ['job_name', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('idx_scheduled_job_runs_job_started', table_name='scheduled_job_runs')
+    op.drop_table('scheduled_job_runs')
@@ -0,0 +1,53 @@
+"""Add BRIN index on audit_logs.created_at
+
+Revision ID: f8b4c1d9a062
+Revises: d6a2f8c3e715
+Create Date: 2026-10-17 16:48:30.715204
+
+Incremental backups filter audit_logs on created_at; a BRIN index stays
+tiny because created_at grows with insertion order. The parent index is
+created with ONLY and each partition's index is built concurrently and
+then attached. Databases that got the index from an earlier revision of
+e5a1b7c04d19 already have it and are left as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b4c1d9a062'
+down_revision = 'd6a2f8c3e715'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'idx_audit_logs_created_at_brin'
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    conn = op.get_bind()
+    if conn.execute(sa.text(f"SELECT to_regclass('{INDEX_NAME}')")).scalar() is not None:
+        return
+    partitions = conn.execute(sa.text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+        WHERE parent.relname = 'audit_logs' AND ns.nspname = current_schema()
+    """)).scalars().all()
+
+    op.execute(f"CREATE INDEX {INDEX_NAME} ON ONLY audit_logs USING brin (created_at)")
+    with op.get_context().autocommit_block():
+        for name in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}_created_at_brin_idx" '
+                f'ON "{name}" USING brin (created_at)'
+            )
+    # The parent index becomes valid once every partition's index is attached
+    for name in partitions:
+        op.execute(f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION "{name}_created_at_brin_idx"')
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(INDEX_NAME, table_name='audit_logs')
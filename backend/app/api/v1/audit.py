@@ -7,7 +7,7 @@ audit log events with multi-tenant support and advanced filtering.
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import structlog
 
 from app.api.middleware import (
@@ -18,6 +18,8 @@ from app.core.exceptions import (
     NotFoundError,
     ValidationError,
     AuthorizationError,
+    RateLimitError,
+    ServiceUnavailableError,
 )
 from app.models.audit import (
     AuditEventCreate,
@@ -25,6 +27,7 @@ from app.models.audit import (
     AuditEventResponse,
     AuditEventQuery,
     AuditEventQueryResponse,
+    AuditSummaryResponse,
     PaginatedResponse,
     DynamicFilter,
     DynamicFilterGroup,
@@ -38,8 +41,10 @@ from app.models.metrics import (
     MetricsResponse,
 )
 from app.models.auth import Permission
-from app.models.base import PaginationParams, SortOrder
+from app.models.base import CountMode, PaginationParams, SortOrder
 from app.services.audit_service import get_audit_service
+from app.services.export_service import gzip_stream
+from app.utils.cache_keys import query_fingerprint
 from datetime import datetime
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -105,6 +110,18 @@ async def create_audit_event(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e),
         )
+    except RateLimitError as e:
+        # Ingestion buffer is full; ask the client to back off
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+        )
+    except ServiceUnavailableError as e:
+        # Ingestion buffer is shutting down; the client can retry elsewhere
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error("Failed to create audit event", error=str(e))
         raise HTTPException(
@@ -192,6 +209,8 @@ async def get_audit_events(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    count: CountMode = Query(CountMode.EXACT, description="Total count mode: exact, estimated or none"),
     # Standard filtering parameters
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
@@ -218,6 +237,10 @@ async def get_audit_events(
     This endpoint allows authorized users to retrieve audit log events with
     comprehensive filtering, sorting, and pagination capabilities.
     
+    For deep result sets pass the previous response's `next_cursor` as
+    `cursor` to page by keyset instead of offset, and use `count=estimated`
+    or `count=none` to avoid an exact count on every request.
+    
     **Required Permission**: AUDIT_READ
     """
     try:
@@ -274,7 +297,12 @@ async def get_audit_events(
             sort_order=sort_order,
         )
         
-        pagination = PaginationParams(page=page, size=size)
+        pagination = PaginationParams(
+            page=page,
+            page_size=size,
+            cursor=cursor,
+            count_mode=count,
+        )
         
         audit_service = get_audit_service()
         results = await audit_service.query_audit_logs(
@@ -312,64 +340,13 @@ async def get_audit_events(
         )
 
 
-@router.get("/events/{audit_id}", response_model=AuditEventResponse)
-@require_permission(Permission.READ_AUDIT)
-@limiter.limit("500/minute")
-async def get_audit_event(
-    request: Request,
-    audit_id: str,
-):
-    """
-    Get a specific audit log event by ID.
-    
-    This endpoint allows authorized users to retrieve a single audit log
-    event by its unique identifier.
-    
-    **Required Permission**: AUDIT_READ
-    """
-    try:
-        user_id, tenant_id, _, _ = get_current_user(request)
-        
-        audit_service = get_audit_service()
-        result = await audit_service.get_audit_log(
-            audit_id=audit_id,
-            tenant_id=tenant_id,
-            user_id=user_id,
-        )
-        
-        logger.info(
-            "Audit event retrieved via API",
-            audit_id=audit_id,
-            tenant_id=tenant_id,
-        )
-        
-        return result
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e),
-        )
-    except AuthorizationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e),
-        )
-    except Exception as e:
-        logger.error("Failed to get audit event", audit_id=audit_id, error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get audit event",
-        )
-
-
-@router.get("/events/export", response_model=AuditEventQueryResponse)
+@router.get("/events/export", response_class=StreamingResponse)
 @require_permission(Permission.EXPORT_AUDIT)
 @limiter.limit("10/minute")  # Low rate limit for exports
 async def export_audit_events(
     request: Request,
     # Export parameters
-    format: str = Query("json", regex="^(json|csv)$", description="Export format"),
+    format: str = Query("ndjson", regex="^(json|ndjson|csv|parquet)$", description="Export format"),
     # Standard filtering parameters
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
@@ -391,11 +368,12 @@ async def export_audit_events(
     sort_order: SortOrder = Query(SortOrder.DESC, description="Sort order"),
 ):
     """
-    Export audit log events in CSV or JSON format.
+    Export audit log events as JSON, NDJSON, CSV or Parquet.
     
     This endpoint allows authorized users to export audit log events
-    with the same filtering capabilities as the query endpoint.
-    Maximum export size is 100,000 records.
+    with the same filtering capabilities as the query endpoint. The export
+    is streamed from a server-side cursor, so there is no size limit, and
+    text formats are gzip-encoded when the client accepts it.
     
     **Required Permission**: EXPORT_DATA
     """
@@ -454,21 +432,29 @@ async def export_audit_events(
         )
         
         audit_service = get_audit_service()
-        result = await audit_service.export_audit_logs(
+        encoder, body = await audit_service.export_audit_logs(
             query=query,
             tenant_id=tenant_id,
             user_id=user_id,
             export_format=format,
         )
         
+        filename = f"audit-export-{query_fingerprint(query)[:12]}.{encoder.extension}"
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Vary": "Accept-Encoding",
+        }
+        if encoder.compressible and "gzip" in request.headers.get("accept-encoding", ""):
+            body = gzip_stream(body)
+            headers["Content-Encoding"] = "gzip"
+        
         logger.info(
-            "Audit events exported via API",
+            "Audit events export started via API",
             tenant_id=tenant_id,
             format=format,
-            count=result.count,
         )
         
-        return result
+        return StreamingResponse(body, media_type=encoder.media_type, headers=headers)
         
     except ValidationError as e:
         raise HTTPException(
@@ -488,7 +474,58 @@ async def export_audit_events(
         )
 
 
-@router.get("/summary", response_model=AuditEventQueryResponse)
+@router.get("/events/{audit_id}", response_model=AuditEventResponse)
+@require_permission(Permission.READ_AUDIT)
+@limiter.limit("500/minute")
+async def get_audit_event(
+    request: Request,
+    audit_id: str,
+):
+    """
+    Get a specific audit log event by ID.
+    
+    This endpoint allows authorized users to retrieve a single audit log
+    event by its unique identifier.
+    
+    **Required Permission**: AUDIT_READ
+    """
+    try:
+        user_id, tenant_id, _, _ = get_current_user(request)
+        
+        audit_service = get_audit_service()
+        result = await audit_service.get_audit_log(
+            audit_id=audit_id,
+            tenant_id=tenant_id,
+            user_id=user_id,
+        )
+        
+        logger.info(
+            "Audit event retrieved via API",
+            audit_id=audit_id,
+            tenant_id=tenant_id,
+        )
+        
+        return result
+        
+    except NotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except AuthorizationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error("Failed to get audit event", audit_id=audit_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get audit event",
+        )
+
+
+@router.get("/summary", response_model=AuditSummaryResponse)
 @require_permission(Permission.READ_AUDIT)
 @limiter.limit("100/minute")
 async def get_audit_summary(
@@ -506,12 +543,18 @@ async def get_audit_summary(
     session_ids: Optional[List[str]] = Query(None, description="Session ID filters"),
     correlation_ids: Optional[List[str]] = Query(None, description="Correlation ID filters"),
     search: Optional[str] = Query(None, description="Search term"),
+    # Summary parameters
+    facets: Optional[List[str]] = Query(
+        None, description="Columns to summarize (event_type, action, status, service_name, resource_type, user_id)"
+    ),
+    top: Optional[int] = Query(None, ge=1, description="Number of values returned per facet"),
 ):
     """
     Get audit log statistics and summary metrics.
     
-    This endpoint provides summary statistics for audit log events
-    including counts by event type, severity, and resource type.
+    This endpoint provides the total event count and the top values of
+    each requested facet (by default event type, status and resource
+    type), all computed in a single pass over the matching events.
     
     **Required Permission**: AUDIT_READ
     """
@@ -538,6 +581,8 @@ async def get_audit_summary(
             query=query,
             tenant_id=tenant_id,
             user_id=user_id,
+            facets=facets,
+            top_n=top,
         )
         
         logger.info(
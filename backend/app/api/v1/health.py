@@ -16,7 +16,7 @@ from pydantic import BaseModel
 
 from app.config import get_settings
 from app.db.database import get_database
-from app.services.cache_service import get_cache_service
+from app.services.cache_service import get_cache_service_async
 from app.services.nats_service import get_nats_service
 
 logger = structlog.get_logger(__name__)
@@ -103,7 +103,7 @@ async def check_cache_health() -> ComponentHealth:
     start_time = time.time()
     
     try:
-        cache = await get_cache_service()
+        cache = await get_cache_service_async()
         
         # Test basic operations
         test_key = "health_check_test"
@@ -6,6 +6,7 @@ with support for environment variables and .env files.
 """
 
 import os
+import re
 from typing import Any, Dict, List, Optional, Union
 
 from pydantic import Field, validator
@@ -29,6 +30,28 @@ class DatabaseSettings(BaseSettings):
         env_prefix = "DATABASE_"
 
 
+class PartitionSettings(BaseSettings):
+    """audit_logs range partitioning settings."""
+    
+    enabled: bool = Field(default=True, description="Create upcoming partitions automatically")
+    granularity: str = Field(default="monthly", description="Partition size (daily or monthly)")
+    premake: int = Field(default=3, description="Number of future partitions kept ready")
+    maintenance_interval_seconds: int = Field(
+        default=3600, description="How often upcoming partitions are checked"
+    )
+    
+    @validator("granularity")
+    def validate_granularity(cls, v: str) -> str:
+        """Validate partition granularity."""
+        allowed = ["daily", "monthly"]
+        if v not in allowed:
+            raise ValueError(f"Partition granularity must be one of: {allowed}")
+        return v
+    
+    class Config:
+        env_prefix = "PARTITION_"
+
+
 class RedisSettings(BaseSettings):
     """Redis configuration settings."""
     
@@ -39,6 +62,10 @@ class RedisSettings(BaseSettings):
     pool_size: int = Field(default=10, description="Connection pool size")
     cache_ttl: int = Field(default=3600, description="Default cache TTL in seconds")
     max_connections: int = Field(default=50, description="Maximum connections")
+    socket_timeout: float = Field(default=1.0, description="Socket connect/read timeout in seconds")
+    local_cache_max_entries: int = Field(default=1024, description="In-process cache size (entries)")
+    local_cache_ttl_seconds: float = Field(default=5.0, description="In-process cache TTL in seconds")
+    invalidation_coalesce_ms: int = Field(default=50, description="Debounce window for invalidation broadcasts")
     
     class Config:
         env_prefix = "REDIS_"
@@ -55,6 +82,23 @@ class NATSSettings(BaseSettings):
     client_id: str = Field(default="audit-api", description="NATS client ID")
     max_reconnect: int = Field(default=10, description="Maximum reconnection attempts")
     reconnect_wait: int = Field(default=2, description="Reconnection wait time in seconds")
+    reconnect_buffer_bytes: int = Field(
+        default=8 * 1024 * 1024, description="Outgoing bytes buffered while reconnecting"
+    )
+    stream_name: str = Field(default="AUDIT", description="JetStream stream holding audit messages")
+    stream_subjects: List[str] = Field(
+        default=["audit.events.>", "audit.batch.>"],
+        description=(
+            "Subjects published to and consumed from JetStream; audit.system.> stays on "
+            "core NATS so broadcasts such as cache invalidations reach every pod"
+        ),
+    )
+    max_in_flight: int = Field(default=512, description="JetStream publishes awaiting their ack at once")
+    publish_timeout_seconds: float = Field(default=5.0, description="How long a publish waits for its ack")
+    fetch_batch_size: int = Field(default=100, description="Messages fetched per pull consumer request")
+    fetch_timeout_seconds: float = Field(default=1.0, description="How long a fetch waits for messages")
+    ack_wait_seconds: int = Field(default=30, description="Redelivery delay for unacknowledged messages")
+    max_deliver: int = Field(default=5, description="Delivery attempts before a message is dropped")
     
     class Config:
         env_prefix = "NATS_"
@@ -153,10 +197,25 @@ class PaginationSettings(BaseSettings):
         env_prefix = "PAGINATION_"
 
 
+class SummarySettings(BaseSettings):
+    """Summary statistics settings."""
+    
+    default_facets: List[str] = Field(
+        default=["event_type", "status", "resource_type"],
+        description="Facets summarized when a request does not specify any",
+    )
+    top_n: int = Field(default=10, description="Default number of values returned per facet")
+    max_top_n: int = Field(default=100, description="Maximum number of values returned per facet")
+    
+    class Config:
+        env_prefix = "SUMMARY_"
+
+
 class ExportSettings(BaseSettings):
     """Export functionality settings."""
     
-    max_records: int = Field(default=100000, description="Maximum records per export")
+    max_records: Optional[int] = Field(default=None, description="Optional cap on records per export (unbounded if unset)")
+    chunk_size: int = Field(default=5000, description="Rows fetched per server-side cursor round trip")
     timeout_seconds: int = Field(default=300, description="Export timeout in seconds")
     
     class Config:
@@ -172,11 +231,65 @@ class WorkerSettings(BaseSettings):
     batch_timeout_seconds: int = Field(
         default=5, description="Batch timeout in seconds"
     )
+    tenant_buffer_size: int = Field(
+        default=5000, description="Events buffered per tenant before the consumer waits"
+    )
+    max_buffered_events: int = Field(
+        default=50000, description="Events buffered across all tenants before the consumer waits"
+    )
+    processes: int = Field(default=1, ge=1, description="Worker processes run by the supervisor")
+    heartbeat_timeout_seconds: float = Field(
+        default=30.0, description="Restart a worker process whose event loop has not reported for this long"
+    )
+    drain_timeout_seconds: float = Field(
+        default=30.0, description="Time a worker process gets to drain on shutdown before it is killed"
+    )
+    restart_backoff_seconds: float = Field(
+        default=1.0, description="Delay before restarting a failed worker process, doubled on each repeated failure"
+    )
+    max_restart_backoff_seconds: float = Field(
+        default=60.0, description="Upper bound for the worker restart delay"
+    )
     
     class Config:
         env_prefix = "WORKER_"
 
 
+class IngestionSettings(BaseSettings):
+    """Write-behind ingestion buffer settings."""
+    
+    buffer_enabled: bool = Field(
+        default=True, description="Coalesce single-event writes into group commits"
+    )
+    max_batch_size: int = Field(default=500, description="Maximum rows per group commit")
+    max_latency_ms: int = Field(
+        default=10, description="Maximum time a row waits before its group is flushed"
+    )
+    queue_size: int = Field(default=10000, description="Maximum queued rows before backpressure")
+    enqueue_timeout_seconds: float = Field(
+        default=1.0, description="How long a request waits for queue space before rejection"
+    )
+    
+    class Config:
+        env_prefix = "INGESTION_"
+
+
+class RollupSettings(BaseSettings):
+    """Time-bucket rollup settings for metrics."""
+    
+    enabled: bool = Field(default=True, description="Maintain rollups on ingestion")
+    minute_retention_hours: int = Field(
+        default=48, description="How long minute buckets are kept"
+    )
+    hour_retention_days: int = Field(default=400, description="How long hour buckets are kept")
+    flush_interval_seconds: float = Field(
+        default=1.0, description="How often counts of ingested rows are written to the rollups"
+    )
+    
+    class Config:
+        env_prefix = "ROLLUP_"
+
+
 class RetentionSettings(BaseSettings):
     """Data retention settings."""
     
@@ -189,11 +302,100 @@ class RetentionSettings(BaseSettings):
     cleanup_interval_hours: int = Field(
         default=24, description="Cleanup job interval in hours"
     )
+    delete_chunk_size: int = Field(
+        default=5000, description="Rows deleted per retention delete transaction"
+    )
+    delete_chunk_sleep_ms: int = Field(
+        default=100, description="Pause between retention delete chunks"
+    )
+    delete_time_budget_seconds: float = Field(
+        default=0, description="Stop a policy's delete after this long and resume next run (0 = no limit)"
+    )
+    estimate_sample_rows: int = Field(
+        default=100000, description="Rows read by TABLESAMPLE when estimating retention impact"
+    )
+    exact_stats_ttl_seconds: int = Field(
+        default=3600, description="How long exact retention counts from the background job are served"
+    )
     
     class Config:
         env_prefix = "RETENTION_"
 
 
+class ArchiveSettings(BaseSettings):
+    """Audit log archival settings."""
+    
+    directory: str = Field(default="/tmp/audit_archive", description="Root directory for archive runs")
+    format: str = Field(default="parquet", description="Segment format (parquet or ndjson)")
+    segment_max_bytes: int = Field(
+        default=128 * 1024 * 1024, description="Compressed size at which a segment file is closed"
+    )
+    fetch_size: int = Field(default=5000, description="Rows read per keyset page")
+    
+    @validator("format")
+    def validate_format(cls, v: str) -> str:
+        """Validate archive segment format."""
+        allowed = ["parquet", "ndjson"]
+        if v not in allowed:
+            raise ValueError(f"Archive format must be one of: {allowed}")
+        return v
+    
+    class Config:
+        env_prefix = "ARCHIVE_"
+
+
+class BackupSettings(BaseSettings):
+    """Audit log backup settings."""
+    
+    directory: str = Field(default="/tmp/audit_backups", description="Root directory for backups")
+    shards: int = Field(default=16, description="Date-range shards a backup is split into")
+    connections: int = Field(default=4, description="Shards read concurrently, one connection each")
+    workers: int = Field(default=0, description="Encoder processes (0 = one per CPU)")
+    fetch_size: int = Field(default=5000, description="Rows read per keyset page")
+    compression_level: int = Field(default=6, description="gzip level for backup parts")
+    restore_chunk_size: int = Field(default=10000, description="Rows merged per restore transaction")
+    max_chain_length: int = Field(default=24, description="Incrementals on one base before a new full backup")
+    verify_workers: int = Field(default=4, description="Threads hashing backup parts during verification")
+    consistency_lag_seconds: float = Field(
+        default=60.0,
+        description=(
+            "Rows created this recently are left to the next backup; must exceed the longest "
+            "time between stamping created_at and committing the row (ingestion buffer plus commit)"
+        ),
+    )
+    
+    class Config:
+        env_prefix = "BACKUP_"
+
+
+class SchedulerSettings(BaseSettings):
+    """Background job scheduler settings."""
+    
+    enabled: bool = Field(default=True, description="Run retention and backup jobs on their schedules")
+    tick_seconds: int = Field(default=30, description="How often due jobs and the leader lease are checked")
+    lease_key: int = Field(
+        default=7207001, description="PostgreSQL advisory lock key held by the scheduler leader"
+    )
+    off_peak_window: str = Field(
+        default="01:00-05:00", description="UTC window heavy jobs may start in (HH:MM-HH:MM, empty = any time)"
+    )
+    retention_schedule: str = Field(default="0 1 * * *", description="Cron schedule of retention cleanup")
+    retention_time_budget_seconds: float = Field(
+        default=3600, description="Stop retention deletes after this long (0 = until the window closes)"
+    )
+    backup_cleanup_schedule: str = Field(default="30 4 * * *", description="Cron schedule of backup cleanup")
+    
+    @validator("off_peak_window")
+    def validate_off_peak_window(cls, v: str) -> str:
+        """Validate the off-peak window format."""
+        if v and not re.fullmatch(r"\d{2}:\d{2}-\d{2}:\d{2}", v):
+            raise ValueError("Off-peak window must look like HH:MM-HH:MM")
+        return v
+    
+    class Config:
+        env_prefix = "SCHEDULER_"
+
+
 class BigQuerySettings(BaseSettings):
     """BigQuery configuration for production."""
     
@@ -254,6 +456,7 @@ class Settings(BaseSettings):
     
     # Component settings
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
+    partition: PartitionSettings = Field(default_factory=PartitionSettings)
     redis: RedisSettings = Field(default_factory=RedisSettings)
     nats: NATSSettings = Field(default_factory=NATSSettings)
     security: SecuritySettings = Field(default_factory=SecuritySettings)
@@ -262,9 +465,15 @@ class Settings(BaseSettings):
     monitoring: MonitoringSettings = Field(default_factory=MonitoringSettings)
     rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
     pagination: PaginationSettings = Field(default_factory=PaginationSettings)
+    summary: SummarySettings = Field(default_factory=SummarySettings)
     export: ExportSettings = Field(default_factory=ExportSettings)
     worker: WorkerSettings = Field(default_factory=WorkerSettings)
+    ingestion: IngestionSettings = Field(default_factory=IngestionSettings)
+    rollup: RollupSettings = Field(default_factory=RollupSettings)
     retention: RetentionSettings = Field(default_factory=RetentionSettings)
+    archive: ArchiveSettings = Field(default_factory=ArchiveSettings)
+    backup: BackupSettings = Field(default_factory=BackupSettings)
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
     bigquery: BigQuerySettings = Field(default_factory=BigQuerySettings)
     pubsub: PubSubSettings = Field(default_factory=PubSubSettings)
     features: FeatureFlags = Field(default_factory=FeatureFlags)
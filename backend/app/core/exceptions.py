@@ -92,6 +92,17 @@ class RateLimitError(AuditLogException):
         )
 
 
+class ServiceUnavailableError(AuditLogException):
+    """Raised when a component is not accepting work, e.g. while shutting down."""
+    
+    def __init__(self, message: str = "Service unavailable"):
+        super().__init__(
+            message=message,
+            error_code="service_unavailable",
+            status_code=503,
+        )
+
+
 class DatabaseError(AuditLogException):
     """Raised when database operations fail."""
     
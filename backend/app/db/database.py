@@ -5,6 +5,8 @@ This module provides database connection management, session handling,
 and basic database operations using SQLAlchemy with async support.
 """
 
+import json
+from datetime import date, datetime, timezone
 from typing import AsyncGenerator, Optional, Any, Dict, List
 from contextlib import asynccontextmanager
 
@@ -12,6 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngin
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text, select, func
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 import structlog
 
 from app.config import DatabaseSettings
@@ -307,58 +311,59 @@ class BaseRepository:
             raise DatabaseError(f"Failed to execute query: {str(e)}")
 
 
-# Utility functions for database operations
-async def create_partition_if_not_exists(partition_date: str) -> None:
-    """Create audit log partition for the given date if it doesn't exist."""
-    manager = get_database_manager()
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper that keeps the statement's bound parameters."""
     
-    partition_name = f"audit_logs_{partition_date.replace('-', '_')}"
-    start_date = partition_date
-    end_date = f"DATE '{partition_date}' + INTERVAL '1 month'"
+    inherit_cache = False
     
-    create_partition_sql = f"""
-    CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF audit_logs
-    FOR VALUES FROM ('{start_date}') TO ({end_date});
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_row_count(session: AsyncSession, stmt) -> Optional[int]:
+    """
+    Estimate the number of rows a SELECT returns using the query planner.
+    
+    Returns None on databases other than PostgreSQL, in which case callers
+    should fall back to an exact count.
     """
+    if session.get_bind().dialect.name != "postgresql":
+        return None
     
     try:
-        await manager.execute_raw_query(create_partition_sql)
-        logger.info("Created partition", partition_name=partition_name)
-    except Exception as e:
-        logger.error("Failed to create partition", partition_name=partition_name, error=str(e))
-        # Don't raise exception as partition might already exist
+        result = await session.execute(Explain(stmt))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (SQLAlchemyError, KeyError, IndexError, TypeError, ValueError) as e:
+        logger.warning("Failed to estimate row count", error=str(e))
+        return None
+
+
+# Utility functions for database operations
+async def create_partition_if_not_exists(partition_date: str) -> None:
+    """Create the audit log partitions up to and including the given date's."""
+    from app.db.partitioning import get_partition_manager
+    
+    await get_partition_manager().ensure_partitions(today=date.fromisoformat(partition_date))
 
 
 async def cleanup_old_partitions(retention_months: int = 12) -> List[str]:
-    """Clean up old audit log partitions based on retention policy."""
-    manager = get_database_manager()
+    """Drop audit log partitions that ended more than ``retention_months`` ago."""
+    from app.db.partitioning import get_partition_manager
     
-    # Get list of partitions older than retention period
-    query = """
-    SELECT schemaname, tablename 
-    FROM pg_tables 
-    WHERE tablename LIKE 'audit_logs_%'
-    AND tablename < 'audit_logs_' || TO_CHAR(CURRENT_DATE - INTERVAL '%s months', 'YYYY_MM')
-    """
+    today = datetime.now(timezone.utc).date()
+    months = today.year * 12 + today.month - 1 - retention_months
+    cutoff = date(months // 12, months % 12 + 1, 1)
     
     try:
-        result = await manager.execute_raw_query(query, {"months": retention_months})
-        old_partitions = result.fetchall()
-        
-        dropped_partitions = []
-        for partition in old_partitions:
-            partition_name = partition.tablename
-            drop_sql = f"DROP TABLE IF EXISTS {partition_name}"
-            
-            try:
-                await manager.execute_raw_query(drop_sql)
-                dropped_partitions.append(partition_name)
-                logger.info("Dropped old partition", partition_name=partition_name)
-            except Exception as e:
-                logger.error("Failed to drop partition", partition_name=partition_name, error=str(e))
-        
-        return dropped_partitions
-        
+        return await get_partition_manager().drop_partitions_before(cutoff)
     except Exception as e:
         logger.error("Failed to cleanup old partitions", error=str(e))
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,354 @@
+"""
+Range partition management for the audit log framework.
+
+audit_logs is range-partitioned on partition_date (the UTC date of the
+event). This module creates upcoming daily or monthly partitions ahead of
+time, keeps the audit_log_partitions registry in sync, and drops whole
+partitions once every row in them has expired, which is far cheaper than
+deleting the rows one by one.
+
+Rows outside every range land in the default partition. PostgreSQL refuses
+to create a partition whose range already has rows in the default one, so
+such rows are moved into the new partition while the default partition is
+detached.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+import structlog
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import PartitionSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditLog, AuditLogPartition
+
+logger = structlog.get_logger(__name__)
+
+PARENT_TABLE = AuditLog.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+DAILY = "daily"
+MONTHLY = "monthly"
+
+_BOUND_PATTERN = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+_LIST_PARTITIONS_SQL = text("""
+    SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+    WHERE parent.relname = :parent AND ns.nspname = current_schema()
+""")
+
+_IS_PARTITIONED_SQL = text("""
+    SELECT c.relkind = 'p'
+    FROM pg_class c
+    JOIN pg_namespace ns ON ns.oid = c.relnamespace
+    WHERE c.relname = :parent AND ns.nspname = current_schema()
+""")
+
+
+@dataclass(frozen=True)
+class PartitionRange:
+    """A partition of audit_logs; unbounded ends are None."""
+    name: str
+    start: Optional[date]
+    end: Optional[date]
+    is_default: bool = False
+    
+    def overlaps(self, start: date, end: date) -> bool:
+        """Check whether this partition overlaps ``[start, end)``."""
+        if self.is_default:
+            return False
+        return (self.start is None or self.start < end) and (self.end is None or self.end > start)
+
+
+def partition_start(day: date, granularity: str) -> date:
+    """First day of the partition containing ``day``."""
+    return day if granularity == DAILY else day.replace(day=1)
+
+
+def next_partition_start(start: date, granularity: str) -> date:
+    """First day of the partition following the one starting at ``start``."""
+    if granularity == DAILY:
+        return start + timedelta(days=1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(start: date, granularity: str) -> str:
+    """Name of the partition starting at ``start``, e.g. audit_logs_2025_08."""
+    suffix = start.strftime("%Y_%m_%d" if granularity == DAILY else "%Y_%m")
+    return f"{PARENT_TABLE}_{suffix}"
+
+
+def parse_partition_bound(name: str, bound: str) -> PartitionRange:
+    """Parse the output of ``pg_get_expr(relpartbound)`` into a range."""
+    if bound.strip().upper() == "DEFAULT":
+        return PartitionRange(name=name, start=None, end=None, is_default=True)
+    
+    match = _BOUND_PATTERN.search(bound)
+    if not match:
+        raise ValueError(f"Unsupported partition bound for {name}: {bound}")
+    
+    def to_date(value: str) -> Optional[date]:
+        return None if value.endswith("VALUE") else date.fromisoformat(value.strip("'"))
+    
+    return PartitionRange(name=name, start=to_date(match.group(1)), end=to_date(match.group(2)))
+
+
+class PartitionManager:
+    """Creates, tracks and drops audit_logs range partitions."""
+    
+    def __init__(self, settings: PartitionSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    async def start(self) -> None:
+        """Create missing partitions now and keep creating them periodically."""
+        await self.run_maintenance()
+        self._task = asyncio.create_task(self._maintenance_loop())
+    
+    async def stop(self) -> None:
+        """Stop periodic maintenance."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.maintenance_interval_seconds)
+            await self.run_maintenance()
+    
+    async def run_maintenance(self) -> List[str]:
+        """Create upcoming partitions, logging rather than raising on failure."""
+        try:
+            return await self.ensure_partitions()
+        except Exception as e:
+            logger.error("Partition maintenance failed", error=str(e))
+            return []
+    
+    def planned_ranges(self, today: date) -> List[PartitionRange]:
+        """Partitions that should exist: the current one and ``premake`` ahead."""
+        ranges = []
+        start = partition_start(today, self.settings.granularity)
+        for _ in range(self.settings.premake + 1):
+            end = next_partition_start(start, self.settings.granularity)
+            ranges.append(PartitionRange(
+                name=partition_name(start, self.settings.granularity),
+                start=start,
+                end=end,
+            ))
+            start = end
+        return ranges
+    
+    async def is_partitioned(self, session: AsyncSession) -> bool:
+        """Check whether audit_logs is a partitioned table."""
+        if session.get_bind().dialect.name != "postgresql":
+            return False
+        result = await session.execute(_IS_PARTITIONED_SQL, {"parent": PARENT_TABLE})
+        return bool(result.scalar())
+    
+    async def list_partitions(self, session: AsyncSession) -> List[PartitionRange]:
+        """List the partitions currently attached to audit_logs."""
+        result = await session.execute(_LIST_PARTITIONS_SQL, {"parent": PARENT_TABLE})
+        return [parse_partition_bound(row.name, row.bound) for row in result]
+    
+    async def ensure_partitions(self, today: Optional[date] = None) -> List[str]:
+        """
+        Create the current and upcoming partitions, plus a default partition.
+        
+        Ranges overlapping an existing partition (for example after the
+        granularity was changed) are skipped. Rows of a new range already
+        in the default partition are moved into the new partition.
+        
+        Returns:
+            List[str]: Names of the partitions created
+        """
+        today = today or datetime.now(timezone.utc).date()
+        created = []
+        
+        async with self.db_manager.get_session() as session:
+            if not await self.is_partitioned(session):
+                logger.warning("audit_logs is not partitioned, skipping partition maintenance")
+                return created
+            
+            existing = await self.list_partitions(session)
+            has_default = any(partition.is_default for partition in existing)
+            
+            for planned in self.planned_ranges(today):
+                if any(partition.overlaps(planned.start, planned.end) for partition in existing):
+                    continue
+                if has_default and await self._default_has_rows(session, planned):
+                    await self._create_from_default(session, planned)
+                else:
+                    await session.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {planned.name} PARTITION OF {PARENT_TABLE} "
+                        f"FOR VALUES FROM ('{planned.start.isoformat()}') TO ('{planned.end.isoformat()}')"
+                    ))
+                await self._register(session, planned)
+                created.append(planned.name)
+            
+            if not has_default:
+                await session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+                ))
+                created.append(DEFAULT_PARTITION)
+            
+            await session.commit()
+        
+        if created:
+            logger.info("Created audit log partitions", partitions=created)
+        return created
+    
+    async def drop_partitions_before(
+        self,
+        cutoff: date,
+        keep_if: Optional[ColumnElement] = None,
+        dry_run: bool = False,
+    ) -> List[str]:
+        """
+        Drop partitions whose whole range ends on or before ``cutoff``.
+        
+        Args:
+            cutoff: Partitions ending on or before this date are expired
+            keep_if: Condition on audit_logs columns; partitions holding any
+                matching row are kept (e.g. events under a longer retention)
+            dry_run: Only report what would be dropped
+        
+        Returns:
+            List[str]: Names of the dropped (or droppable) partitions
+        """
+        dropped = []
+        
+        async with self.db_manager.get_session() as session:
+            if not await self.is_partitioned(session):
+                return dropped
+            partitions = await self.list_partitions(session)
+        
+        for partition in partitions:
+            if partition.is_default or partition.end is None or partition.end > cutoff:
+                continue
+            
+            async with self.db_manager.get_session() as session:
+                if keep_if is not None and await self._has_rows(session, partition, keep_if):
+                    logger.info("Keeping partition with unexpired rows", partition=partition.name)
+                    continue
+                
+                if not dry_run:
+                    await session.execute(text(
+                        f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}"
+                    ))
+                    await session.execute(text(f"DROP TABLE {partition.name}"))
+                    await session.execute(
+                        update(AuditLogPartition)
+                        .where(AuditLogPartition.partition_name == partition.name)
+                        .values(is_active=False, last_maintenance=datetime.now(timezone.utc))
+                    )
+                    await session.commit()
+            
+            dropped.append(partition.name)
+        
+        if dropped:
+            logger.info("Dropped expired audit log partitions", partitions=dropped, dry_run=dry_run)
+        return dropped
+    
+    @staticmethod
+    async def _default_has_rows(session: AsyncSession, partition: PartitionRange) -> bool:
+        """Check whether the default partition holds rows of a planned range."""
+        result = await session.execute(text(
+            f"SELECT 1 FROM {DEFAULT_PARTITION} "
+            f"WHERE partition_date >= '{partition.start.isoformat()}' "
+            f"AND partition_date < '{partition.end.isoformat()}' LIMIT 1"
+        ))
+        return result.first() is not None
+    
+    @staticmethod
+    async def _create_from_default(session: AsyncSession, partition: PartitionRange) -> None:
+        """
+        Create a partition whose range already has rows in the default partition.
+        
+        The default partition is detached, the new partition created and
+        the rows moved into it, and the default partition re-attached, all
+        in the caller's transaction. Re-attaching scans only the default
+        partition, which this keeps small.
+        """
+        bounds = (
+            f"partition_date >= '{partition.start.isoformat()}' "
+            f"AND partition_date < '{partition.end.isoformat()}'"
+        )
+        await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+        await session.execute(text(
+            f"CREATE TABLE {partition.name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+        ))
+        moved = await session.execute(text(
+            f"INSERT INTO {partition.name} SELECT * FROM {DEFAULT_PARTITION} WHERE {bounds}"
+        ))
+        await session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {bounds}"))
+        await session.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        logger.info(
+            "Moved default partition rows into new partition",
+            partition=partition.name,
+            rows=moved.rowcount,
+        )
+    
+    @staticmethod
+    async def _has_rows(session: AsyncSession, partition: PartitionRange, condition: ColumnElement) -> bool:
+        """Check for a matching row, reading only the given partition."""
+        stmt = select(AuditLog.audit_id).where(condition).limit(1)
+        if partition.start is not None:
+            stmt = stmt.where(AuditLog.partition_date >= partition.start)
+        stmt = stmt.where(AuditLog.partition_date < partition.end)
+        result = await session.execute(stmt)
+        return result.first() is not None
+    
+    @staticmethod
+    async def _register(session: AsyncSession, partition: PartitionRange) -> None:
+        """Record a partition in the audit_log_partitions registry."""
+        await session.execute(
+            insert(AuditLogPartition)
+            .values(
+                partition_name=partition.name,
+                start_date=partition.start,
+                end_date=partition.end,
+                is_active=True,
+            )
+            .on_conflict_do_nothing(index_elements=["partition_name"])
+        )
+
+
+# Global partition manager instance
+_partition_manager: Optional[PartitionManager] = None
+
+
+def get_partition_manager() -> PartitionManager:
+    """Get the global partition manager instance."""
+    global _partition_manager
+    if _partition_manager is None:
+        _partition_manager = PartitionManager(get_settings().partition)
+    return _partition_manager
+
+
+def set_partition_manager(manager: Optional[PartitionManager]) -> None:
+    """Set the global partition manager instance."""
+    global _partition_manager
+    _partition_manager = manager
@@ -6,11 +6,11 @@ with BigQuery-compatible design for easy migration.
 """
 
 import uuid
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, timezone
 from typing import List
 
 from sqlalchemy import (
-    Column, String, DateTime, Date, Integer, Boolean, Text, JSON,
+    Column, String, DateTime, Date, Integer, BigInteger, Boolean, Float, Text, JSON,
     ForeignKey, Index, CheckConstraint, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID, INET, ARRAY
@@ -21,6 +21,15 @@ from sqlalchemy.sql import func
 Base = declarative_base()
 
 
+def _default_expires_at(context) -> datetime:
+    """Compute expires_at for inserts that do not set it explicitly."""
+    params = context.get_current_parameters()
+    timestamp = params.get("timestamp")
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.now(timezone.utc)
+    return timestamp + timedelta(days=params.get("retention_period_days") or 90)
+
+
 class TimestampMixin:
     """Mixin for timestamp fields."""
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -31,8 +40,9 @@ class AuditLog(Base, TimestampMixin):
     """
     Audit log table with partitioning support.
     
-    This table is designed to be compatible with BigQuery schema
-    and supports partitioning by date for performance.
+    This table is designed to be compatible with BigQuery schema and is
+    range-partitioned on partition_date in PostgreSQL (see
+    app.db.partitioning), so the partition key is part of the primary key.
     """
     __tablename__ = "audit_logs"
     
@@ -65,11 +75,13 @@ class AuditLog(Base, TimestampMixin):
     service_name = Column(String(100), nullable=False, index=True)
     correlation_id = Column(String(255), nullable=True, index=True)
     
-    # Data retention
+    # Data retention; expires_at is timestamp + retention_period_days,
+    # materialized so expiry is an index range scan
     retention_period_days = Column(Integer, nullable=False, default=90)
+    expires_at = Column(DateTime(timezone=True), nullable=True, default=_default_expires_at)
     
-    # Partitioning field (for BigQuery compatibility)
-    partition_date = Column(Date, nullable=False, default=func.current_date(), index=True)
+    # Partitioning field (range partition key, also used for BigQuery)
+    partition_date = Column(Date, primary_key=True, default=func.current_date(), index=True)
     
     # Constraints
     __table_args__ = (
@@ -83,8 +95,13 @@ class AuditLog(Base, TimestampMixin):
         Index('idx_audit_logs_partition_tenant', 'partition_date', 'tenant_id'),
         Index('idx_audit_logs_correlation', 'correlation_id'),
         Index('idx_audit_logs_resource', 'resource_type', 'resource_id'),
+        Index('idx_audit_logs_expires_at', 'expires_at'),
+        Index('idx_audit_logs_partition_key', 'partition_date', 'audit_id'),
+        Index('idx_audit_logs_archive_key', 'partition_date', 'tenant_id', 'audit_id'),
+        Index('idx_audit_logs_created_at_brin', 'created_at', postgresql_using='brin'),
         # Note: GIN indexes on JSON fields removed due to operator class issues
         # Can be added later with proper JSONB columns if needed
+        {'postgresql_partition_by': 'RANGE (partition_date)'},
     )
 
 
@@ -267,6 +284,125 @@ class AuditLogPartition(Base):
     )
 
 
+class AuditEventRollup(Base):
+    """
+    Pre-aggregated audit event counts per tenant and time bucket.
+    
+    The ingestion path adds the counts of committed events to an in-memory
+    delta that RollupService upserts in the background every
+    ``flush_interval_seconds``, so metrics never have to scan audit_logs.
+    """
+    __tablename__ = "audit_event_rollups"
+    
+    tenant_id = Column(String(255), primary_key=True)
+    granularity = Column(String(10), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    event_type = Column(String(100), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    service_name = Column(String(100), primary_key=True)
+    event_count = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        CheckConstraint("granularity IN ('minute', 'hour')", name='ck_audit_event_rollups_granularity'),
+        Index('idx_audit_event_rollups_bucket', 'granularity', 'bucket_start'),
+    )
+
+
+
+class RetentionCheckpoint(Base):
+    """
+    Progress of a chunked retention delete, one row per retention policy.
+    
+    The row is written in the same transaction as every deleted chunk and
+    removed when the delete finishes, so a killed run resumes after the
+    last committed key instead of rescanning from the start.
+    """
+    __tablename__ = "retention_checkpoints"
+    
+    policy_name = Column(String(100), primary_key=True)
+    cutoff = Column(DateTime(timezone=True), nullable=False)
+    last_partition_date = Column(Date, nullable=False)
+    last_audit_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class ArchiveProgress(Base):
+    """
+    How far each archive, typically a retention policy, has been archived.
+    
+    The row is advanced once a run's manifest is written, so every node
+    sees the same progress and retention never deletes rows past it.
+    """
+    __tablename__ = "archive_progress"
+    
+    name = Column(String(100), primary_key=True)
+    archived_until = Column(DateTime(timezone=True), nullable=False)
+    last_run_id = Column(String(255), nullable=False)
+    archived_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class BackupCatalogEntry(Base):
+    """
+    Durable record of a backup and its place in a backup chain.
+    
+    ``watermark`` is the created_at bound the backup was closed at; an
+    incremental or differential backup exports the rows created after its
+    parent's watermark, and ``parts`` keeps each shard's file, row count
+    and checksum so chains can be restored and verified without reading
+    old backups.
+    """
+    __tablename__ = "backup_catalog"
+    
+    backup_id = Column(String(255), primary_key=True)
+    config_name = Column(String(100), nullable=False)
+    backup_type = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    parent_id = Column(String(255), ForeignKey('backup_catalog.backup_id'), nullable=True)
+    chain_depth = Column(Integer, nullable=False, default=0)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=True)
+    window_end = Column(DateTime(timezone=True), nullable=True)
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    file_path = Column(Text, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    record_count = Column(BigInteger, nullable=True)
+    checksum = Column(String(64), nullable=True)
+    parts = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_backup_catalog_config_status_start', 'config_name', 'status', 'start_time'),
+        Index('idx_backup_catalog_parent', 'parent_id'),
+    )
+
+
+class ScheduledJobRun(Base):
+    """
+    One run of a scheduled background job.
+    
+    The row is inserted when the leader starts the job and completed with
+    its status, duration and result summary, so job history survives
+    restarts and leader changes.
+    """
+    __tablename__ = "scheduled_job_runs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_name = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False)
+    leader = Column(String(255), nullable=False)
+    scheduled_for = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    result = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_scheduled_job_runs_job_started', 'job_name', 'started_at'),
+    )
+
 # Materialized view for daily audit statistics (PostgreSQL specific)
 class DailyAuditSummary(Base):
     """
@@ -31,8 +31,13 @@ from app.api.v1 import audit, auth, health, metrics, mcp, llm, cloud
 from app.config import get_settings
 from app.core.exceptions import AuditLogException
 from app.db.database import DatabaseManager
+from app.db.partitioning import PartitionManager, set_partition_manager
 from app.services.cache_service import CacheService
+from app.services.ingestion_service import IngestionBuffer, set_ingestion_buffer
 from app.services.nats_service import NATSService
+from app.services.rollup_service import RollupService, get_rollup_service
+from app.services.scheduler import JobScheduler, default_jobs, set_job_scheduler
+from app.services.tiered_cache import TieredCache, set_tiered_cache
 from app.utils.logging import setup_logging, LoggingMiddleware
 from app.utils.metrics import setup_metrics
 
@@ -49,6 +54,11 @@ limiter = Limiter(key_func=get_remote_address)
 db_manager: DatabaseManager = None
 cache_service: CacheService = None
 nats_service: NATSService = None
+ingestion_buffer: IngestionBuffer = None
+tiered_cache: TieredCache = None
+partition_manager: PartitionManager = None
+rollup_service: RollupService = None
+job_scheduler: JobScheduler = None
 
 
 @asynccontextmanager
@@ -63,7 +73,7 @@ async def lifespan(fastapi_app: FastAPI) -> AsyncGenerator[None, None]:
     
     try:
         # Initialize services
-        global db_manager, cache_service, nats_service
+        global db_manager, cache_service, nats_service, ingestion_buffer, tiered_cache, partition_manager, job_scheduler, rollup_service
         
         # Database
         logger.info("Initializing database connection")
@@ -75,6 +85,12 @@ async def lifespan(fastapi_app: FastAPI) -> AsyncGenerator[None, None]:
         from app.db.database import set_database_manager
         set_database_manager(db_manager)
         
+        # Keep upcoming audit_logs partitions created ahead of time
+        if settings.partition.enabled:
+            partition_manager = PartitionManager(settings.partition, db_manager)
+            await partition_manager.start()
+            set_partition_manager(partition_manager)
+        
         # Cache
         logger.info("Initializing cache service")
         cache_service = CacheService(settings.redis)
@@ -96,6 +112,30 @@ async def lifespan(fastapi_app: FastAPI) -> AsyncGenerator[None, None]:
         import app.services.nats_service
         app.services.nats_service._nats_service = nats_service
         
+        # In-process cache in front of Redis, kept coherent across pods over NATS
+        tiered_cache = TieredCache(cache_service, settings.redis, nats_service)
+        await tiered_cache.start()
+        set_tiered_cache(tiered_cache)
+        
+        # Metric rollups counted on ingestion, flushed in the background
+        if settings.rollup.enabled:
+            rollup_service = get_rollup_service()
+            await rollup_service.start()
+        
+        # Write-behind ingestion buffer
+        if settings.ingestion.buffer_enabled:
+            logger.info("Starting ingestion buffer")
+            ingestion_buffer = IngestionBuffer(settings.ingestion, db_manager)
+            await ingestion_buffer.start()
+            set_ingestion_buffer(ingestion_buffer)
+        
+        # Retention, backup and cleanup jobs; only the lease holder runs them
+        if settings.scheduler.enabled:
+            logger.info("Starting job scheduler")
+            job_scheduler = JobScheduler(settings.scheduler, db_manager, default_jobs(settings.scheduler))
+            await job_scheduler.start()
+            set_job_scheduler(job_scheduler)
+        
         # Setup metrics
         if settings.monitoring.metrics_enabled:
             setup_metrics()
@@ -112,6 +152,29 @@ async def lifespan(fastapi_app: FastAPI) -> AsyncGenerator[None, None]:
         # Shutdown
         logger.info("Shutting down audit log framework")
         
+        # Stop scheduling and release the leader lease
+        if job_scheduler:
+            await job_scheduler.stop()
+            set_job_scheduler(None)
+        
+        # Flush pending writes before closing the database
+        if ingestion_buffer:
+            await ingestion_buffer.stop()
+            set_ingestion_buffer(None)
+        
+        # Write the rollups of everything committed so far
+        if rollup_service:
+            await rollup_service.stop()
+        
+        # Send pending cache invalidations before closing NATS
+        if tiered_cache:
+            await tiered_cache.stop()
+            set_tiered_cache(None)
+        
+        if partition_manager:
+            await partition_manager.stop()
+            set_partition_manager(None)
+        
         # Close services
         if nats_service:
             await nats_service.close()
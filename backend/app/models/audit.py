@@ -352,14 +352,13 @@ class AuditEventQuery(BaseAuditModel):
 class AuditEventQueryResponse(PaginatedResponse[AuditEventResponse]):
     """Model for audit event query response."""
     
-    # Inherits all fields from PaginatedResponse[AuditEventResponse]
-    # items: List[AuditEventResponse]
-    # total_count: int
-    # page: int
-    # page_size: int
-    # total_pages: int
-    # has_next: bool
-    # has_previous: bool
+    # Inherits items, page, page_size, has_next and has_previous from
+    # PaginatedResponse[AuditEventResponse]; totals are optional because they
+    # may be skipped or replaced by a planner estimate.
+    total_count: Optional[int] = Field(None, description="Total number of items, if computed")
+    total_pages: Optional[int] = Field(None, description="Total number of pages, if computed")
+    total_count_is_estimate: bool = Field(False, description="Whether total_count is a planner estimate")
+    next_cursor: Optional[str] = Field(None, description="Cursor for fetching the next page")
 
 
 class AuditEventExport(BaseAuditModel):
@@ -439,12 +438,37 @@ class AuditStatisticsResponse(BaseAuditModel):
     period: str = Field(..., description="Statistics period")
 
 
+class FacetBucket(BaseAuditModel):
+    """Model for the event count of a single facet value."""
+    
+    value: Optional[str] = Field(None, description="Facet value (null for unset)")
+    count: int = Field(..., description="Number of matching events")
+
+
+class FacetDistribution(BaseAuditModel):
+    """Model for the top-N value distribution of a summary facet."""
+    
+    buckets: List[FacetBucket] = Field(default_factory=list, description="Top values by count")
+    distinct_count: int = Field(0, description="Number of distinct values")
+    other_count: int = Field(0, description="Events whose value is outside the top values")
+
+
+class AuditSummaryResponse(BaseAuditModel):
+    """Model for audit log summary statistics."""
+    
+    total_count: int = Field(..., description="Number of matching events")
+    facets: Dict[str, FacetDistribution] = Field(
+        default_factory=dict, description="Value distribution per facet"
+    )
+    date_range: Dict[str, Optional[str]] = Field(..., description="Requested date range")
+
+
 # Aliases for backward compatibility
 AuditLogCreate = AuditEventCreate
 AuditLogBatchCreate = AuditEventBatchCreate
 AuditLogResponse = AuditEventResponse
 AuditLogQuery = AuditEventQuery
-AuditLogSummary = AuditStatistics
+AuditLogSummary = AuditSummaryResponse
 PaginatedAuditLogs = AuditEventQueryResponse
 AuditLogExport = AuditEventExport
 EventType = AuditEventType
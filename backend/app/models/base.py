@@ -42,11 +42,20 @@ class SoftDeleteMixin(BaseModel):
     deleted_at: Optional[datetime] = Field(None, description="Soft delete timestamp")
 
 
+class CountMode(str, Enum):
+    """How the total count of a paginated query is computed."""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
 class PaginationParams(BaseAppModel):
     """Model for pagination parameters."""
     
     page: int = Field(1, description="Page number", ge=1)
     page_size: int = Field(50, description="Page size", ge=1, le=1000)
+    cursor: Optional[str] = Field(None, description="Opaque keyset cursor from a previous page")
+    count_mode: CountMode = Field(CountMode.EXACT, description="How to compute total_count")
     
     @property
     def offset(self) -> int:
@@ -0,0 +1,401 @@
+"""
+Audit log archival for the audit log framework.
+
+Archivable rows are read with keyset pagination and streamed into
+size-bounded segment files laid out as ``tenant=<id>/date=<day>/part-N``,
+either as zstd-compressed Parquet or as zstd-compressed NDJSON. Every run
+writes a manifest listing its segments with row counts, time bounds and
+SHA-256 checksums, so archives can be verified and pruned by tenant and
+day without opening them. How far each archive has got is recorded in the
+archive_progress table once its manifest is written.
+"""
+
+import asyncio
+import hashlib
+import json
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time as dt_time, timezone
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from urllib.parse import quote
+from uuid import uuid4
+
+import structlog
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import ArchiveSettings, get_settings
+from app.core.exceptions import ExportError
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import ArchiveProgress, AuditLog
+from app.services.export_service import NDJSONEncoder, ParquetEncoder, row_to_export_record
+
+logger = structlog.get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Archive page order; idx_audit_logs_archive_key serves it as a range scan
+_KEY = tuple_(AuditLog.partition_date, AuditLog.tenant_id, AuditLog.audit_id)
+
+
+@dataclass
+class ArchiveSegment:
+    """One archive file; ``path`` is relative to the run directory."""
+    path: str
+    tenant_id: str
+    date: str
+    rows: int
+    bytes: int
+    sha256: str
+    min_timestamp: Optional[str] = None
+    max_timestamp: Optional[str] = None
+
+
+@dataclass
+class ArchiveManifest:
+    """Description of an archive run and its segments."""
+    run_id: str
+    name: str
+    format: str
+    compression: str
+    window_start: str
+    window_end: str
+    created_at: str
+    total_rows: int = 0
+    segments: List[ArchiveSegment] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ArchiveManifest":
+        segments = [ArchiveSegment(**segment) for segment in data.get("segments", [])]
+        return cls(**{**data, "segments": segments})
+
+
+class SegmentWriter:
+    """Writes one segment file, hashing the bytes as they hit the disk."""
+    
+    def __init__(self, run_dir: Path, relative_path: str, archive_format: str, tenant_id: str, day: date):
+        self.relative_path = relative_path
+        self.tenant_id = tenant_id
+        self.day = day
+        self.rows = 0
+        self.bytes_written = 0
+        self._min_timestamp: Optional[datetime] = None
+        self._max_timestamp: Optional[datetime] = None
+        self._hash = hashlib.sha256()
+        
+        if archive_format == "parquet":
+            self._encoder = ParquetEncoder()
+            self._codec = None
+        else:
+            import pyarrow as pa
+            self._encoder = NDJSONEncoder()
+            self._codec = pa.Codec("zstd")
+        
+        path = run_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "wb")
+        self._write(self._encoder.header())
+    
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Append export records to the segment."""
+        self._write(self._encoder.encode(records))
+        self.rows += len(records)
+        for record in records:
+            timestamp = record["timestamp"]
+            if self._min_timestamp is None or timestamp < self._min_timestamp:
+                self._min_timestamp = timestamp
+            if self._max_timestamp is None or timestamp > self._max_timestamp:
+                self._max_timestamp = timestamp
+    
+    def close(self) -> ArchiveSegment:
+        """Finish the file and describe it for the manifest."""
+        self._write(self._encoder.footer())
+        self._file.close()
+        return ArchiveSegment(
+            path=self.relative_path,
+            tenant_id=self.tenant_id,
+            date=self.day.isoformat(),
+            rows=self.rows,
+            bytes=self.bytes_written,
+            sha256=self._hash.hexdigest(),
+            min_timestamp=self._min_timestamp.isoformat() if self._min_timestamp else None,
+            max_timestamp=self._max_timestamp.isoformat() if self._max_timestamp else None,
+        )
+    
+    def abort(self) -> None:
+        """Close the file without finishing it."""
+        self._file.close()
+    
+    def _write(self, data: bytes) -> None:
+        if not data:
+            return
+        if self._codec is not None:
+            # Every chunk is its own zstd frame; concatenated frames form a
+            # valid zstd stream.
+            data = self._codec.compress(data, asbytes=True)
+        self._file.write(data)
+        self._hash.update(data)
+        self.bytes_written += len(data)
+
+
+def _segment_extension(archive_format: str) -> str:
+    return "parquet" if archive_format == "parquet" else "ndjson.zst"
+
+
+def _segment_path(tenant_id: str, day: date, part: int, archive_format: str) -> str:
+    return (
+        f"tenant={quote(tenant_id, safe='')}/date={day.isoformat()}/"
+        f"part-{part:05d}.{_segment_extension(archive_format)}"
+    )
+
+
+class AuditArchiver:
+    """Streams audit logs from a time window into archive segments."""
+    
+    def __init__(self, settings: ArchiveSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    @property
+    def root(self) -> Path:
+        return Path(self.settings.directory)
+    
+    def list_manifests(self, name: Optional[str] = None) -> List[ArchiveManifest]:
+        """Read the manifests of completed runs, oldest first."""
+        manifests = []
+        if not self.root.is_dir():
+            return manifests
+        for path in sorted(self.root.glob(f"*/{MANIFEST_NAME}")):
+            manifest = ArchiveManifest.from_dict(json.loads(path.read_text()))
+            if name is None or manifest.name == name:
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda manifest: manifest.window_end)
+    
+    async def archived_until(self, name: str) -> Optional[datetime]:
+        """End of the latest window archived under ``name``."""
+        stmt = select(ArchiveProgress.archived_until).where(ArchiveProgress.name == name)
+        async with self.db_manager.get_session() as session:
+            return (await session.execute(stmt)).scalar()
+    
+    async def archive(
+        self,
+        name: str,
+        start: datetime,
+        end: datetime,
+        conditions: Sequence[ColumnElement] = (),
+        deadline: Optional[float] = None,
+    ) -> ArchiveManifest:
+        """
+        Archive the events with ``start <= created_at < end``.
+        
+        The window is on created_at, like retention deletes, so every row
+        a delete can reach has been through some window. Rows are read in
+        (partition_date, tenant_id, audit_id) order, one keyset page at a
+        time, so only one segment is open at any moment. A segment is
+        closed when the tenant or day changes or when it reaches
+        ``segment_max_bytes``. Encoding and file writes run in a worker
+        thread, overlapping with the next page's fetch. The manifest is
+        written last and archive_progress advanced to ``end``; a run that
+        fails leaves nothing behind.
+        
+        When ``deadline`` passes, the run ends at midnight of the day it was
+        reading, since partition_date is the UTC date of created_at: that
+        day's segments are removed and the window closes there, so the next
+        run resumes from it. A run that has not finished a single day fails
+        with TimeoutError instead.
+        
+        Args:
+            name: Archive name, typically the retention policy
+            start: Inclusive start of the window
+            end: Exclusive end of the window
+            conditions: Extra conditions selecting the rows
+            deadline: Monotonic time after which the run stops early
+        
+        Returns:
+            ArchiveManifest: The run's manifest
+        """
+        created_at = datetime.now(timezone.utc)
+        run_id = f"{name}-{created_at:%Y%m%dT%H%M%SZ}-{uuid4().hex[:8]}"
+        run_dir = self.root / run_id
+        await asyncio.to_thread(run_dir.mkdir, parents=True)
+        
+        manifest = ArchiveManifest(
+            run_id=run_id,
+            name=name,
+            format=self.settings.format,
+            compression="zstd",
+            window_start=start.isoformat(),
+            window_end=end.isoformat(),
+            created_at=created_at.isoformat(),
+        )
+        window = and_(
+            AuditLog.created_at >= start,
+            AuditLog.created_at < end,
+            AuditLog.partition_date >= start.astimezone(timezone.utc).date(),
+            AuditLog.partition_date <= end.astimezone(timezone.utc).date(),
+            *conditions,
+        )
+        
+        writer: Optional[SegmentWriter] = None
+        parts: Dict[tuple, int] = {}
+        last_key = None
+        pending: Optional[asyncio.Future] = None
+        
+        def write_page(rows: List[Mapping[str, Any]]) -> None:
+            nonlocal writer
+            for group_key, group in groupby(rows, key=lambda row: (row["tenant_id"], row["partition_date"])):
+                if writer is not None and (writer.tenant_id, writer.day) != group_key:
+                    manifest.segments.append(writer.close())
+                    writer = None
+                if writer is None:
+                    part = parts.get(group_key, 0)
+                    parts[group_key] = part + 1
+                    writer = SegmentWriter(
+                        run_dir,
+                        _segment_path(*group_key, part, self.settings.format),
+                        self.settings.format,
+                        *group_key,
+                    )
+                
+                writer.write([row_to_export_record(row) for row in group])
+                if writer.bytes_written >= self.settings.segment_max_bytes:
+                    manifest.segments.append(writer.close())
+                    writer = None
+        
+        def drop_day(day: date) -> None:
+            nonlocal writer
+            if writer is not None:
+                writer.abort()
+                writer = None
+            for path in run_dir.glob(f"*/date={day.isoformat()}"):
+                shutil.rmtree(path)
+            manifest.segments = [segment for segment in manifest.segments if segment.date != day.isoformat()]
+        
+        def finish() -> None:
+            nonlocal writer
+            if writer is not None:
+                manifest.segments.append(writer.close())
+                writer = None
+            manifest.total_rows = sum(segment.rows for segment in manifest.segments)
+            manifest_path = run_dir / MANIFEST_NAME
+            tmp_path = manifest_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(manifest.to_dict(), indent=2))
+            tmp_path.replace(manifest_path)
+        
+        try:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    if pending is not None:
+                        await pending
+                        pending = None
+                    cut = datetime.combine(last_key[0], dt_time.min, tzinfo=timezone.utc) if last_key else start
+                    if cut <= start:
+                        raise TimeoutError(f"Archive run {run_id} ran past its time budget")
+                    await asyncio.to_thread(drop_day, last_key[0])
+                    end = cut
+                    manifest.window_end = end.isoformat()
+                    logger.warning("Archive run stopped at its time budget", name=name, run_id=run_id, until=end)
+                    break
+                
+                stmt = select(AuditLog.__table__).where(window)
+                if last_key:
+                    stmt = stmt.where(_KEY > tuple_(*last_key))
+                stmt = stmt.order_by(
+                    AuditLog.partition_date, AuditLog.tenant_id, AuditLog.audit_id
+                ).limit(self.settings.fetch_size)
+                
+                async with self.db_manager.get_session() as session:
+                    rows = (await session.execute(stmt)).mappings().all()
+                
+                # Writing the previous page overlaps with this fetch
+                if pending is not None:
+                    await pending
+                    pending = None
+                if not rows:
+                    break
+                
+                pending = asyncio.ensure_future(asyncio.to_thread(write_page, rows))
+                last = rows[-1]
+                last_key = (last["partition_date"], last["tenant_id"], last["audit_id"])
+                if len(rows) < self.settings.fetch_size:
+                    break
+            
+            if pending is not None:
+                await pending
+                pending = None
+            await asyncio.to_thread(finish)
+            await self._record_progress(name, end, run_id, manifest.total_rows)
+        
+        except Exception as e:
+            if pending is not None:
+                await asyncio.gather(pending, return_exceptions=True)
+            if writer is not None:
+                writer.abort()
+            await asyncio.to_thread(shutil.rmtree, run_dir, ignore_errors=True)
+            logger.error("Archive run failed", name=name, run_id=run_id, error=str(e))
+            if isinstance(e, ExportError):
+                raise
+            raise ExportError(f"Archive run {run_id} failed: {str(e)}")
+        
+        logger.info(
+            "Archive run completed",
+            name=name,
+            run_id=run_id,
+            rows=manifest.total_rows,
+            segments=len(manifest.segments),
+        )
+        return manifest
+    
+    async def _record_progress(self, name: str, archived_until: datetime, run_id: str, rows: int) -> None:
+        stmt = insert(ArchiveProgress).values(
+            name=name,
+            archived_until=archived_until,
+            last_run_id=run_id,
+            archived_count=rows,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={
+                "archived_until": func.greatest(ArchiveProgress.archived_until, stmt.excluded.archived_until),
+                "last_run_id": stmt.excluded.last_run_id,
+                "archived_count": ArchiveProgress.archived_count + stmt.excluded.archived_count,
+                "updated_at": func.now(),
+            },
+        )
+        async with self.db_manager.get_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+def verify_segment(run_dir: Path, segment: ArchiveSegment) -> bool:
+    """Check a segment file against its manifest checksum."""
+    digest = hashlib.sha256()
+    with open(run_dir / segment.path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest() == segment.sha256
+
+
+# Global archiver instance
+_archiver: Optional[AuditArchiver] = None
+
+
+def get_archiver() -> AuditArchiver:
+    """Get the global audit archiver instance."""
+    global _archiver
+    if _archiver is None:
+        _archiver = AuditArchiver(get_settings().archive)
+    return _archiver
@@ -6,21 +6,22 @@ with high-performance batch processing and filtering capabilities.
 """
 
 import asyncio
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from datetime import date, datetime, timezone, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import structlog
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, func, and_, or_, desc, asc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import get_settings
 from app.core.exceptions import (
     NotFoundError,
     ValidationError,
     AuthorizationError,
 )
-from app.db.database import get_database_manager
+from app.db.database import estimate_row_count, get_database_manager
 from app.db.schemas import AuditLog, User
 from app.models.audit import (
     AuditEventCreate,
@@ -28,16 +29,44 @@ from app.models.audit import (
     AuditEventResponse,
     AuditEventQuery,
     AuditEventQueryResponse,
+    AuditLogSummary,
     PaginatedResponse,
 )
-from app.models.base import PaginationParams, SortOrder
+from app.models.base import CountMode, PaginationParams, SortOrder
 from app.services.nats_service import get_nats_service
 from app.services.cache_service import get_cache_service
 from app.services.dynamic_filter_service import dynamic_filter_service
+from app.services.export_service import ExportEncoder, get_export_encoder, row_to_export_record
+from app.services.rollup_service import get_rollup_service
+from app.services.summary_service import build_summary_statement, fold_summary_rows, validate_facets
+from app.services.tiered_cache import get_tiered_cache
+from app.services.ingestion_service import (
+    build_audit_row,
+    build_audit_rows,
+    get_bulk_writer,
+    get_ingestion_buffer,
+    row_to_response,
+)
+from app.utils.cache_keys import PAGINATION_FIELDS, SORT_FIELDS, build_cache_key, query_fingerprint
 from app.utils.metrics import audit_metrics
+from app.utils.pagination import decode_cursor, encode_cursor
 
 logger = structlog.get_logger(__name__)
 
+# Metrics time ranges: (window, interval between data points)
+METRIC_TIME_RANGES = {
+    "1h": (timedelta(hours=1), timedelta(minutes=1)),
+    "24h": (timedelta(hours=24), timedelta(minutes=15)),
+    "7d": (timedelta(days=7), timedelta(hours=1)),
+}
+
+
+def _utc_date(value: datetime) -> date:
+    """UTC calendar date of a timestamp; naive timestamps are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
 
 class AuditService:
     """Service for managing audit logs with high-performance operations."""
@@ -46,6 +75,9 @@ class AuditService:
         self.db_manager = get_database_manager()
         self.nats_service = get_nats_service()
         self.cache_service = get_cache_service()
+        self.bulk_writer = get_bulk_writer()
+        self.tiered_cache = get_tiered_cache()
+        self.rollups = get_rollup_service()
     
     async def create_audit_event(
         self,
@@ -53,40 +85,33 @@ class AuditService:
         tenant_id: str,
         user_id: Optional[str] = None,
     ) -> AuditEventResponse:
-        """Create a single audit log entry."""
+        """
+        Create a single audit log entry.
+        
+        When the write-behind ingestion buffer is running, the row is
+        group-committed together with concurrent requests; the call still
+        returns only after the row is durable.
+        """
         try:
-            # Generate audit log ID
-            audit_id = uuid4()
-            
-            # Create audit log record
-            audit_log = AuditLog(
-                audit_id=audit_id,
-                tenant_id=tenant_id,
-                user_id=user_id,
-                event_type=audit_data.event_type,
-                resource_type=audit_data.resource_type,
-                resource_id=audit_data.resource_id,
-                action=audit_data.action,
-                status=audit_data.status,
-                event_metadata=audit_data.metadata or {},
-                ip_address=audit_data.ip_address,
-                user_agent=audit_data.user_agent,
-                session_id=audit_data.session_id,
-                correlation_id=audit_data.correlation_id,
-                service_name=audit_data.service_name,
-                retention_period_days=audit_data.retention_period_days,
-                timestamp=datetime.now(timezone.utc),
-                created_at=datetime.now(timezone.utc),
-            )
+            # Build the complete row client-side
+            row = build_audit_row(audit_data, tenant_id, user_id)
+            audit_id = row["audit_id"]
             
             # Store in database
-            async with self.db_manager.get_session() as session:
-                session.add(audit_log)
-                await session.commit()
-                await session.refresh(audit_log)
+            ingestion_buffer = get_ingestion_buffer()
+            if ingestion_buffer is not None and ingestion_buffer.is_running:
+                await ingestion_buffer.submit(row)
+            else:
+                async with self.db_manager.get_session() as session:
+                    await self.bulk_writer.write(session, [row])
+                    await session.commit()
+                self.bulk_writer.committed([row])
+            
+            # Invalidate cached query pages for the tenant
+            await self.tiered_cache.invalidate(self._cache_namespace(tenant_id))
             
             # Publish to NATS for real-time processing
-            await self._publish_audit_event(audit_log)
+            await self._publish_audit_event(row)
             
             # Update metrics - temporarily disabled
             # audit_metrics.audit_logs_created.inc()
@@ -103,28 +128,7 @@ class AuditService:
                 action=audit_data.action,
             )
             
-            return AuditEventResponse(
-                audit_id=audit_log.audit_id,
-                timestamp=audit_log.timestamp,
-                event_type=audit_log.event_type,
-                user_id=audit_log.user_id,
-                session_id=audit_log.session_id,
-                ip_address=audit_log.ip_address,
-                user_agent=audit_log.user_agent,
-                resource_type=audit_log.resource_type,
-                resource_id=audit_log.resource_id,
-                action=audit_log.action,
-                status=audit_log.status,
-                request_data=audit_log.request_data,
-                response_data=audit_log.response_data,
-                metadata=audit_log.event_metadata,
-                tenant_id=audit_log.tenant_id,
-                service_name=audit_log.service_name,
-                correlation_id=audit_log.correlation_id,
-                retention_period_days=audit_log.retention_period_days,
-                created_at=audit_log.created_at,
-                partition_date=audit_log.partition_date,
-            )
+            return row_to_response(row)
             
         except Exception as e:
             # audit_metrics.audit_logs_errors.inc()
@@ -137,82 +141,39 @@ class AuditService:
         tenant_id: str,
         user_id: Optional[str] = None,
     ) -> List[AuditEventResponse]:
-        """Create multiple audit log entries in a batch."""
+        """
+        Create multiple audit log entries in a batch.
+        
+        Rows are built with client-side defaults and written in a single
+        COPY/INSERT statement, so the response is built from the input
+        without re-reading any row.
+        """
         try:
-            audit_logs = []
-            current_time = datetime.now(timezone.utc)
+            rows = build_audit_rows(batch_data.events, tenant_id, user_id)
             
-            # Create audit log records
-            for audit_data in batch_data.events:
-                audit_id = uuid4()
-                
-                audit_log = AuditLog(
-                    audit_id=audit_id,
-                    tenant_id=tenant_id,
-                    user_id=user_id,
-                    event_type=audit_data.event_type,
-                    resource_type=audit_data.resource_type,
-                    resource_id=audit_data.resource_id,
-                    action=audit_data.action,
-                    status=audit_data.status,
-                    event_metadata=audit_data.metadata or {},
-                    ip_address=audit_data.ip_address,
-                    user_agent=audit_data.user_agent,
-                    session_id=audit_data.session_id,
-                    correlation_id=audit_data.correlation_id,
-                    service_name=audit_data.service_name,
-                    retention_period_days=audit_data.retention_period_days,
-                    timestamp=current_time,
-                    created_at=current_time,
-                )
-                audit_logs.append(audit_log)
-            
-            # Batch insert to database
+            # Bulk insert to database
             async with self.db_manager.get_session() as session:
-                session.add_all(audit_logs)
+                await self.bulk_writer.write(session, rows)
                 await session.commit()
-                
-                # Refresh all records to get generated fields
-                for audit_log in audit_logs:
-                    await session.refresh(audit_log)
+            self.bulk_writer.committed(rows)
+            
+            # Invalidate cached query pages for the tenant
+            await self.tiered_cache.invalidate(self._cache_namespace(tenant_id))
             
             # Publish batch to NATS for real-time processing
-            await self._publish_audit_batch(audit_logs)
+            await self._publish_audit_batch(rows)
             
             # Update metrics - temporarily disabled
-            # audit_metrics.audit_logs_created.inc(len(audit_logs))
+            # audit_metrics.audit_logs_created.inc(len(rows))
             # audit_metrics.batch_operations.inc()
             
             logger.info(
                 "Audit log batch created",
-                batch_size=len(audit_logs),
+                batch_size=len(rows),
                 tenant_id=tenant_id,
             )
             
-            return [
-                AuditEventResponse(
-                    audit_id=log.audit_id,
-                    timestamp=log.timestamp,
-                    event_type=log.event_type,
-                    user_id=log.user_id,
-                    session_id=log.session_id,
-                    ip_address=log.ip_address,
-                    user_agent=log.user_agent,
-                    resource_type=log.resource_type,
-                    resource_id=log.resource_id,
-                    action=log.action,
-                    status=log.status,
-                    request_data=log.request_data,
-                    response_data=log.response_data,
-                    metadata=log.event_metadata,
-                    tenant_id=log.tenant_id,
-                    service_name=log.service_name,
-                    correlation_id=log.correlation_id,
-                    retention_period_days=log.retention_period_days,
-                    created_at=log.created_at,
-                    partition_date=log.partition_date,
-                ) for log in audit_logs
-            ]
+            return [row_to_response(row) for row in rows]
             
         except Exception as e:
             # audit_metrics.audit_logs_errors.inc()
@@ -274,157 +235,228 @@ class AuditService:
         user_id: str,
         pagination: PaginationParams,
     ) -> AuditEventQueryResponse:
-        """Query audit logs with filtering, sorting, and pagination."""
+        """
+        Query audit logs with filtering, sorting, and pagination.
+        
+        When ``pagination.cursor`` is set the page is fetched with a keyset
+        predicate on ``(timestamp, audit_id)`` instead of OFFSET, and the
+        total count is computed according to ``pagination.count_mode``.
+        """
         try:
-            # Check cache first
-            cache_key = self._build_cache_key(query, tenant_id, pagination)
-            cached_result = await self.cache_service.get(cache_key)
-            if cached_result:
-                # audit_metrics.cache_hits.inc()
-                return AuditEventQueryResponse.parse_obj(cached_result)
+            if pagination.cursor and (query.sort_by or "timestamp") != "timestamp":
+                raise ValidationError("Cursor pagination requires sort_by=timestamp")
+            
+            # Served from the in-process cache, then Redis, then the database;
+            # identical concurrent queries share a single database load
+            return await self.tiered_cache.get_or_load(
+                self._cache_namespace(tenant_id),
+                self._build_cache_key(query, tenant_id, pagination),
+                lambda: self._load_audit_logs(query, tenant_id, pagination),
+                ttl=300,  # 5 minutes
+                model=AuditEventQueryResponse,
+            )
             
-            async with self.db_manager.get_session() as session:
-                # Build base query
-                stmt = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
-                
-                # Apply filters
-                stmt = self._apply_filters(stmt, query)
-                
-                # Get total count
-                count_stmt = select(func.count()).select_from(stmt.subquery())
-                total_result = await session.execute(count_stmt)
-                total_count = total_result.scalar()
-                
-                # Apply sorting
-                stmt = self._apply_sorting(stmt, query.sort_by, query.sort_order)
-                
-                # Apply pagination
-                stmt = stmt.offset(pagination.offset).limit(pagination.page_size)
-                
-                # Execute query
-                result = await session.execute(stmt)
-                audit_logs = result.scalars().all()
-                
-                # Convert to response models
-                items = [
-                    AuditEventResponse(
-                        audit_id=log.audit_id,
-                        timestamp=log.timestamp,
-                        event_type=log.event_type,
-                        user_id=log.user_id,
-                        session_id=log.session_id,
-                        ip_address=log.ip_address,
-                        user_agent=log.user_agent,
-                        resource_type=log.resource_type,
-                        resource_id=log.resource_id,
-                        action=log.action,
-                        status=log.status,
-                        request_data=log.request_data,
-                        response_data=log.response_data,
-                        metadata=log.event_metadata,
-                        tenant_id=log.tenant_id,
-                        service_name=log.service_name,
-                        correlation_id=log.correlation_id,
-                        retention_period_days=log.retention_period_days,
-                        created_at=log.created_at,
-                        partition_date=log.partition_date,
-                    ) for log in audit_logs
-                ]
-                
-                # Create paginated response
-                paginated_result = AuditEventQueryResponse(
-                    items=items,
-                    total_count=total_count,
-                    page=pagination.page,
-                    page_size=pagination.page_size,
-                    total_pages=(total_count + pagination.page_size - 1) // pagination.page_size,
-                    has_next=pagination.page * pagination.page_size < total_count,
-                    has_previous=pagination.page > 1,
-                )
-                
-                # Cache the result
-                await self.cache_service.set(
-                    cache_key,
-                    paginated_result.dict(),
-                    ttl=300,  # 5 minutes
-                )
-                
-                # audit_metrics.cache_misses.inc()
-                # audit_metrics.queries_executed.inc()
-                
-                logger.info(
-                    "Audit logs queried",
-                    tenant_id=tenant_id,
-                    total_count=total_count,
-                    page=pagination.page,
-                    size=pagination.page_size,
-                )
-                
-                return paginated_result
-                
         except Exception as e:
             logger.error("Failed to query audit logs", error=str(e))
             raise
     
+    async def _load_audit_logs(
+        self,
+        query: AuditEventQuery,
+        tenant_id: str,
+        pagination: PaginationParams,
+    ) -> AuditEventQueryResponse:
+        """Load one page of audit logs from the database."""
+        sort_order = SortOrder(query.sort_order)
+        keyset_sort = (query.sort_by or "timestamp") == "timestamp"
+        
+        async with self.db_manager.get_session() as session:
+            # Build base query
+            stmt = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
+            
+            # Apply filters
+            stmt = self._apply_filters(stmt, query)
+            
+            # Get total count
+            total_count, is_estimate = await self._count_audit_logs(
+                session, stmt, query, tenant_id, CountMode(pagination.count_mode)
+            )
+            
+            # Apply sorting
+            stmt = self._apply_sorting(stmt, query.sort_by, sort_order)
+            
+            # Apply pagination, fetching one extra row to detect a next page
+            if pagination.cursor:
+                stmt = self._apply_keyset(stmt, pagination.cursor, sort_order)
+            else:
+                stmt = stmt.offset(pagination.offset)
+            stmt = stmt.limit(pagination.page_size + 1)
+            
+            # Execute query
+            result = await session.execute(stmt)
+            audit_logs = result.scalars().all()
+            has_next = len(audit_logs) > pagination.page_size
+            audit_logs = audit_logs[:pagination.page_size]
+            
+            # Convert to response models
+            items = [
+                AuditEventResponse(
+                    audit_id=log.audit_id,
+                    timestamp=log.timestamp,
+                    event_type=log.event_type,
+                    user_id=log.user_id,
+                    session_id=log.session_id,
+                    ip_address=log.ip_address,
+                    user_agent=log.user_agent,
+                    resource_type=log.resource_type,
+                    resource_id=log.resource_id,
+                    action=log.action,
+                    status=log.status,
+                    request_data=log.request_data,
+                    response_data=log.response_data,
+                    metadata=log.event_metadata,
+                    tenant_id=log.tenant_id,
+                    service_name=log.service_name,
+                    correlation_id=log.correlation_id,
+                    retention_period_days=log.retention_period_days,
+                    created_at=log.created_at,
+                    partition_date=log.partition_date,
+                ) for log in audit_logs
+            ]
+            
+            next_cursor = None
+            if has_next and keyset_sort:
+                last = audit_logs[-1]
+                next_cursor = encode_cursor(last.timestamp, last.audit_id, sort_order.value)
+            
+            total_pages = None
+            if total_count is not None:
+                total_pages = (total_count + pagination.page_size - 1) // pagination.page_size
+            
+            # Create paginated response
+            paginated_result = AuditEventQueryResponse(
+                items=items,
+                total_count=total_count,
+                page=pagination.page,
+                page_size=pagination.page_size,
+                total_pages=total_pages,
+                has_next=has_next,
+                has_previous=pagination.page > 1 or pagination.cursor is not None,
+                total_count_is_estimate=is_estimate,
+                next_cursor=next_cursor,
+            )
+            
+            # audit_metrics.queries_executed.inc()
+            
+            logger.info(
+                "Audit logs queried",
+                tenant_id=tenant_id,
+                total_count=total_count,
+                count_mode=pagination.count_mode,
+                page=pagination.page,
+                size=pagination.page_size,
+                keyset=pagination.cursor is not None,
+            )
+            
+            return paginated_result
+    
+    async def _count_audit_logs(
+        self,
+        session: AsyncSession,
+        stmt,
+        query: AuditEventQuery,
+        tenant_id: str,
+        count_mode: CountMode,
+    ) -> Tuple[Optional[int], bool]:
+        """
+        Count rows matching a filtered query.
+        
+        Returns the count (None when skipped) and whether it is an estimate.
+        Exact counts are cached per filter set so that paging through a
+        result does not recount it on every request.
+        """
+        if count_mode == CountMode.NONE:
+            return None, False
+        
+        if count_mode == CountMode.ESTIMATED:
+            estimate = await estimate_row_count(session, stmt)
+            if estimate is not None:
+                return estimate, True
+        
+        async def load_count() -> int:
+            count_stmt = select(func.count()).select_from(stmt.subquery())
+            total_result = await session.execute(count_stmt)
+            return total_result.scalar()
+        
+        total_count = await self.tiered_cache.get_or_load(
+            self._cache_namespace(tenant_id),
+            self._build_count_cache_key(query, tenant_id),
+            load_count,
+            ttl=60,
+        )
+        return total_count, False
+    
     async def get_audit_summary(
         self,
         query: AuditEventQuery,
         tenant_id: str,
         user_id: str,
-    ) -> AuditEventQueryResponse:
-        """Get audit log summary statistics."""
+        facets: Optional[List[str]] = None,
+        top_n: Optional[int] = None,
+    ) -> AuditLogSummary:
+        """
+        Get audit log summary statistics.
+        
+        Args:
+            query: Filters selecting the events to summarize
+            tenant_id: Tenant ID
+            user_id: User ID
+            facets: Columns to summarize (defaults to SUMMARY_DEFAULT_FACETS)
+            top_n: Values returned per facet (defaults to SUMMARY_TOP_N)
+            
+        Returns:
+            AuditLogSummary: Total count and top-N distribution per facet
+        """
+        settings = get_settings().summary
+        facets = validate_facets(facets or settings.default_facets)
+        top_n = top_n or settings.top_n
+        if not 1 <= top_n <= settings.max_top_n:
+            raise ValidationError(f"top_n must be between 1 and {settings.max_top_n}")
+        
+        return await self.tiered_cache.get_or_load(
+            self._cache_namespace(tenant_id),
+            self._build_summary_cache_key(query, tenant_id, facets, top_n),
+            lambda: self._load_audit_summary(query, tenant_id, facets, top_n),
+            ttl=300,
+            model=AuditLogSummary,
+        )
+    
+    async def _load_audit_summary(
+        self,
+        query: AuditEventQuery,
+        tenant_id: str,
+        facets: List[str],
+        top_n: int,
+    ) -> AuditLogSummary:
+        """Compute audit log summary statistics in a single grouped scan."""
         try:
+            filtered = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
+            filtered = self._apply_filters(filtered, query)
+            stmt = build_summary_statement(filtered, facets, top_n)
+            
             async with self.db_manager.get_session() as session:
-                # Build base query
-                base_stmt = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
-                base_stmt = self._apply_filters(base_stmt, query)
-                
-                # Total count
-                count_stmt = select(func.count()).select_from(base_stmt.subquery())
-                total_result = await session.execute(count_stmt)
-                total_count = total_result.scalar()
-                
-                # Event type distribution
-                event_type_stmt = (
-                    select(AuditLog.event_type, func.count().label('count'))
-                    .where(AuditLog.tenant_id == tenant_id)
-                    .group_by(AuditLog.event_type)
-                )
-                event_type_stmt = self._apply_filters(event_type_stmt, query)
-                event_type_result = await session.execute(event_type_stmt)
-                event_types = {row.event_type.value: row.count for row in event_type_result}
-                
-                # Severity distribution
-                severity_stmt = (
-                    select(AuditLog.severity, func.count().label('count'))
-                    .where(AuditLog.tenant_id == tenant_id)
-                    .group_by(AuditLog.severity)
-                )
-                severity_stmt = self._apply_filters(severity_stmt, query)
-                severity_result = await session.execute(severity_stmt)
-                severities = {row.severity.value: row.count for row in severity_result}
-                
-                # Resource type distribution
-                resource_stmt = (
-                    select(AuditLog.resource_type, func.count().label('count'))
-                    .where(AuditLog.tenant_id == tenant_id)
-                    .group_by(AuditLog.resource_type)
-                )
-                resource_stmt = self._apply_filters(resource_stmt, query)
-                resource_result = await session.execute(resource_stmt)
-                resource_types = {row.resource_type: row.count for row in resource_result}
-                
-                return AuditLogSummary(
-                    total_count=total_count,
-                    event_types=event_types,
-                    severities=severities,
-                    resource_types=resource_types,
-                    date_range={
-                        "start": query.start_time.isoformat() if query.start_time else None,
-                        "end": query.end_time.isoformat() if query.end_time else None,
-                    },
-                )
-                
+                result = await session.execute(stmt)
+                rows = result.all()
+            
+            return fold_summary_rows(
+                rows,
+                facets,
+                date_range={
+                    "start": query.start_time.isoformat() if query.start_time else None,
+                    "end": query.end_time.isoformat() if query.end_time else None,
+                },
+            )
+            
         except Exception as e:
             logger.error("Failed to get audit summary", error=str(e))
             raise
@@ -434,70 +466,84 @@ class AuditService:
         query: AuditEventQuery,
         tenant_id: str,
         user_id: str,
-        export_format: str = "json",
-    ) -> AuditEventQueryResponse:
-        """Export audit logs in specified format."""
+        export_format: str = "ndjson",
+    ) -> Tuple[ExportEncoder, AsyncIterator[bytes]]:
+        """
+        Export audit logs in the specified format.
+        
+        Returns the encoder (for media type and file extension) and an async
+        iterator of encoded bytes. Rows are read through a server-side
+        cursor in chunks of ``export.chunk_size``, so memory use does not
+        grow with the size of the export.
+        """
+        # Resolve the encoder eagerly so bad formats fail before streaming
+        encoder = get_export_encoder(export_format)
+        return encoder, self._stream_export(query, tenant_id, encoder)
+    
+    async def _stream_export(
+        self,
+        query: AuditEventQuery,
+        tenant_id: str,
+        encoder: ExportEncoder,
+    ) -> AsyncIterator[bytes]:
+        """Stream encoded audit logs for an export."""
+        export_settings = get_settings().export
+        
+        stmt = select(AuditLog.__table__).where(AuditLog.tenant_id == tenant_id)
+        stmt = self._apply_filters(stmt, query)
+        stmt = self._apply_sorting(stmt, query.sort_by, SortOrder(query.sort_order))
+        if export_settings.max_records:
+            stmt = stmt.limit(export_settings.max_records)
+        stmt = stmt.execution_options(yield_per=export_settings.chunk_size)
+        
+        count = 0
         try:
-            # Limit export size for performance
-            max_export_size = 100000  # 100k records max
+            yield encoder.header()
             
             async with self.db_manager.get_session() as session:
-                # Build query
-                stmt = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
-                stmt = self._apply_filters(stmt, query)
-                stmt = self._apply_sorting(stmt, query.sort_by, query.sort_order)
-                stmt = stmt.limit(max_export_size)
-                
-                # Execute query
-                result = await session.execute(stmt)
-                audit_logs = result.scalars().all()
-                
-                # Convert to export format
-                export_data = []
-                for log in audit_logs:
-                    export_data.append({
-                        "id": log.id,
-                        "timestamp": log.timestamp.isoformat(),
-                        "event_type": log.event_type.value,
-                        "resource_type": log.resource_type,
-                        "resource_id": log.resource_id,
-                        "action": log.action,
-                        "severity": log.severity.value,
-                        "description": log.description,
-                        "metadata": log.event_metadata,
-                        "ip_address": log.ip_address,
-                        "user_agent": log.user_agent,
-                        "session_id": log.session_id,
-                        "correlation_id": log.correlation_id,
-                    })
-                
-                # audit_metrics.exports_generated.inc()
-                
-                logger.info(
-                    "Audit logs exported",
-                    tenant_id=tenant_id,
-                    count=len(export_data),
-                    format=export_format,
-                )
-                
-                return AuditLogExport(
-                    data=export_data,
-                    format=export_format,
-                    count=len(export_data),
-                    generated_at=datetime.now(timezone.utc),
-                )
-                
+                result = await session.stream(stmt)
+                async for rows in result.mappings().partitions():
+                    records = [row_to_export_record(row) for row in rows]
+                    count += len(records)
+                    chunk = encoder.encode(records)
+                    if chunk:
+                        yield chunk
+            
+            yield encoder.footer()
+            
         except Exception as e:
-            logger.error("Failed to export audit logs", error=str(e))
+            logger.error(
+                "Failed to export audit logs",
+                tenant_id=tenant_id,
+                exported=count,
+                error=str(e),
+            )
             raise
+        
+        audit_metrics.exports_generated.labels(
+            tenant_id=tenant_id,
+            format=encoder.extension,
+        ).inc()
+        
+        logger.info(
+            "Audit logs exported",
+            tenant_id=tenant_id,
+            count=count,
+            format=encoder.extension,
+            query_fingerprint=query_fingerprint(query),
+        )
     
     def _apply_filters(self, stmt, query: AuditEventQuery):
         """Apply filters to the query statement."""
+        # partition_date is the UTC date of the timestamp; repeating the time
+        # range on it lets PostgreSQL prune partitions outside the range.
         if query.start_time:
             stmt = stmt.where(AuditLog.timestamp >= query.start_time)
+            stmt = stmt.where(AuditLog.partition_date >= _utc_date(query.start_time))
         
         if query.end_time:
             stmt = stmt.where(AuditLog.timestamp <= query.end_time)
+            stmt = stmt.where(AuditLog.partition_date <= _utc_date(query.end_time))
         
         if query.event_type:
             stmt = stmt.where(AuditLog.event_type == query.event_type)
@@ -542,14 +588,32 @@ class AuditService:
             sort_by = "timestamp"
         
         sort_column = getattr(AuditLog, sort_by, AuditLog.timestamp)
+        direction = desc if sort_order == SortOrder.DESC else asc
+        stmt = stmt.order_by(direction(sort_column))
         
-        if sort_order == SortOrder.DESC:
-            stmt = stmt.order_by(desc(sort_column))
-        else:
-            stmt = stmt.order_by(asc(sort_column))
+        # Break timestamp ties on audit_id so keyset cursors are stable
+        if sort_column is AuditLog.timestamp:
+            stmt = stmt.order_by(direction(AuditLog.audit_id))
         
         return stmt
     
+    def _apply_keyset(self, stmt, cursor: str, sort_order: SortOrder):
+        """Restrict a timestamp-sorted query to rows after the cursor."""
+        timestamp, audit_id = decode_cursor(cursor, sort_order.value)
+        row_key = tuple_(AuditLog.timestamp, AuditLog.audit_id)
+        
+        # The plain timestamp bound lets the planner use
+        # idx_audit_logs_tenant_timestamp; the row comparison breaks ties.
+        if sort_order == SortOrder.DESC:
+            return stmt.where(
+                AuditLog.timestamp <= timestamp,
+                row_key < tuple_(timestamp, audit_id),
+            )
+        return stmt.where(
+            AuditLog.timestamp >= timestamp,
+            row_key > tuple_(timestamp, audit_id),
+        )
+    
     def _build_cache_key(
         self,
         query: AuditEventQuery,
@@ -557,62 +621,95 @@ class AuditService:
         pagination: PaginationParams,
     ) -> str:
         """Build cache key for query results."""
-        key_parts = [
-            "audit_query",
+        return build_cache_key(
+            "query",
+            tenant_id,
+            query,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            count_mode=CountMode(pagination.count_mode).value,
+        )
+    
+    def _build_count_cache_key(self, query: AuditEventQuery, tenant_id: str) -> str:
+        """Build cache key for the total count of a filter set."""
+        return build_cache_key("count", tenant_id, query, exclude=PAGINATION_FIELDS | SORT_FIELDS)
+    
+    def _build_summary_cache_key(
+        self,
+        query: AuditEventQuery,
+        tenant_id: str,
+        facets: List[str],
+        top_n: int,
+    ) -> str:
+        """Build cache key for summary statistics of a filter set."""
+        return build_cache_key(
+            "summary",
             tenant_id,
-            str(hash(query.json())),
-            f"page_{pagination.page}",
-            f"size_{pagination.page_size}",
-        ]
-        return ":".join(key_parts)
+            query,
+            exclude=PAGINATION_FIELDS | SORT_FIELDS,
+            facets=facets,
+            top_n=top_n,
+        )
     
-    async def _publish_audit_event(self, audit_log: AuditLog):
+    @staticmethod
+    def _cache_namespace(tenant_id: str) -> str:
+        """Cache generation namespace for a tenant's query results."""
+        return f"audit_logs:{tenant_id}"
+    
+    async def _publish_audit_event(self, row: Dict[str, Any]):
         """Publish single audit event to NATS."""
         try:
             event_data = {
-                "id": audit_log.audit_id,
-                "tenant_id": audit_log.tenant_id,
-                "event_type": audit_log.event_type,
-                "resource_type": audit_log.resource_type,
-                "resource_id": audit_log.resource_id,
-                "action": audit_log.action,
-                "status": audit_log.status,
-                "timestamp": audit_log.timestamp.isoformat(),
-                "metadata": audit_log.event_metadata,
+                "id": row["audit_id"],
+                "tenant_id": row["tenant_id"],
+                "event_type": row["event_type"],
+                "resource_type": row["resource_type"],
+                "resource_id": row["resource_id"],
+                "action": row["action"],
+                "status": row["status"],
+                "timestamp": row["timestamp"],
+                "metadata": row["event_metadata"],
             }
             
             await self.nats_service.publish(
-                subject=f"audit.events.{audit_log.tenant_id}",
+                subject=f"audit.events.{row['tenant_id']}",
                 data=event_data,
             )
             
         except Exception as e:
             logger.warning("Failed to publish audit event to NATS", error=str(e))
     
-    async def _publish_audit_batch(self, audit_logs: List[AuditLog]):
+    async def _publish_audit_batch(self, rows: List[Dict[str, Any]]):
         """Publish batch of audit events to NATS."""
+        if not rows:
+            return
+        
         try:
+            tenant_id = rows[0]["tenant_id"]
             batch_data = {
                 "batch_id": str(uuid4()),
-                "tenant_id": audit_logs[0].tenant_id if audit_logs else None,
-                "count": len(audit_logs),
+                "tenant_id": tenant_id,
+                "count": len(rows),
                 "events": [
                     {
-                        "id": log.audit_id,
-                        "event_type": log.event_type,
-                        "resource_type": log.resource_type,
-                        "resource_id": log.resource_id,
-                        "action": log.action,
-                        "status": log.status,
-                        "timestamp": log.timestamp.isoformat(),
+                        "id": row["audit_id"],
+                        "event_type": row["event_type"],
+                        "resource_type": row["resource_type"],
+                        "resource_id": row["resource_id"],
+                        "action": row["action"],
+                        "status": row["status"],
+                        "timestamp": row["timestamp"],
                     }
-                    for log in audit_logs
+                    for row in rows
                 ],
             }
             
+            # Batches are large and repetitive enough to be worth compressing
             await self.nats_service.publish(
-                subject=f"audit.batch.{audit_logs[0].tenant_id}",
+                subject=f"audit.batch.{tenant_id}",
                 data=batch_data,
+                compress=True,
             )
             
         except Exception as e:
@@ -621,160 +718,96 @@ class AuditService:
     # Metrics methods
     async def get_metrics(self, tenant_id: str):
         """Get comprehensive metrics for the audit system."""
+        from app.models.metrics import MetricsResponse
+        
+        return await self.tiered_cache.get_or_load(
+            self._cache_namespace(tenant_id),
+            build_cache_key("metrics", tenant_id),
+            lambda: self._load_metrics(tenant_id),
+            ttl=30,
+            model=MetricsResponse,
+        )
+    
+    async def _load_metrics(self, tenant_id: str):
+        """Compute metrics for the audit system from the metric rollups."""
         try:
-            async with self.db_manager.get_session() as session:
-                # Get total events
-                total_events = await session.scalar(
-                    select(func.count(AuditLog.audit_id))
-                    .where(AuditLog.tenant_id == tenant_id)
-                )
-                
-                # Get events today
-                today = datetime.now(timezone.utc).date()
-                events_today = await session.scalar(
-                    select(func.count(AuditLog.audit_id))
-                    .where(
-                        and_(
-                            AuditLog.tenant_id == tenant_id,
-                            func.date(AuditLog.timestamp) == today
-                        )
-                    )
-                )
-                
-                # Get events this hour
-                hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-                events_this_hour = await session.scalar(
-                    select(func.count(AuditLog.audit_id))
-                    .where(
-                        and_(
-                            AuditLog.tenant_id == tenant_id,
-                            AuditLog.timestamp >= hour_ago
-                        )
-                    )
-                )
-                
-                # Calculate ingestion rate (events per minute in last hour)
-                ingestion_rate = events_this_hour / 60.0 if events_this_hour else 0.0
-                
-                # Mock query rate and response time for now
-                query_rate = 5.0  # Mock value
-                avg_response_time = 150.0  # Mock value in milliseconds
-                error_rate = 0.5  # Mock value in percentage
-                
-                from app.models.metrics import (
-                    MetricsData,
-                    IngestionRateData,
-                    QueryRateData,
-                    TopEventType,
-                    SystemMetrics,
-                    MetricsResponse,
-                )
-                
-                # Get top event types
-                top_event_types = await self.get_top_event_types(limit=10, tenant_id=tenant_id)
-                
-                # Get system metrics
-                system_metrics = await self.get_system_metrics()
-                
-                # Create metrics data
-                metrics_data = MetricsData(
-                    total_events=total_events or 0,
-                    events_today=events_today or 0,
-                    events_this_hour=events_this_hour or 0,
-                    ingestion_rate=ingestion_rate,
-                    query_rate=query_rate,
-                    avg_response_time=avg_response_time,
-                    error_rate=error_rate,
-                )
-                
-                # Create mock time series data
-                ingestion_rate_data = [
-                    IngestionRateData(
-                        timestamp=datetime.now(timezone.utc) - timedelta(minutes=i),
-                        rate=ingestion_rate * (0.8 + 0.4 * (i % 3)),  # Mock variation
-                        events_count=int(ingestion_rate * (0.8 + 0.4 * (i % 3)))
-                    )
-                    for i in range(60, 0, -1)
-                ]
-                
-                query_rate_data = [
-                    QueryRateData(
-                        timestamp=datetime.now(timezone.utc) - timedelta(minutes=i),
-                        rate=query_rate * (0.7 + 0.6 * (i % 2)),  # Mock variation
-                        queries_count=int(query_rate * (0.7 + 0.6 * (i % 2)))
-                    )
-                    for i in range(60, 0, -1)
-                ]
-                
-                return MetricsResponse(
-                    metrics=metrics_data,
-                    ingestion_rate_data=ingestion_rate_data,
-                    query_rate_data=query_rate_data,
-                    top_event_types=top_event_types,
-                    system_metrics=system_metrics,
+            totals = await self.rollups.get_totals(tenant_id)
+            events_this_hour = totals["last_hour"]
+            
+            # Calculate ingestion rate (events per minute in last hour)
+            ingestion_rate = events_this_hour / 60.0
+            
+            # Mock query rate and response time for now
+            query_rate = 5.0  # Mock value
+            avg_response_time = 150.0  # Mock value in milliseconds
+            error_rate = 0.5  # Mock value in percentage
+            
+            from app.models.metrics import (
+                MetricsData,
+                QueryRateData,
+                MetricsResponse,
+            )
+            
+            # Get top event types
+            top_event_types = await self.get_top_event_types(limit=10, tenant_id=tenant_id)
+            
+            # Get system metrics
+            system_metrics = await self.get_system_metrics()
+            
+            # Create metrics data
+            metrics_data = MetricsData(
+                total_events=totals["total"],
+                events_today=totals["today"],
+                events_this_hour=events_this_hour,
+                ingestion_rate=ingestion_rate,
+                query_rate=query_rate,
+                avg_response_time=avg_response_time,
+                error_rate=error_rate,
+            )
+            
+            ingestion_rate_data = await self.get_ingestion_rate("1h", tenant_id)
+            
+            query_rate_data = [
+                QueryRateData(
+                    timestamp=datetime.now(timezone.utc) - timedelta(minutes=i),
+                    rate=query_rate * (0.7 + 0.6 * (i % 2)),  # Mock variation
+                    queries_count=int(query_rate * (0.7 + 0.6 * (i % 2)))
                 )
-                
+                for i in range(60, 0, -1)
+            ]
+            
+            return MetricsResponse(
+                metrics=metrics_data,
+                ingestion_rate_data=ingestion_rate_data,
+                query_rate_data=query_rate_data,
+                top_event_types=top_event_types,
+                system_metrics=system_metrics,
+            )
+            
         except Exception as e:
             logger.error("Failed to get metrics", error=str(e))
             raise
 
     async def get_ingestion_rate(self, time_range: str, tenant_id: str):
-        """Get event ingestion rate over time."""
+        """Get event ingestion rate over time from the metric rollups."""
         try:
-            async with self.db_manager.get_session() as session:
-                # Parse time range
-                if time_range == "1h":
-                    start_time = datetime.now(timezone.utc) - timedelta(hours=1)
-                    interval_minutes = 1
-                elif time_range == "24h":
-                    start_time = datetime.now(timezone.utc) - timedelta(hours=24)
-                    interval_minutes = 15
-                elif time_range == "7d":
-                    start_time = datetime.now(timezone.utc) - timedelta(days=7)
-                    interval_minutes = 60
-                else:
-                    start_time = datetime.now(timezone.utc) - timedelta(hours=1)
-                    interval_minutes = 1
-                
-                # Get events in time range
-                events = await session.execute(
-                    select(AuditLog.timestamp)
-                    .where(
-                        and_(
-                            AuditLog.tenant_id == tenant_id,
-                            AuditLog.timestamp >= start_time
-                        )
-                    )
-                    .order_by(AuditLog.timestamp)
+            from app.models.metrics import IngestionRateData
+            
+            window, interval = METRIC_TIME_RANGES.get(time_range, METRIC_TIME_RANGES["1h"])
+            interval_minutes = interval / timedelta(minutes=1)
+            now = datetime.now(timezone.utc)
+            
+            series = await self.rollups.get_series(tenant_id, now - window, now, interval)
+            
+            return [
+                IngestionRateData(
+                    timestamp=bucket_start,
+                    rate=events_count / interval_minutes,
+                    events_count=events_count,
                 )
-                
-                events = events.scalars().all()
-                
-                # Calculate rates for intervals
-                from app.models.metrics import IngestionRateData
-                
-                rate_data = []
-                current_time = start_time
-                
-                while current_time < datetime.now(timezone.utc):
-                    end_time = current_time + timedelta(minutes=interval_minutes)
-                    interval_events = [
-                        e for e in events 
-                        if current_time <= e < end_time
-                    ]
-                    
-                    rate = len(interval_events) / interval_minutes
-                    
-                    rate_data.append(IngestionRateData(
-                        timestamp=current_time,
-                        rate=rate,
-                        events_count=len(interval_events)
-                    ))
-                    
-                    current_time = end_time
-                
-                return rate_data
-                
+                for bucket_start, events_count in series
+            ]
+            
         except Exception as e:
             logger.error("Failed to get ingestion rate", error=str(e))
             raise
@@ -818,43 +851,21 @@ class AuditService:
             raise
 
     async def get_top_event_types(self, limit: int, tenant_id: str):
-        """Get top event types by count."""
+        """Get top event types by count from the metric rollups."""
         try:
-            async with self.db_manager.get_session() as session:
-                # Get total events for percentage calculation
-                total_events = await session.scalar(
-                    select(func.count(AuditLog.audit_id))
-                    .where(AuditLog.tenant_id == tenant_id)
-                )
-                
-                if not total_events:
-                    return []
-                
-                # Get top event types
-                result = await session.execute(
-                    select(
-                        AuditLog.event_type,
-                        func.count(AuditLog.audit_id).label('count')
-                    )
-                    .where(AuditLog.tenant_id == tenant_id)
-                    .group_by(AuditLog.event_type)
-                    .order_by(desc(func.count(AuditLog.audit_id)))
-                    .limit(limit)
+            from app.models.metrics import TopEventType
+            
+            event_types, total_events = await self.rollups.get_top_event_types(tenant_id, limit)
+            
+            return [
+                TopEventType(
+                    event_type=event_type,
+                    count=count,
+                    percentage=(count / total_events) * 100,
                 )
-                
-                from app.models.metrics import TopEventType
-                
-                top_types = []
-                for row in result:
-                    percentage = (row.count / total_events) * 100
-                    top_types.append(TopEventType(
-                        event_type=row.event_type,
-                        count=row.count,
-                        percentage=percentage
-                    ))
-                
-                return top_types
-                
+                for event_type, count in event_types
+            ]
+            
         except Exception as e:
             logger.error("Failed to get top event types", error=str(e))
             raise
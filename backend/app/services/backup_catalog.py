@@ -0,0 +1,215 @@
+"""
+Durable backup catalog for the audit log framework.
+
+Every backup is recorded in the backup_catalog table as soon as it starts
+and updated when it finishes, so backup history, watermarks and chains
+survive restarts. Incremental and differential backups point at the
+backup they extend; a restore reads the chain from the catalog instead of
+scanning old backup files.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import BackupCatalogEntry
+
+logger = structlog.get_logger(__name__)
+
+_FIELDS = [column.name for column in BackupCatalogEntry.__table__.columns]
+
+
+class BackupMetadata:
+    """Backup metadata information."""
+    
+    def __init__(
+        self,
+        backup_id: str,
+        config_name: str,
+        backup_type: str,
+        start_time: datetime,
+        end_time: Optional[datetime] = None,
+        status: str = "running",
+        file_path: Optional[str] = None,
+        file_size: Optional[int] = None,
+        record_count: Optional[int] = None,
+        checksum: Optional[str] = None,
+        error_message: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        chain_depth: int = 0,
+        window_end: Optional[datetime] = None,
+        watermark: Optional[datetime] = None,
+        parts: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.backup_id = backup_id
+        self.config_name = config_name
+        self.backup_type = backup_type
+        self.start_time = start_time
+        self.end_time = end_time
+        self.status = status
+        self.file_path = file_path
+        self.file_size = file_size
+        self.record_count = record_count
+        self.checksum = checksum
+        self.error_message = error_message
+        self.parent_id = parent_id  # backup this one extends
+        self.chain_depth = chain_depth  # number of ancestors
+        self.window_end = window_end
+        self.watermark = watermark  # created_at bound the backup covers
+        self.parts = parts or []
+    
+    @classmethod
+    def from_entry(cls, entry: BackupCatalogEntry) -> "BackupMetadata":
+        """Build metadata from a catalog row."""
+        return cls(**{name: getattr(entry, name) for name in _FIELDS})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        return {
+            'backup_id': self.backup_id,
+            'config_name': self.config_name,
+            'backup_type': self.backup_type,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'status': self.status,
+            'file_path': self.file_path,
+            'file_size': self.file_size,
+            'record_count': self.record_count,
+            'checksum': self.checksum,
+            'error_message': self.error_message,
+            'parent_id': self.parent_id,
+            'chain_depth': self.chain_depth,
+            'window_end': self.window_end.isoformat() if self.window_end else None,
+            'watermark': self.watermark.isoformat() if self.watermark else None
+        }
+
+
+class BackupCatalog:
+    """Stores backup metadata and resolves backup chains."""
+    
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self._db_manager = db_manager
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    async def save(self, metadata: BackupMetadata) -> None:
+        """Insert or update a backup's catalog entry."""
+        values = {name: getattr(metadata, name) for name in _FIELDS}
+        stmt = insert(BackupCatalogEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["backup_id"],
+            set_={name: stmt.excluded[name] for name in _FIELDS if name != "backup_id"},
+        )
+        async with self.db_manager.get_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+    
+    async def get(self, backup_id: str) -> Optional[BackupMetadata]:
+        """Look up one backup."""
+        stmt = select(BackupCatalogEntry).where(BackupCatalogEntry.backup_id == backup_id)
+        async with self.db_manager.get_session() as session:
+            entry = (await session.execute(stmt)).scalars().first()
+        return BackupMetadata.from_entry(entry) if entry else None
+    
+    async def latest(self, config_name: str, backup_type: Optional[str] = None) -> Optional[BackupMetadata]:
+        """Most recent completed backup of a configuration."""
+        stmt = select(BackupCatalogEntry).where(
+            BackupCatalogEntry.config_name == config_name,
+            BackupCatalogEntry.status == "completed",
+        )
+        if backup_type:
+            stmt = stmt.where(BackupCatalogEntry.backup_type == backup_type)
+        stmt = stmt.order_by(BackupCatalogEntry.start_time.desc()).limit(1)
+        async with self.db_manager.get_session() as session:
+            entry = (await session.execute(stmt)).scalars().first()
+        return BackupMetadata.from_entry(entry) if entry else None
+    
+    async def list_backups(self, config_name: Optional[str] = None, limit: Optional[int] = None) -> List[BackupMetadata]:
+        """Backups, newest first."""
+        stmt = select(BackupCatalogEntry).order_by(BackupCatalogEntry.start_time.desc())
+        if config_name:
+            stmt = stmt.where(BackupCatalogEntry.config_name == config_name)
+        if limit:
+            stmt = stmt.limit(limit)
+        async with self.db_manager.get_session() as session:
+            entries = (await session.execute(stmt)).scalars().all()
+        return [BackupMetadata.from_entry(entry) for entry in entries]
+    
+    async def chain(self, backup_id: str) -> List[BackupMetadata]:
+        """
+        The backups needed to restore ``backup_id``, base backup first.
+        
+        Resolved with one recursive query over parent_id.
+        """
+        base = select(BackupCatalogEntry.backup_id, BackupCatalogEntry.parent_id).where(
+            BackupCatalogEntry.backup_id == backup_id
+        ).cte("chain", recursive=True)
+        parent = aliased(BackupCatalogEntry)
+        ancestors = base.union_all(
+            select(parent.backup_id, parent.parent_id).where(parent.backup_id == base.c.parent_id)
+        )
+        stmt = (
+            select(BackupCatalogEntry)
+            .join(ancestors, ancestors.c.backup_id == BackupCatalogEntry.backup_id)
+            .order_by(BackupCatalogEntry.chain_depth)
+        )
+        async with self.db_manager.get_session() as session:
+            entries = (await session.execute(stmt)).scalars().all()
+        return [BackupMetadata.from_entry(entry) for entry in entries]
+    
+    async def expired(self, config_name: str, cutoff: datetime) -> List[BackupMetadata]:
+        """
+        Backups of a configuration that can be deleted, newest first.
+        
+        A backup older than ``cutoff`` is kept while any backup extending
+        it, directly or through its chain, is still retained.
+        """
+        backups = await self.list_backups(config_name)
+        children: Dict[str, List[BackupMetadata]] = {}
+        for backup in backups:
+            if backup.parent_id:
+                children.setdefault(backup.parent_id, []).append(backup)
+        
+        def retained(backup: BackupMetadata) -> bool:
+            return backup.start_time >= cutoff or any(retained(child) for child in children.get(backup.backup_id, []))
+        
+        # Newest first, so children are deleted before their parents
+        return [backup for backup in backups if not retained(backup)]
+    
+    async def remove(self, backup_id: str) -> None:
+        """Delete a backup's catalog entry."""
+        async with self.db_manager.get_session() as session:
+            await session.execute(delete(BackupCatalogEntry).where(BackupCatalogEntry.backup_id == backup_id))
+            await session.commit()
+    
+    async def summary(self) -> Dict[str, Any]:
+        """Backup count, total size and latest start time of completed backups."""
+        stmt = select(
+            func.count(),
+            func.coalesce(func.sum(BackupCatalogEntry.file_size), literal(0)),
+            func.max(BackupCatalogEntry.start_time),
+        ).where(BackupCatalogEntry.status == "completed")
+        async with self.db_manager.get_session() as session:
+            count, size, last_start = (await session.execute(stmt)).one()
+        return {'total_backups': count, 'storage_usage': size, 'last_backup_time': last_start}
+
+
+# Global backup catalog instance
+_backup_catalog: Optional[BackupCatalog] = None
+
+
+def get_backup_catalog() -> BackupCatalog:
+    """Get the global backup catalog instance."""
+    global _backup_catalog
+    if _backup_catalog is None:
+        _backup_catalog = BackupCatalog()
+    return _backup_catalog
@@ -0,0 +1,235 @@
+"""
+Bulk restore engine for the audit log framework.
+
+Backup parts are streamed into PostgreSQL in chunks. Each chunk is loaded
+with COPY into a temporary staging table and merged into audit_logs with
+``INSERT ... SELECT ... ON CONFLICT DO NOTHING``, in its own transaction,
+so rows that are already present are skipped and a restore can be re-run
+safely. After every committed chunk the position reached, a part and a
+byte offset into its NDJSON stream, is saved next to the manifest, and an
+interrupted restore continues from there.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import column, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import BackupSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditLog
+from app.services.backup_writer import decode_backup_record, read_manifest
+from app.services.ingestion_service import AUDIT_LOG_COLUMNS, BulkAuditWriter
+
+logger = structlog.get_logger(__name__)
+
+PROGRESS_NAME = "restore-progress.json"
+
+STAGING_TABLE = "audit_logs_restore"
+
+_CONFLICT_KEY = ["partition_date", "audit_id"]
+
+
+@dataclass
+class RestorePosition:
+    """Where a restore stands: a part and a byte offset into its NDJSON."""
+    part: int = 0
+    offset: int = 0
+
+
+@dataclass
+class RestoreResult:
+    """Outcome of a restore run."""
+    rows_read: int = 0
+    rows_restored: int = 0
+    chunks: int = 0
+    duration: float = 0.0
+    resumed_from: Optional[RestorePosition] = None
+    
+    @property
+    def rows_skipped(self) -> int:
+        """Rows that were already present."""
+        return self.rows_read - self.rows_restored
+
+
+def iter_record_chunks(
+    manifest_path: Path,
+    position: RestorePosition,
+    chunk_size: int,
+) -> Iterator[Tuple[List[Dict[str, Any]], RestorePosition]]:
+    """
+    Yield chunks of records starting at ``position``, with the position after each.
+    
+    Chunks never span parts. Offsets count bytes of the decompressed NDJSON,
+    so plain parts are resumed with a seek and gzip parts by decompressing
+    up to the offset without parsing.
+    """
+    manifest_path = Path(manifest_path)
+    parts = read_manifest(manifest_path)["parts"]
+    
+    for index in range(position.part, len(parts)):
+        path = manifest_path.parent / parts[index]["path"]
+        offset = position.offset if index == position.part else 0
+        opener = gzip.open if path.suffix == ".gz" else open
+        
+        with opener(path, "rb") as file:
+            file.seek(offset)
+            chunk: List[Dict[str, Any]] = []
+            for line in file:
+                offset += len(line)
+                if line.strip():
+                    chunk.append(decode_backup_record(line))
+                if len(chunk) >= chunk_size:
+                    yield chunk, RestorePosition(index, offset)
+                    chunk = []
+            if chunk:
+                yield chunk, RestorePosition(index, offset)
+
+
+class BulkRestorer:
+    """Restores backups into audit_logs through a COPY staging table."""
+    
+    def __init__(self, settings: BackupSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    @staticmethod
+    def progress_path(manifest_path: Path) -> Path:
+        return Path(manifest_path).parent / PROGRESS_NAME
+    
+    def load_progress(self, manifest_path: Path) -> Optional[RestorePosition]:
+        """Position saved by an interrupted restore of this backup."""
+        path = self.progress_path(manifest_path)
+        if not path.exists():
+            return None
+        return RestorePosition(**json.loads(path.read_text()))
+    
+    async def restore(
+        self,
+        manifest_path: Path,
+        target_table: Optional[str] = None,
+        resume: bool = True,
+    ) -> RestoreResult:
+        """
+        Restore every record of a backup.
+        
+        The next chunk is read and decoded in a thread while the current
+        one is merged.
+        
+        Args:
+            manifest_path: Manifest of the backup to restore
+            target_table: Table to merge into (default: audit_logs)
+            resume: Continue from the saved position instead of the start
+        
+        Returns:
+            RestoreResult: Rows read, rows inserted and chunks committed
+        """
+        target_table = target_table or AuditLog.__tablename__
+        position = self.load_progress(manifest_path) if resume else None
+        result = RestoreResult(resumed_from=position)
+        if position:
+            logger.info("Resuming restore", manifest=str(manifest_path), part=position.part, offset=position.offset)
+        
+        chunks = iter_record_chunks(manifest_path, position or RestorePosition(), self.settings.restore_chunk_size)
+        started = time.monotonic()
+        
+        pending = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+        try:
+            while True:
+                item = await pending
+                if item is None:
+                    break
+                records, position = item
+                pending = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+                
+                async with self.db_manager.get_session() as session:
+                    restored = await self._merge_chunk(session, records, target_table)
+                    await session.commit()
+                
+                self._save_progress(manifest_path, position)
+                result.rows_read += len(records)
+                result.rows_restored += restored
+                result.chunks += 1
+        
+        finally:
+            if not pending.done():
+                pending.cancel()
+        
+        self.progress_path(manifest_path).unlink(missing_ok=True)
+        result.duration = time.monotonic() - started
+        logger.info(
+            "Restore finished",
+            manifest=str(manifest_path),
+            rows_read=result.rows_read,
+            rows_restored=result.rows_restored,
+            chunks=result.chunks,
+            duration=round(result.duration, 3),
+        )
+        return result
+    
+    async def _merge_chunk(self, session: AsyncSession, records: List[Dict[str, Any]], target_table: str) -> int:
+        """Load a chunk into staging and insert the rows not yet present."""
+        target = table(target_table, *[column(name, AuditLog.__table__.c[name].type) for name in AUDIT_LOG_COLUMNS])
+        
+        if not self._supports_copy(session):
+            stmt = insert(target).on_conflict_do_nothing(index_elements=_CONFLICT_KEY)
+            result = await session.execute(stmt, records)
+            return max(result.rowcount, 0)
+        
+        # ON COMMIT DELETE ROWS empties staging when the chunk commits; the
+        # table is created on whichever pooled connection the chunk runs.
+        await session.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+            f"(LIKE {target_table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ))
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=[BulkAuditWriter._to_copy_record(record) for record in records],
+            columns=AUDIT_LOG_COLUMNS,
+        )
+        
+        staging = table(STAGING_TABLE, *[column(name) for name in AUDIT_LOG_COLUMNS])
+        stmt = insert(target).from_select(AUDIT_LOG_COLUMNS, select(staging)).on_conflict_do_nothing(
+            index_elements=_CONFLICT_KEY
+        )
+        result = await session.execute(stmt)
+        return result.rowcount
+    
+    @staticmethod
+    def _supports_copy(session: AsyncSession) -> bool:
+        bind = session.get_bind()
+        return bind.dialect.name == "postgresql" and bind.dialect.driver == "asyncpg"
+    
+    def _save_progress(self, manifest_path: Path, position: RestorePosition) -> None:
+        path = self.progress_path(manifest_path)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(position)))
+        tmp_path.replace(path)
+
+
+# Global bulk restorer instance
+_bulk_restorer: Optional[BulkRestorer] = None
+
+
+def get_bulk_restorer() -> BulkRestorer:
+    """Get the global bulk restorer instance."""
+    global _bulk_restorer
+    if _bulk_restorer is None:
+        _bulk_restorer = BulkRestorer(get_settings().backup)
+    return _bulk_restorer
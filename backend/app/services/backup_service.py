@@ -7,24 +7,30 @@ and data restoration capabilities for the audit logging system.
 """
 
 import asyncio
-import gzip
-import json
 import logging
 import shutil
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import structlog
 from google.cloud import storage
-from sqlalchemy import func, select, text
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import get_settings
-from app.db.database import get_database
-from app.models.audit import AuditLog
+from app.config import get_settings
+from app.db.database import get_database_manager
+from app.services.backup_catalog import BackupMetadata, get_backup_catalog
+from app.services.backup_restorer import get_bulk_restorer
+from app.services.backup_writer import (
+    BackupResult,
+    file_sha256,
+    get_backup_writer,
+    iter_backup_records,
+    read_manifest,
+    verify_backup,
+)
 from app.services.bigquery_service import get_bigquery_service
-from app.utils.metrics import metrics
+from app.utils.metrics import audit_metrics
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -55,58 +61,12 @@ class BackupConfig:
     
     def get_retention_cutoff(self) -> datetime:
         """Get the cutoff date for backup retention."""
-        return datetime.utcnow() - timedelta(days=self.retention_days)
+        return datetime.now(timezone.utc) - timedelta(days=self.retention_days)
     
     def __str__(self) -> str:
         return f"BackupConfig({self.name}, {self.backup_type}, {self.schedule})"
 
 
-class BackupMetadata:
-    """Backup metadata information."""
-    
-    def __init__(
-        self,
-        backup_id: str,
-        config_name: str,
-        backup_type: str,
-        start_time: datetime,
-        end_time: Optional[datetime] = None,
-        status: str = "running",
-        file_path: Optional[str] = None,
-        file_size: Optional[int] = None,
-        record_count: Optional[int] = None,
-        checksum: Optional[str] = None,
-        error_message: Optional[str] = None
-    ):
-        self.backup_id = backup_id
-        self.config_name = config_name
-        self.backup_type = backup_type
-        self.start_time = start_time
-        self.end_time = end_time
-        self.status = status
-        self.file_path = file_path
-        self.file_size = file_size
-        self.record_count = record_count
-        self.checksum = checksum
-        self.error_message = error_message
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation."""
-        return {
-            'backup_id': self.backup_id,
-            'config_name': self.config_name,
-            'backup_type': self.backup_type,
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat() if self.end_time else None,
-            'status': self.status,
-            'file_path': self.file_path,
-            'file_size': self.file_size,
-            'record_count': self.record_count,
-            'checksum': self.checksum,
-            'error_message': self.error_message
-        }
-
-
 class BackupService:
     """
     Backup and disaster recovery service.
@@ -116,10 +76,12 @@ class BackupService:
     """
     
     def __init__(self):
-        self.db = get_database()
+        self.db = get_database_manager()
+        self.writer = get_backup_writer()
+        self.restorer = get_bulk_restorer()
+        self.catalog = get_backup_catalog()
         self.bigquery_service = get_bigquery_service()
         self.backup_configs = self._load_backup_configs()
-        self.backup_history: List[BackupMetadata] = []
         self.storage_client = None
         
         # Initialize cloud storage client if configured
@@ -188,7 +150,8 @@ class BackupService:
         config_name: str,
         backup_type: Optional[str] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        time_budget: Optional[float] = None
     ) -> BackupMetadata:
         """
         Create a backup based on configuration.
@@ -198,6 +161,8 @@ class BackupService:
             backup_type: Override backup type (full, incremental, differential)
             start_date: Start date for data range (for incremental backups)
             end_date: End date for data range
+            time_budget: Seconds the backup may read for before it is
+                abandoned and recorded as failed
             
         Returns:
             Backup metadata
@@ -208,14 +173,14 @@ class BackupService:
             raise ValueError(f"Backup configuration '{config_name}' not found")
         
         # Generate backup ID
-        backup_id = f"{config_name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        backup_id = f"{config_name}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
         
         # Create backup metadata
         metadata = BackupMetadata(
             backup_id=backup_id,
             config_name=config_name,
             backup_type=backup_type or config.backup_type,
-            start_time=datetime.utcnow()
+            start_time=datetime.now(timezone.utc)
         )
         
         logger.info(
@@ -226,46 +191,70 @@ class BackupService:
         )
         
         try:
-            # Determine date range for backup
-            if metadata.backup_type == "incremental":
-                if not start_date:
-                    # Get last backup time for incremental
-                    start_date = await self._get_last_backup_time(config_name)
-                end_date = end_date or datetime.utcnow()
-            elif metadata.backup_type == "differential":
-                if not start_date:
-                    # Get last full backup time for differential
-                    start_date = await self._get_last_full_backup_time(config_name)
-                end_date = end_date or datetime.utcnow()
-            else:  # full backup
+            # Incremental and differential backups extend a parent and
+            # export the rows created after its watermark
+            after = None
+            if metadata.backup_type != "full":
+                parent = await self._find_parent(config, metadata.backup_type)
+                if parent:
+                    metadata.parent_id = parent.backup_id
+                    metadata.chain_depth = parent.chain_depth + 1
+                    metadata.watermark = parent.watermark
+                    after = None if start_date else parent.watermark
+                else:
+                    logger.info(
+                        "No base backup to extend, taking a full backup",
+                        backup_id=backup_id,
+                        requested_type=metadata.backup_type
+                    )
+                    metadata.backup_type = "full"
+            
+            if metadata.backup_type == "full":
                 start_date = None
                 end_date = None
             
-            # Create backup file
-            backup_file_path = await self._create_backup_file(
-                metadata, config, start_date, end_date
+            metadata.window_end = end_date
+            await self.catalog.save(metadata)
+            
+            # Create backup files
+            deadline = time.monotonic() + time_budget if time_budget else None
+            backup = await self._create_backup_file(
+                metadata, config, start_date, end_date, after, deadline
             )
             
-            metadata.file_path = str(backup_file_path)
-            metadata.file_size = backup_file_path.stat().st_size
+            metadata.file_path = str(backup.manifest_path)
+            metadata.file_size = backup.total_bytes
+            metadata.record_count = backup.rows
+            metadata.watermark = backup.watermark
+            metadata.window_end = backup.watermark
+            metadata.parts = [
+                {
+                    'path': part.path,
+                    'rows': part.rows,
+                    'bytes': part.bytes,
+                    'sha256': part.sha256
+                }
+                for part in backup.parts
+            ]
             
-            # Calculate checksum
-            metadata.checksum = await self._calculate_checksum(backup_file_path)
+            # The manifest lists every part's checksum, so its own checksum,
+            # computed as it was written, covers the whole backup
+            metadata.checksum = backup.checksum
             
             # Upload to cloud storage if configured
             if config.storage_location != "local":
-                await self._upload_to_cloud_storage(backup_file_path, metadata, config)
+                await self._upload_to_cloud_storage(backup.backup_dir, metadata, config)
             
             # Update metadata
-            metadata.end_time = datetime.utcnow()
+            metadata.end_time = datetime.now(timezone.utc)
             metadata.status = "completed"
             
-            # Add to history
-            self.backup_history.append(metadata)
+            # Record in the catalog
+            await self.catalog.save(metadata)
             
             # Record metrics
             duration = (metadata.end_time - metadata.start_time).total_seconds()
-            metrics.record_backup_created(
+            audit_metrics.record_backup_created(
                 config_name=config_name,
                 backup_type=metadata.backup_type,
                 file_size=metadata.file_size,
@@ -284,12 +273,15 @@ class BackupService:
             return metadata
             
         except Exception as e:
-            metadata.end_time = datetime.utcnow()
+            metadata.end_time = datetime.now(timezone.utc)
             metadata.status = "failed"
             metadata.error_message = str(e)
-            self.backup_history.append(metadata)
             
             logger.error("Backup failed", backup_id=backup_id, error=str(e))
+            try:
+                await self.catalog.save(metadata)
+            except Exception as catalog_error:
+                logger.error("Failed to record failed backup", backup_id=backup_id, error=str(catalog_error))
             raise
     
     async def _create_backup_file(
@@ -297,147 +289,64 @@ class BackupService:
         metadata: BackupMetadata,
         config: BackupConfig,
         start_date: Optional[datetime],
-        end_date: Optional[datetime]
-    ) -> Path:
-        """Create backup file with audit log data."""
-        # Create backup directory
-        backup_dir = Path(getattr(settings, 'backup_directory', '/tmp/audit_backups'))
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate filename
-        timestamp = metadata.start_time.strftime('%Y%m%d_%H%M%S')
-        filename = f"{metadata.backup_id}.json"
-        if config.compression:
-            filename += ".gz"
-        
-        backup_file_path = backup_dir / filename
-        
-        # Query data based on backup type and date range
-        async with self.db.get_session() as session:
-            query = select(AuditLog)
-            
-            if start_date:
-                query = query.where(AuditLog.created_at >= start_date)
-            if end_date:
-                query = query.where(AuditLog.created_at <= end_date)
-            
-            # Order by creation time for consistent backups
-            query = query.order_by(AuditLog.created_at)
-            
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            result = await session.execute(count_query)
-            total_count = result.scalar()
-            metadata.record_count = total_count
-            
-            logger.info(
-                "Creating backup file",
-                backup_id=metadata.backup_id,
-                record_count=total_count,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            # Write data to file
-            if config.compression:
-                file_handle = gzip.open(backup_file_path, 'wt', encoding='utf-8')
-            else:
-                file_handle = open(backup_file_path, 'w', encoding='utf-8')
-            
-            try:
-                # Write backup metadata header
-                backup_header = {
-                    'backup_metadata': metadata.to_dict(),
-                    'backup_config': {
-                        'name': config.name,
-                        'backup_type': config.backup_type,
-                        'compression': config.compression,
-                        'encryption': config.encryption
-                    },
-                    'data_range': {
-                        'start_date': start_date.isoformat() if start_date else None,
-                        'end_date': end_date.isoformat() if end_date else None,
-                        'total_records': total_count
-                    }
-                }
-                
-                file_handle.write(json.dumps(backup_header) + '\n')
-                
-                # Write data in batches
-                batch_size = getattr(settings, 'backup_batch_size', 1000)
-                offset = 0
-                
-                while offset < total_count:
-                    batch_query = query.offset(offset).limit(batch_size)
-                    result = await session.execute(batch_query)
-                    batch_records = result.scalars().all()
-                    
-                    if not batch_records:
-                        break
-                    
-                    # Convert records to JSON
-                    for record in batch_records:
-                        record_dict = {
-                            'id': str(record.id),
-                            'tenant_id': record.tenant_id,
-                            'user_id': record.user_id,
-                            'event_type': record.event_type,
-                            'resource_type': record.resource_type,
-                            'resource_id': record.resource_id,
-                            'action': record.action,
-                            'timestamp': record.timestamp.isoformat(),
-                            'ip_address': record.ip_address,
-                            'user_agent': record.user_agent,
-                            'metadata': record.event_metadata,
-                            'created_at': record.created_at.isoformat()
-                        }
-                        file_handle.write(json.dumps(record_dict) + '\n')
-                    
-                    offset += len(batch_records)
-                    
-                    logger.debug(
-                        "Backup progress",
-                        backup_id=metadata.backup_id,
-                        processed=offset,
-                        total=total_count,
-                        progress=f"{(offset/total_count)*100:.1f}%"
-                    )
-            
-            finally:
-                file_handle.close()
+        end_date: Optional[datetime],
+        after: Optional[datetime] = None,
+        deadline: Optional[float] = None
+    ) -> BackupResult:
+        """
+        Create backup files with audit log data.
         
-        return backup_file_path
+        The date range is split into shards that are read concurrently with
+        keyset pagination and encoded in a process pool; each shard becomes
+        one part file next to a manifest.
+        """
+        logger.info(
+            "Creating backup files",
+            backup_id=metadata.backup_id,
+            start_date=start_date,
+            end_date=end_date,
+            after=after
+        )
+        
+        return await self.writer.write(
+            metadata.backup_id,
+            start=start_date,
+            end=end_date,
+            after=after,
+            compress=config.compression,
+            deadline=deadline,
+            header={
+                'backup_metadata': metadata.to_dict(),
+                'backup_config': {
+                    'name': config.name,
+                    'backup_type': config.backup_type,
+                    'compression': config.compression,
+                    'encryption': config.encryption
+                },
+            },
+        )
     
     async def _calculate_checksum(self, file_path: Path) -> str:
         """Calculate SHA-256 checksum of backup file."""
-        import hashlib
-        
-        sha256_hash = hashlib.sha256()
-        
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        
-        return sha256_hash.hexdigest()
+        return await asyncio.to_thread(file_sha256, file_path)
     
     async def _upload_to_cloud_storage(
         self,
-        file_path: Path,
+        backup_dir: Path,
         metadata: BackupMetadata,
         config: BackupConfig
     ) -> None:
-        """Upload backup file to cloud storage."""
+        """Upload backup files to cloud storage."""
         if config.storage_location == "gcs" and self.storage_client:
             try:
                 bucket_name = getattr(settings, 'backup_gcs_bucket', 'audit-service-backups')
                 bucket = self.storage_client.bucket(bucket_name)
                 
-                # Create blob path
-                blob_path = f"backups/{config.name}/{file_path.name}"
-                blob = bucket.blob(blob_path)
-                
-                # Upload file
-                blob.upload_from_filename(str(file_path))
+                # Parts first, manifest last, so a listed manifest is complete
+                files = sorted(backup_dir.iterdir(), key=lambda path: path.name == 'manifest.json')
+                for file_path in files:
+                    blob = bucket.blob(self._blob_path(config.name, metadata.backup_id, file_path.name))
+                    await asyncio.to_thread(blob.upload_from_filename, str(file_path))
                 
                 # Set metadata
                 blob.metadata = {
@@ -453,70 +362,67 @@ class BackupService:
                     "Backup uploaded to GCS",
                     backup_id=metadata.backup_id,
                     bucket=bucket_name,
-                    blob_path=blob_path
+                    files=len(files)
                 )
                 
             except Exception as e:
                 logger.error("Failed to upload backup to GCS", error=str(e))
                 raise
     
-    async def _get_last_backup_time(self, config_name: str) -> datetime:
-        """Get the timestamp of the last backup for incremental backups."""
-        # Find the most recent successful backup
-        recent_backups = [
-            b for b in self.backup_history
-            if b.config_name == config_name and b.status == "completed"
-        ]
-        
-        if recent_backups:
-            latest_backup = max(recent_backups, key=lambda b: b.start_time)
-            return latest_backup.start_time
-        
-        # If no previous backup, start from 24 hours ago
-        return datetime.utcnow() - timedelta(hours=24)
+    @staticmethod
+    def _blob_path(config_name: str, backup_id: str, file_name: str) -> str:
+        """Cloud storage path of one backup file."""
+        return f"backups/{config_name}/{backup_id}/{file_name}"
     
-    async def _get_last_full_backup_time(self, config_name: str) -> datetime:
-        """Get the timestamp of the last full backup for differential backups."""
-        # Find the most recent successful full backup
-        full_backups = [
-            b for b in self.backup_history
-            if b.config_name == config_name and b.backup_type == "full" and b.status == "completed"
-        ]
-        
-        if full_backups:
-            latest_backup = max(full_backups, key=lambda b: b.start_time)
-            return latest_backup.start_time
+    async def _find_parent(self, config: BackupConfig, backup_type: str) -> Optional[BackupMetadata]:
+        """
+        Find the backup an incremental or differential backup extends.
         
-        # If no previous full backup, start from 7 days ago
-        return datetime.utcnow() - timedelta(days=7)
+        Incrementals extend the latest backup and differentials the latest
+        full one. Once a chain reaches ``max_chain_length`` no parent is
+        returned, so the next backup starts a new chain.
+        """
+        if backup_type == "differential":
+            parent = await self.catalog.latest(config.name, backup_type="full")
+        else:
+            parent = await self.catalog.latest(config.name)
+        
+        if parent and parent.chain_depth >= settings.backup.max_chain_length:
+            return None
+        return parent
     
     async def restore_from_backup(
         self,
         backup_id: str,
         target_table: Optional[str] = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        resume: bool = True
     ) -> Dict[str, Any]:
         """
         Restore data from a backup.
         
+        Incremental and differential backups are restored together with
+        the chain they extend, base backup first, as recorded in the
+        backup catalog.
+        
         Args:
             backup_id: ID of backup to restore from
             target_table: Target table name (default: main audit table)
             dry_run: If True, only validate backup without restoring
+            resume: Continue an interrupted restore of this backup
             
         Returns:
             Restoration results
         """
-        # Find backup metadata
-        backup_metadata = next(
-            (b for b in self.backup_history if b.backup_id == backup_id), None
-        )
+        # Find the backup and the chain it extends
+        chain = await self.catalog.chain(backup_id)
         
-        if not backup_metadata:
+        if not chain or chain[-1].backup_id != backup_id:
             raise ValueError(f"Backup '{backup_id}' not found")
         
-        if backup_metadata.status != "completed":
-            raise ValueError(f"Backup '{backup_id}' is not in completed state")
+        for backup_metadata in chain:
+            if backup_metadata.status != "completed":
+                raise ValueError(f"Backup '{backup_metadata.backup_id}' is not in completed state")
         
         logger.info(
             "Starting restore from backup",
@@ -527,94 +433,60 @@ class BackupService:
         
         restore_results = {
             'backup_id': backup_id,
-            'start_time': datetime.utcnow(),
+            'start_time': datetime.now(timezone.utc),
             'dry_run': dry_run,
             'records_processed': 0,
             'records_restored': 0,
+            'records_skipped': 0,
+            'chain': [b.backup_id for b in chain],
             'errors': [],
-            'validation_results': {}
+            'validation_results': {'checksum_valid': False, 'header_valid': False, 'expected_records': 0}
         }
         
         try:
-            # Validate backup file
-            backup_file_path = Path(backup_metadata.file_path)
-            if not backup_file_path.exists():
-                # Try to download from cloud storage
-                await self._download_from_cloud_storage(backup_metadata)
-            
-            # Verify checksum
-            current_checksum = await self._calculate_checksum(backup_file_path)
-            if current_checksum != backup_metadata.checksum:
-                raise ValueError("Backup file checksum mismatch - file may be corrupted")
-            
-            restore_results['validation_results']['checksum_valid'] = True
-            
-            # Process backup file
-            if backup_file_path.suffix == '.gz':
-                file_handle = gzip.open(backup_file_path, 'rt', encoding='utf-8')
-            else:
-                file_handle = open(backup_file_path, 'r', encoding='utf-8')
-            
-            try:
-                # Read backup header
-                header_line = file_handle.readline().strip()
-                backup_header = json.loads(header_line)
+            # Validate every backup of the chain before restoring any
+            manifest_paths = []
+            for backup_metadata in chain:
+                backup_file_path = Path(backup_metadata.file_path)
+                if not backup_file_path.exists():
+                    # Try to download from cloud storage
+                    await self._download_from_cloud_storage(backup_metadata)
+                
+                # Verify checksum
+                current_checksum = await self._calculate_checksum(backup_file_path)
+                if current_checksum != backup_metadata.checksum:
+                    raise ValueError(
+                        f"Backup '{backup_metadata.backup_id}' checksum mismatch - file may be corrupted"
+                    )
                 
-                restore_results['validation_results']['header_valid'] = True
-                restore_results['validation_results']['expected_records'] = (
+                backup_header = read_manifest(backup_file_path)
+                restore_results['validation_results']['expected_records'] += (
                     backup_header['data_range']['total_records']
                 )
-                
+                manifest_paths.append(backup_file_path)
+            
+            restore_results['validation_results']['checksum_valid'] = True
+            restore_results['validation_results']['header_valid'] = True
+            
+            for backup_file_path in manifest_paths:
                 if not dry_run:
-                    # Begin database transaction
-                    async with self.db.get_session() as session:
-                        # Process data records
-                        batch_records = []
-                        batch_size = getattr(settings, 'restore_batch_size', 100)
-                        
-                        for line in file_handle:
-                            line = line.strip()
-                            if not line:
-                                continue
-                            
-                            try:
-                                record_data = json.loads(line)
-                                batch_records.append(record_data)
-                                restore_results['records_processed'] += 1
-                                
-                                if len(batch_records) >= batch_size:
-                                    # Process batch
-                                    restored_count = await self._restore_batch(
-                                        session, batch_records, target_table
-                                    )
-                                    restore_results['records_restored'] += restored_count
-                                    batch_records = []
-                                
-                            except json.JSONDecodeError as e:
-                                error_msg = f"Invalid JSON at record {restore_results['records_processed']}: {str(e)}"
-                                restore_results['errors'].append(error_msg)
-                                logger.warning("Restore JSON error", error=error_msg)
-                        
-                        # Process remaining records
-                        if batch_records:
-                            restored_count = await self._restore_batch(
-                                session, batch_records, target_table
-                            )
-                            restore_results['records_restored'] += restored_count
-                        
-                        # Commit transaction
-                        await session.commit()
+                    # COPY into staging and merge chunk by chunk; re-running
+                    # continues from the last committed chunk
+                    restored = await self.restorer.restore(
+                        backup_file_path, target_table=target_table, resume=resume
+                    )
+                    restore_results['records_processed'] += restored.rows_read
+                    restore_results['records_restored'] += restored.rows_restored
+                    restore_results['records_skipped'] += restored.rows_skipped
+                    if restored.resumed_from:
+                        restore_results.setdefault('resumed', []).append(str(backup_file_path.parent.name))
                 
                 else:
                     # Dry run - just count records
-                    for line in file_handle:
-                        if line.strip():
-                            restore_results['records_processed'] += 1
+                    for _ in iter_backup_records(backup_file_path):
+                        restore_results['records_processed'] += 1
             
-            finally:
-                file_handle.close()
-            
-            restore_results['end_time'] = datetime.utcnow()
+            restore_results['end_time'] = datetime.now(timezone.utc)
             restore_results['duration'] = (
                 restore_results['end_time'] - restore_results['start_time']
             ).total_seconds()
@@ -632,7 +504,7 @@ class BackupService:
             return restore_results
             
         except Exception as e:
-            restore_results['end_time'] = datetime.utcnow()
+            restore_results['end_time'] = datetime.now(timezone.utc)
             restore_results['error'] = str(e)
             logger.error("Restore failed", backup_id=backup_id, error=str(e))
             raise
@@ -653,65 +525,31 @@ class BackupService:
             if not config:
                 raise ValueError(f"Backup config '{metadata.config_name}' not found")
             
-            # Download file
-            blob_path = f"backups/{config.name}/{Path(metadata.file_path).name}"
-            blob = bucket.blob(blob_path)
+            # Download the manifest, then the parts it lists
+            manifest_path = Path(metadata.file_path)
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            blob = bucket.blob(self._blob_path(config.name, metadata.backup_id, manifest_path.name))
+            await asyncio.to_thread(blob.download_to_filename, str(manifest_path))
             
-            blob.download_to_filename(metadata.file_path)
+            parts = read_manifest(manifest_path)['parts']
+            for part in parts:
+                blob = bucket.blob(self._blob_path(config.name, metadata.backup_id, part['path']))
+                await asyncio.to_thread(blob.download_to_filename, str(manifest_path.parent / part['path']))
             
             logger.info(
                 "Downloaded backup from GCS",
                 backup_id=metadata.backup_id,
-                blob_path=blob_path
+                parts=len(parts)
             )
             
         except Exception as e:
             logger.error("Failed to download backup from GCS", error=str(e))
             raise
     
-    async def _restore_batch(
-        self,
-        session: AsyncSession,
-        batch_records: List[Dict[str, Any]],
-        target_table: Optional[str]
-    ) -> int:
-        """Restore a batch of records to the database."""
-        restored_count = 0
-        
-        for record_data in batch_records:
-            try:
-                # Create AuditLog instance
-                audit_log = AuditLog(
-                    id=record_data.get('id'),
-                    tenant_id=record_data['tenant_id'],
-                    user_id=record_data.get('user_id'),
-                    event_type=record_data['event_type'],
-                    resource_type=record_data.get('resource_type'),
-                    resource_id=record_data.get('resource_id'),
-                    action=record_data['action'],
-                    timestamp=datetime.fromisoformat(record_data['timestamp']),
-                    ip_address=record_data.get('ip_address'),
-                    user_agent=record_data.get('user_agent'),
-                    metadata=record_data.get('metadata', {}),
-                    created_at=datetime.fromisoformat(record_data['created_at'])
-                )
-                
-                session.add(audit_log)
-                restored_count += 1
-                
-            except Exception as e:
-                logger.warning(
-                    "Failed to restore record",
-                    record_id=record_data.get('id'),
-                    error=str(e)
-                )
-        
-        return restored_count
-    
     async def cleanup_old_backups(self) -> Dict[str, Any]:
         """Clean up old backups based on retention policies."""
         cleanup_results = {
-            'start_time': datetime.utcnow(),
+            'start_time': datetime.now(timezone.utc),
             'configs_processed': 0,
             'backups_deleted': 0,
             'storage_freed': 0,
@@ -724,34 +562,31 @@ class BackupService:
             try:
                 retention_cutoff = config.get_retention_cutoff()
                 
-                # Find old backups for this config
-                old_backups = [
-                    b for b in self.backup_history
-                    if (b.config_name == config.name and 
-                        b.start_time < retention_cutoff and
-                        b.status == "completed")
-                ]
+                # Find old backups for this config that no retained
+                # backup builds on
+                old_backups = await self.catalog.expired(config.name, retention_cutoff)
                 
                 for backup in old_backups:
                     try:
-                        # Delete local file
-                        if backup.file_path and Path(backup.file_path).exists():
-                            file_size = Path(backup.file_path).stat().st_size
-                            Path(backup.file_path).unlink()
+                        # Delete local files
+                        backup_dir = Path(backup.file_path).parent if backup.file_path else None
+                        if backup_dir and backup_dir.exists():
+                            file_size = sum(path.stat().st_size for path in backup_dir.iterdir())
+                            shutil.rmtree(backup_dir)
                             cleanup_results['storage_freed'] += file_size
                         
                         # Delete from cloud storage
                         if config.storage_location != "local":
                             await self._delete_from_cloud_storage(backup, config)
                         
-                        # Remove from history
-                        self.backup_history.remove(backup)
+                        # Remove from the catalog
+                        await self.catalog.remove(backup.backup_id)
                         cleanup_results['backups_deleted'] += 1
                         
                         logger.info(
                             "Deleted old backup",
                             backup_id=backup.backup_id,
-                            age_days=(datetime.utcnow() - backup.start_time).days
+                            age_days=(datetime.now(timezone.utc) - backup.start_time).days
                         )
                         
                     except Exception as e:
@@ -766,7 +601,7 @@ class BackupService:
                 cleanup_results['errors'].append(error_msg)
                 logger.error("Config processing failed", config=config.name, error=str(e))
         
-        cleanup_results['end_time'] = datetime.utcnow()
+        cleanup_results['end_time'] = datetime.now(timezone.utc)
         cleanup_results['duration'] = (
             cleanup_results['end_time'] - cleanup_results['start_time']
         ).total_seconds()
@@ -791,15 +626,16 @@ class BackupService:
                 bucket_name = getattr(settings, 'backup_gcs_bucket', 'audit-service-backups')
                 bucket = self.storage_client.bucket(bucket_name)
                 
-                blob_path = f"backups/{config.name}/{Path(metadata.file_path).name}"
-                blob = bucket.blob(blob_path)
-                
-                blob.delete()
+                prefix = self._blob_path(config.name, metadata.backup_id, "")
+                blobs = list(bucket.list_blobs(prefix=prefix))
+                for blob in blobs:
+                    blob.delete()
                 
                 logger.info(
                     "Deleted backup from GCS",
                     backup_id=metadata.backup_id,
-                    blob_path=blob_path
+                    prefix=prefix,
+                    files=len(blobs)
                 )
                 
             except Exception as e:
@@ -808,33 +644,24 @@ class BackupService:
     
     async def get_backup_status(self) -> Dict[str, Any]:
         """Get backup service status and statistics."""
+        summary = await self.catalog.summary()
         status = {
             'service': 'BackupService',
             'configs': len(self.backup_configs),
-            'total_backups': len(self.backup_history),
+            'total_backups': summary['total_backups'],
             'recent_backups': [],
-            'storage_usage': 0,
+            'storage_usage': summary['storage_usage'],
             'last_backup_time': None,
             'next_scheduled_backup': None
         }
         
         # Recent backups (last 10)
-        recent_backups = sorted(
-            self.backup_history,
-            key=lambda b: b.start_time,
-            reverse=True
-        )[:10]
-        
+        recent_backups = await self.catalog.list_backups(limit=10)
         status['recent_backups'] = [b.to_dict() for b in recent_backups]
         
-        # Calculate storage usage
-        for backup in self.backup_history:
-            if backup.file_size:
-                status['storage_usage'] += backup.file_size
-        
-        # Last backup time
-        if recent_backups:
-            status['last_backup_time'] = recent_backups[0].start_time.isoformat()
+        # Last completed backup time
+        if summary['last_backup_time']:
+            status['last_backup_time'] = summary['last_backup_time'].isoformat()
         
         # Config information
         status['configs'] = [
@@ -851,4 +678,68 @@ class BackupService:
         
         return status
     
-    async def verify_backup_integrity(self, backup
\ No newline at end of file
+    async def verify_backup_integrity(self, backup_id: str) -> Dict[str, Any]:
+        """
+        Verify a backup against its recorded checksums.
+        
+        The manifest is checked against the catalog checksum, then every
+        part against the digest in the manifest; parts are hashed in
+        parallel threads, off the event loop.
+        
+        Args:
+            backup_id: ID of backup to verify
+            
+        Returns:
+            Verification results
+        """
+        backup_metadata = await self.catalog.get(backup_id)
+        if not backup_metadata or not backup_metadata.file_path:
+            raise ValueError(f"Backup '{backup_id}' not found")
+        
+        start_time = datetime.now(timezone.utc)
+        manifest_path = Path(backup_metadata.file_path)
+        if not manifest_path.exists():
+            await self._download_from_cloud_storage(backup_metadata)
+        
+        results = {
+            'backup_id': backup_id,
+            'valid': False,
+            'manifest_valid': False,
+            'parts_checked': 0,
+            'invalid_parts': []
+        }
+        
+        results['manifest_valid'] = await self._calculate_checksum(manifest_path) == backup_metadata.checksum
+        if results['manifest_valid']:
+            parts = await verify_backup(manifest_path, workers=settings.backup.verify_workers)
+            results['parts_checked'] = len(parts)
+            results['invalid_parts'] = [path for path, ok in parts.items() if not ok]
+            results['valid'] = not results['invalid_parts']
+        
+        results['duration'] = (datetime.now(timezone.utc) - start_time).total_seconds()
+        
+        log = logger.info if results['valid'] else logger.error
+        log(
+            "Backup verification completed",
+            backup_id=backup_id,
+            valid=results['valid'],
+            parts_checked=results['parts_checked'],
+            invalid_parts=len(results['invalid_parts']),
+            duration=results['duration']
+        )
+        
+        return results
+
+
+# Global backup service instance
+_backup_service: Optional[BackupService] = None
+
+
+def get_backup_service() -> BackupService:
+    """Get or create backup service instance."""
+    global _backup_service
+    
+    if _backup_service is None:
+        _backup_service = BackupService()
+    
+    return _backup_service
@@ -0,0 +1,421 @@
+"""
+Parallel backup writer for the audit log framework.
+
+A backup is split into shards over partition_date ranges. Each shard is
+read with keyset pagination along idx_audit_logs_partition_key on its own
+connection, and its pages are serialized to NDJSON and gzip-compressed in
+a process pool while the next page is being fetched, so neither encoding
+nor compression runs on the event loop. Every shard produces one part file; a manifest lists the parts
+with their row counts, sizes and SHA-256 checksums.
+
+Every backup is closed at a fixed created_at bound taken when it starts,
+``consistency_lag_seconds`` in the past, and that bound is its watermark.
+created_at is stamped before a row is committed (the ingestion buffer
+holds rows for a while), so a row can commit after a newer one has been
+read. Stopping short of the newest rows leaves them to the next backup,
+which starts after the watermark, instead of skipping them for good. Checksums are computed
+while the bytes are written, and verification hashes the parts in
+parallel threads, so neither needs an extra read pass on the event loop.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import mmap
+import shutil
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+import orjson
+import structlog
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import BackupSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditLog
+
+logger = structlog.get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Page key, in the column order of idx_audit_logs_partition_key so each
+# page is an index range scan rather than a sort of the rest of the shard
+_KEY = tuple_(AuditLog.partition_date, AuditLog.audit_id)
+
+_DATETIME_COLUMNS = ("timestamp", "created_at", "updated_at", "expires_at")
+
+# hashlib releases the GIL for large updates, so parts hash in parallel
+_HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _utc_date(value: datetime) -> date:
+    """UTC calendar date of a timestamp; naive timestamps are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+@dataclass
+class BackupPart:
+    """One part file of a backup; ``path`` is relative to the backup directory."""
+    path: str
+    shard_start: str
+    shard_end: str
+    rows: int
+    bytes: int
+    sha256: str
+
+
+@dataclass
+class BackupResult:
+    """Outcome of a backup write."""
+    backup_dir: Path
+    manifest_path: Path
+    parts: List[BackupPart] = field(default_factory=list)
+    checksum: Optional[str] = None
+    # created_at bound the backup covers; the next incremental starts after it
+    watermark: Optional[datetime] = None
+    
+    @property
+    def rows(self) -> int:
+        return sum(part.rows for part in self.parts)
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(part.bytes for part in self.parts)
+
+
+def plan_shards(first: date, last: date, count: int) -> List[Tuple[date, date]]:
+    """
+    Split the days ``first..last`` into at most ``count`` half-open ranges.
+    
+    Ranges are whole days of near-equal length, in date order.
+    """
+    days = (last - first).days + 1
+    count = max(1, min(count, days))
+    shards = []
+    start = first
+    for index in range(count):
+        length = days // count + (1 if index < days % count else 0)
+        end = start + timedelta(days=length)
+        shards.append((start, end))
+        start = end
+    return shards
+
+
+def encode_backup_chunk(rows: List[Dict[str, Any]], compression_level: int) -> bytes:
+    """
+    Serialize rows to NDJSON, gzip-compressed unless the level is 0.
+    
+    Runs in a worker process; every call produces a complete gzip member,
+    and concatenated members form a valid gzip file.
+    """
+    data = b"".join(orjson.dumps(row, default=str) + b"\n" for row in rows)
+    if compression_level:
+        return gzip.compress(data, compresslevel=compression_level, mtime=0)
+    return data
+
+
+def decode_backup_record(line: bytes) -> Dict[str, Any]:
+    """Parse one backup line back into audit_logs column values."""
+    record = orjson.loads(line)
+    record["audit_id"] = UUID(record["audit_id"])
+    record["partition_date"] = date.fromisoformat(record["partition_date"])
+    for column in _DATETIME_COLUMNS:
+        if record.get(column) is not None:
+            record[column] = datetime.fromisoformat(record[column])
+    return record
+
+
+def read_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """Load a backup manifest."""
+    return json.loads(Path(manifest_path).read_text())
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read through a memory map in large blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        if Path(path).stat().st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(view), _HASH_BLOCK_SIZE):
+                        digest.update(view[offset:offset + _HASH_BLOCK_SIZE])
+                finally:
+                    view.release()
+    return digest.hexdigest()
+
+
+async def verify_backup(manifest_path: Path, workers: int = 4) -> Dict[str, bool]:
+    """
+    Check every part of a backup against the digest in its manifest.
+    
+    Parts are hashed concurrently in a thread pool; a missing part fails.
+    
+    Returns:
+        Dict[str, bool]: Whether each part, by path, matches
+    """
+    manifest_path = Path(manifest_path)
+    parts = read_manifest(manifest_path)["parts"]
+    loop = asyncio.get_running_loop()
+    
+    def check(part: Dict[str, Any]) -> bool:
+        path = manifest_path.parent / part["path"]
+        return path.is_file() and file_sha256(path) == part["sha256"]
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = await asyncio.gather(*(loop.run_in_executor(executor, check, part) for part in parts))
+    return {part["path"]: ok for part, ok in zip(parts, results)}
+
+
+def iter_backup_records(manifest_path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield every record of a backup, part by part."""
+    manifest_path = Path(manifest_path)
+    manifest = read_manifest(manifest_path)
+    for part in manifest["parts"]:
+        path = manifest_path.parent / part["path"]
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    yield decode_backup_record(line)
+
+
+class ParallelBackupWriter:
+    """Writes audit log backups as shard-parallel, multi-part files."""
+    
+    def __init__(self, settings: BackupSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    async def write(
+        self,
+        backup_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[datetime] = None,
+        compress: bool = True,
+        header: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        deadline: Optional[float] = None,
+    ) -> BackupResult:
+        """
+        Write a backup of the audit logs created between ``start`` and ``end``.
+        
+        ``end`` is capped at ``consistency_lag_seconds`` before now, and the
+        capped bound becomes the backup's watermark. Shards are taken from the
+        partition_date range present in the table within the window's days
+        and read by up to ``connections`` concurrent sessions. The manifest
+        is written last; a backup that fails leaves nothing behind, including
+        one that is still reading when ``deadline`` passes.
+        
+        Args:
+            backup_id: Name of the backup directory
+            start: Only rows created at or after this
+            end: Only rows created at or before this
+            after: Only rows created after this watermark
+            compress: gzip the part files
+            header: Extra information stored in the manifest
+            executor: Encoder pool; a process pool is created when omitted
+            deadline: Monotonic time after which the backup fails with TimeoutError
+        
+        Returns:
+            BackupResult: The manifest path and the written parts
+        """
+        backup_dir = Path(self.settings.directory) / backup_id
+        backup_dir.mkdir(parents=True)
+        result = BackupResult(backup_dir=backup_dir, manifest_path=backup_dir / MANIFEST_NAME)
+        
+        # Rows stamped after this may still be uncommitted
+        settled = datetime.now(timezone.utc) - timedelta(seconds=self.settings.consistency_lag_seconds)
+        result.watermark = min(end, settled) if end else settled
+        
+        window = [AuditLog.created_at <= result.watermark]
+        if start:
+            window.append(AuditLog.created_at >= start)
+        if after:
+            window.append(AuditLog.created_at > after)
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=self.settings.workers or None)
+        
+        tasks: List[asyncio.Task] = []
+        try:
+            # partition_date is the UTC date of created_at, so the window's
+            # days bound the shards; a daily incremental then plans one day
+            # instead of the whole table
+            lower = max(filter(None, (start, after)), default=None)
+            first, last = await self._key_range(
+                _utc_date(lower) if lower else None, _utc_date(result.watermark)
+            )
+            shards = plan_shards(first, last, self.settings.shards) if first else []
+            semaphore = asyncio.Semaphore(self.settings.connections)
+            tasks = [
+                asyncio.create_task(
+                    self._write_shard(backup_dir, index, shard, window, compress, executor, semaphore, deadline)
+                )
+                for index, shard in enumerate(shards)
+            ]
+            result.parts = list(await asyncio.gather(*tasks))
+            
+            manifest = {
+                "backup_id": backup_id,
+                "format": "ndjson",
+                "compression": "gzip" if compress else None,
+                "data_range": {
+                    "start_date": start.isoformat() if start else None,
+                    "end_date": end.isoformat() if end else None,
+                    "after": after.isoformat() if after else None,
+                    "total_records": result.rows,
+                    "watermark": result.watermark.isoformat(),
+                },
+                **(header or {}),
+                "parts": [asdict(part) for part in result.parts],
+            }
+            data = json.dumps(manifest, indent=2, default=str).encode()
+            result.checksum = hashlib.sha256(data).hexdigest()
+            tmp_path = result.manifest_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(result.manifest_path)
+        
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            shutil.rmtree(backup_dir, ignore_errors=True)
+            logger.error("Backup write failed", backup_id=backup_id, error=str(e))
+            raise
+        
+        finally:
+            if own_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.info(
+            "Backup written",
+            backup_id=backup_id,
+            parts=len(result.parts),
+            rows=result.rows,
+            bytes=result.total_bytes,
+        )
+        return result
+    
+    async def _key_range(
+        self,
+        lower: Optional[date] = None,
+        upper: Optional[date] = None,
+    ) -> Tuple[Optional[date], Optional[date]]:
+        """Oldest and newest partition_date between two days, read from an index."""
+        stmt = select(func.min(AuditLog.partition_date), func.max(AuditLog.partition_date))
+        if lower:
+            stmt = stmt.where(AuditLog.partition_date >= lower)
+        if upper:
+            stmt = stmt.where(AuditLog.partition_date <= upper)
+        async with self.db_manager.get_session() as session:
+            first, last = (await session.execute(stmt)).one()
+        return first, last
+    
+    async def _write_shard(
+        self,
+        backup_dir: Path,
+        index: int,
+        shard: Tuple[date, date],
+        window: List[ColumnElement],
+        compress: bool,
+        executor: Executor,
+        semaphore: asyncio.Semaphore,
+        deadline: Optional[float] = None,
+    ) -> BackupPart:
+        """Stream one shard into its part file, encoding pages in the pool."""
+        loop = asyncio.get_running_loop()
+        level = self.settings.compression_level if compress else 0
+        name = f"part-{index:05d}.ndjson" + (".gz" if compress else "")
+        condition = and_(AuditLog.partition_date >= shard[0], AuditLog.partition_date < shard[1], *window)
+        
+        digest = hashlib.sha256()
+        rows = 0
+        size = 0
+        
+        async with semaphore:
+            with open(backup_dir / name, "wb") as file:
+                
+                def write(data: bytes) -> None:
+                    nonlocal size
+                    file.write(data)
+                    digest.update(data)
+                    size += len(data)
+                
+                async with self.db_manager.get_session() as session:
+                    last_key = None
+                    pending: Optional[asyncio.Future] = None
+                    while True:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            raise TimeoutError(f"Backup ran past its time budget while writing {name}")
+                        page = await self._next_page(session, condition, last_key)
+                        
+                        # Encoding of the previous page overlaps with this fetch
+                        if pending is not None:
+                            write(await pending)
+                            pending = None
+                        if not page:
+                            break
+                        
+                        rows += len(page)
+                        last_key = (page[-1]["partition_date"], page[-1]["audit_id"])
+                        pending = loop.run_in_executor(
+                            executor, encode_backup_chunk, [dict(row) for row in page], level
+                        )
+                        if len(page) < self.settings.fetch_size:
+                            write(await pending)
+                            pending = None
+                            break
+        
+        logger.debug("Backup shard written", part=name, rows=rows, bytes=size)
+        return BackupPart(
+            path=name,
+            shard_start=shard[0].isoformat(),
+            shard_end=shard[1].isoformat(),
+            rows=rows,
+            bytes=size,
+            sha256=digest.hexdigest(),
+        )
+    
+    async def _next_page(
+        self,
+        session: AsyncSession,
+        condition: ColumnElement,
+        last_key: Optional[Tuple],
+    ) -> List[Mapping[str, Any]]:
+        stmt = select(AuditLog.__table__).where(condition)
+        if last_key:
+            stmt = stmt.where(_KEY > tuple_(*last_key))
+        stmt = stmt.order_by(AuditLog.partition_date, AuditLog.audit_id).limit(self.settings.fetch_size)
+        result = await session.execute(stmt)
+        return result.mappings().all()
+
+
+# Global backup writer instance
+_backup_writer: Optional[ParallelBackupWriter] = None
+
+
+def get_backup_writer() -> ParallelBackupWriter:
+    """Get the global parallel backup writer instance."""
+    global _backup_writer
+    if _backup_writer is None:
+        _backup_writer = ParallelBackupWriter(get_settings().backup)
+    return _backup_writer
@@ -0,0 +1,261 @@
+"""
+BigQuery retention for the audit log framework.
+
+Retention is mapped onto the layout of the BigQuery audit table, which is
+partitioned by day on created_at and clustered by tenant_id and
+event_type, instead of running a full-scan DELETE per policy:
+
+* the table's partition expiration is kept at the longest policy
+  retention, so BigQuery drops partitions nobody needs at no cost;
+* partitions past the retention of the unconditioned (default) policy are
+  deleted whole, unless they still hold rows of a policy that keeps its
+  events longer;
+* only rows selected by policy conditions are removed with DML, using
+  query parameters and a created_at filter so that partition pruning
+  and clustering bound the bytes scanned.
+
+The module talks to a ``google.cloud.bigquery.Client`` passed in by the
+caller and imports the BigQuery library only to build query parameters.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+PARTITION_FIELD = "created_at"
+CLUSTERING_FIELDS = ["tenant_id", "event_type"]
+
+# Columns of the BigQuery table that retention conditions may use
+CONDITION_FIELDS = {"tenant_id", "event_type", "user_id", "resource_id", "action", "ip_address", "user_agent"}
+
+_DAY_MS = 24 * 60 * 60 * 1000
+
+# (name, type, value, is_array)
+QueryParameter = Tuple[str, str, Any, bool]
+
+
+@dataclass
+class RetentionRule:
+    """A retention policy as far as BigQuery is concerned."""
+    name: str
+    retention_days: int
+    conditions: Dict[str, Any] = field(default_factory=dict)
+    
+    def cutoff(self, now: datetime) -> datetime:
+        return now - timedelta(days=self.retention_days)
+
+
+@dataclass
+class BigQueryRetentionResult:
+    """What a BigQuery retention run changed, or would change."""
+    expiration_days: Optional[int] = None
+    layout_updated: List[str] = field(default_factory=list)
+    partitions_deleted: List[str] = field(default_factory=list)
+    rows_deleted: int = 0
+    bytes_processed: int = 0
+    dml_policies: List[str] = field(default_factory=list)
+
+
+def condition_sql(conditions: Dict[str, Any], prefix: str) -> Tuple[str, List[QueryParameter]]:
+    """
+    Render policy conditions as a parameterized BigQuery predicate.
+    
+    Raises:
+        ValueError: If a condition names a column the table does not have;
+            dropping it would delete more than the policy selects
+    """
+    clauses = []
+    parameters: List[QueryParameter] = []
+    for index, (column, values) in enumerate(sorted(conditions.items())):
+        if column not in CONDITION_FIELDS:
+            raise ValueError(f"Retention condition on unknown BigQuery column '{column}'")
+        name = f"{prefix}{index}"
+        if isinstance(values, (list, tuple, set)):
+            clauses.append(f"{column} IN UNNEST(@{name})")
+            parameters.append((name, "STRING", sorted(values), True))
+        else:
+            clauses.append(f"{column} = @{name}")
+            parameters.append((name, "STRING", values, False))
+    return " AND ".join(clauses) or "TRUE", parameters
+
+
+def _query_config(parameters: Sequence[QueryParameter], dry_run: bool = False) -> Any:
+    """Build a QueryJobConfig carrying the query parameters."""
+    from google.cloud import bigquery
+    
+    return bigquery.QueryJobConfig(
+        dry_run=dry_run,
+        query_parameters=[
+            bigquery.ArrayQueryParameter(name, kind, value) if is_array
+            else bigquery.ScalarQueryParameter(name, kind, value)
+            for name, kind, value, is_array in parameters
+        ],
+    )
+
+
+class BigQueryRetentionManager:
+    """Applies retention policies to the BigQuery audit table."""
+    
+    def __init__(self, client: Any, table_id: str):
+        self.client = client
+        self.table_id = table_id
+    
+    async def apply(
+        self,
+        rules: Sequence[RetentionRule],
+        dry_run: bool = False,
+        now: Optional[datetime] = None,
+    ) -> BigQueryRetentionResult:
+        """
+        Enforce the retention rules on the table.
+        
+        Args:
+            rules: Enabled retention policies
+            dry_run: Only report; DML is dry-run to get the bytes it would scan
+            now: Reference time for the cutoffs
+        """
+        now = now or datetime.now(timezone.utc)
+        result = BigQueryRetentionResult()
+        if not rules:
+            return result
+        
+        result.expiration_days = max(rule.retention_days for rule in rules)
+        partitioned = await asyncio.to_thread(self._sync_layout, result.expiration_days, dry_run, result)
+        
+        base_rules = [rule for rule in rules if not rule.conditions]
+        base = max(base_rules, key=lambda rule: rule.retention_days) if base_rules else None
+        
+        if base and base.retention_days < result.expiration_days:
+            longer = [rule for rule in rules if rule.conditions and rule.retention_days > base.retention_days]
+            await self._apply_base_rule(base, longer, partitioned, dry_run, now, result)
+        
+        for rule in rules:
+            if rule.conditions and rule.retention_days < result.expiration_days:
+                predicate, parameters = condition_sql(rule.conditions, "p")
+                await self._delete(rule.name, predicate, parameters, rule.cutoff(now), dry_run, result)
+        
+        logger.info(
+            "BigQuery retention applied",
+            table=self.table_id,
+            dry_run=dry_run,
+            expiration_days=result.expiration_days,
+            partitions_deleted=len(result.partitions_deleted),
+            rows_deleted=result.rows_deleted,
+            bytes_processed=result.bytes_processed,
+        )
+        return result
+    
+    def _sync_layout(self, expiration_days: int, dry_run: bool, result: BigQueryRetentionResult) -> bool:
+        """Set partition expiration and clustering; False if the table is unpartitioned."""
+        table = self.client.get_table(self.table_id)
+        partitioning = table.time_partitioning
+        if partitioning is None or partitioning.field != PARTITION_FIELD:
+            logger.warning("BigQuery table is not partitioned on created_at", table=self.table_id)
+            return False
+        
+        expiration_ms = expiration_days * _DAY_MS
+        if partitioning.expiration_ms != expiration_ms:
+            partitioning.expiration_ms = expiration_ms
+            result.layout_updated.append("time_partitioning")
+        if list(table.clustering_fields or []) != CLUSTERING_FIELDS:
+            # Applies to data written from now on
+            table.clustering_fields = CLUSTERING_FIELDS
+            result.layout_updated.append("clustering_fields")
+        
+        if result.layout_updated and not dry_run:
+            self.client.update_table(table, result.layout_updated)
+        return True
+    
+    async def _apply_base_rule(
+        self,
+        base: RetentionRule,
+        longer: Sequence[RetentionRule],
+        partitioned: bool,
+        dry_run: bool,
+        now: datetime,
+        result: BigQueryRetentionResult,
+    ) -> None:
+        """
+        Remove rows past the default retention that no longer policy keeps.
+        
+        Whole partitions older than the cutoff day are deleted unless they
+        hold rows of a longer policy; only those partitions need DML.
+        """
+        cutoff = base.cutoff(now)
+        keep_predicates = []
+        parameters: List[QueryParameter] = []
+        for index, rule in enumerate(longer):
+            predicate, rule_parameters = condition_sql(rule.conditions, f"k{index}_")
+            keep_predicates.append(f"({predicate})")
+            parameters += rule_parameters
+        keep = " OR ".join(keep_predicates)
+        
+        kept_days = set()
+        if partitioned:
+            if keep:
+                kept_days = await self._partitions_with_rows(keep, parameters, cutoff)
+            
+            expired = [
+                partition for partition in await asyncio.to_thread(self.client.list_partitions, self.table_id)
+                if partition.isdigit() and _partition_day(partition) < cutoff.date() and partition not in kept_days
+            ]
+            for partition in expired:
+                if not dry_run:
+                    await asyncio.to_thread(self.client.delete_table, f"{self.table_id}${partition}", not_found_ok=True)
+                result.partitions_deleted.append(partition)
+        
+        if kept_days or not partitioned:
+            predicate = f"NOT ({keep})" if keep else "TRUE"
+            await self._delete(base.name, predicate, parameters, cutoff, dry_run, result)
+    
+    async def _partitions_with_rows(
+        self,
+        predicate: str,
+        parameters: List[QueryParameter],
+        cutoff: datetime,
+    ) -> set:
+        """Partition ids before ``cutoff`` holding rows that match ``predicate``."""
+        sql = (
+            f"SELECT DISTINCT FORMAT_DATE('%Y%m%d', DATE({PARTITION_FIELD})) AS partition_id "
+            f"FROM `{self.table_id}` WHERE {PARTITION_FIELD} < @cutoff AND ({predicate})"
+        )
+        config = _query_config([("cutoff", "TIMESTAMP", cutoff, False), *parameters])
+        
+        def run() -> set:
+            return {row["partition_id"] for row in self.client.query(sql, job_config=config).result()}
+        
+        return await asyncio.to_thread(run)
+    
+    async def _delete(
+        self,
+        name: str,
+        predicate: str,
+        parameters: List[QueryParameter],
+        cutoff: datetime,
+        dry_run: bool,
+        result: BigQueryRetentionResult,
+    ) -> None:
+        """DELETE matching rows created before ``cutoff``; prunes to older partitions."""
+        sql = f"DELETE FROM `{self.table_id}` WHERE {PARTITION_FIELD} < @cutoff AND {predicate}"
+        config = _query_config([("cutoff", "TIMESTAMP", cutoff, False), *parameters], dry_run=dry_run)
+        
+        def run() -> Tuple[int, int]:
+            job = self.client.query(sql, job_config=config)
+            if not dry_run:
+                job.result()
+            return job.num_dml_affected_rows or 0, job.total_bytes_processed or 0
+        
+        rows, scanned = await asyncio.to_thread(run)
+        result.rows_deleted += rows
+        result.bytes_processed += scanned
+        result.dml_policies.append(name)
+        logger.info("BigQuery retention delete", policy=name, dry_run=dry_run, rows=rows, bytes_processed=scanned)
+
+
+def _partition_day(partition_id: str) -> date:
+    return datetime.strptime(partition_id, "%Y%m%d").date()
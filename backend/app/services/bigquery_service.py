@@ -19,6 +19,7 @@ from pydantic import BaseModel
 from app.core.config import get_settings
 from app.db.models import AuditLogCreate, AuditLogResponse
 from app.services.audit_service import AuditService
+from app.services.bigquery_retention import CLUSTERING_FIELDS, PARTITION_FIELD
 
 logger = structlog.get_logger(__name__)
 
@@ -145,15 +146,16 @@ class BigQueryService:
         # Create table with partitioning and clustering
         table = bigquery.Table(self.table_ref, schema=schema)
         
-        # Time partitioning by created_at
+        # Time partitioning by created_at; retention runs keep the
+        # expiration in line with the longest retention policy
         table.time_partitioning = bigquery.TimePartitioning(
             type_=bigquery.TimePartitioningType.DAY,
-            field="created_at",
+            field=PARTITION_FIELD,
             expiration_ms=7776000000  # 90 days
         )
         
-        # Clustering for better query performance
-        table.clustering_fields = ["tenant_id", "event_type"]
+        # Clustering for better query performance and cheaper retention deletes
+        table.clustering_fields = CLUSTERING_FIELDS
         
         # Create the table
         table = self.client.create_table(table)
@@ -1,13 +1,17 @@
 """
 Cache service for the audit log framework.
 
-This module provides Redis-based caching functionality with
-connection management and basic cache operations.
+This module provides Redis-based caching functionality with a pooled
+async client, orjson serialization, pipelined bulk operations and
+generation-based invalidation.
 """
 
-from typing import Any, Optional, Dict
-import json
+from typing import Any, Dict, List, Mapping, Optional
+
+import orjson
 import structlog
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
 
 from app.config import RedisSettings
 from app.core.exceptions import CacheError
@@ -15,45 +19,180 @@ from app.core.exceptions import CacheError
 logger = structlog.get_logger(__name__)
 
 
+def _default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively (IP addresses, Decimal, ...)."""
+    return str(value)
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize a value for storage in Redis."""
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def deserialize(data: Optional[bytes]) -> Optional[Any]:
+    """Deserialize a value read from Redis."""
+    if data is None:
+        return None
+    return orjson.loads(data)
+
+
 class CacheService:
-    """Redis cache service."""
+    """
+    Redis cache service.
     
-    def __init__(self, settings: RedisSettings):
+    Read and write failures are logged and treated as cache misses so that
+    a Redis outage degrades performance rather than failing requests.
+    
+    Cached entries that depend on mutable data should embed a namespace
+    generation (see ``get_generation``) in their key. Bumping the generation
+    with ``bump_generation`` makes every older key unreachable in a single
+    INCR; the orphaned entries simply expire with their TTL.
+    """
+    
+    GENERATION_PREFIX = "cache_gen"
+    
+    def __init__(self, settings: RedisSettings, client: Optional[Redis] = None):
         self.settings = settings
-        self._client = None
+        self._client = client
+        self._pool: Optional[ConnectionPool] = None
+    
+    @property
+    def client(self) -> Redis:
+        """Get the underlying Redis client."""
+        if self._client is None:
+            raise CacheError("Cache service not initialized")
+        return self._client
     
     async def initialize(self) -> None:
         """Initialize cache connection."""
         try:
-            # This will be implemented with actual Redis client
-            logger.info("Cache service initialized (stub)")
-        except Exception as e:
+            if self._client is None:
+                self._pool = ConnectionPool.from_url(
+                    self.settings.url,
+                    max_connections=self.settings.max_connections,
+                    socket_timeout=self.settings.socket_timeout,
+                    socket_connect_timeout=self.settings.socket_timeout,
+                    health_check_interval=30,
+                )
+                self._client = Redis(connection_pool=self._pool)
+            
+            await self._client.ping()
+            logger.info(
+                "Cache service initialized",
+                max_connections=self.settings.max_connections,
+            )
+        except RedisError as e:
             logger.error("Failed to initialize cache", error=str(e))
             raise CacheError(f"Cache initialization failed: {str(e)}")
     
     async def close(self) -> None:
         """Close cache connection."""
-        logger.info("Cache service closed (stub)")
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+        logger.info("Cache service closed")
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        logger.debug("Cache get operation (stub)", key=key)
-        return None
+        try:
+            return deserialize(await self.client.get(key))
+        except (RedisError, orjson.JSONDecodeError) as e:
+            logger.warning("Cache get failed", key=key, error=str(e))
+            return None
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache."""
-        logger.debug("Cache set operation (stub)", key=key, ttl=ttl)
+        try:
+            await self.client.set(key, serialize(value), ex=ttl or self.settings.cache_ttl)
+        except (RedisError, TypeError) as e:
+            logger.warning("Cache set failed", key=key, error=str(e))
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete one or more keys from cache."""
+        if not keys:
+            return 0
+        try:
+            return await self.client.unlink(*keys)
+        except RedisError as e:
+            logger.warning("Cache delete failed", keys=len(keys), error=str(e))
+            return 0
+    
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip; missing keys yield None."""
+        if not keys:
+            return []
+        try:
+            values = await self.client.mget(keys)
+            return [deserialize(value) for value in values]
+        except (RedisError, orjson.JSONDecodeError) as e:
+            logger.warning("Cache mget failed", keys=len(keys), error=str(e))
+            return [None] * len(keys)
+    
+    async def mset(self, items: Mapping[str, Any], ttl: Optional[int] = None) -> None:
+        """Set several values with a TTL in one pipelined round trip."""
+        if not items:
+            return
+        ttl = ttl or self.settings.cache_ttl
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, serialize(value), ex=ttl)
+                await pipe.execute()
+        except (RedisError, TypeError) as e:
+            logger.warning("Cache mset failed", keys=len(items), error=str(e))
+    
+    async def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """
+        Delete all keys matching a glob pattern.
+        
+        This walks the keyspace with SCAN and is intended for administrative
+        invalidation; hot paths should use generations instead.
+        """
+        deleted = 0
+        batch: List[bytes] = []
+        try:
+            async for key in self.client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self.client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                deleted += await self.client.unlink(*batch)
+        except RedisError as e:
+            logger.warning("Cache delete_pattern failed", pattern=pattern, error=str(e))
+        return deleted
     
-    async def delete(self, key: str) -> None:
-        """Delete key from cache."""
-        logger.debug("Cache delete operation (stub)", key=key)
+    async def get_generation(self, namespace: str) -> int:
+        """Get the current generation of a cache namespace."""
+        try:
+            value = await self.client.get(f"{self.GENERATION_PREFIX}:{namespace}")
+            return int(value) if value is not None else 0
+        except RedisError as e:
+            logger.warning("Cache generation lookup failed", namespace=namespace, error=str(e))
+            return 0
+    
+    async def bump_generation(self, *namespaces: str) -> None:
+        """Invalidate every entry keyed on the given namespace generations."""
+        if not namespaces:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for namespace in namespaces:
+                    pipe.incr(f"{self.GENERATION_PREFIX}:{namespace}")
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Cache generation bump failed", namespaces=namespaces, error=str(e))
     
     async def info(self) -> Dict[str, Any]:
         """Get cache info."""
+        info = await self.client.info()
         return {
-            "redis_version": "7.0.0",
-            "connected_clients": 1,
-            "used_memory_human": "1M",
+            "redis_version": info.get("redis_version"),
+            "connected_clients": info.get("connected_clients"),
+            "used_memory_human": info.get("used_memory_human"),
         }
 
 
@@ -74,4 +213,4 @@ async def get_cache_service_async() -> CacheService:
     global _cache_service
     if not _cache_service:
         raise CacheError("Cache service not initialized")
-    return _cache_service
\ No newline at end of file
+    return _cache_service
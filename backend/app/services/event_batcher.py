@@ -0,0 +1,170 @@
+"""
+Per-tenant event batching for the audit worker.
+
+Events taken off the bus are buffered per tenant in bounded queues and
+processed in batches, with up to ``concurrency`` tenants in flight at
+once and batches of one tenant processed in order. When a tenant's queue
+or the total reaches its limit, ``add`` waits, which stops the consumer
+from fetching more messages. A bus message is acked only after every
+event it carried has been processed, and nak'ed if any of them failed, so
+delivery is at least once and nothing is kept in memory after a failure.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+from app.config import WorkerSettings
+from app.utils.metrics import audit_metrics
+
+logger = structlog.get_logger(__name__)
+
+BatchProcessor = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+def max_ack_pending(settings: WorkerSettings, fetch_batch_size: int) -> int:
+    """
+    Unacked messages a durable consumer must allow for the worker pool.
+    
+    Every process holds up to ``max_buffered_events`` unacked messages in
+    its batcher plus the fetch being handed to it. With a lower limit the
+    consumer stops handing out messages before tenant batches fill up, and
+    the pool only makes progress when the batch timer fires.
+    """
+    return settings.processes * (settings.max_buffered_events + fetch_batch_size)
+
+
+@dataclass
+class PendingMessage:
+    """A bus message whose events are buffered or being processed."""
+    message: Any
+    remaining: int
+    failed: bool = False
+
+
+class TenantBatcher:
+    """Bounded per-tenant buffers flushed by concurrent tenant batches."""
+    
+    def __init__(self, settings: WorkerSettings, process: BatchProcessor):
+        self.settings = settings
+        self.process = process
+        # A full tenant queue must hold at least one batch, or it could
+        # never fill up far enough to be flushed
+        self.tenant_capacity = max(settings.tenant_buffer_size, settings.batch_size)
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+        self._buffers: Dict[str, Deque[Tuple[Dict[str, Any], PendingMessage]]] = {}
+        self._space = asyncio.Condition()
+        self._tenants = asyncio.Semaphore(settings.concurrency)
+        self._flushing: Dict[str, asyncio.Task] = {}
+        self._timer: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Flush partial batches every ``batch_timeout_seconds``."""
+        self._timer = asyncio.create_task(self._timer_loop())
+    
+    async def close(self) -> None:
+        """Stop the timer and process everything still buffered."""
+        if self._timer:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        await self.flush()
+    
+    async def add(self, message: Any, events: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Buffer the ``(tenant_id, item)`` events carried by one bus message.
+        
+        Waits while the tenant's queue or the whole batcher is full. The
+        message is acked or nak'ed once all of its events are processed;
+        a message without events is acked straight away.
+        """
+        if not events:
+            await message.ack()
+            return
+        
+        pending = PendingMessage(message, len(events))
+        for tenant_id, item in events:
+            async with self._space:
+                await self._space.wait_for(lambda: self._has_space(tenant_id))
+                buffer = self._buffers.setdefault(tenant_id, deque())
+                buffer.append((item, pending))
+                self.buffered += 1
+                full = len(buffer) >= self.settings.batch_size
+            if full:
+                self._schedule(tenant_id)
+    
+    async def flush(self) -> None:
+        """Process every buffered event and wait until it is done."""
+        for tenant_id, buffer in list(self._buffers.items()):
+            if buffer:
+                self._schedule(tenant_id)
+        while self._flushing:
+            await asyncio.gather(*list(self._flushing.values()))
+        self.last_flush = time.monotonic()
+    
+    def _has_space(self, tenant_id: str) -> bool:
+        buffer = self._buffers.get(tenant_id)
+        return (
+            self.buffered < self.settings.max_buffered_events
+            and (buffer is None or len(buffer) < self.tenant_capacity)
+        )
+    
+    def _schedule(self, tenant_id: str) -> None:
+        if tenant_id not in self._flushing:
+            self._flushing[tenant_id] = asyncio.create_task(self._flush_tenant(tenant_id))
+    
+    async def _flush_tenant(self, tenant_id: str) -> None:
+        """Process a tenant's queue batch by batch until it is empty."""
+        buffer = self._buffers[tenant_id]
+        try:
+            async with self._tenants:
+                while buffer:
+                    batch = [buffer.popleft() for _ in range(min(len(buffer), self.settings.batch_size))]
+                    await self._process_batch(tenant_id, batch)
+        finally:
+            del self._flushing[tenant_id]
+            if not buffer:
+                self._buffers.pop(tenant_id, None)
+    
+    async def _process_batch(self, tenant_id: str, batch: List[Tuple[Dict[str, Any], PendingMessage]]) -> None:
+        succeeded = True
+        try:
+            await self.process(tenant_id, [item for item, _ in batch])
+            audit_metrics.batch_size.observe(len(batch))
+        except Exception as e:
+            succeeded = False
+            logger.error("Tenant batch failed", tenant_id=tenant_id, size=len(batch), error=str(e))
+        
+        async with self._space:
+            self.buffered -= len(batch)
+            self._space.notify_all()
+        
+        for _, pending in batch:
+            pending.remaining -= 1
+            pending.failed = pending.failed or not succeeded
+            if pending.remaining == 0:
+                await self._settle(pending)
+    
+    @staticmethod
+    async def _settle(pending: PendingMessage) -> None:
+        try:
+            if pending.failed:
+                await pending.message.nak()
+            else:
+                await pending.message.ack()
+        except Exception as e:
+            logger.warning("Failed to settle bus message", failed=pending.failed, error=str(e))
+    
+    async def _timer_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.batch_timeout_seconds)
+            if self.buffered:
+                await self.flush()
@@ -0,0 +1,125 @@
+"""
+Binary envelope for messages on the NATS and Pub/Sub bus.
+
+A message is a three-byte header followed by a msgpack body::
+
+    0xA5 | version | flags | [uint32 raw size, if compressed] | body
+
+UUIDs travel as 16-byte extension values, datetimes as msgpack timestamps
+and enums as their values, so publishers can hand over rows as they come
+out of the database. Bodies are maps keyed by field name: readers ignore
+fields they do not know and default the ones that are missing, so fields
+can be added without touching the version, which only changes for
+incompatible layouts. Batch bodies can be zstd-compressed. Decoding reads
+the body straight out of the received buffer through a memoryview, and
+messages without the header are decoded as JSON so consumers keep working
+while publishers roll over.
+"""
+
+import json
+import struct
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Union
+from uuid import UUID
+
+import msgpack
+
+from app.core.exceptions import MessageQueueError
+
+MAGIC = 0xA5
+VERSION = 1
+FLAG_ZSTD = 0x01
+
+CONTENT_TYPE = "application/vnd.audit.envelope+msgpack"
+
+# Compressing smaller bodies costs more than it saves
+MIN_COMPRESS_BYTES = 512
+
+_HEADER = struct.Struct("!BBB")
+_RAW_SIZE = struct.Struct("!I")
+_UUID_EXT = 1
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _default(value: Any) -> Any:
+    """Pack types msgpack does not handle natively."""
+    if isinstance(value, UUID):
+        return msgpack.ExtType(_UUID_EXT, value.bytes)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    # IP addresses and anything else the JSON path used to str()
+    return str(value)
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _UUID_EXT:
+        return UUID(bytes=bytes(data))
+    return msgpack.ExtType(code, data)
+
+
+def _zstd():
+    import pyarrow as pa
+    return pa.Codec("zstd")
+
+
+def encode_envelope(payload: Any, compress: bool = False) -> bytes:
+    """
+    Encode a message payload.
+
+    Args:
+        payload: Message body, usually a dict
+        compress: zstd-compress the body if it is large enough to benefit
+
+    Returns:
+        bytes: Header and body
+    """
+    body = msgpack.packb(payload, default=_default, use_bin_type=True)
+    if compress and len(body) >= MIN_COMPRESS_BYTES:
+        compressed = _zstd().compress(body, asbytes=True)
+        return _HEADER.pack(MAGIC, VERSION, FLAG_ZSTD) + _RAW_SIZE.pack(len(body)) + compressed
+    return _HEADER.pack(MAGIC, VERSION, 0) + body
+
+
+def is_envelope(data: Buffer) -> bool:
+    """Check whether a message starts with the envelope header."""
+    return len(data) >= _HEADER.size and data[0] == MAGIC
+
+
+def decode_envelope(data: Buffer) -> Any:
+    """
+    Decode a message published with :func:`encode_envelope`, or as JSON.
+
+    Raises:
+        MessageQueueError: If the envelope comes from a newer, incompatible
+            publisher or is malformed
+    """
+    view = memoryview(data)
+    if not is_envelope(view):
+        return json.loads(bytes(view))
+
+    _, version, flags = _HEADER.unpack_from(view)
+    if version > VERSION:
+        raise MessageQueueError(f"Unsupported message envelope version {version}")
+
+    body = view[_HEADER.size:]
+    if flags & FLAG_ZSTD:
+        (raw_size,) = _RAW_SIZE.unpack_from(body)
+        body = _zstd().decompress(body[_RAW_SIZE.size:], decompressed_size=raw_size, asbytes=True)
+
+    try:
+        return msgpack.unpackb(body, ext_hook=_ext_hook, timestamp=3, raw=False, strict_map_key=False)
+    except ValueError as e:
+        raise MessageQueueError(f"Malformed message envelope: {str(e)}")
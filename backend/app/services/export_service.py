@@ -0,0 +1,265 @@
+"""
+Streaming export encoders for the audit log framework.
+
+This module turns chunks of audit log rows into JSON, NDJSON, CSV or
+Parquet bytes incrementally, so exports can be streamed to the client in
+constant memory regardless of their size.
+"""
+
+import csv
+import io
+import zlib
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Mapping
+
+import orjson
+
+from app.core.exceptions import ExportError, ValidationError
+
+# Exported columns, in output order
+EXPORT_COLUMNS = [
+    "audit_id",
+    "timestamp",
+    "event_type",
+    "action",
+    "status",
+    "tenant_id",
+    "service_name",
+    "user_id",
+    "session_id",
+    "ip_address",
+    "user_agent",
+    "resource_type",
+    "resource_id",
+    "correlation_id",
+    "request_data",
+    "response_data",
+    "metadata",
+    "retention_period_days",
+    "partition_date",
+    "created_at",
+]
+
+_JSON_COLUMNS = ("request_data", "response_data", "metadata")
+
+
+class ExportFormat(str, Enum):
+    """Supported export formats."""
+    JSON = "json"
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+def row_to_export_record(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Map an audit_logs row to an export record."""
+    record = {column: row.get(column) for column in EXPORT_COLUMNS}
+    record["metadata"] = row.get("event_metadata")
+    return record
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+class ExportEncoder(ABC):
+    """Incrementally encodes export records into bytes."""
+    
+    media_type = "application/octet-stream"
+    extension = "bin"
+    # Whether gzip content encoding is worth applying
+    compressible = True
+    
+    def header(self) -> bytes:
+        return b""
+    
+    @abstractmethod
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        """Encode the next chunk of records."""
+    
+    def footer(self) -> bytes:
+        return b""
+
+
+class JSONArrayEncoder(ExportEncoder):
+    """Streams records as a single JSON array."""
+    
+    media_type = "application/json"
+    extension = "json"
+    
+    def __init__(self):
+        self._first = True
+    
+    def header(self) -> bytes:
+        return b"["
+    
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        if not records:
+            return b""
+        body = b",".join(_dumps(record) for record in records)
+        if self._first:
+            self._first = False
+            return body
+        return b"," + body
+    
+    def footer(self) -> bytes:
+        return b"]"
+
+
+class NDJSONEncoder(ExportEncoder):
+    """Streams records as newline-delimited JSON."""
+    
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+    
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        return b"".join(_dumps(record) + b"\n" for record in records)
+
+
+class CSVEncoder(ExportEncoder):
+    """Streams records as CSV with a header row; JSON columns are embedded as JSON text."""
+    
+    media_type = "text/csv"
+    extension = "csv"
+    
+    def header(self) -> bytes:
+        return self._write([EXPORT_COLUMNS])
+    
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        return self._write([self._to_row(record) for record in records])
+    
+    @staticmethod
+    def _to_row(record: Dict[str, Any]) -> List[Any]:
+        row = []
+        for column in EXPORT_COLUMNS:
+            value = record[column]
+            if value is None:
+                value = ""
+            elif column in _JSON_COLUMNS:
+                value = _dumps(value).decode()
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            row.append(value)
+        return row
+    
+    @staticmethod
+    def _write(rows: List[List[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group."""
+    
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class ParquetEncoder(ExportEncoder):
+    """Streams records as a zstd-compressed Parquet file, one row group per chunk."""
+    
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+    compressible = False
+    
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Parquet export requires pyarrow")
+        
+        self._pa = pa
+        self._schema = pa.schema([
+            ("audit_id", pa.string()),
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("event_type", pa.string()),
+            ("action", pa.string()),
+            ("status", pa.string()),
+            ("tenant_id", pa.string()),
+            ("service_name", pa.string()),
+            ("user_id", pa.string()),
+            ("session_id", pa.string()),
+            ("ip_address", pa.string()),
+            ("user_agent", pa.string()),
+            ("resource_type", pa.string()),
+            ("resource_id", pa.string()),
+            ("correlation_id", pa.string()),
+            ("request_data", pa.string()),
+            ("response_data", pa.string()),
+            ("metadata", pa.string()),
+            ("retention_period_days", pa.int32()),
+            ("partition_date", pa.date32()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+    
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        if not records:
+            return b""
+        table = self._pa.Table.from_pylist(
+            [self._to_arrow(record) for record in records],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+        return self._sink.drain()
+    
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+    
+    @staticmethod
+    def _to_arrow(record: Dict[str, Any]) -> Dict[str, Any]:
+        converted = dict(record)
+        for column in ("audit_id", "ip_address"):
+            if converted[column] is not None:
+                converted[column] = str(converted[column])
+        for column in _JSON_COLUMNS:
+            if converted[column] is not None:
+                converted[column] = _dumps(converted[column]).decode()
+        return converted
+
+
+_ENCODERS = {
+    ExportFormat.JSON: JSONArrayEncoder,
+    ExportFormat.NDJSON: NDJSONEncoder,
+    ExportFormat.CSV: CSVEncoder,
+    ExportFormat.PARQUET: ParquetEncoder,
+}
+
+
+def get_export_encoder(export_format: str) -> ExportEncoder:
+    """Create a fresh encoder for an export format."""
+    try:
+        return _ENCODERS[ExportFormat(export_format)]()
+    except ValueError:
+        raise ValidationError(
+            f"Unsupported export format: {export_format}",
+            details={"supported": [fmt.value for fmt in ExportFormat]},
+        )
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
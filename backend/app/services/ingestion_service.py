@@ -0,0 +1,421 @@
+"""
+Bulk ingestion engine for the audit log framework.
+
+This module builds fully-populated audit log rows on the client side and
+writes them to the database in a single statement, using PostgreSQL COPY
+when the asyncpg driver is available and a multi-row INSERT otherwise.
+It also provides a write-behind buffer that coalesces single-event writes
+from concurrent requests into group commits.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import IngestionSettings, get_settings
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+from app.db.schemas import AuditLog
+from app.models.audit import AuditEventCreate, AuditEventResponse
+from app.services.rollup_service import RollupService, get_rollup_service
+from app.utils.metrics import audit_metrics
+
+logger = structlog.get_logger(__name__)
+
+
+# Column order used for COPY; every column is populated client-side so that
+# no row has to be re-read after it is written.
+AUDIT_LOG_COLUMNS = [
+    "audit_id",
+    "timestamp",
+    "event_type",
+    "action",
+    "status",
+    "user_id",
+    "session_id",
+    "ip_address",
+    "user_agent",
+    "resource_type",
+    "resource_id",
+    "request_data",
+    "response_data",
+    "event_metadata",
+    "tenant_id",
+    "service_name",
+    "correlation_id",
+    "retention_period_days",
+    "expires_at",
+    "partition_date",
+    "created_at",
+    "updated_at",
+]
+
+_JSON_COLUMNS = ("request_data", "response_data", "event_metadata")
+
+
+def build_audit_row(
+    audit_data: AuditEventCreate,
+    tenant_id: str,
+    user_id: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Build a complete audit log row with client-side defaults."""
+    now = now or datetime.now(timezone.utc)
+    ip_address = audit_data.ip_address
+    
+    return {
+        "audit_id": uuid4(),
+        "timestamp": now,
+        "event_type": audit_data.event_type,
+        "action": audit_data.action,
+        "status": audit_data.status or "success",
+        "user_id": user_id,
+        "session_id": audit_data.session_id,
+        "ip_address": str(ip_address) if ip_address is not None else None,
+        "user_agent": audit_data.user_agent,
+        "resource_type": audit_data.resource_type,
+        "resource_id": audit_data.resource_id,
+        "request_data": audit_data.request_data,
+        "response_data": audit_data.response_data,
+        "event_metadata": audit_data.metadata or {},
+        "tenant_id": tenant_id,
+        "service_name": audit_data.service_name,
+        "correlation_id": audit_data.correlation_id,
+        "retention_period_days": audit_data.retention_period_days,
+        "expires_at": now + timedelta(days=audit_data.retention_period_days),
+        "partition_date": now.date(),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def build_audit_rows(
+    events: Iterable[AuditEventCreate],
+    tenant_id: str,
+    user_id: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Build audit log rows for a batch, sharing a single timestamp."""
+    now = now or datetime.now(timezone.utc)
+    return [build_audit_row(event, tenant_id, user_id, now) for event in events]
+
+
+def row_to_response(row: Dict[str, Any]) -> AuditEventResponse:
+    """Convert a built audit log row into an API response model."""
+    return AuditEventResponse(
+        audit_id=row["audit_id"],
+        timestamp=row["timestamp"],
+        event_type=row["event_type"],
+        user_id=row["user_id"],
+        session_id=row["session_id"],
+        ip_address=row["ip_address"],
+        user_agent=row["user_agent"],
+        resource_type=row["resource_type"],
+        resource_id=row["resource_id"],
+        action=row["action"],
+        status=row["status"],
+        request_data=row["request_data"],
+        response_data=row["response_data"],
+        metadata=row["event_metadata"],
+        tenant_id=row["tenant_id"],
+        service_name=row["service_name"],
+        correlation_id=row["correlation_id"],
+        retention_period_days=row["retention_period_days"],
+        created_at=row["created_at"],
+        partition_date=row["partition_date"],
+    )
+
+
+class BulkAuditWriter:
+    """Writes batches of pre-built audit log rows in a single round trip."""
+    
+    def __init__(self, use_copy: bool = True, rollups: Optional[RollupService] = None):
+        self.use_copy = use_copy
+        self.rollups = rollups
+    
+    async def write(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """
+        Write rows inside the session's current transaction.
+        
+        The caller is responsible for committing the session and then
+        calling ``committed``.
+        """
+        if not rows:
+            return 0
+        
+        if self.use_copy and self._supports_copy(session):
+            await self._copy_rows(session, rows)
+        else:
+            await session.execute(insert(AuditLog), rows)
+        
+        return len(rows)
+    
+    def committed(self, rows: List[Dict[str, Any]]) -> None:
+        """Count rows whose transaction has committed into the metric rollups."""
+        if self.rollups is not None:
+            self.rollups.add(rows)
+    
+    def _supports_copy(self, session: AsyncSession) -> bool:
+        """Check whether the bound engine can use asyncpg's COPY protocol."""
+        bind = session.get_bind()
+        return bind.dialect.name == "postgresql" and bind.dialect.driver == "asyncpg"
+    
+    async def _copy_rows(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """Stream rows into audit_logs with the binary COPY protocol."""
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        
+        records = [self._to_copy_record(row) for row in rows]
+        await driver_connection.copy_records_to_table(
+            AuditLog.__tablename__,
+            records=records,
+            columns=AUDIT_LOG_COLUMNS,
+        )
+    
+    @staticmethod
+    def _to_copy_record(row: Dict[str, Any]) -> tuple:
+        """Convert a row dict into a COPY record tuple."""
+        record = []
+        for column in AUDIT_LOG_COLUMNS:
+            value = row[column]
+            if column in _JSON_COLUMNS and value is not None:
+                value = json.dumps(value, default=str)
+            record.append(value)
+        return tuple(record)
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Check whether a write failed on the connection rather than on its rows."""
+    return isinstance(error, (OSError, asyncio.TimeoutError)) or bool(
+        getattr(error, "connection_invalidated", False)
+    )
+
+
+class IngestionBuffer:
+    """
+    Write-behind buffer with group commit for single audit events.
+    
+    Rows submitted by concurrent requests are queued and flushed together
+    once ``max_batch_size`` rows are pending or the oldest row has waited
+    ``max_latency_ms``. ``submit`` only returns after the row's group has
+    been committed, so callers still receive a durable acknowledgement.
+    A group whose commit fails is retried in halves, so only the rows that
+    actually fail are rejected.
+    """
+    
+    def __init__(
+        self,
+        settings: IngestionSettings,
+        db_manager,
+        writer: Optional[BulkAuditWriter] = None,
+    ):
+        self.settings = settings
+        self.db_manager = db_manager
+        self.writer = writer or get_bulk_writer()
+        self.max_batch_size = settings.max_batch_size
+        self.max_latency = settings.max_latency_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+    
+    @property
+    def is_running(self) -> bool:
+        """Check if the buffer is accepting writes."""
+        return self._running
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of rows waiting to be flushed."""
+        return self._queue.qsize() if self._queue else 0
+    
+    async def start(self) -> None:
+        """Start the background flusher."""
+        if self._running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.settings.queue_size)
+        self._task = asyncio.create_task(self._flush_loop())
+        self._running = True
+        logger.info(
+            "Ingestion buffer started",
+            max_batch_size=self.max_batch_size,
+            max_latency_ms=self.settings.max_latency_ms,
+            queue_size=self.settings.queue_size,
+        )
+    
+    async def stop(self) -> None:
+        """
+        Stop accepting writes and flush everything still queued.
+        
+        Rows that reach the queue behind the stop marker, e.g. from callers
+        that were waiting for space, are failed rather than left waiting.
+        """
+        if not self._running:
+            return
+        self._running = False
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._fail_pending()
+        logger.info("Ingestion buffer stopped")
+    
+    async def submit(self, row: Dict[str, Any]) -> None:
+        """
+        Queue a row and wait until it has been committed.
+        
+        Raises:
+            ServiceUnavailableError: If the buffer is not running or stops
+                before the row is queued.
+            RateLimitError: If the queue stays full for longer than
+                ``enqueue_timeout_seconds``.
+        """
+        if not self._running:
+            raise ServiceUnavailableError("Ingestion buffer is not running")
+        
+        future = asyncio.get_running_loop().create_future()
+        item = (row, future, time.perf_counter())
+        
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(
+                    self._queue.put(item),
+                    timeout=self.settings.enqueue_timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                audit_metrics.ingestion_rejected.inc()
+                raise RateLimitError("Ingestion buffer is full, retry later")
+        
+        # The buffer may have stopped and drained while this call waited for space
+        if not self._running and self._task is None:
+            self._fail_pending()
+        
+        audit_metrics.ingestion_queue_depth.set(self._queue.qsize())
+        await future
+    
+    def _fail_pending(self) -> None:
+        """Fail the rows left in the queue after the flusher has exited."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is not None and not item[1].done():
+                item[1].set_exception(ServiceUnavailableError("Ingestion buffer stopped"))
+    
+    async def _flush_loop(self) -> None:
+        """Collect queued rows into groups and flush them."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.max_latency
+            
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # Keep the flusher alive; callers must never be left waiting
+                logger.error("Group flush failed", size=len(batch), error=str(e))
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]) -> None:
+        """
+        Write a group of rows in one transaction and resolve their futures.
+        
+        When the commit fails because of the rows, the group is split in
+        halves and each half is retried, down to single rows, so one bad row
+        only fails its own caller. Connection failures fail the whole group
+        at once, since retrying smaller groups cannot help.
+        """
+        rows = [row for row, _, _ in batch]
+        
+        try:
+            async with self.db_manager.get_session() as session:
+                await self.writer.write(session, rows)
+                await session.commit()
+        except Exception as e:
+            logger.error("Group commit failed", size=len(rows), error=str(e))
+            if len(batch) > 1 and not _is_connection_error(e):
+                middle = len(batch) // 2
+                await self._flush(batch[:middle])
+                await self._flush(batch[middle:])
+                return
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self.writer.committed(rows)
+        acked_at = time.perf_counter()
+        for _, future, enqueued_at in batch:
+            audit_metrics.ingestion_ack_latency.observe(acked_at - enqueued_at)
+            if not future.done():
+                future.set_result(None)
+        
+        audit_metrics.ingestion_flush_size.observe(len(rows))
+        audit_metrics.ingestion_queue_depth.set(self._queue.qsize())
+        logger.debug("Group commit completed", size=len(rows))
+
+
+# Global bulk writer instance
+_bulk_writer: Optional[BulkAuditWriter] = None
+
+
+def get_bulk_writer() -> BulkAuditWriter:
+    """Get the global bulk audit writer instance."""
+    global _bulk_writer
+    if _bulk_writer is None:
+        rollups = get_rollup_service() if get_settings().rollup.enabled else None
+        _bulk_writer = BulkAuditWriter(rollups=rollups)
+    return _bulk_writer
+
+
+# Global ingestion buffer instance
+_ingestion_buffer: Optional[IngestionBuffer] = None
+
+
+def get_ingestion_buffer() -> Optional[IngestionBuffer]:
+    """
+    Get the global ingestion buffer instance.
+    
+    Returns None when the buffer has not been started (for example in the
+    background worker), in which case callers should write directly.
+    """
+    return _ingestion_buffer
+
+
+def set_ingestion_buffer(buffer: Optional[IngestionBuffer]) -> None:
+    """Set the global ingestion buffer instance."""
+    global _ingestion_buffer
+    _ingestion_buffer = buffer
@@ -1,61 +1,341 @@
 """
 NATS service for the audit log framework.
 
-This module provides NATS-based message queuing functionality with
-connection management and basic pub/sub operations.
+This module keeps one persistent NATS connection per process. Subjects
+covered by the audit JetStream stream are published with pipelined acks:
+a publish returns as soon as the message is queued on the connection and
+its ack is awaited in the background, with at most ``max_in_flight`` acks
+outstanding. Those subjects are consumed through durable pull consumers
+that fetch messages in batches. Other subjects (cache invalidation, health
+and alerts) use plain core NATS pub/sub. While the connection is being
+re-established, outgoing messages are buffered by the client up to
+``reconnect_buffer_bytes``.
 """
 
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import nats
 import structlog
+from nats.aio.client import Client as NATS
+from nats.errors import TimeoutError as NATSTimeoutError
+from nats.js import JetStreamContext
+from nats.js.api import ConsumerConfig, PubAck
+from nats.js.errors import NotFoundError
 
 from app.config import NATSSettings
 from app.core.exceptions import MessageQueueError
+from app.services.event_codec import encode_envelope
+from app.utils.metrics import audit_metrics
 
 logger = structlog.get_logger(__name__)
 
+MessagePayload = Union[bytes, Dict[str, Any], List[Any]]
+MessageCallback = Callable[[Any], Awaitable[None]]
+
+
+def subject_matches(pattern: str, subject: str) -> bool:
+    """Check a subject against a NATS wildcard pattern (``*`` and ``>``)."""
+    pattern_tokens = pattern.split(".")
+    subject_tokens = subject.split(".")
+    for index, token in enumerate(pattern_tokens):
+        if token == ">":
+            return len(subject_tokens) > index
+        if index >= len(subject_tokens) or (token != "*" and token != subject_tokens[index]):
+            return False
+    return len(pattern_tokens) == len(subject_tokens)
+
+
+def encode_payload(data: MessagePayload, compress: bool = False) -> bytes:
+    """Encode a message body; dicts and lists are sent in the binary envelope."""
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    return encode_envelope(data, compress=compress)
+
+
+def _metric_subject(subject: str) -> str:
+    # Keep tenant ids out of metric labels
+    return ".".join(subject.split(".")[:2])
+
 
 class NATSService:
     """NATS message queue service."""
     
     def __init__(self, settings: NATSSettings):
         self.settings = settings
-        self._client = None
-        self._connected = False
+        self._client: Optional[NATS] = None
+        self._js: Optional[JetStreamContext] = None
+        self._window = asyncio.Semaphore(settings.max_in_flight)
+        self._pending: Set[asyncio.Task] = set()
+        self._consumers: List[asyncio.Task] = []
     
     async def initialize(self) -> None:
-        """Initialize NATS connection."""
+        """Connect to NATS and make sure the audit stream exists."""
         try:
-            # This will be implemented with actual NATS client
-            self._connected = True
-            logger.info("NATS service initialized (stub)")
+            self._client = await nats.connect(
+                servers=self.settings.url.split(","),
+                name=self.settings.client_id,
+                max_reconnect_attempts=self.settings.max_reconnect,
+                reconnect_time_wait=self.settings.reconnect_wait,
+                pending_size=self.settings.reconnect_buffer_bytes,
+                error_cb=self._on_error,
+                disconnected_cb=self._on_disconnected,
+                reconnected_cb=self._on_reconnected,
+            )
+            self._js = self._client.jetstream(timeout=self.settings.publish_timeout_seconds)
+            await self._ensure_stream()
+            logger.info(
+                "NATS service initialized",
+                url=self.settings.url,
+                stream=self.settings.stream_name,
+                max_in_flight=self.settings.max_in_flight,
+            )
         except Exception as e:
             logger.error("Failed to initialize NATS", error=str(e))
             raise MessageQueueError(f"NATS initialization failed: {str(e)}")
     
     async def close(self) -> None:
-        """Close NATS connection."""
-        self._connected = False
-        logger.info("NATS service closed (stub)")
+        """Wait for outstanding acks, stop consumers and drain the connection."""
+        await self.flush()
+        await self.stop_consumers()
+        
+        if self._client is not None and not self._client.is_closed:
+            try:
+                await self._client.drain()
+            except Exception as e:
+                logger.warning("NATS drain failed", error=str(e))
+                await self._client.close()
+        self._client = None
+        self._js = None
+        logger.info("NATS service closed")
+    
+    async def stop_consumers(self) -> None:
+        """Stop fetching from pull consumers; the connection stays open for acks."""
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers.clear()
     
     def is_connected(self) -> bool:
         """Check if NATS is connected."""
-        return self._connected
+        return self._client is not None and self._client.is_connected
+    
+    def is_stream_subject(self, subject: str) -> bool:
+        """Check whether a subject is stored in the audit stream."""
+        return any(subject_matches(pattern, subject) for pattern in self.settings.stream_subjects)
+    
+    async def publish(
+        self,
+        subject: str,
+        data: MessagePayload,
+        headers: Optional[Dict[str, str]] = None,
+        compress: bool = False,
+    ) -> Optional[asyncio.Task]:
+        """
+        Publish a message to a NATS subject.
+        
+        Stream subjects go through JetStream: once a slot in the in-flight
+        window is free the message is sent and the returned task resolves
+        to its PubAck, so callers that need the ack await the task and the
+        rest carry on. Failed acks are logged and counted. Core subjects
+        are fire-and-forget and return None. ``compress`` zstd-compresses
+        large bodies, which pays off for batches.
+        """
+        client = self._require_client()
+        payload = encode_payload(data, compress)
+        
+        if not self.is_stream_subject(subject):
+            await client.publish(subject, payload, headers=headers)
+            audit_metrics.nats_messages_published.labels(subject=_metric_subject(subject)).inc()
+            return None
+        
+        await self._window.acquire()
+        task = asyncio.create_task(self._publish_stream(subject, payload, headers))
+        self._pending.add(task)
+        task.add_done_callback(self._publish_done)
+        return task
+    
+    async def publish_batch(self, messages: Iterable[Tuple[str, MessagePayload]]) -> List[Optional[PubAck]]:
+        """
+        Publish many messages with their acks pipelined and wait for all.
+        
+        Raises:
+            MessageQueueError: If any message was not acknowledged
+        """
+        tasks = [await self.publish(subject, data) for subject, data in messages]
+        results = await asyncio.gather(*(task for task in tasks if task is not None), return_exceptions=True)
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            raise MessageQueueError(f"{len(failures)} of {len(results)} messages were not acknowledged: {failures[0]}")
+        acks = iter(results)
+        return [next(acks) if task is not None else None for task in tasks]
     
-    async def publish(self, subject: str, data: bytes) -> None:
-        """Publish message to NATS subject."""
-        logger.debug("NATS publish operation (stub)", subject=subject)
+    async def flush(self) -> None:
+        """Wait until every JetStream publish has been acknowledged or failed."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        if self._client is not None and self._client.is_connected:
+            await self._client.flush()
     
-    async def subscribe(self, subject: str, callback, queue: Optional[str] = None) -> None:
-        """Subscribe to NATS subject."""
-        logger.debug("NATS subscribe operation (stub)", subject=subject, queue=queue)
+    @property
+    def in_flight(self) -> int:
+        """JetStream publishes still waiting for their ack."""
+        return len(self._pending)
+    
+    async def subscribe(
+        self,
+        subject: str,
+        callback: MessageCallback,
+        queue: Optional[str] = None,
+        max_ack_pending: Optional[int] = None,
+    ) -> None:
+        """
+        Subscribe to a NATS subject.
+        
+        Stream subjects are read by a pull consumer; subscribers sharing a
+        queue name share one durable consumer, so each message goes to one
+        of them, like a core NATS queue group. The callback must ack or nak
+        the messages it is given. ``max_ack_pending`` caps the messages
+        the consumer hands out unacknowledged across all subscribers, ten
+        fetches by default; subscribers that hold acks while batching
+        need more, or fetching stalls.
+        
+        Raises:
+            MessageQueueError: If a stream subject is subscribed without a
+                queue name, which would create an anonymous consumer that
+                replays the stream and is never shared
+        """
+        client = self._require_client()
+        
+        if not self.is_stream_subject(subject):
+            await client.subscribe(subject, queue=queue or "", cb=callback)
+            logger.info("Subscribed to NATS subject", subject=subject, queue=queue)
+            return
+        
+        if not queue:
+            raise MessageQueueError(
+                f"Subject {subject} is stored in stream {self.settings.stream_name}; "
+                "subscribe with a queue name or use a core NATS subject"
+            )
+        
+        config = ConsumerConfig(
+            ack_wait=self.settings.ack_wait_seconds,
+            max_deliver=self.settings.max_deliver,
+            max_ack_pending=max_ack_pending or self.settings.fetch_batch_size * 10,
+        )
+        await self._update_consumer(queue, config)
+        subscription = await self._js.pull_subscribe(
+            subject,
+            durable=queue,
+            stream=self.settings.stream_name,
+            config=config,
+        )
+        self._consumers.append(asyncio.create_task(self._consume(subject, subscription, callback)))
+        logger.info("Pull consumer started", subject=subject, durable=queue)
+    
+    async def _consume(self, subject: str, subscription, callback: MessageCallback) -> None:
+        """Fetch batches from a pull consumer and hand each message to ``callback``."""
+        while True:
+            try:
+                messages = await subscription.fetch(
+                    self.settings.fetch_batch_size, timeout=self.settings.fetch_timeout_seconds
+                )
+            except (asyncio.TimeoutError, NATSTimeoutError):
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Pull consumer fetch failed", subject=subject, error=str(e))
+                await asyncio.sleep(self.settings.reconnect_wait)
+                continue
+            
+            for message in messages:
+                try:
+                    await callback(message)
+                except Exception as e:
+                    logger.error("Message handler failed", subject=message.subject, error=str(e))
+                    try:
+                        await message.nak()
+                    except Exception:
+                        pass
+    
+    async def _update_consumer(self, durable: str, config: ConsumerConfig) -> None:
+        """Apply changed limits to an existing durable consumer; pull_subscribe only creates missing ones."""
+        try:
+            info = await self._js.consumer_info(self.settings.stream_name, durable)
+        except NotFoundError:
+            return
+        
+        current = info.config
+        limits = ("ack_wait", "max_deliver", "max_ack_pending")
+        if all(getattr(current, name) == getattr(config, name) for name in limits):
+            return
+        for name in limits:
+            setattr(current, name, getattr(config, name))
+        await self._js.add_consumer(self.settings.stream_name, config=current)
+        logger.info("Updated JetStream consumer limits", durable=durable, max_ack_pending=config.max_ack_pending)
+    
+    async def _publish_stream(self, subject: str, payload: bytes, headers: Optional[Dict[str, str]]) -> PubAck:
+        return await self._js.publish(
+            subject,
+            payload,
+            timeout=self.settings.publish_timeout_seconds,
+            stream=self.settings.stream_name,
+            headers=headers,
+        )
+    
+    def _publish_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        self._window.release()
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            audit_metrics.nats_messages_published.labels(subject="jetstream").inc()
+        else:
+            audit_metrics.nats_publish_errors.labels(error_type=type(error).__name__).inc()
+            logger.warning("JetStream publish was not acknowledged", error=str(error))
+    
+    async def _ensure_stream(self) -> None:
+        """Create the audit stream, or update its subjects if they changed."""
+        name = self.settings.stream_name
+        subjects = list(self.settings.stream_subjects)
+        try:
+            info = await self._js.stream_info(name)
+        except NotFoundError:
+            await self._js.add_stream(name=name, subjects=subjects)
+            logger.info("Created JetStream stream", stream=name, subjects=subjects)
+            return
+        
+        if set(info.config.subjects or []) != set(subjects):
+            info.config.subjects = subjects
+            await self._js.update_stream(info.config)
+            logger.info("Updated JetStream stream subjects", stream=name, subjects=subjects)
+    
+    def _require_client(self) -> NATS:
+        if self._client is None:
+            raise MessageQueueError("NATS service not initialized")
+        return self._client
+    
+    async def _on_error(self, error: Exception) -> None:
+        logger.warning("NATS client error", error=str(error))
+    
+    async def _on_disconnected(self) -> None:
+        logger.warning("NATS disconnected, buffering outgoing messages", url=self.settings.url)
+    
+    async def _on_reconnected(self) -> None:
+        url = self._client.connected_url if self._client else None
+        logger.info("NATS reconnected", server=url.netloc if url else None)
     
     def get_server_info(self) -> Dict[str, Any]:
         """Get NATS server info."""
+        info = getattr(self._client, "_server_info", None) or {}
         return {
-            "server_id": "test-server",
-            "server_name": "nats-server",
-            "version": "2.10.0",
-            "max_payload": 1048576,
+            "server_id": info.get("server_id"),
+            "server_name": info.get("server_name"),
+            "version": info.get("version"),
+            "max_payload": info.get("max_payload"),
+            "in_flight": self.in_flight,
         }
 
 
@@ -76,4 +356,4 @@ async def get_nats_service_async() -> NATSService:
     global _nats_service
     if not _nats_service:
         raise MessageQueueError("NATS service not initialized")
-    return _nats_service
\ No newline at end of file
+    return _nats_service
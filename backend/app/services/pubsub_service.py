@@ -6,7 +6,6 @@ with automatic fallback to NATS for local development and hybrid deployments.
 """
 
 import asyncio
-import json
 import logging
 from typing import Any, Callable, Dict, List, Optional, Union
 
@@ -16,6 +15,7 @@ from google.cloud.exceptions import GoogleCloudError
 from pydantic import BaseModel
 
 from app.core.config import get_settings
+from app.services.event_codec import decode_envelope, encode_envelope
 from app.services.nats_service import NATSService
 
 logger = structlog.get_logger(__name__)
@@ -242,7 +242,7 @@ class PubSubService:
             raise RuntimeError("Pub/Sub publisher not initialized")
         
         # Prepare message data
-        message_data = json.dumps(data).encode('utf-8')
+        message_data = encode_envelope(data)
         message_attributes = attributes or {}
         
         def _publish():
@@ -330,7 +330,7 @@ class PubSubService:
             futures = []
             
             for message in messages:
-                message_data = json.dumps(message.data).encode('utf-8')
+                message_data = encode_envelope(message.data)
                 message_attributes = message.attributes or {}
                 
                 publish_kwargs = {
@@ -407,7 +407,7 @@ class PubSubService:
             """Process received message."""
             try:
                 # Parse message data
-                data = json.loads(message.data.decode('utf-8'))
+                data = decode_envelope(message.data)
                 
                 # Process with registered handlers
                 for handler_name, handler_func in self._message_handlers.items():
@@ -0,0 +1,341 @@
+"""
+Chunked retention deletes for the audit log framework.
+
+Expired audit logs are deleted in small batches walked in (partition_date,
+audit_id) order, each in its own transaction, so a cleanup run never holds
+row locks or produces WAL for more than one chunk at a time. That order is
+served by idx_audit_logs_partition_key; the primary key is (audit_id,
+partition_date) and cannot serve it. Progress is checkpointed in retention_checkpoints together with
+every chunk, so a run that is killed resumes after the last committed key.
+
+Rows also expire on their own: expires_at is materialized at insert time
+from retention_period_days and indexed, so per-event retention is a range
+scan rather than a computation over every row.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import structlog
+from sqlalchemy import and_, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import RetentionSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditLog, RetentionCheckpoint
+from app.utils.metrics import audit_metrics
+
+logger = structlog.get_logger(__name__)
+
+# Chunk key, in the column order of idx_audit_logs_partition_key
+_KEY = tuple_(AuditLog.partition_date, AuditLog.audit_id)
+
+# Job names for runs that are not tied to a retention policy
+ROW_EXPIRY = "row_expiry"
+EXPIRY_BACKFILL = "expiry_backfill"
+
+
+@dataclass
+class ChunkRunResult:
+    """Outcome of one chunked retention job."""
+    rows: int = 0
+    chunks: int = 0
+    duration: float = 0.0
+    completed: bool = True
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration if self.duration > 0 else 0.0
+
+
+def expired_condition(cutoff: datetime, conditions: Sequence[ColumnElement] = ()) -> ColumnElement:
+    """
+    Rows of a policy that are past its retention cutoff.
+    
+    The partition_date bound lets PostgreSQL skip partitions and walk
+    idx_audit_logs_partition_key instead of scanning created_at.
+    """
+    return and_(
+        AuditLog.partition_date <= cutoff.date(),
+        AuditLog.created_at < cutoff,
+        *conditions,
+    )
+
+
+class ChunkedRetentionDeleter:
+    """Deletes expired audit logs in bounded, checkpointed chunks."""
+    
+    def __init__(self, settings: RetentionSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+        # Monotonic time after which running jobs pause, set by callers
+        # that run retention inside a bounded window
+        self.deadline: Optional[float] = None
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    async def count_expired(self, cutoff: datetime, conditions: Sequence[ColumnElement] = ()) -> int:
+        """Count the rows a delete would remove, for dry runs."""
+        stmt = select(func.count()).select_from(AuditLog).where(expired_condition(cutoff, conditions))
+        async with self.db_manager.get_session() as session:
+            return (await session.execute(stmt)).scalar() or 0
+    
+    async def delete_expired(
+        self,
+        policy_name: str,
+        cutoff: datetime,
+        conditions: Sequence[ColumnElement] = (),
+    ) -> ChunkRunResult:
+        """
+        Delete a policy's expired rows chunk by chunk.
+        
+        Each chunk selects the next ``delete_chunk_size`` keys after the last
+        committed one, deletes that key range and advances the checkpoint in
+        the same transaction. When the time budget runs out the checkpoint is
+        left in place and the next run continues from it.
+        
+        Args:
+            policy_name: Retention policy, used as the checkpoint key
+            cutoff: Rows created before this are expired
+            conditions: Extra conditions selecting the policy's rows
+        
+        Returns:
+            ChunkRunResult: Rows deleted, chunks committed and throughput
+        """
+        expired = expired_condition(cutoff, conditions)
+        last_key = await self._load_checkpoint(policy_name)
+        if last_key:
+            logger.info("Resuming retention delete", policy=policy_name, after=str(last_key))
+        
+        async def delete_chunk(session: AsyncSession) -> Tuple[int, bool]:
+            nonlocal last_key
+            keys = await self._next_chunk(session, expired, last_key)
+            deleted = 0
+            if keys:
+                deleted = await self._delete_range(session, expired, last_key, keys[-1])
+                last_key = keys[-1]
+            
+            finished = len(keys) < self.settings.delete_chunk_size
+            if finished:
+                await self._clear_checkpoint(session, policy_name)
+            else:
+                await self._save_checkpoint(session, policy_name, cutoff, last_key, deleted)
+            return deleted, finished
+        
+        return await self._run_chunks(policy_name, delete_chunk)
+    
+    async def count_past_expiry(
+        self,
+        now: Optional[datetime] = None,
+        conditions: Sequence[ColumnElement] = (),
+    ) -> int:
+        """Count rows whose own retention period has run out, for dry runs."""
+        now = now or datetime.now(timezone.utc)
+        stmt = select(func.count()).select_from(AuditLog).where(AuditLog.expires_at <= now, *conditions)
+        async with self.db_manager.get_session() as session:
+            return (await session.execute(stmt)).scalar() or 0
+    
+    async def delete_past_expiry(
+        self,
+        now: Optional[datetime] = None,
+        conditions: Sequence[ColumnElement] = (),
+    ) -> ChunkRunResult:
+        """
+        Delete rows whose own retention period has run out.
+        
+        Chunks are read in expires_at order from its index. Deleted rows no
+        longer match, so every chunk starts from the earliest remaining
+        expiry and an interrupted run needs no checkpoint.
+        
+        Args:
+            now: Rows expiring at or before this are expired
+            conditions: Extra conditions a row must also meet, e.g. being
+                past the retention of the policies that match it
+        """
+        now = now or datetime.now(timezone.utc)
+        expired = and_(AuditLog.expires_at <= now, *conditions)
+        
+        async def delete_chunk(session: AsyncSession) -> Tuple[int, bool]:
+            result = await session.execute(
+                select(AuditLog.partition_date, AuditLog.audit_id)
+                .where(expired)
+                .order_by(AuditLog.expires_at)
+                .limit(self.settings.delete_chunk_size)
+            )
+            keys = [tuple(row) for row in result.all()]
+            deleted = 0
+            if keys:
+                result = await session.execute(
+                    delete(AuditLog).where(expired, _KEY.in_(keys))
+                )
+                deleted = result.rowcount
+            return deleted, len(keys) < self.settings.delete_chunk_size
+        
+        return await self._run_chunks(ROW_EXPIRY, delete_chunk)
+    
+    async def backfill_expires_at(self) -> ChunkRunResult:
+        """
+        Fill expires_at for rows written before it was maintained on insert.
+        
+        Rows are updated in (partition_date, audit_id) order with the same
+        chunk size, pause and time budget as deletes; a later run picks up
+        whatever an interrupted one left behind.
+        """
+        last_key: Optional[Tuple] = None
+        missing = AuditLog.expires_at.is_(None)
+        
+        async def fill_chunk(session: AsyncSession) -> Tuple[int, bool]:
+            nonlocal last_key
+            keys = await self._next_chunk(session, missing, last_key)
+            updated = 0
+            if keys:
+                stmt = (
+                    update(AuditLog)
+                    .where(missing, _KEY <= tuple_(*keys[-1]))
+                    .values(expires_at=AuditLog.timestamp + func.make_interval(0, 0, 0, AuditLog.retention_period_days))
+                )
+                if last_key:
+                    stmt = stmt.where(_KEY > tuple_(*last_key))
+                updated = (await session.execute(stmt)).rowcount
+                last_key = keys[-1]
+            return updated, len(keys) < self.settings.delete_chunk_size
+        
+        return await self._run_chunks(EXPIRY_BACKFILL, fill_chunk, deletes=False)
+    
+    async def _run_chunks(
+        self,
+        job: str,
+        run_chunk: Callable[[AsyncSession], Awaitable[Tuple[int, bool]]],
+        deletes: bool = True,
+    ) -> ChunkRunResult:
+        """
+        Run ``run_chunk`` in its own transaction until it reports completion.
+        
+        Chunks are separated by ``delete_chunk_sleep_ms`` and the run stops
+        early once ``delete_time_budget_seconds`` is spent or ``deadline``
+        has passed.
+        """
+        result = ChunkRunResult()
+        started = time.monotonic()
+        
+        while True:
+            budget = self.settings.delete_time_budget_seconds
+            if (budget and time.monotonic() - started >= budget) or (
+                self.deadline is not None and time.monotonic() >= self.deadline
+            ):
+                result.completed = False
+                break
+            
+            chunk_started = time.monotonic()
+            async with self.db_manager.get_session() as session:
+                rows, finished = await run_chunk(session)
+                await session.commit()
+            
+            if rows:
+                result.rows += rows
+                result.chunks += 1
+                if deletes:
+                    audit_metrics.record_retention_chunk(job, rows, time.monotonic() - chunk_started)
+            
+            if finished:
+                break
+            
+            await asyncio.sleep(self.settings.delete_chunk_sleep_ms / 1000)
+        
+        result.duration = time.monotonic() - started
+        logger.info(
+            "Chunked retention job finished" if result.completed else "Chunked retention job paused",
+            job=job,
+            rows=result.rows,
+            chunks=result.chunks,
+            rows_per_second=round(result.rows_per_second, 1),
+        )
+        return result
+    
+    async def _next_chunk(
+        self,
+        session: AsyncSession,
+        expired: ColumnElement,
+        last_key: Optional[Tuple],
+    ) -> List[Tuple]:
+        stmt = select(AuditLog.partition_date, AuditLog.audit_id).where(expired)
+        if last_key:
+            stmt = stmt.where(_KEY > tuple_(*last_key))
+        stmt = stmt.order_by(AuditLog.partition_date, AuditLog.audit_id).limit(self.settings.delete_chunk_size)
+        result = await session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+    
+    @staticmethod
+    async def _delete_range(
+        session: AsyncSession,
+        expired: ColumnElement,
+        after: Optional[Tuple],
+        through: Tuple,
+    ) -> int:
+        stmt = delete(AuditLog).where(expired, _KEY <= tuple_(*through))
+        if after:
+            stmt = stmt.where(_KEY > tuple_(*after))
+        result = await session.execute(stmt)
+        return result.rowcount
+    
+    async def _load_checkpoint(self, policy_name: str) -> Optional[Tuple]:
+        stmt = select(RetentionCheckpoint.last_partition_date, RetentionCheckpoint.last_audit_id).where(
+            RetentionCheckpoint.policy_name == policy_name
+        )
+        async with self.db_manager.get_session() as session:
+            row = (await session.execute(stmt)).first()
+        return tuple(row) if row else None
+    
+    @staticmethod
+    async def _save_checkpoint(
+        session: AsyncSession,
+        policy_name: str,
+        cutoff: datetime,
+        last_key: Tuple,
+        deleted: int,
+    ) -> None:
+        stmt = insert(RetentionCheckpoint).values(
+            policy_name=policy_name,
+            cutoff=cutoff,
+            last_partition_date=last_key[0],
+            last_audit_id=last_key[1],
+            deleted_count=deleted,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["policy_name"],
+            set_={
+                "cutoff": stmt.excluded.cutoff,
+                "last_partition_date": stmt.excluded.last_partition_date,
+                "last_audit_id": stmt.excluded.last_audit_id,
+                "deleted_count": RetentionCheckpoint.deleted_count + stmt.excluded.deleted_count,
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+    
+    @staticmethod
+    async def _clear_checkpoint(session: AsyncSession, policy_name: str) -> None:
+        await session.execute(
+            delete(RetentionCheckpoint).where(RetentionCheckpoint.policy_name == policy_name)
+        )
+
+
+# Global retention deleter instance
+_retention_deleter: Optional[ChunkedRetentionDeleter] = None
+
+
+def get_retention_deleter() -> ChunkedRetentionDeleter:
+    """Get the global chunked retention deleter instance."""
+    global _retention_deleter
+    if _retention_deleter is None:
+        _retention_deleter = ChunkedRetentionDeleter(get_settings().retention)
+    return _retention_deleter
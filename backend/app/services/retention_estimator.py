@@ -0,0 +1,318 @@
+"""
+Cost-bounded retention estimates for the audit log framework.
+
+Retention statistics used to be exact counts over the unindexed
+created_at column, one full scan per policy and age bucket. Estimates are
+now taken from planner statistics and a single TABLESAMPLE pass:
+
+* the table size comes from ``pg_class.reltuples`` of the partitions, or
+  from ``pg_stat_user_tables.n_live_tup`` before the first ANALYZE, with
+  the rows modified since the last ANALYZE as its error bound;
+* the share of rows matching each condition comes from a block sample of
+  about ``estimate_sample_rows`` rows, with a 95% confidence interval
+  that accounts for rows of one page being correlated.
+
+Exact counts are only computed by a background job, one scan for all
+conditions, and are cached for ``exact_stats_ttl_seconds``. When there are
+no statistics at all the estimates are unbounded until that job finishes.
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import structlog
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.util import ClauseAdapter
+
+from app.config import RetentionSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditLog
+
+logger = structlog.get_logger(__name__)
+
+# Two-sided 95% normal quantile
+_Z = 1.96
+
+_TABLE_STATS_SQL = text("""
+    SELECT
+        coalesce(sum(greatest(c.reltuples, 0)), 0) AS rows,
+        coalesce(sum(s.n_mod_since_analyze), 0) AS drift,
+        coalesce(sum(s.n_live_tup), 0) AS live,
+        coalesce(sum(pg_relation_size(c.oid)), 0) AS bytes
+    FROM pg_class c
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.oid = CAST(:parent AS regclass)
+       OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:parent AS regclass))
+""")
+
+
+@dataclass
+class Estimate:
+    """A row count with a 95% confidence interval; ``upper`` is None when unbounded."""
+    value: int
+    lower: int
+    upper: Optional[int]
+    source: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TableStats:
+    """Planner statistics for audit_logs and its partitions."""
+    rows: int
+    drift: int
+    bytes: int
+    live: int = 0
+    oldest_partition_date: Optional[date] = None
+    newest_partition_date: Optional[date] = None
+    
+    @property
+    def total(self) -> int:
+        """Rows to scale samples by: reltuples, or n_live_tup before the first ANALYZE."""
+        return self.rows or self.live
+    
+    @property
+    def avg_row_bytes(self) -> Optional[float]:
+        return self.bytes / self.total if self.total else None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for key in ("oldest_partition_date", "newest_partition_date"):
+            data[key] = data[key].isoformat() if data[key] else None
+        data["avg_row_bytes"] = self.avg_row_bytes
+        return data
+
+
+@dataclass
+class ExactCounts:
+    """Result of an exact count job."""
+    counts: Dict[str, int]
+    computed_at: datetime
+    duration: float
+
+
+def wilson_interval(hits: float, n: float) -> Tuple[float, float]:
+    """95% Wilson score interval for a proportion of ``hits`` in ``n``."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = hits / n
+    denominator = 1 + _Z ** 2 / n
+    center = (p + _Z ** 2 / (2 * n)) / denominator
+    half = _Z * math.sqrt(p * (1 - p) / n + _Z ** 2 / (4 * n ** 2)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate_from_sample(
+    pages: Sequence[Tuple[int, int]],
+    total: int,
+    total_error: int,
+) -> Estimate:
+    """
+    Scale a block sample's matching rows up to the table.
+    
+    Args:
+        pages: (rows sampled, rows matching) for every sampled page
+        total: Estimated rows in the table
+        total_error: Bound on the error of ``total``
+    
+    The proportion's variance is taken over pages rather than rows, and
+    the Wilson interval is evaluated at the resulting effective sample
+    size, so a condition that clusters on pages gets a wider interval.
+    """
+    n = sum(rows for rows, _ in pages)
+    hits = sum(matching for _, matching in pages)
+    if not n:
+        return Estimate(value=0, lower=0, upper=total + total_error, source="tablesample")
+    
+    p = hits / n
+    effective_n = n
+    if len(pages) > 1 and 0 < p < 1:
+        variance = (
+            len(pages) / (len(pages) - 1)
+            * sum((matching - p * rows) ** 2 for rows, matching in pages)
+            / n ** 2
+        )
+        if variance > 0:
+            effective_n = min(n, p * (1 - p) / variance)
+    
+    low, high = wilson_interval(p * effective_n, effective_n)
+    return Estimate(
+        value=round(p * total),
+        lower=math.floor(low * max(total - total_error, 0)),
+        upper=math.ceil(high * (total + total_error)),
+        source="tablesample",
+    )
+
+
+def sample_percent(sample_rows: int, stats: TableStats) -> float:
+    """TABLESAMPLE percentage expected to read about ``sample_rows`` rows."""
+    return min(100.0, 100.0 * sample_rows / max(stats.total + stats.drift, 1))
+
+
+def needs_exact(stats: TableStats) -> bool:
+    """Check whether a table has rows but no statistics to scale a sample by."""
+    return stats.total == 0 and stats.bytes > 0
+
+
+class RetentionEstimator:
+    """Estimates audit log counts without scanning the table."""
+    
+    def __init__(self, settings: RetentionSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+        self._exact: Dict[str, ExactCounts] = {}
+        self._jobs: Dict[str, asyncio.Task] = {}
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    async def table_stats(self) -> Optional[TableStats]:
+        """Row count, drift and size from pg_class, or None off PostgreSQL."""
+        async with self.db_manager.get_session() as session:
+            if session.get_bind().dialect.name != "postgresql":
+                return None
+            row = (await session.execute(_TABLE_STATS_SQL, {"parent": AuditLog.__tablename__})).one()
+            # partition_date leads idx_audit_logs_partition_key, so min/max
+            # are index lookups
+            oldest, newest = (await session.execute(
+                select(func.min(AuditLog.partition_date), func.max(AuditLog.partition_date))
+            )).one()
+        return TableStats(
+            rows=int(row.rows),
+            drift=int(row.drift),
+            bytes=int(row.bytes),
+            live=int(row.live),
+            oldest_partition_date=oldest,
+            newest_partition_date=newest,
+        )
+    
+    async def estimate(
+        self,
+        conditions: Mapping[str, ColumnElement],
+        stats: Optional[TableStats] = None,
+    ) -> Dict[str, Estimate]:
+        """
+        Estimate how many rows match each named condition.
+        
+        All conditions are evaluated in one pass over a TABLESAMPLE SYSTEM
+        sample sized to ``estimate_sample_rows``. Tables no larger than
+        that are counted exactly instead. A non-empty table without any
+        statistics yet gets unbounded estimates rather than a full scan;
+        ``needs_exact`` tells the caller to start the exact job.
+        
+        Returns:
+            Dict[str, Estimate]: An estimate per condition name, empty off
+            PostgreSQL
+        """
+        stats = stats or await self.table_stats()
+        if stats is None or not conditions:
+            return {}
+        
+        if needs_exact(stats):
+            return {name: Estimate(0, 0, None, "unbounded") for name in conditions}
+        
+        sample_rows = self.settings.estimate_sample_rows
+        if stats.total + stats.drift <= sample_rows:
+            counts = await self._count(conditions)
+            return {name: Estimate(count, count, count, "exact") for name, count in counts.items()}
+        
+        percent = sample_percent(sample_rows, stats)
+        sample = AuditLog.__table__.tablesample(func.system(percent), name="sample", seed=literal_column("0"))
+        adapter = ClauseAdapter(sample)
+        
+        block = literal_column("(sample.ctid::text::point)[0]").label("block")
+        relid = literal_column("sample.tableoid").label("relid")
+        names = list(conditions)
+        stmt = select(
+            relid,
+            block,
+            func.count().label("rows"),
+            *[func.count().filter(adapter.traverse(conditions[name])).label(f"c{index}") for index, name in enumerate(names)],
+        ).select_from(sample).group_by(relid, block)
+        
+        started = time.monotonic()
+        async with self.db_manager.get_session() as session:
+            pages = (await session.execute(stmt)).all()
+        logger.debug(
+            "Sampled audit_logs",
+            percent=round(percent, 4),
+            pages=len(pages),
+            duration=round(time.monotonic() - started, 3),
+        )
+        
+        return {
+            name: estimate_from_sample(
+                [(page.rows, page[3 + index]) for page in pages],
+                stats.total,
+                stats.drift,
+            )
+            for index, name in enumerate(names)
+        }
+    
+    def cached_exact(self, key: str) -> Optional[ExactCounts]:
+        """Exact counts of a finished job, if younger than the TTL."""
+        result = self._exact.get(key)
+        if result is None:
+            return None
+        age = (datetime.now(timezone.utc) - result.computed_at).total_seconds()
+        return result if age < self.settings.exact_stats_ttl_seconds else None
+    
+    def exact_job_running(self, key: str) -> bool:
+        job = self._jobs.get(key)
+        return job is not None and not job.done()
+    
+    def start_exact_job(self, key: str, conditions: Mapping[str, ColumnElement]) -> bool:
+        """
+        Count the conditions exactly in the background and cache the result.
+        
+        Returns:
+            bool: False when a job for ``key`` is already running
+        """
+        if self.exact_job_running(key):
+            return False
+        self._jobs[key] = asyncio.create_task(self._run_exact_job(key, dict(conditions)))
+        return True
+    
+    async def _run_exact_job(self, key: str, conditions: Dict[str, ColumnElement]) -> None:
+        started = time.monotonic()
+        try:
+            counts = await self._count(conditions)
+        except Exception as e:
+            logger.error("Exact retention count failed", key=key, error=str(e))
+            return
+        self._exact[key] = ExactCounts(
+            counts=counts,
+            computed_at=datetime.now(timezone.utc),
+            duration=time.monotonic() - started,
+        )
+        logger.info("Exact retention count finished", key=key, duration=round(self._exact[key].duration, 3))
+    
+    async def _count(self, conditions: Mapping[str, ColumnElement]) -> Dict[str, int]:
+        """Count every condition exactly in a single scan."""
+        names = list(conditions)
+        stmt = select(*[func.count().filter(conditions[name]) for name in names]).select_from(AuditLog)
+        async with self.db_manager.get_session() as session:
+            row = (await session.execute(stmt)).one()
+        return {name: int(row[index] or 0) for index, name in enumerate(names)}
+
+
+# Global retention estimator instance
+_retention_estimator: Optional[RetentionEstimator] = None
+
+
+def get_retention_estimator() -> RetentionEstimator:
+    """Get the global retention estimator instance."""
+    global _retention_estimator
+    if _retention_estimator is None:
+        _retention_estimator = RetentionEstimator(get_settings().retention)
+    return _retention_estimator
@@ -8,19 +8,27 @@ and comply with data governance requirements.
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 import structlog
-from google.cloud import bigquery
-from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy import and_, func, not_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.core.config import get_settings
-from app.db.database import get_database
-from app.models.audit import AuditLog
+from app.config import get_settings
+from app.db.database import get_database_manager
+from app.db.partitioning import get_partition_manager
+from app.db.schemas import AuditLog
+from app.services.archive_service import get_archiver
+from app.services.bigquery_retention import BigQueryRetentionManager, BigQueryRetentionResult, RetentionRule
 from app.services.bigquery_service import get_bigquery_service
-from app.utils.metrics import metrics
+from app.services.retention_deleter import expired_condition, get_retention_deleter
+from app.services.retention_estimator import Estimate, TableStats, get_retention_estimator, needs_exact
+from app.services.rollup_service import get_rollup_service
+from app.utils.metrics import audit_metrics
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -68,7 +76,10 @@ class RetentionService:
     """
     
     def __init__(self):
-        self.db = get_database()
+        self.db = get_database_manager()
+        self.deleter = get_retention_deleter()
+        self.archiver = get_archiver()
+        self.estimator = get_retention_estimator()
         self.bigquery_service = get_bigquery_service()
         self.policies = self._load_retention_policies()
         self._cleanup_stats = {
@@ -120,13 +131,23 @@ class RetentionService:
         # Filter enabled policies
         return [policy for policy in policies if policy.enabled]
     
-    async def run_cleanup(self, dry_run: bool = False) -> Dict[str, Any]:
+    async def run_cleanup(self, dry_run: bool = False, time_budget: Optional[float] = None) -> Dict[str, Any]:
         """
         Run data cleanup based on retention policies.
         
+        Every policy's archive window is archived before anything is
+        deleted. A row is then deleted once both its own expires_at and the
+        retention of every enabled policy matching it have passed, that is
+        at max(expires_at, created_at + longest matching retention); rows of
+        a policy that archives are also held until they are archived.
+        
         Args:
             dry_run: If True, only simulate cleanup without actual deletion
-            
+            time_budget: Seconds the run may take. Archival stops at a day
+                boundary and chunked deletes pause at a checkpoint once it
+                is spent, and the remaining steps are skipped; the next run
+                resumes from there
+        
         Returns:
             Cleanup statistics and results
         """
@@ -142,26 +163,101 @@ class RetentionService:
             'policy_results': {}
         }
         
+        deadline = time.monotonic() + time_budget if time_budget else None
+        self.deleter.deadline = deadline
+        policies = [policy for policy in self.policies if policy.enabled]
+        
+        def out_of_time(step: str) -> bool:
+            if deadline is None or time.monotonic() < deadline:
+                return False
+            if 'stopped_before' not in cleanup_results:
+                cleanup_results['stopped_before'] = step
+                logger.warning("Retention cleanup stopped at its time budget", step=step)
+            return True
+        
         try:
-            for policy in self.policies:
-                if not policy.enabled:
-                    continue
-                
+            # Archive first so that nothing is deleted before it is archived
+            for policy in policies:
                 logger.info("Processing retention policy", policy=policy.name)
-                
+                policy_result = cleanup_results['policy_results'][policy.name] = {
+                    'policy_name': policy.name,
+                    'retention_cutoff': policy.get_retention_cutoff(),
+                    'archive_cutoff': policy.get_archive_cutoff(),
+                    'deleted_count': 0,
+                    'archived_count': 0,
+                    'errors': []
+                }
+                if not policy.should_archive() or out_of_time(f"archive:{policy.name}"):
+                    continue
                 try:
-                    policy_result = await self._process_policy(policy, dry_run)
-                    cleanup_results['policy_results'][policy.name] = policy_result
-                    cleanup_results['total_deleted'] += policy_result['deleted_count']
+                    policy_result['archived_count'] = await self._archive_data(policy, dry_run, deadline)
                     cleanup_results['total_archived'] += policy_result['archived_count']
+                except Exception as e:
+                    error_msg = f"Error archiving policy {policy.name}: {str(e)}"
+                    logger.error("Policy archival failed", policy=policy.name, error=str(e))
+                    policy_result['errors'].append(error_msg)
+                    cleanup_results['errors'].append(error_msg)
+                    self._cleanup_stats['errors'] += 1
+            
+            now = datetime.now(timezone.utc)
+            cutoffs = {policy.name: await self._delete_cutoff(policy, dry_run) for policy in policies}
+            deletable, retained = self._retention_conditions(now, cutoffs)
+            
+            # Drop whole expired partitions first so row deletes only touch the rest
+            if not out_of_time("partition_drop"):
+                try:
+                    cleanup_results['partitions_dropped'] = await self._drop_expired_partitions(
+                        now, retained, dry_run
+                    )
+                except Exception as e:
+                    logger.error("Partition drop failed", error=str(e))
+                    cleanup_results['errors'].append(f"Partition drop failed: {str(e)}")
+            
+            # Honor each event's own retention_period_days
+            if not out_of_time("row_expiry"):
+                try:
+                    cleanup_results['expired_rows_deleted'] = await self._delete_rows_past_expiry(
+                        now, deletable, dry_run
+                    )
+                    cleanup_results['total_deleted'] += cleanup_results['expired_rows_deleted']
+                except Exception as e:
+                    logger.error("Row expiry delete failed", error=str(e))
+                    cleanup_results['errors'].append(f"Row expiry delete failed: {str(e)}")
+            
+            for policy in policies:
+                if out_of_time(f"delete:{policy.name}"):
+                    break
+                policy_result = cleanup_results['policy_results'][policy.name]
+                try:
+                    policy_result['deleted_count'] = await self._delete_expired_data(
+                        policy, cutoffs[policy.name], deletable, dry_run
+                    )
+                    cleanup_results['total_deleted'] += policy_result['deleted_count']
                     cleanup_results['policies_processed'] += 1
-                    
+                
                 except Exception as e:
                     error_msg = f"Error processing policy {policy.name}: {str(e)}"
                     logger.error("Policy processing failed", policy=policy.name, error=str(e))
+                    policy_result['errors'].append(error_msg)
                     cleanup_results['errors'].append(error_msg)
                     self._cleanup_stats['errors'] += 1
             
+            # Apply retention to BigQuery through its partition layout
+            if self.bigquery_service.is_available() and not out_of_time("bigquery"):
+                try:
+                    cleanup_results['bigquery'] = asdict(await self._cleanup_bigquery_data(dry_run))
+                except Exception as e:
+                    logger.error("BigQuery cleanup failed", error=str(e))
+                    cleanup_results['errors'].append(f"BigQuery cleanup failed: {str(e)}")
+            
+            # Drop metric rollup buckets past their retention
+            if not dry_run and not out_of_time("rollup_prune"):
+                try:
+                    cleanup_results['rollups_pruned'] = await get_rollup_service().prune()
+                except Exception as e:
+                    logger.error("Rollup pruning failed", error=str(e))
+                    cleanup_results['errors'].append(f"Rollup pruning failed: {str(e)}")
+            
             # Update statistics
             if not dry_run:
                 self._cleanup_stats['last_run'] = datetime.utcnow()
@@ -174,7 +270,7 @@ class RetentionService:
             ).total_seconds()
             
             # Record metrics
-            metrics.record_cleanup_run(
+            audit_metrics.record_cleanup_run(
                 deleted=cleanup_results['total_deleted'],
                 archived=cleanup_results['total_archived'],
                 duration=cleanup_results['duration'],
@@ -191,242 +287,223 @@ class RetentionService:
             )
             
             return cleanup_results
-            
+        
         except Exception as e:
             logger.error("Data cleanup failed", error=str(e))
             cleanup_results['errors'].append(f"Cleanup failed: {str(e)}")
             raise
+        
+        finally:
+            self.deleter.deadline = None
     
-    async def _process_policy(self, policy: RetentionPolicy, dry_run: bool) -> Dict[str, Any]:
-        """Process a single retention policy."""
-        result = {
-            'policy_name': policy.name,
-            'retention_cutoff': policy.get_retention_cutoff(),
-            'archive_cutoff': policy.get_archive_cutoff(),
-            'deleted_count': 0,
-            'archived_count': 0,
-            'errors': []
-        }
+    async def _delete_cutoff(self, policy: RetentionPolicy, dry_run: bool) -> datetime:
+        """
+        Time before which a policy's rows may be deleted.
         
-        try:
-            # Archive old data if archival is enabled
-            if policy.should_archive():
-                result['archived_count'] = await self._archive_data(policy, dry_run)
-            
-            # Delete expired data
-            result['deleted_count'] = await self._delete_expired_data(policy, dry_run)
-            
-            # Clean up BigQuery if using cloud storage
-            if self.bigquery_service.is_available():
-                await self._cleanup_bigquery_data(policy, dry_run)
-            
-        except Exception as e:
-            error_msg = f"Policy {policy.name} processing error: {str(e)}"
-            result['errors'].append(error_msg)
-            logger.error("Policy processing error", policy=policy.name, error=str(e))
+        That is the policy's retention cutoff, held back to how far the
+        policy has been archived when it archives. A dry run assumes the
+        archival it skipped would have succeeded.
+        """
+        cutoff = policy.get_retention_cutoff().replace(tzinfo=timezone.utc)
+        if policy.should_archive() and not dry_run:
+            archived_until = await self.archiver.archived_until(policy.name)
+            if archived_until and archived_until < cutoff:
+                cutoff = archived_until
+        return cutoff
+    
+    def _retention_conditions(
+        self,
+        now: datetime,
+        cutoffs: Dict[str, datetime]
+    ) -> Tuple[ColumnElement, ColumnElement]:
+        """
+        Conditions for rows that may be deleted and for rows that must be kept.
         
-        return result
+        A row may be deleted once its expires_at has passed and it is older
+        than the delete cutoff of every policy it matches. Rows whose
+        expires_at has not been backfilled yet are kept. The two conditions
+        are exact complements, written out so neither depends on NULL
+        handling.
+        """
+        deletable = [AuditLog.expires_at <= now]
+        retained = [AuditLog.expires_at.is_(None), AuditLog.expires_at > now]
+        for policy in self.policies:
+            if not policy.enabled:
+                continue
+            cutoff = cutoffs.get(policy.name, policy.get_retention_cutoff().replace(tzinfo=timezone.utc))
+            conditions = self._policy_conditions(policy)
+            if conditions:
+                deletable.append(or_(not_(and_(*conditions)), AuditLog.created_at < cutoff))
+                retained.append(and_(*conditions, AuditLog.created_at >= cutoff))
+            else:
+                deletable.append(AuditLog.created_at < cutoff)
+                retained.append(AuditLog.created_at >= cutoff)
+        return and_(*deletable), or_(*retained)
     
-    async def _archive_data(self, policy: RetentionPolicy, dry_run: bool) -> int:
-        """Archive data based on policy."""
-        archive_cutoff = policy.get_archive_cutoff()
-        retention_cutoff = policy.get_retention_cutoff()
+    async def _archive_data(
+        self,
+        policy: RetentionPolicy,
+        dry_run: bool,
+        deadline: Optional[float] = None
+    ) -> int:
+        """
+        Archive data based on policy.
+        
+        Only the part of the archive window not covered by an earlier run
+        of the policy is archived, so each run writes just the newly
+        archivable events. A run cut short by ``deadline`` archives up to
+        the day it reached.
+        """
+        archive_cutoff = policy.get_archive_cutoff().replace(tzinfo=timezone.utc)
+        retention_cutoff = policy.get_retention_cutoff().replace(tzinfo=timezone.utc)
+        
+        # Resume where the last run stopped, even if that has since fallen
+        # past the retention cutoff; those rows are not deleted until archived
+        archived_until = await self.archiver.archived_until(policy.name)
+        start = archived_until or retention_cutoff
         
         logger.info(
             "Archiving data",
             policy=policy.name,
             archive_cutoff=archive_cutoff,
-            retention_cutoff=retention_cutoff
+            retention_cutoff=retention_cutoff,
+            start=start
         )
         
-        archived_count = 0
+        if start >= archive_cutoff:
+            logger.info("No data to archive", policy=policy.name)
+            return 0
         
-        async with self.db.get_session() as session:
-            # Build query based on policy conditions
-            query = select(AuditLog).where(
-                and_(
-                    AuditLog.created_at >= retention_cutoff,
-                    AuditLog.created_at < archive_cutoff
-                )
-            )
-            
-            # Apply policy conditions
-            if policy.conditions:
-                for field, values in policy.conditions.items():
-                    if hasattr(AuditLog, field):
-                        column = getattr(AuditLog, field)
-                        if isinstance(values, list):
-                            query = query.where(column.in_(values))
-                        else:
-                            query = query.where(column == values)
-            
-            # Get count for logging
-            count_query = select(func.count()).select_from(query.subquery())
-            result = await session.execute(count_query)
-            total_count = result.scalar()
-            
-            if total_count == 0:
-                logger.info("No data to archive", policy=policy.name)
-                return 0
-            
-            logger.info("Found data to archive", policy=policy.name, count=total_count)
-            
-            if not dry_run:
-                # Process in batches to avoid memory issues
-                batch_size = getattr(settings, 'archive_batch_size', 1000)
-                offset = 0
-                
-                while offset < total_count:
-                    batch_query = query.offset(offset).limit(batch_size)
-                    batch_result = await session.execute(batch_query)
-                    batch_records = batch_result.scalars().all()
-                    
-                    if not batch_records:
-                        break
-                    
-                    # Archive to external storage (e.g., Cloud Storage)
-                    await self._archive_batch_to_storage(batch_records, policy)
-                    
-                    archived_count += len(batch_records)
-                    offset += batch_size
-                    
-                    logger.debug(
-                        "Archived batch",
-                        policy=policy.name,
-                        batch_size=len(batch_records),
-                        total_archived=archived_count
-                    )
-            else:
-                archived_count = total_count
+        conditions = self._policy_conditions(policy)
         
-        logger.info("Data archival completed", policy=policy.name, archived_count=archived_count)
-        return archived_count
-    
-    async def _archive_batch_to_storage(self, records: List[AuditLog], policy: RetentionPolicy) -> None:
-        """Archive a batch of records to external storage."""
-        # This would typically involve:
-        # 1. Serializing records to JSON/Parquet
-        # 2. Compressing the data
-        # 3. Uploading to Cloud Storage/S3
-        # 4. Recording archive metadata
-        
-        # For now, we'll implement a simple JSON export
-        import json
-        from pathlib import Path
-        
-        archive_dir = Path(getattr(settings, 'archive_directory', '/tmp/audit_archive'))
-        archive_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"{policy.name}_{timestamp}_{len(records)}.json"
-        filepath = archive_dir / filename
-        
-        # Convert records to JSON
-        archive_data = []
-        for record in records:
-            record_dict = {
-                'id': str(record.id),
-                'tenant_id': record.tenant_id,
-                'user_id': record.user_id,
-                'event_type': record.event_type,
-                'resource_type': record.resource_type,
-                'resource_id': record.resource_id,
-                'action': record.action,
-                'timestamp': record.timestamp.isoformat(),
-                'ip_address': record.ip_address,
-                'user_agent': record.user_agent,
-                'metadata': record.event_metadata,
-                'created_at': record.created_at.isoformat()
-            }
-            archive_data.append(record_dict)
+        if dry_run:
+            async with self.db.get_session() as session:
+                count_query = select(func.count()).select_from(AuditLog).where(
+                    AuditLog.created_at >= start,
+                    AuditLog.created_at < archive_cutoff,
+                    *conditions,
+                )
+                result = await session.execute(count_query)
+                return result.scalar()
         
-        # Write to file
-        with open(filepath, 'w') as f:
-            json.dump(archive_data, f, indent=2)
+        manifest = await self.archiver.archive(
+            policy.name, start, archive_cutoff, conditions, deadline=deadline
+        )
         
         logger.info(
-            "Batch archived to storage",
+            "Data archival completed",
             policy=policy.name,
-            filename=filename,
-            record_count=len(records)
+            archived_count=manifest.total_rows,
+            run_id=manifest.run_id
+        )
+        return manifest.total_rows
+    
+    @staticmethod
+    def _policy_conditions(policy: RetentionPolicy) -> List[Any]:
+        """Build the row conditions selecting the events a policy applies to."""
+        conditions = []
+        for field, values in policy.conditions.items():
+            if hasattr(AuditLog, field):
+                column = getattr(AuditLog, field)
+                if isinstance(values, list):
+                    conditions.append(column.in_(values))
+                else:
+                    conditions.append(column == values)
+        return conditions
+    
+    async def _drop_expired_partitions(
+        self,
+        now: datetime,
+        retained: ColumnElement,
+        dry_run: bool
+    ) -> List[str]:
+        """
+        Drop audit_logs partitions whose rows may all be deleted.
+        
+        A partition ending by today is dropped unless it still holds a row
+        that ``retained`` keeps; such partitions are left to the row deletes.
+        """
+        return await get_partition_manager().drop_partitions_before(
+            now.date(),
+            keep_if=retained,
+            dry_run=dry_run,
         )
     
-    async def _delete_expired_data(self, policy: RetentionPolicy, dry_run: bool) -> int:
-        """Delete expired data based on policy."""
-        retention_cutoff = policy.get_retention_cutoff()
+    async def _delete_rows_past_expiry(self, now: datetime, deletable: ColumnElement, dry_run: bool) -> int:
+        """
+        Delete rows whose own retention_period_days has run out.
         
-        logger.info("Deleting expired data", policy=policy.name, cutoff=retention_cutoff)
+        Rows still within the retention of a policy matching them are kept.
+        Rows written before expires_at was maintained on insert are
+        backfilled first, within the same chunk time budget.
+        """
+        if dry_run:
+            return await self.deleter.count_past_expiry(now, [deletable])
         
-        async with self.db.get_session() as session:
-            # Build delete query based on policy conditions
-            delete_query = delete(AuditLog).where(AuditLog.created_at < retention_cutoff)
-            
-            # Apply policy conditions
-            if policy.conditions:
-                for field, values in policy.conditions.items():
-                    if hasattr(AuditLog, field):
-                        column = getattr(AuditLog, field)
-                        if isinstance(values, list):
-                            delete_query = delete_query.where(column.in_(values))
-                        else:
-                            delete_query = delete_query.where(column == values)
-            
-            if dry_run:
-                # Count records that would be deleted
-                count_query = select(func.count()).select_from(
-                    select(AuditLog).where(delete_query.whereclause).subquery()
-                )
-                result = await session.execute(count_query)
-                deleted_count = result.scalar()
-            else:
-                # Execute deletion
-                result = await session.execute(delete_query)
-                deleted_count = result.rowcount
-                await session.commit()
+        backfill = await self.deleter.backfill_expires_at()
+        if backfill.rows:
+            logger.info("Backfilled expires_at", rows=backfill.rows, completed=backfill.completed)
+        
+        run = await self.deleter.delete_past_expiry(now, [deletable])
+        logger.info("Deleted rows past their retention period", deleted_count=run.rows)
+        return run.rows
+    
+    async def _delete_expired_data(
+        self,
+        policy: RetentionPolicy,
+        cutoff: datetime,
+        deletable: ColumnElement,
+        dry_run: bool
+    ) -> int:
+        """
+        Delete expired data based on policy.
+        
+        Rows are deleted in key-ordered, checkpointed chunks; an interrupted
+        or time-boxed delete continues where it stopped on the next run.
+        Only rows that are ``deletable`` under every policy and their own
+        expiry are removed.
+        """
+        conditions = self._policy_conditions(policy) + [deletable]
+        
+        logger.info("Deleting expired data", policy=policy.name, cutoff=cutoff)
+        
+        if dry_run:
+            deleted_count = await self.deleter.count_expired(cutoff, conditions)
+        else:
+            run = await self.deleter.delete_expired(policy.name, cutoff, conditions)
+            deleted_count = run.rows
         
         logger.info("Data deletion completed", policy=policy.name, deleted_count=deleted_count)
         return deleted_count
     
-    async def _cleanup_bigquery_data(self, policy: RetentionPolicy, dry_run: bool) -> None:
-        """Clean up BigQuery data based on retention policy."""
-        if not self.bigquery_service.is_available():
-            return
-        
-        try:
-            retention_cutoff = policy.get_retention_cutoff()
-            
-            # Build BigQuery DELETE query
-            table_id = f"{settings.gcp_project_id}.{settings.bigquery_dataset}.{settings.bigquery_table}"
-            
-            conditions = [f"timestamp < '{retention_cutoff.isoformat()}'"]
-            
-            # Apply policy conditions
-            if policy.conditions:
-                for field, values in policy.conditions.items():
-                    if isinstance(values, list):
-                        value_list = "', '".join(values)
-                        conditions.append(f"{field} IN ('{value_list}')")
-                    else:
-                        conditions.append(f"{field} = '{values}'")
-            
-            where_clause = " AND ".join(conditions)
-            delete_sql = f"DELETE FROM `{table_id}` WHERE {where_clause}"
-            
-            if dry_run:
-                # Count records that would be deleted
-                count_sql = f"SELECT COUNT(*) FROM `{table_id}` WHERE {where_clause}"
-                logger.info("BigQuery cleanup (dry run)", policy=policy.name, query=count_sql)
-            else:
-                logger.info("Executing BigQuery cleanup", policy=policy.name, query=delete_sql)
-                # Execute the delete query
-                # Note: This would require BigQuery client implementation
-                # await self.bigquery_service.execute_query(delete_sql)
+    async def _cleanup_bigquery_data(self, dry_run: bool) -> BigQueryRetentionResult:
+        """
+        Apply the retention policies to the BigQuery audit table.
         
-        except Exception as e:
-            logger.error("BigQuery cleanup failed", policy=policy.name, error=str(e))
+        Retention is enforced with partition expiration and partition
+        deletes; DML only runs for rows selected by policy conditions.
+        """
+        table_ref = self.bigquery_service.table_ref
+        manager = BigQueryRetentionManager(
+            self.bigquery_service.client,
+            f"{table_ref.project}.{table_ref.dataset_id}.{table_ref.table_id}"
+        )
+        rules = [
+            RetentionRule(policy.name, policy.retention_days, policy.conditions)
+            for policy in self.policies
+            if policy.enabled
+        ]
+        return await manager.apply(rules, dry_run=dry_run)
     
-    async def get_retention_stats(self) -> Dict[str, Any]:
-        """Get retention and cleanup statistics."""
+    async def get_retention_stats(self, exact: bool = False) -> Dict[str, Any]:
+        """
+        Get retention and cleanup statistics.
+        
+        Record counts are estimates with 95% bounds (see
+        RetentionEstimator). With ``exact`` the counts of a background
+        exact count are returned when one finished recently; otherwise one
+        is started and the estimates are returned meanwhile.
+        """
         stats = {
             'cleanup_stats': self._cleanup_stats.copy(),
             'policies': [],
@@ -446,119 +523,144 @@ class RetentionService:
             }
             stats['policies'].append(policy_info)
         
-        # Get data distribution statistics
-        async with self.db.get_session() as session:
-            # Total record count
-            total_query = select(func.count()).select_from(AuditLog)
-            result = await session.execute(total_query)
-            stats['data_distribution']['total_records'] = result.scalar()
-            
-            # Records by age
-            now = datetime.utcnow()
-            age_ranges = [
-                ('last_24h', 1),
-                ('last_week', 7),
-                ('last_month', 30),
-                ('last_quarter', 90),
-                ('last_year', 365)
-            ]
-            
-            for range_name, days in age_ranges:
-                cutoff = now - timedelta(days=days)
-                age_query = select(func.count()).select_from(AuditLog).where(
-                    AuditLog.created_at >= cutoff
-                )
-                result = await session.execute(age_query)
-                stats['data_distribution'][range_name] = result.scalar()
+        # Records by age
+        now = datetime.now(timezone.utc)
+        age_ranges = [
+            ('last_24h', 1),
+            ('last_week', 7),
+            ('last_month', 30),
+            ('last_quarter', 90),
+            ('last_year', 365)
+        ]
+        conditions = {
+            range_name: AuditLog.created_at >= now - timedelta(days=days)
+            for range_name, days in age_ranges
+        }
+        
+        table_stats = await self.estimator.table_stats()
+        counts, stats['estimation'] = await self._estimate_counts(
+            "retention_stats", conditions, table_stats, exact
+        )
+        
+        distribution = stats['data_distribution']
+        distribution['total_records'] = self._table_total(table_stats)
+        for range_name in conditions:
+            distribution[range_name] = counts[range_name].to_dict() if range_name in counts else None
+        distribution['table'] = table_stats.to_dict() if table_stats else None
         
         return stats
     
-    async def estimate_cleanup_impact(self) -> Dict[str, Any]:
-        """Estimate the impact of running cleanup policies."""
+    async def estimate_cleanup_impact(self, exact: bool = False) -> Dict[str, Any]:
+        """
+        Estimate the impact of running cleanup policies.
+        
+        All policies are estimated from one sample of audit_logs; see
+        get_retention_stats for ``exact``. Totals add up the per-policy
+        bounds, which is conservative.
+        """
         impact = {
             'policies': {},
-            'total_to_delete': 0,
-            'total_to_archive': 0,
+            'total_to_delete': None,
+            'total_to_archive': None,
             'storage_savings_estimate': 0
         }
         
+        conditions = {}
+        cutoffs = {
+            policy.name: await self._delete_cutoff(policy, dry_run=False)
+            for policy in self.policies
+            if policy.enabled
+        }
+        deletable, _ = self._retention_conditions(datetime.now(timezone.utc), cutoffs)
         for policy in self.policies:
             if not policy.enabled:
                 continue
-            
-            policy_impact = await self._estimate_policy_impact(policy)
-            impact['policies'][policy.name] = policy_impact
-            impact['total_to_delete'] += policy_impact['records_to_delete']
-            impact['total_to_archive'] += policy_impact['records_to_archive']
-        
-        # Estimate storage savings (rough calculation)
-        avg_record_size = getattr(settings, 'avg_audit_record_size_bytes', 1024)
-        impact['storage_savings_estimate'] = (
-            impact['total_to_delete'] * avg_record_size
-        )
-        
-        return impact
-    
-    async def _estimate_policy_impact(self, policy: RetentionPolicy) -> Dict[str, Any]:
-        """Estimate the impact of a single policy."""
-        retention_cutoff = policy.get_retention_cutoff()
-        archive_cutoff = policy.get_archive_cutoff()
-        
-        impact = {
-            'policy_name': policy.name,
-            'records_to_delete': 0,
-            'records_to_archive': 0,
-            'oldest_record': None,
-            'newest_record': None
-        }
-        
-        async with self.db.get_session() as session:
-            # Base query with policy conditions
-            base_query = select(AuditLog)
-            
-            if policy.conditions:
-                for field, values in policy.conditions.items():
-                    if hasattr(AuditLog, field):
-                        column = getattr(AuditLog, field)
-                        if isinstance(values, list):
-                            base_query = base_query.where(column.in_(values))
-                        else:
-                            base_query = base_query.where(column == values)
-            
-            # Count records to delete
-            delete_query = select(func.count()).select_from(
-                base_query.where(AuditLog.created_at < retention_cutoff).subquery()
+            retention_cutoff = policy.get_retention_cutoff()
+            policy_conditions = self._policy_conditions(policy)
+            conditions[f"{policy.name}:delete"] = expired_condition(
+                cutoffs[policy.name], policy_conditions + [deletable]
             )
-            result = await session.execute(delete_query)
-            impact['records_to_delete'] = result.scalar()
-            
-            # Count records to archive
             if policy.should_archive():
-                archive_query = select(func.count()).select_from(
-                    base_query.where(
-                        and_(
-                            AuditLog.created_at >= retention_cutoff,
-                            AuditLog.created_at < archive_cutoff
-                        )
-                    ).subquery()
+                conditions[f"{policy.name}:archive"] = and_(
+                    AuditLog.created_at >= retention_cutoff,
+                    AuditLog.created_at < policy.get_archive_cutoff(),
+                    *policy_conditions
                 )
-                result = await session.execute(archive_query)
-                impact['records_to_archive'] = result.scalar()
-            
-            # Get date range for affected records
-            date_query = select(
-                func.min(AuditLog.created_at),
-                func.max(AuditLog.created_at)
-            ).select_from(base_query.subquery())
-            result = await session.execute(date_query)
-            min_date, max_date = result.first()
-            
-            if min_date:
-                impact['oldest_record'] = min_date.isoformat()
-            if max_date:
-                impact['newest_record'] = max_date.isoformat()
+        
+        table_stats = await self.estimator.table_stats()
+        counts, impact['estimation'] = await self._estimate_counts(
+            "cleanup_impact", conditions, table_stats, exact
+        )
+        if not counts:
+            return impact
+        
+        nothing = Estimate(0, 0, 0, "exact")
+        for policy in self.policies:
+            if not policy.enabled:
+                continue
+            impact['policies'][policy.name] = {
+                'policy_name': policy.name,
+                'records_to_delete': counts[f"{policy.name}:delete"].to_dict(),
+                'records_to_archive': counts.get(f"{policy.name}:archive", nothing).to_dict()
+            }
+        
+        def total(suffix: str) -> Dict[str, Any]:
+            parts = [estimate for name, estimate in counts.items() if name.endswith(suffix)]
+            return Estimate(
+                value=sum(estimate.value for estimate in parts),
+                lower=sum(estimate.lower for estimate in parts),
+                upper=None if any(estimate.upper is None for estimate in parts) else sum(
+                    estimate.upper for estimate in parts
+                ),
+                source=parts[0].source if parts else "exact"
+            ).to_dict()
+        
+        impact['total_to_delete'] = total(":delete")
+        impact['total_to_archive'] = total(":archive")
+        
+        # Average row size from the table's on-disk size when known
+        avg_record_size = (table_stats.avg_row_bytes if table_stats else None) or getattr(
+            settings, 'avg_audit_record_size_bytes', 1024
+        )
+        impact['storage_savings_estimate'] = int(impact['total_to_delete']['value'] * avg_record_size)
         
         return impact
+    
+    async def _estimate_counts(
+        self,
+        key: str,
+        conditions: Dict[str, Any],
+        table_stats: Optional[TableStats],
+        exact: bool
+    ) -> Tuple[Dict[str, Estimate], Dict[str, Any]]:
+        """Sampled estimates, or cached exact counts when requested and fresh."""
+        estimation = {'mode': 'estimate', 'exact_job': None, 'computed_at': None}
+        
+        # Without statistics the estimates are unbounded, so count exactly
+        # in the background even when not asked to
+        if exact or (table_stats is not None and needs_exact(table_stats)):
+            cached = self.estimator.cached_exact(key)
+            if cached and set(cached.counts) == set(conditions):
+                estimation.update(mode='exact', exact_job='cached', computed_at=cached.computed_at.isoformat())
+                return {
+                    name: Estimate(count, count, count, "exact") for name, count in cached.counts.items()
+                }, estimation
+            self.estimator.start_exact_job(key, conditions)
+            estimation['exact_job'] = 'running'
+        
+        return await self.estimator.estimate(conditions, table_stats), estimation
+    
+    @staticmethod
+    def _table_total(table_stats: Optional[TableStats]) -> Optional[Dict[str, Any]]:
+        """Total rows from planner statistics, bounded by changes since ANALYZE."""
+        if table_stats is None:
+            return None
+        return Estimate(
+            value=table_stats.total,
+            lower=max(table_stats.total - table_stats.drift, 0),
+            upper=table_stats.total + table_stats.drift,
+            source="pg_class" if table_stats.rows else "pg_stat_user_tables"
+        ).to_dict()
 
 
 # Global retention service instance
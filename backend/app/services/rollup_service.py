@@ -0,0 +1,322 @@
+"""
+Time-bucket rollups for the audit log framework.
+
+This module maintains per-tenant event counts by minute and hour, broken
+down by event type, status and service. The ingestion path adds the counts
+of committed rows to an in-memory delta that is upserted in the background
+every ``flush_interval_seconds``, so ingest transactions never wait on the
+rollup rows' locks. The metrics endpoints read the rollups instead of
+scanning audit_logs, so their cost depends on the time window rather than
+the table size.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, case, delete, desc, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import RollupSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import AuditEventRollup
+
+logger = structlog.get_logger(__name__)
+
+MINUTE = "minute"
+HOUR = "hour"
+
+GRANULARITIES = {
+    MINUTE: timedelta(minutes=1),
+    HOUR: timedelta(hours=1),
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def truncate(timestamp: datetime, interval: timedelta) -> datetime:
+    """Floor a timestamp to a multiple of ``interval`` since the epoch (UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp - (timestamp - _EPOCH) % interval
+
+
+def count_rollups(rows: Iterable[Dict[str, Any]]) -> Counter:
+    """Count audit log rows by rollup key for every granularity."""
+    counts: Counter = Counter()
+    for row in rows:
+        for granularity, interval in GRANULARITIES.items():
+            counts[(
+                row["tenant_id"],
+                granularity,
+                truncate(row["timestamp"], interval),
+                row["event_type"],
+                row["status"],
+                row["service_name"],
+            )] += 1
+    return counts
+
+
+def _rollup_values(counts: Counter) -> List[Dict[str, Any]]:
+    """
+    Turn rollup counts into rollup rows.
+    
+    The rows are sorted by primary key so that concurrent flushes lock
+    rollup rows in the same order.
+    """
+    return [
+        {
+            "tenant_id": tenant_id,
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "event_type": event_type,
+            "status": status,
+            "service_name": service_name,
+            "event_count": count,
+        }
+        for (tenant_id, granularity, bucket_start, event_type, status, service_name), count
+        in sorted(counts.items())
+    ]
+
+
+class RollupService:
+    """Maintains and reads time-bucket event count rollups."""
+    
+    def __init__(self, settings: RollupSettings, db_manager: Optional[DatabaseManager] = None):
+        self.settings = settings
+        self._db_manager = db_manager
+        self._pending: Counter = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    @property
+    def pending(self) -> int:
+        """Number of rollup rows waiting to be flushed."""
+        return len(self._pending)
+    
+    async def start(self) -> None:
+        """Start flushing added counts periodically."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self) -> None:
+        """Stop the periodic flush and flush what is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.flush_interval_seconds)
+            await self.flush()
+    
+    def add(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add committed audit log rows to the pending rollup delta.
+        
+        Only call this once the rows' transaction has committed; the delta
+        is written by the next ``flush``. Counts still pending when the
+        process dies are lost, so rollups may undercount by up to one
+        flush interval.
+        """
+        self._pending.update(count_rollups(rows))
+    
+    async def flush(self) -> int:
+        """
+        Upsert the pending delta in its own transaction.
+        
+        On failure the delta is kept and retried by the next flush.
+        
+        Returns:
+            int: Number of rollup rows upserted
+        """
+        async with self._flush_lock:
+            counts, self._pending = self._pending, Counter()
+            if not counts:
+                return 0
+            values = _rollup_values(counts)
+            try:
+                async with self.db_manager.get_session() as session:
+                    await self._upsert(session, values)
+                    await session.commit()
+            except Exception as e:
+                self._pending.update(counts)
+                logger.error("Rollup flush failed", rows=len(values), error=str(e))
+                return 0
+        
+        logger.debug("Flushed metric rollups", rows=len(values))
+        return len(values)
+    
+    @staticmethod
+    async def _upsert(session: AsyncSession, values: List[Dict[str, Any]]) -> None:
+        insert = _INSERTS[session.get_bind().dialect.name]
+        stmt = insert(AuditEventRollup).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[column.name for column in AuditEventRollup.__table__.primary_key],
+            set_={"event_count": AuditEventRollup.event_count + stmt.excluded.event_count},
+        )
+        await session.execute(stmt)
+    
+    async def get_totals(self, tenant_id: str, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Get all-time, today's and last-hour event counts in one statement.
+        
+        The all-time total covers the hour rollup retention window.
+        """
+        now = now or datetime.now(timezone.utc)
+        midnight = truncate(now, timedelta(days=1))
+        hour_ago = truncate(now - timedelta(hours=1), GRANULARITIES[MINUTE])
+        is_hour = AuditEventRollup.granularity == HOUR
+        
+        def total(condition):
+            return func.coalesce(func.sum(case((condition, AuditEventRollup.event_count), else_=0)), 0)
+        
+        stmt = select(
+            total(is_hour).label("total"),
+            total(and_(is_hour, AuditEventRollup.bucket_start >= midnight)).label("today"),
+            total(~is_hour).label("last_hour"),
+        ).where(
+            AuditEventRollup.tenant_id == tenant_id,
+            or_(
+                is_hour,
+                and_(
+                    AuditEventRollup.granularity == MINUTE,
+                    AuditEventRollup.bucket_start >= hour_ago,
+                ),
+            ),
+        )
+        
+        async with self.db_manager.get_session() as session:
+            row = (await session.execute(stmt)).one()
+        
+        return {"total": int(row.total), "today": int(row.today), "last_hour": int(row.last_hour)}
+    
+    async def get_series(
+        self,
+        tenant_id: str,
+        start: datetime,
+        end: datetime,
+        interval: timedelta,
+    ) -> List[Tuple[datetime, int]]:
+        """
+        Get event counts per ``interval`` between ``start`` and ``end``.
+        
+        Hour rollups are read when the interval is a whole number of hours,
+        minute rollups otherwise. Empty intervals are returned with a zero
+        count.
+        
+        Returns:
+            List of ``(interval_start, count)`` pairs in time order
+        """
+        granularity = HOUR if interval % GRANULARITIES[HOUR] == timedelta(0) else MINUTE
+        start = truncate(start, interval)
+        
+        stmt = (
+            select(
+                AuditEventRollup.bucket_start,
+                func.sum(AuditEventRollup.event_count).label("event_count"),
+            )
+            .where(
+                AuditEventRollup.tenant_id == tenant_id,
+                AuditEventRollup.granularity == granularity,
+                AuditEventRollup.bucket_start >= start,
+                AuditEventRollup.bucket_start < end,
+            )
+            .group_by(AuditEventRollup.bucket_start)
+        )
+        
+        async with self.db_manager.get_session() as session:
+            result = await session.execute(stmt)
+            buckets = result.all()
+        
+        slots = int((end - start) / interval) + (1 if (end - start) % interval else 0)
+        counts = [0] * slots
+        for bucket_start, event_count in buckets:
+            if bucket_start.tzinfo is None:
+                bucket_start = bucket_start.replace(tzinfo=timezone.utc)
+            counts[int((bucket_start - start) / interval)] += int(event_count)
+        
+        return [(start + index * interval, count) for index, count in enumerate(counts)]
+    
+    async def get_top_event_types(self, tenant_id: str, limit: int) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        Get the most frequent event types of a tenant.
+        
+        Returns:
+            Tuple of ``[(event_type, count), ...]`` and the tenant's total count
+        """
+        event_count = func.sum(AuditEventRollup.event_count)
+        stmt = (
+            select(
+                AuditEventRollup.event_type,
+                event_count.label("event_count"),
+                func.sum(event_count).over().label("total"),
+            )
+            .where(
+                AuditEventRollup.tenant_id == tenant_id,
+                AuditEventRollup.granularity == HOUR,
+            )
+            .group_by(AuditEventRollup.event_type)
+            .order_by(desc("event_count"), AuditEventRollup.event_type)
+            .limit(limit)
+        )
+        
+        async with self.db_manager.get_session() as session:
+            rows = (await session.execute(stmt)).all()
+        
+        total = int(rows[0].total) if rows else 0
+        return [(row.event_type, int(row.event_count)) for row in rows], total
+    
+    async def prune(self, now: Optional[datetime] = None) -> int:
+        """Delete rollup buckets older than their granularity's retention."""
+        now = now or datetime.now(timezone.utc)
+        stmt = delete(AuditEventRollup).where(
+            or_(
+                and_(
+                    AuditEventRollup.granularity == MINUTE,
+                    AuditEventRollup.bucket_start < now - timedelta(hours=self.settings.minute_retention_hours),
+                ),
+                and_(
+                    AuditEventRollup.granularity == HOUR,
+                    AuditEventRollup.bucket_start < now - timedelta(days=self.settings.hour_retention_days),
+                ),
+            )
+        )
+        
+        async with self.db_manager.get_session() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        
+        logger.info("Pruned metric rollups", deleted=result.rowcount)
+        return result.rowcount
+
+
+# Global rollup service instance
+_rollup_service: Optional[RollupService] = None
+
+
+def get_rollup_service() -> RollupService:
+    """Get the global rollup service instance."""
+    global _rollup_service
+    if _rollup_service is None:
+        _rollup_service = RollupService(get_settings().rollup)
+    return _rollup_service
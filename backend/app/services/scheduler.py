@@ -0,0 +1,468 @@
+"""
+Background job scheduler for the audit log framework.
+
+Retention cleanup, backups and backup cleanup run on cron schedules in
+exactly one process: the scheduler holding a PostgreSQL session-level
+advisory lock on its own connection is the leader, and the lock is
+released by the server if that process or connection dies. Heavy jobs only
+start inside the off-peak window and run one after another; retention
+deletes pause at their time budget or when the window closes, and backups
+still reading when the window closes are abandoned. The lease is checked
+every ``tick_seconds`` while a job runs, and a job whose leader loses it
+is cancelled so two leaders never run jobs at once. Every run is recorded
+in scheduled_job_runs with its status and duration, including runs
+cancelled by a scheduler shutdown; a new leader resumes the schedules
+from that history, so a run missed during a failover happens once when
+the lease is taken over.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+from uuid import uuid4
+
+import structlog
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import SchedulerSettings, get_settings
+from app.db.database import DatabaseManager, get_database_manager
+from app.db.schemas import ScheduledJobRun
+from app.utils.metrics import audit_metrics
+
+logger = structlog.get_logger(__name__)
+
+_TRY_LOCK_SQL = text("SELECT pg_try_advisory_lock(:key)")
+_UNLOCK_SQL = text("SELECT pg_advisory_unlock(:key)")
+
+# (low, high) bounds of minute, hour, day of month, month and day of week
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    """Parse one cron field: ``*``, ``a``, ``a-b`` and ``/step``, comma separated."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """A five-field cron expression, evaluated in UTC."""
+    expression: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    day_restricted: bool
+    weekday_restricted: bool
+    
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs five fields: {expression}")
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, _CRON_FIELDS)
+        )
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            # Both 0 and 7 are Sunday
+            weekdays=frozenset(day % 7 for day in weekdays),
+            day_restricted=fields[2] != "*",
+            weekday_restricted=fields[4] != "*",
+        )
+    
+    def matches_day(self, day: date) -> bool:
+        """Check the day fields; like cron, restricting both matches either."""
+        weekday = (day.weekday() + 1) % 7
+        if self.day_restricted and self.weekday_restricted:
+            return day.day in self.days or weekday in self.weekdays
+        return day.day in self.days and weekday in self.weekdays
+    
+    def next_after(self, moment: datetime) -> datetime:
+        """First minute after ``moment`` the schedule fires at."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=5 * 366)
+        while candidate < limit:
+            if candidate.month not in self.months or not self.matches_day(candidate.date()):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """A daily UTC time window; it wraps past midnight when end < start."""
+    start: dt_time
+    end: dt_time
+    
+    @classmethod
+    def parse(cls, window: str) -> Optional["TimeWindow"]:
+        """Parse ``HH:MM-HH:MM``; an empty string means no window."""
+        if not window:
+            return None
+        start, end = window.split("-", 1)
+        return cls(dt_time.fromisoformat(start), dt_time.fromisoformat(end))
+    
+    def contains(self, moment: datetime) -> bool:
+        now = moment.time().replace(tzinfo=None)
+        if self.start <= self.end:
+            return self.start <= now < self.end
+        return now >= self.start or now < self.end
+    
+    def remaining(self, moment: datetime) -> float:
+        """Seconds from ``moment`` until the window closes."""
+        end = datetime.combine(moment.date(), self.end, tzinfo=moment.tzinfo)
+        if end <= moment:
+            end += timedelta(days=1)
+        return (end - moment).total_seconds()
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A job the scheduler runs.
+    
+    ``run`` is called with the job's time budget in seconds, or None when
+    it has no window to finish in.
+    """
+    name: str
+    schedule: CronSchedule
+    run: Callable[[Optional[float]], Awaitable[Any]]
+    window: Optional[TimeWindow] = None
+    next_run: Optional[datetime] = None
+
+
+def _summarize(result: Any) -> Any:
+    """Make a job's return value storable as JSON."""
+    if hasattr(result, "to_dict"):
+        result = result.to_dict()
+    return json.loads(json.dumps(result, default=str))
+
+
+class JobScheduler:
+    """Runs scheduled jobs while holding the scheduler leader lease."""
+    
+    def __init__(
+        self,
+        settings: SchedulerSettings,
+        db_manager: Optional[DatabaseManager] = None,
+        jobs: Optional[List[ScheduledJob]] = None,
+    ):
+        self.settings = settings
+        self._db_manager = db_manager
+        self.jobs = jobs if jobs is not None else []
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+        self._lease: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        if self._db_manager is None:
+            self._db_manager = get_database_manager()
+        return self._db_manager
+    
+    @property
+    def is_leader(self) -> bool:
+        return self._lease is not None
+    
+    async def start(self) -> None:
+        """Start checking for due jobs every ``tick_seconds``."""
+        self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self) -> None:
+        """Stop scheduling and give up the leader lease."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_lease()
+    
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error("Scheduler tick failed", error=str(e))
+            await asyncio.sleep(self.settings.tick_seconds)
+    
+    async def tick(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Run every job that is due, if this process holds the lease.
+        
+        A due job outside its window stays due until the window opens.
+        Jobs run one at a time and the lease is checked while each runs and
+        again after it, so a leader that lost its connection cancels its
+        job and stops before the next one.
+        
+        Returns:
+            List[str]: Names of the jobs that ran
+        """
+        if not await self._hold_lease(now):
+            return []
+        
+        ran = []
+        for job in self.jobs:
+            moment = now or datetime.now(timezone.utc)
+            if job.next_run is None or job.next_run > moment:
+                continue
+            if job.window and not job.window.contains(moment):
+                continue
+            
+            await self.run_job(job, moment)
+            ran.append(job.name)
+            if not await self._hold_lease(now):
+                break
+        return ran
+    
+    async def run_job(self, job: ScheduledJob, now: datetime) -> str:
+        """Run one job, recording it in the job history; returns its status."""
+        run_id = uuid4()
+        budget = job.window.remaining(now) if job.window else None
+        await self._record(insert(ScheduledJobRun).values(
+            id=run_id,
+            job_name=job.name,
+            status="running",
+            leader=self.identity,
+            scheduled_for=job.next_run or now,
+            started_at=now,
+        ))
+        logger.info("Scheduled job started", job=job.name, time_budget=budget)
+        
+        started = time.monotonic()
+        status, result, error = "completed", None, None
+        cancelled = False
+        job_task = asyncio.ensure_future(job.run(budget))
+        watcher = asyncio.create_task(self._watch_lease(job_task))
+        try:
+            result = _summarize(await job_task)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # stop() interrupted the job; record that before passing the cancellation on
+                status, error, cancelled = "cancelled", "Scheduler stopped during the run", True
+            else:
+                status, error = "cancelled", "Scheduler lost its leader lease during the run"
+            logger.warning("Scheduled job cancelled", job=job.name, reason=error)
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error("Scheduled job failed", job=job.name, error=str(e))
+        finally:
+            watcher.cancel()
+        duration = time.monotonic() - started
+        finished_at = now + timedelta(seconds=duration)
+        
+        # Slots missed while the job ran are skipped rather than queued
+        job.next_run = job.schedule.next_after(finished_at)
+        await self._record(
+            update(ScheduledJobRun)
+            .where(ScheduledJobRun.id == run_id)
+            .values(
+                status=status,
+                finished_at=finished_at,
+                duration_seconds=duration,
+                result=result,
+                error_message=error,
+            )
+        )
+        audit_metrics.record_scheduled_job(job.name, status, duration)
+        logger.info(
+            "Scheduled job finished",
+            job=job.name,
+            status=status,
+            duration=round(duration, 3),
+            next_run=job.next_run.isoformat(),
+        )
+        if cancelled:
+            raise asyncio.CancelledError()
+        return status
+    
+    async def history(self, job_name: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent job runs, newest first."""
+        stmt = select(ScheduledJobRun).order_by(ScheduledJobRun.started_at.desc()).limit(limit)
+        if job_name:
+            stmt = stmt.where(ScheduledJobRun.job_name == job_name)
+        async with self.db_manager.get_session() as session:
+            runs = (await session.execute(stmt)).scalars().all()
+        return [
+            {
+                'job_name': run.job_name,
+                'status': run.status,
+                'leader': run.leader,
+                'scheduled_for': run.scheduled_for,
+                'started_at': run.started_at,
+                'finished_at': run.finished_at,
+                'duration_seconds': run.duration_seconds,
+                'result': run.result,
+                'error_message': run.error_message,
+            }
+            for run in runs
+        ]
+    
+    async def _record(self, stmt) -> None:
+        async with self.db_manager.get_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+    
+    async def _watch_lease(self, job_task: asyncio.Future) -> None:
+        """Cancel ``job_task`` if the lease is lost while it runs."""
+        while not job_task.done():
+            await asyncio.sleep(self.settings.tick_seconds)
+            if not job_task.done() and not await self._check_lease():
+                job_task.cancel()
+                return
+    
+    async def _check_lease(self) -> bool:
+        """Check the lease this process holds; a lost lease is released."""
+        if self._lease is None:
+            return False
+        try:
+            await self._lease.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning("Scheduler lost its leader lease", leader=self.identity, error=str(e))
+            await self._release_lease()
+            return False
+    
+    async def _hold_lease(self, now: Optional[datetime] = None) -> bool:
+        """Check the lease this process holds, or try to take it."""
+        if await self._check_lease():
+            return True
+        
+        # The lock belongs to the connection, so it is kept out of the pool
+        # and in autocommit mode rather than idle inside a transaction
+        connection = await self.db_manager.engine.connect()
+        try:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = (await connection.execute(_TRY_LOCK_SQL, {"key": self.settings.lease_key})).scalar()
+        except Exception:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        
+        self._lease = connection
+        audit_metrics.scheduler_leader.set(1)
+        logger.info("Scheduler acquired leader lease", leader=self.identity)
+        await self._resume_schedules(now or datetime.now(timezone.utc))
+        return True
+    
+    async def _release_lease(self) -> None:
+        if self._lease is None:
+            return
+        connection, self._lease = self._lease, None
+        audit_metrics.scheduler_leader.set(0)
+        try:
+            await connection.execute(_UNLOCK_SQL, {"key": self.settings.lease_key})
+        except Exception as e:
+            logger.warning("Failed to release scheduler lease", error=str(e))
+        finally:
+            try:
+                await connection.close()
+            except Exception:
+                pass
+    
+    async def _resume_schedules(self, now: datetime) -> None:
+        """Schedule each job's next run after its last recorded one."""
+        stmt = (
+            select(ScheduledJobRun.job_name, func.max(ScheduledJobRun.scheduled_for))
+            .where(ScheduledJobRun.job_name.in_([job.name for job in self.jobs]))
+            .group_by(ScheduledJobRun.job_name)
+        )
+        async with self.db_manager.get_session() as session:
+            last_runs = dict((await session.execute(stmt)).all())
+        
+        for job in self.jobs:
+            job.next_run = job.schedule.next_after(last_runs.get(job.name) or now)
+
+
+def default_jobs(settings: SchedulerSettings) -> List[ScheduledJob]:
+    """
+    Retention cleanup, one job per enabled backup configuration, and
+    backup cleanup.
+    
+    Full backups and both cleanups are limited to the off-peak window;
+    incremental backups are small and keep their own schedule.
+    """
+    from app.services.backup_service import get_backup_service
+    from app.services.retention_service import get_retention_service
+    
+    window = TimeWindow.parse(settings.off_peak_window)
+    backup_service = get_backup_service()
+    
+    async def run_retention(budget: Optional[float]) -> Dict[str, Any]:
+        limits = [limit for limit in (budget, settings.retention_time_budget_seconds) if limit]
+        return await get_retention_service().run_cleanup(time_budget=min(limits) if limits else None)
+    
+    def run_backup(config_name: str) -> Callable[[Optional[float]], Awaitable[Any]]:
+        async def run(budget: Optional[float]) -> Any:
+            return await backup_service.create_backup(config_name, time_budget=budget)
+        return run
+    
+    async def run_backup_cleanup(budget: Optional[float]) -> Dict[str, Any]:
+        return await backup_service.cleanup_old_backups()
+    
+    jobs = [ScheduledJob("retention_cleanup", CronSchedule.parse(settings.retention_schedule), run_retention, window)]
+    for config in backup_service.backup_configs:
+        jobs.append(ScheduledJob(
+            f"backup:{config.name}",
+            CronSchedule.parse(config.schedule),
+            run_backup(config.name),
+            window if config.backup_type == "full" else None,
+        ))
+    jobs.append(ScheduledJob(
+        "backup_cleanup", CronSchedule.parse(settings.backup_cleanup_schedule), run_backup_cleanup, window
+    ))
+    return jobs
+
+
+# Global job scheduler instance
+_job_scheduler: Optional[JobScheduler] = None
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get the global job scheduler instance."""
+    global _job_scheduler
+    if _job_scheduler is None:
+        settings = get_settings().scheduler
+        _job_scheduler = JobScheduler(settings, jobs=default_jobs(settings))
+    return _job_scheduler
+
+
+def set_job_scheduler(scheduler: Optional[JobScheduler]) -> None:
+    """Set the global job scheduler instance."""
+    global _job_scheduler
+    _job_scheduler = scheduler
@@ -0,0 +1,142 @@
+"""
+Single-pass summary aggregation for the audit log framework.
+
+This module computes the total count and the top-N value distribution of
+several facets of a filtered audit log set in one statement, using
+``GROUP BY GROUPING SETS`` instead of one scan per facet.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.sql import Select
+
+from app.core.exceptions import ValidationError
+from app.db.schemas import AuditLog
+from app.models.audit import AuditSummaryResponse, FacetBucket, FacetDistribution
+
+# Columns a summary may be faceted by
+SUMMARY_FACETS = {
+    "event_type": AuditLog.event_type,
+    "action": AuditLog.action,
+    "status": AuditLog.status,
+    "service_name": AuditLog.service_name,
+    "resource_type": AuditLog.resource_type,
+    "user_id": AuditLog.user_id,
+}
+
+
+def validate_facets(facets: Iterable[str]) -> List[str]:
+    """Validate and de-duplicate requested facets, preserving their order."""
+    facets = list(dict.fromkeys(facets))
+    unknown = [facet for facet in facets if facet not in SUMMARY_FACETS]
+    if unknown:
+        raise ValidationError(
+            f"Unsupported summary facets: {', '.join(unknown)}",
+            details={"supported": sorted(SUMMARY_FACETS)},
+        )
+    if not facets:
+        raise ValidationError("At least one summary facet is required")
+    return facets
+
+
+def _grouping_id(index: int, facet_count: int) -> int:
+    """
+    Value of ``GROUPING(c0, ..., cn)`` for the grouping set of column ``index``.
+    
+    GROUPING sets a bit for every argument not in the current grouping set,
+    with the first argument as the most significant bit.
+    """
+    all_bits = (1 << facet_count) - 1
+    return all_bits ^ (1 << (facet_count - 1 - index))
+
+
+def build_summary_statement(filtered: Select, facets: Sequence[str], top_n: int) -> Select:
+    """
+    Build the single-pass summary statement for a filtered audit log select.
+    
+    The statement groups by one grouping set per facet plus the empty set
+    (the grand total), ranks each facet's values by count with a window
+    function and keeps the top ``top_n`` rows of every facet.
+    
+    Args:
+        filtered: ``select(AuditLog)`` with tenant and query filters applied
+        facets: Validated facet names
+        top_n: Maximum values returned per facet
+    
+    Returns:
+        Select: Rows of ``(grouping_id, <facet columns>, event_count, distinct_count, rank)``
+    """
+    columns = [SUMMARY_FACETS[facet] for facet in facets]
+    grouping_id = func.grouping(*columns).label("grouping_id")
+    event_count = func.count().label("event_count")
+    
+    grouped = (
+        filtered.with_only_columns(grouping_id, *columns, event_count)
+        .group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+        .cte("summary_groups")
+    )
+    
+    facet_columns = [grouped.c[column.key] for column in columns]
+    ranked = select(
+        grouped.c.grouping_id,
+        *facet_columns,
+        grouped.c.event_count,
+        func.count().over(partition_by=grouped.c.grouping_id).label("distinct_count"),
+        func.row_number()
+        .over(
+            partition_by=grouped.c.grouping_id,
+            order_by=(grouped.c.event_count.desc(), *(column.asc() for column in facet_columns)),
+        )
+        .label("rank"),
+    ).subquery("summary_ranked")
+    
+    return (
+        select(ranked)
+        .where(ranked.c.rank <= top_n)
+        .order_by(ranked.c.grouping_id, ranked.c.rank)
+    )
+
+
+def fold_summary_rows(
+    rows: Iterable,
+    facets: Sequence[str],
+    date_range: Optional[Dict[str, Optional[str]]] = None,
+) -> AuditSummaryResponse:
+    """
+    Fold the rows of a summary statement into a summary response.
+    
+    Rows are expected in the statement's order, i.e. ranked within each facet.
+    """
+    facet_by_grouping_id = {
+        _grouping_id(index, len(facets)): facet for index, facet in enumerate(facets)
+    }
+    total_grouping_id = (1 << len(facets)) - 1
+    
+    total_count = 0
+    buckets: Dict[str, List[FacetBucket]] = {facet: [] for facet in facets}
+    distinct_counts: Dict[str, int] = {facet: 0 for facet in facets}
+    
+    for row in rows:
+        if row.grouping_id == total_grouping_id:
+            total_count = row.event_count
+            continue
+        facet = facet_by_grouping_id[row.grouping_id]
+        value = getattr(row, SUMMARY_FACETS[facet].key)
+        buckets[facet].append(FacetBucket(value=value, count=row.event_count))
+        distinct_counts[facet] = row.distinct_count
+    
+    distributions = {}
+    for facet in facets:
+        facet_buckets = buckets[facet]
+        distributions[facet] = FacetDistribution(
+            buckets=facet_buckets,
+            distinct_count=distinct_counts[facet],
+            other_count=total_count - sum(bucket.count for bucket in facet_buckets),
+        )
+    
+    return AuditSummaryResponse(
+        total_count=total_count,
+        facets=distributions,
+        date_range=date_range or {"start": None, "end": None},
+    )
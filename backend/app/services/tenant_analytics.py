@@ -0,0 +1,167 @@
+"""
+Incremental per-tenant analytics kept in Redis.
+
+Every batch adds to its tenant's hourly counters instead of replacing
+them, so batches flushed one after another, or by several worker
+processes at once, all end up in the totals:
+
+* ``analytics:{tenant}:hourly:{YYYYmmddHH}:counts`` is a hash of event
+  counters (``total``, ``type:<event_type>``, ``severity:<severity>``)
+  updated with HINCRBY.
+* ``...:users`` and ``...:ips`` are HyperLogLogs of the distinct user ids
+  and IP addresses seen in the hour.
+* ``recent_events:{tenant}:list`` holds the latest events, newest first,
+  capped with LPUSH and LTRIM.
+
+Events are bucketed by their own timestamp, so batches processed late
+count towards the hour the events happened in. A batch is written in
+one MULTI/EXEC round trip and costs O(batch) whatever the size of the
+data already stored. Like the cache, analytics are best effort: Redis
+failures are logged and do not fail event processing.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.services.cache_service import CacheService, deserialize, serialize
+
+logger = structlog.get_logger(__name__)
+
+# Hourly keys live this long after the last event counted in them
+HOURLY_TTL_SECONDS = 3600
+RECENT_EVENTS_LIMIT = 1000
+RECENT_EVENTS_TTL_SECONDS = 1800
+
+
+def hourly_key(tenant_id: str, hour: str) -> str:
+    """Key of a tenant's counters hash for an hour formatted as ``YYYYmmddHH``."""
+    return f"analytics:{tenant_id}:hourly:{hour}:counts"
+
+
+def recent_events_key(tenant_id: str) -> str:
+    return f"recent_events:{tenant_id}:list"
+
+
+def event_hour(timestamp: Any, fallback: Optional[datetime] = None) -> str:
+    """UTC hour bucket (``YYYYmmddHH``) of an event timestamp."""
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            timestamp = None
+    if not isinstance(timestamp, datetime):
+        timestamp = fallback or datetime.now(timezone.utc)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).strftime("%Y%m%d%H")
+
+
+class TenantAnalytics:
+    """Mergeable hourly counters and recent-event lists per tenant."""
+    
+    def __init__(self, cache_service: CacheService):
+        self.cache_service = cache_service
+    
+    async def record(self, tenant_id: str, events: Sequence[Dict[str, Any]]) -> None:
+        """
+        Add a batch of worker events to the tenant's analytics.
+        
+        Args:
+            tenant_id: Tenant the events belong to
+            events: Buffered worker items with the event under ``data``
+        """
+        if not events:
+            return
+        
+        counters: Dict[str, Counter] = defaultdict(Counter)
+        users: Dict[str, Set[str]] = defaultdict(set)
+        ips: Dict[str, Set[str]] = defaultdict(set)
+        recent: List[bytes] = []
+        
+        for event in events:
+            data = event["data"]
+            hour = event_hour(data.get("timestamp"), event.get("received_at"))
+            counts = counters[hour]
+            counts["total"] += 1
+            counts[f"type:{data.get('event_type', 'unknown')}"] += 1
+            counts[f"severity:{data.get('severity', 'info')}"] += 1
+            if data.get("user_id"):
+                users[hour].add(str(data["user_id"]))
+            if data.get("ip_address"):
+                ips[hour].add(str(data["ip_address"]))
+            recent.append(serialize({
+                "id": data.get("id"),
+                "event_type": data.get("event_type"),
+                "timestamp": data.get("timestamp"),
+                "resource_type": data.get("resource_type"),
+                "action": data.get("action"),
+            }))
+        
+        updated_at = datetime.now(timezone.utc).isoformat()
+        try:
+            async with self.cache_service.client.pipeline(transaction=True) as pipe:
+                for hour, counts in counters.items():
+                    key = hourly_key(tenant_id, hour)
+                    for field, amount in counts.items():
+                        pipe.hincrby(key, field, amount)
+                    pipe.hset(key, "updated_at", updated_at)
+                    pipe.expire(key, HOURLY_TTL_SECONDS)
+                    for suffix, members in (("users", users.get(hour)), ("ips", ips.get(hour))):
+                        if members:
+                            pipe.pfadd(f"{key}:{suffix}", *members)
+                            pipe.expire(f"{key}:{suffix}", HOURLY_TTL_SECONDS)
+                
+                key = recent_events_key(tenant_id)
+                pipe.lpush(key, *recent)
+                pipe.ltrim(key, 0, RECENT_EVENTS_LIMIT - 1)
+                pipe.expire(key, RECENT_EVENTS_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to update tenant analytics", tenant_id=tenant_id, error=str(e))
+    
+    async def hourly(self, tenant_id: str, hour: datetime) -> Dict[str, Any]:
+        """Get a tenant's counters and distinct user and IP estimates for an hour."""
+        key = hourly_key(tenant_id, event_hour(hour))
+        try:
+            async with self.cache_service.client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(key)
+                pipe.pfcount(f"{key}:users")
+                pipe.pfcount(f"{key}:ips")
+                fields, unique_users, unique_ips = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to read tenant analytics", tenant_id=tenant_id, error=str(e))
+            fields, unique_users, unique_ips = {}, 0, 0
+        
+        result = {
+            "event_counts": {},
+            "severity_counts": {},
+            "total_events": 0,
+            "unique_users": unique_users,
+            "unique_ips": unique_ips,
+            "updated_at": None,
+        }
+        for field, value in fields.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            value = value.decode() if isinstance(value, bytes) else value
+            if field == "updated_at":
+                result["updated_at"] = value
+            elif field == "total":
+                result["total_events"] = int(value)
+            elif field.startswith("type:"):
+                result["event_counts"][field[len("type:"):]] = int(value)
+            elif field.startswith("severity:"):
+                result["severity_counts"][field[len("severity:"):]] = int(value)
+        return result
+    
+    async def recent_events(self, tenant_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get a tenant's most recent events, newest first."""
+        try:
+            values = await self.cache_service.client.lrange(recent_events_key(tenant_id), 0, limit - 1)
+        except RedisError as e:
+            logger.warning("Failed to read recent events", tenant_id=tenant_id, error=str(e))
+            return []
+        return [deserialize(value) for value in values]
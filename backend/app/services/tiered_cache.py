@@ -0,0 +1,296 @@
+"""
+Two-tier cache for the audit log framework.
+
+This module layers a size-bounded in-process LRU (L1) with a short TTL in
+front of the Redis-backed CacheService (L2). Concurrent misses for the same
+key are coalesced so that only one caller loads from the database, and
+invalidations are broadcast to every API pod over NATS.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Type
+from uuid import uuid4
+
+import structlog
+from pydantic import BaseModel
+
+from app.config import RedisSettings, get_settings
+from app.services.cache_service import CacheService, get_cache_service
+from app.services.event_codec import decode_envelope
+from app.utils.metrics import audit_metrics
+
+logger = structlog.get_logger(__name__)
+
+CACHE_INVALIDATE_SUBJECT = "audit.system.cache_invalidate"
+
+_MISSING = object()
+
+
+class LocalCache:
+    """Size-bounded in-process LRU cache with per-entry TTL and namespaces."""
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._namespaces: Dict[str, Set[str]] = defaultdict(set)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Any:
+        """Get a live entry, or ``_MISSING``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            return _MISSING
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, namespace: str, ttl: Optional[float] = None) -> None:
+        """Store an entry, evicting the least recently used ones if full."""
+        if key in self._entries:
+            self._remove(key)
+        
+        expires_at = self._clock() + (ttl if ttl is not None else self.ttl_seconds)
+        self._entries[key] = (expires_at, namespace, value)
+        self._namespaces[namespace].add(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+    
+    def invalidate_namespace(self, namespace: str) -> int:
+        """Drop every entry stored under a namespace."""
+        keys = self._namespaces.pop(namespace, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        return len(keys)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._namespaces.clear()
+    
+    def _remove(self, key: str) -> None:
+        _, namespace, _ = self._entries.pop(key)
+        keys = self._namespaces.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[namespace]
+
+
+class _LoadAbandoned(Exception):
+    """Raised to followers whose single-flight leader was cancelled."""
+
+
+class TieredCache:
+    """
+    In-process LRU in front of Redis with single-flight loading.
+    
+    Entries belong to a namespace (typically one per tenant). Redis keys
+    embed the namespace generation kept by CacheService, so invalidating a
+    namespace bumps the generation, drops local entries immediately and
+    broadcasts a ``cache_invalidate`` system event so other pods drop theirs.
+    Broadcasts are debounced per namespace; remote staleness is bounded by
+    the L1 TTL even if a message is lost.
+    """
+    
+    def __init__(
+        self,
+        cache_service: CacheService,
+        settings: RedisSettings,
+        nats_service=None,
+    ):
+        self.cache_service = cache_service
+        self.settings = settings
+        self.nats_service = nats_service
+        self.local = LocalCache(
+            settings.local_cache_max_entries,
+            settings.local_cache_ttl_seconds,
+        )
+        self.instance_id = uuid4().hex
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._epochs: Dict[str, int] = defaultdict(int)
+        self._pending_broadcasts: Dict[str, asyncio.Task] = {}
+    
+    async def start(self) -> None:
+        """Listen for invalidations broadcast by other pods."""
+        if self.nats_service is None:
+            return
+        # No queue group: every pod must see every invalidation
+        await self.nats_service.subscribe(
+            subject=CACHE_INVALIDATE_SUBJECT,
+            callback=self._handle_invalidation_message,
+        )
+        logger.info("Tiered cache listening for invalidations", instance_id=self.instance_id)
+    
+    async def stop(self) -> None:
+        """Flush pending broadcasts and drop local entries."""
+        pending = list(self._pending_broadcasts.values())
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._pending_broadcasts.clear()
+        self.local.clear()
+    
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        model: Optional[Type[BaseModel]] = None,
+    ) -> Any:
+        """
+        Get a value from L1, then Redis, then ``loader``.
+        
+        Args:
+            namespace: Invalidation namespace the entry belongs to
+            key: Cache key, unique within the namespace
+            loader: Coroutine function computing the value on a miss
+            ttl: Redis TTL in seconds
+            model: Pydantic model the value is stored as; Redis holds its
+                dict form and L1 holds the model instance
+        """
+        while True:
+            value = self.local.get(key)
+            if value is not _MISSING:
+                audit_metrics.cache_hits.labels(cache_type="local").inc()
+                return value
+            
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            audit_metrics.cache_coalesced_requests.inc()
+            try:
+                return await asyncio.shield(inflight)
+            except _LoadAbandoned:
+                # The leader's request went away, not ours: load again
+                continue
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        epoch = self._epochs[namespace]
+        
+        try:
+            value = await self._load(namespace, key, loader, ttl, model)
+        except BaseException as e:
+            # A cancelled leader must not cancel the followers' requests
+            future.set_exception(e if isinstance(e, Exception) else _LoadAbandoned())
+            # Mark as retrieved so lone leaders don't log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        
+        # Don't cache a value loaded across an invalidation
+        if self._epochs[namespace] == epoch:
+            self.local.set(key, value, namespace)
+        future.set_result(value)
+        return value
+    
+    async def invalidate(self, namespace: str, broadcast: bool = True) -> None:
+        """Invalidate a namespace in Redis, locally and on other pods."""
+        await self.cache_service.bump_generation(namespace)
+        self.invalidate_local(namespace)
+        
+        if broadcast and self.nats_service is not None:
+            if namespace not in self._pending_broadcasts:
+                self._pending_broadcasts[namespace] = asyncio.create_task(
+                    self._broadcast(namespace)
+                )
+    
+    def invalidate_local(self, namespace: str) -> None:
+        """Drop a namespace from the in-process cache only."""
+        self._epochs[namespace] += 1
+        dropped = self.local.invalidate_namespace(namespace)
+        logger.debug("Local cache namespace invalidated", namespace=namespace, dropped=dropped)
+    
+    async def _load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        model: Optional[Type[BaseModel]],
+    ) -> Any:
+        generation = await self.cache_service.get_generation(namespace)
+        redis_key = f"{key}:g{generation}"
+        
+        cached = await self.cache_service.get(redis_key)
+        if cached is not None:
+            audit_metrics.cache_hits.labels(cache_type="redis").inc()
+            return model.parse_obj(cached) if model else cached
+        
+        audit_metrics.cache_misses.labels(cache_type="redis").inc()
+        value = await loader()
+        await self.cache_service.set(
+            redis_key,
+            value.dict() if model else value,
+            ttl=ttl,
+        )
+        return value
+    
+    async def _broadcast(self, namespace: str) -> None:
+        """Publish a debounced invalidation for a namespace."""
+        try:
+            await asyncio.sleep(self.settings.invalidation_coalesce_ms / 1000.0)
+            self._pending_broadcasts.pop(namespace, None)
+            await self.nats_service.publish(
+                subject=CACHE_INVALIDATE_SUBJECT,
+                data={
+                    "type": "cache_invalidate",
+                    "namespaces": [namespace],
+                    "origin": self.instance_id,
+                },
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Failed to broadcast cache invalidation", namespace=namespace, error=str(e))
+    
+    async def _handle_invalidation_message(self, msg) -> None:
+        """Apply an invalidation broadcast by another pod."""
+        try:
+            data = decode_envelope(msg.data)
+            if data.get("origin") == self.instance_id:
+                return
+            for namespace in data.get("namespaces", []):
+                self.invalidate_local(namespace)
+        except Exception as e:
+            logger.warning("Failed to apply cache invalidation", error=str(e))
+
+
+# Global tiered cache instance
+_tiered_cache: Optional[TieredCache] = None
+
+
+def get_tiered_cache() -> TieredCache:
+    """
+    Get the global tiered cache instance.
+    
+    The API lifespan installs an instance wired to NATS; elsewhere a
+    local-only instance is created on first use.
+    """
+    global _tiered_cache
+    if _tiered_cache is None:
+        _tiered_cache = TieredCache(get_cache_service(), get_settings().redis)
+    return _tiered_cache
+
+
+def set_tiered_cache(cache: Optional[TieredCache]) -> None:
+    """Set the global tiered cache instance."""
+    global _tiered_cache
+    _tiered_cache = cache
@@ -0,0 +1,142 @@
+"""
+Cache key utilities for the audit log framework.
+
+This module builds deterministic cache keys from audit queries. Queries are
+reduced to a canonical form (unset filters dropped, commutative filter lists
+sorted, datetimes normalized to UTC) and hashed with SHA-256, so identical
+queries map to the same key in every process and replica.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+from app.models.audit import AuditEventQuery
+
+# Bump whenever the shape of cached payloads changes so that replicas
+# running different versions never read each other's entries.
+CACHE_SCHEMA_VERSION = 1
+
+CACHE_KEY_PREFIX = "audit"
+
+# Fields that only select a page of a result, not the result itself
+PAGINATION_FIELDS = frozenset({"page", "page_size"})
+
+# Fields that only change the order of a result
+SORT_FIELDS = frozenset({"sort_by", "sort_order"})
+
+_ORDER_INSENSITIVE_OPERATORS = ("in", "not_in")
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize a scalar or container into a JSON-stable form."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _sorted(items: Iterable[Any]) -> list:
+    return sorted(items, key=_dumps)
+
+
+def _canonical_filter(filter_item: Dict[str, Any]) -> Dict[str, Any]:
+    canonical = _normalize(filter_item)
+    if canonical.get("operator") in _ORDER_INSENSITIVE_OPERATORS and isinstance(canonical.get("value"), list):
+        canonical["value"] = _sorted(canonical["value"])
+    return canonical
+
+
+def canonical_query(
+    query: AuditEventQuery,
+    exclude: Iterable[str] = PAGINATION_FIELDS,
+) -> Dict[str, Any]:
+    """
+    Reduce a query to a canonical dict.
+    
+    Dynamic filters and filter groups are ANDed together (and each group
+    is a single AND/OR), so their order does not change the result and they
+    are sorted; so are the values of ``in``/``not_in`` filters.
+    """
+    data = query.dict(exclude=set(exclude))
+    canonical: Dict[str, Any] = {}
+    
+    for field, value in data.items():
+        if value is None or value == []:
+            continue
+        if field == "dynamic_filters":
+            value = _sorted(_canonical_filter(item) for item in value)
+        elif field == "filter_groups":
+            value = _sorted(
+                {
+                    "operator": group["operator"],
+                    "filters": _sorted(_canonical_filter(item) for item in group["filters"]),
+                }
+                for group in value
+            )
+        else:
+            value = _normalize(value)
+        canonical[field] = value
+    
+    return canonical
+
+
+def fingerprint(value: Any) -> str:
+    """Stable SHA-256 hex digest of a JSON-serializable value."""
+    return hashlib.sha256(_dumps(_normalize(value))).hexdigest()
+
+
+def query_fingerprint(
+    query: AuditEventQuery,
+    exclude: Iterable[str] = PAGINATION_FIELDS,
+) -> str:
+    """Stable digest identifying the result set of a query."""
+    return fingerprint(canonical_query(query, exclude))
+
+
+def build_cache_key(
+    kind: str,
+    tenant_id: str,
+    query: Optional[AuditEventQuery] = None,
+    exclude: Iterable[str] = PAGINATION_FIELDS,
+    **params: Any,
+) -> str:
+    """
+    Build a versioned cache key for a tenant-scoped query result.
+    
+    Args:
+        kind: Result kind, e.g. ``query``, ``count`` or ``summary``
+        tenant_id: Tenant the result belongs to
+        query: Query whose canonical form identifies the result
+        exclude: Query fields that do not affect this kind of result
+        **params: Extra parameters that do (page, cursor, format, ...)
+    
+    Returns:
+        str: Key of the form ``audit:v<version>:<kind>:<tenant>:<digest>``
+    """
+    payload = {
+        "tenant_id": tenant_id,
+        "query": canonical_query(query, exclude) if query is not None else None,
+        "params": {key: value for key, value in params.items() if value is not None},
+    }
+    return ":".join([
+        CACHE_KEY_PREFIX,
+        f"v{CACHE_SCHEMA_VERSION}",
+        kind,
+        tenant_id,
+        fingerprint(payload),
+    ])
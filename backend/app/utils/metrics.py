@@ -51,6 +51,109 @@ class AuditMetrics:
             buckets=[1, 10, 50, 100, 500, 1000, 5000]
         )
         
+        # Write-behind ingestion buffer metrics
+        self.ingestion_flush_size = Histogram(
+            'audit_ingestion_flush_size',
+            'Number of rows written per group commit',
+            buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000]
+        )
+        
+        self.ingestion_ack_latency = Histogram(
+            'audit_ingestion_ack_latency_seconds',
+            'Time from enqueue to durable acknowledgement',
+            buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+        )
+        
+        self.ingestion_queue_depth = Gauge(
+            'audit_ingestion_queue_depth',
+            'Number of rows waiting in the ingestion buffer'
+        )
+        
+        self.ingestion_rejected = Counter(
+            'audit_ingestion_rejected_total',
+            'Total number of writes rejected because the ingestion buffer was full'
+        )
+        
+        # Retention metrics
+        self.retention_rows_deleted = Counter(
+            'audit_retention_rows_deleted_total',
+            'Total number of audit logs deleted by retention',
+            ['policy']
+        )
+        
+        self.retention_chunk_duration = Histogram(
+            'audit_retention_chunk_duration_seconds',
+            'Duration of a single retention delete chunk in seconds',
+            buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+        )
+        
+        self.retention_cleanup_runs = Counter(
+            'audit_retention_cleanup_runs_total',
+            'Total number of retention cleanup runs',
+            ['status']
+        )
+        
+        self.retention_cleanup_duration = Histogram(
+            'audit_retention_cleanup_duration_seconds',
+            'Duration of retention cleanup runs in seconds',
+            buckets=[1.0, 10.0, 60.0, 300.0, 900.0, 3600.0]
+        )
+        
+        self.retention_rows_archived = Counter(
+            'audit_retention_rows_archived_total',
+            'Total number of audit logs archived by retention'
+        )
+        
+        self.retention_delete_rate = Gauge(
+            'audit_retention_delete_rows_per_second',
+            'Delete throughput of the last retention cleanup run'
+        )
+        
+        # Backup metrics
+        self.backups_created = Counter(
+            'audit_backups_created_total',
+            'Total number of backups created',
+            ['config_name', 'backup_type']
+        )
+        
+        self.backup_duration = Histogram(
+            'audit_backup_duration_seconds',
+            'Duration of backups in seconds',
+            ['backup_type'],
+            buckets=[1.0, 10.0, 60.0, 300.0, 900.0, 3600.0]
+        )
+        
+        self.backup_rows = Counter(
+            'audit_backup_rows_total',
+            'Total number of audit logs written to backups',
+            ['backup_type']
+        )
+        
+        self.backup_bytes = Counter(
+            'audit_backup_bytes_total',
+            'Total number of backup bytes written',
+            ['backup_type']
+        )
+        
+        # Scheduler metrics
+        self.scheduled_job_runs = Counter(
+            'audit_scheduled_job_runs_total',
+            'Total number of scheduled job runs',
+            ['job', 'status']
+        )
+        
+        self.scheduled_job_duration = Histogram(
+            'audit_scheduled_job_duration_seconds',
+            'Duration of scheduled job runs in seconds',
+            ['job'],
+            buckets=[1.0, 10.0, 60.0, 300.0, 900.0, 3600.0, 14400.0]
+        )
+        
+        self.scheduler_leader = Gauge(
+            'audit_scheduler_leader',
+            'Whether this process holds the scheduler leader lease'
+        )
+        
         # Query metrics
         self.queries_executed = Counter(
             'audit_queries_executed_total',
@@ -84,6 +187,11 @@ class AuditMetrics:
             ['cache_type']
         )
         
+        self.cache_coalesced_requests = Counter(
+            'audit_cache_coalesced_requests_total',
+            'Total number of cache misses served by an in-flight load'
+        )
+        
         # Export metrics
         self.exports_generated = Counter(
             'audit_exports_generated_total',
@@ -159,6 +267,38 @@ class AuditMetrics:
             'audit_active_users',
             'Number of active users'
         )
+    
+    def record_retention_chunk(self, policy: str, deleted: int, duration: float) -> None:
+        """Record one committed retention delete chunk."""
+        self.retention_rows_deleted.labels(policy=policy).inc(deleted)
+        self.retention_chunk_duration.observe(duration)
+    
+    def record_cleanup_run(self, deleted: int, archived: int, duration: float, errors: int) -> None:
+        """Record the outcome and throughput of a retention cleanup run."""
+        self.retention_cleanup_runs.labels(status='error' if errors else 'success').inc()
+        self.retention_cleanup_duration.observe(duration)
+        self.retention_rows_archived.inc(archived)
+        if duration > 0:
+            self.retention_delete_rate.set(deleted / duration)
+    
+    def record_scheduled_job(self, job: str, status: str, duration: float) -> None:
+        """Record a finished scheduled job run."""
+        self.scheduled_job_runs.labels(job=job, status=status).inc()
+        self.scheduled_job_duration.labels(job=job).observe(duration)
+    
+    def record_backup_created(
+        self,
+        config_name: str,
+        backup_type: str,
+        file_size: int,
+        record_count: int,
+        duration: float,
+    ) -> None:
+        """Record a completed backup."""
+        self.backups_created.labels(config_name=config_name, backup_type=backup_type).inc()
+        self.backup_duration.labels(backup_type=backup_type).observe(duration)
+        self.backup_rows.labels(backup_type=backup_type).inc(record_count or 0)
+        self.backup_bytes.labels(backup_type=backup_type).inc(file_size or 0)
 
 
 # Global metrics instance
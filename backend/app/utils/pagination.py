@@ -0,0 +1,57 @@
+"""
+Pagination utilities for the audit log framework.
+
+This module provides opaque keyset cursors for paginating audit logs by
+``(timestamp, audit_id)`` without OFFSET scans.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from app.core.exceptions import ValidationError
+
+
+def encode_cursor(timestamp: datetime, audit_id: UUID, sort_order: str = "desc") -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+
+    Args:
+        timestamp: Timestamp of the last row on the current page
+        audit_id: Audit ID of the last row on the current page
+        sort_order: Sort direction the cursor was produced for
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = {"t": timestamp.isoformat(), "id": str(audit_id), "o": sort_order}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_order: str = "desc") -> Tuple[datetime, UUID]:
+    """
+    Decode an opaque cursor back into its ``(timestamp, audit_id)`` key.
+
+    Raises:
+        ValidationError: If the cursor is malformed or was produced for a
+            different sort direction.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        timestamp = datetime.fromisoformat(payload["t"])
+        audit_id = UUID(payload["id"])
+        cursor_order = payload.get("o", "desc")
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValidationError("Invalid pagination cursor", details={"error": str(e)})
+
+    if cursor_order != sort_order:
+        raise ValidationError(
+            "Pagination cursor does not match the requested sort order",
+            details={"cursor_sort_order": cursor_order, "sort_order": sort_order},
+        )
+
+    return timestamp, audit_id
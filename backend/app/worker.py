@@ -3,12 +3,15 @@ Background worker for the audit log framework.
 
 This module provides NATS-based background processing for audit log events,
 including batch processing, real-time event handling, and data pipeline operations.
+Run with ``--processes N`` to spread the work over N supervised processes.
 """
 
+import argparse
 import asyncio
-import json
+import os
 import signal
 import sys
+import time
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 from uuid import uuid4
@@ -22,7 +25,10 @@ from app.db.database import DatabaseManager, set_database_manager
 from app.db.schemas import AuditLog
 from app.models.audit import EventType, Severity
 from app.services.cache_service import CacheService
+from app.services.event_batcher import TenantBatcher, max_ack_pending
+from app.services.event_codec import decode_envelope
 from app.services.nats_service import NATSService
+from app.services.tenant_analytics import TenantAnalytics
 from app.utils.metrics import audit_metrics, track_execution_time
 from app.utils.logging import setup_logging
 
@@ -33,15 +39,16 @@ settings = get_settings()
 class AuditWorker:
     """Background worker for processing audit log events."""
     
-    def __init__(self):
+    def __init__(self, heartbeat: Optional[Any] = None):
         self.nats_service = None
         self.db_manager = None
         self.cache_service = None
+        self.analytics = None
         self.running = False
-        self.batch_buffer: List[Dict[str, Any]] = []
-        self.batch_size = settings.worker.batch_size
-        self.batch_timeout = settings.worker.batch_timeout_seconds
-        self.last_batch_time = datetime.now(timezone.utc)
+        self.stopped = False
+        # Shared with the supervisor when running in a worker pool
+        self.heartbeat = heartbeat
+        self.batcher = TenantBatcher(settings.worker, self._process_tenant_events)
     
     async def start(self):
         """Start the background worker."""
@@ -52,6 +59,7 @@ class AuditWorker:
             self.db_manager = DatabaseManager(settings.database)
             self.cache_service = CacheService(settings.redis)
             self.nats_service = NATSService(settings.nats)
+            self.analytics = TenantAnalytics(self.cache_service)
             
             await self.db_manager.initialize()
             await self.cache_service.initialize()
@@ -72,14 +80,18 @@ class AuditWorker:
             raise
     
     async def stop(self):
-        """Stop the background worker."""
+        """Stop fetching, drain buffered events and close the services."""
+        if self.stopped:
+            return
+        self.stopped = True
         logger.info("Stopping audit log worker")
         
         self.running = False
         
-        # Process remaining batch items
-        if self.batch_buffer:
-            await self._process_batch()
+        # Stop fetching, then process and ack what is still buffered
+        if self.nats_service:
+            await self.nats_service.stop_consumers()
+        await self.batcher.close()
         
         # Close services
         if self.nats_service:
@@ -92,13 +104,20 @@ class AuditWorker:
         logger.info("Audit log worker stopped")
     
     def _setup_signal_handlers(self):
-        """Set up signal handlers for graceful shutdown."""
-        def signal_handler(signum, frame):
+        """
+        Set up signal handlers for graceful shutdown.
+        
+        A signal ends the processing loop; the caller then runs stop(),
+        which drains the worker.
+        """
+        loop = asyncio.get_running_loop()
+        
+        def signal_handler(signum):
             logger.info("Received shutdown signal", signal=signum)
-            asyncio.create_task(self.stop())
+            self.running = False
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, signal_handler, signum)
     
     async def _start_processing(self):
         """Start processing NATS messages."""
@@ -106,11 +125,13 @@ class AuditWorker:
             # Subscribe to audit event streams
             await self._subscribe_to_events()
             
-            # Start batch processing timer
-            asyncio.create_task(self._batch_timer())
+            # Flush partial tenant batches periodically
+            await self.batcher.start()
             
-            # Keep worker running
+            # Keep worker running, telling the supervisor the loop is alive
             while self.running:
+                if self.heartbeat is not None:
+                    self.heartbeat.value = time.monotonic()
                 await asyncio.sleep(1)
                 
         except Exception as e:
@@ -120,11 +141,15 @@ class AuditWorker:
     async def _subscribe_to_events(self):
         """Subscribe to NATS subjects for audit events."""
         try:
+            # Messages stay unacked while their tenant batch fills up
+            ack_limit = max_ack_pending(settings.worker, settings.nats.fetch_batch_size)
+            
             # Subscribe to individual audit events
             await self.nats_service.subscribe(
                 subject="audit.events.*",
                 callback=self._handle_audit_event,
                 queue="audit-workers",
+                max_ack_pending=ack_limit,
             )
             
             # Subscribe to batch audit events
@@ -132,6 +157,7 @@ class AuditWorker:
                 subject="audit.batch.*",
                 callback=self._handle_audit_batch,
                 queue="audit-batch-workers",
+                max_ack_pending=ack_limit,
             )
             
             # Subscribe to system events
@@ -152,7 +178,7 @@ class AuditWorker:
         """Handle individual audit event messages."""
         try:
             # Parse message data
-            data = json.loads(msg.data.decode())
+            data = decode_envelope(msg.data)
             
             logger.debug(
                 "Processing audit event",
@@ -161,19 +187,13 @@ class AuditWorker:
                 tenant_id=data.get("tenant_id"),
             )
             
-            # Add to batch buffer for efficient processing
-            self.batch_buffer.append({
+            # Buffer for the tenant's next batch; the message is acked
+            # once that batch has been processed
+            await self.batcher.add(msg, [(data.get("tenant_id", "unknown"), {
                 "type": "event",
                 "data": data,
                 "received_at": datetime.now(timezone.utc),
-            })
-            
-            # Process batch if buffer is full
-            if len(self.batch_buffer) >= self.batch_size:
-                await self._process_batch()
-            
-            # Acknowledge message
-            await msg.ack()
+            })])
             
             audit_metrics.nats_messages_published.labels(
                 subject=msg.subject
@@ -193,7 +213,7 @@ class AuditWorker:
         """Handle batch audit event messages."""
         try:
             # Parse batch data
-            batch_data = json.loads(msg.data.decode())
+            batch_data = decode_envelope(msg.data)
             
             logger.info(
                 "Processing audit batch",
@@ -202,22 +222,18 @@ class AuditWorker:
                 tenant_id=batch_data.get("tenant_id"),
             )
             
-            # Process batch events
-            events = batch_data.get("events", [])
-            for event in events:
-                self.batch_buffer.append({
+            # Buffer the batch's events; the message is acked once all of
+            # them have been processed
+            received_at = datetime.now(timezone.utc)
+            await self.batcher.add(msg, [
+                (event.get("tenant_id") or batch_data.get("tenant_id", "unknown"), {
                     "type": "batch_event",
                     "data": event,
                     "batch_id": batch_data.get("batch_id"),
-                    "received_at": datetime.now(timezone.utc),
+                    "received_at": received_at,
                 })
-            
-            # Process if buffer is getting full
-            if len(self.batch_buffer) >= self.batch_size:
-                await self._process_batch()
-            
-            # Acknowledge message
-            await msg.ack()
+                for event in batch_data.get("events", [])
+            ])
             
             audit_metrics.batch_operations.labels(
                 tenant_id=batch_data.get("tenant_id", "unknown")
@@ -233,9 +249,13 @@ class AuditWorker:
             await msg.nak()
     
     async def _handle_system_event(self, msg):
-        """Handle system-level events."""
+        """
+        Handle system-level events.
+        
+        System subjects are plain core NATS, so there is nothing to ack.
+        """
         try:
-            data = json.loads(msg.data.decode())
+            data = decode_envelope(msg.data)
             event_type = data.get("type")
             
             logger.info("Processing system event", event_type=event_type)
@@ -247,128 +267,31 @@ class AuditWorker:
             elif event_type == "health_check":
                 await self._handle_health_check(data)
             
-            await msg.ack()
-            
         except Exception as e:
             logger.error("Failed to handle system event", error=str(e))
-            await msg.nak()
-    
-    async def _process_batch(self):
-        """Process the current batch of events."""
-        if not self.batch_buffer:
-            return
-        
-        try:
-            batch_size = len(self.batch_buffer)
-            logger.info("Processing event batch", size=batch_size)
-            
-            # Group events by tenant for efficient processing
-            tenant_groups = {}
-            for item in self.batch_buffer:
-                tenant_id = item["data"].get("tenant_id", "unknown")
-                if tenant_id not in tenant_groups:
-                    tenant_groups[tenant_id] = []
-                tenant_groups[tenant_id].append(item)
-            
-            # Process each tenant group
-            for tenant_id, events in tenant_groups.items():
-                await self._process_tenant_events(tenant_id, events)
-            
-            # Update metrics
-            audit_metrics.batch_size.observe(batch_size)
-            
-            # Clear buffer
-            self.batch_buffer.clear()
-            self.last_batch_time = datetime.now(timezone.utc)
-            
-            logger.info("Batch processing completed", size=batch_size)
-            
-        except Exception as e:
-            logger.error("Failed to process batch", error=str(e))
-            # Don't clear buffer on error - will retry
     
     async def _process_tenant_events(self, tenant_id: str, events: List[Dict[str, Any]]):
-        """Process events for a specific tenant."""
-        try:
-            # Aggregate events for analytics
-            await self._update_tenant_analytics(tenant_id, events)
-            
-            # Update cache with recent events
-            await self._update_event_cache(tenant_id, events)
-            
-            # Trigger alerts if needed
-            await self._check_alert_conditions(tenant_id, events)
-            
-            logger.debug(
-                "Processed tenant events",
-                tenant_id=tenant_id,
-                count=len(events),
-            )
-            
-        except Exception as e:
-            logger.error(
-                "Failed to process tenant events",
-                tenant_id=tenant_id,
-                error=str(e),
-            )
+        """
+        Process one batch of a tenant's events.
+        
+        Errors propagate so the batcher nak's the batch's messages for
+        redelivery.
+        """
+        # Aggregate events for analytics and recent event lists
+        await self._update_tenant_analytics(tenant_id, events)
+        
+        # Trigger alerts if needed
+        await self._check_alert_conditions(tenant_id, events)
+        
+        logger.debug(
+            "Processed tenant events",
+            tenant_id=tenant_id,
+            count=len(events),
+        )
     
     async def _update_tenant_analytics(self, tenant_id: str, events: List[Dict[str, Any]]):
-        """Update analytics data for tenant events."""
-        try:
-            # Count events by type
-            event_counts = {}
-            severity_counts = {}
-            
-            for event in events:
-                data = event["data"]
-                event_type = data.get("event_type", "unknown")
-                severity = data.get("severity", "info")
-                
-                event_counts[event_type] = event_counts.get(event_type, 0) + 1
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            
-            # Store analytics in cache
-            analytics_key = f"analytics:{tenant_id}:hourly:{datetime.now().strftime('%Y%m%d%H')}"
-            analytics_data = {
-                "event_counts": event_counts,
-                "severity_counts": severity_counts,
-                "total_events": len(events),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            }
-            
-            await self.cache_service.set(analytics_key, analytics_data, ttl=3600)
-            
-        except Exception as e:
-            logger.warning("Failed to update tenant analytics", error=str(e))
-    
-    async def _update_event_cache(self, tenant_id: str, events: List[Dict[str, Any]]):
-        """Update cache with recent events for fast retrieval."""
-        try:
-            # Store recent events in cache
-            recent_events_key = f"recent_events:{tenant_id}"
-            
-            # Get existing recent events
-            existing_events = await self.cache_service.get(recent_events_key) or []
-            
-            # Add new events
-            for event in events:
-                existing_events.append({
-                    "id": event["data"].get("id"),
-                    "event_type": event["data"].get("event_type"),
-                    "timestamp": event["data"].get("timestamp"),
-                    "resource_type": event["data"].get("resource_type"),
-                    "action": event["data"].get("action"),
-                })
-            
-            # Keep only last 1000 events
-            if len(existing_events) > 1000:
-                existing_events = existing_events[-1000:]
-            
-            # Update cache
-            await self.cache_service.set(recent_events_key, existing_events, ttl=1800)
-            
-        except Exception as e:
-            logger.warning("Failed to update event cache", error=str(e))
+        """Add the batch to the tenant's hourly counters and recent events."""
+        await self.analytics.record(tenant_id, events)
     
     async def _check_alert_conditions(self, tenant_id: str, events: List[Dict[str, Any]]):
         """Check if any events trigger alert conditions."""
@@ -424,24 +347,6 @@ class AuditWorker:
         except Exception as e:
             logger.error("Failed to trigger alert", error=str(e))
     
-    async def _batch_timer(self):
-        """Timer to process batches periodically."""
-        while self.running:
-            try:
-                await asyncio.sleep(self.batch_timeout)
-                
-                # Check if batch timeout has been reached
-                time_since_last_batch = (
-                    datetime.now(timezone.utc) - self.last_batch_time
-                ).total_seconds()
-                
-                if time_since_last_batch >= self.batch_timeout and self.batch_buffer:
-                    logger.debug("Processing batch due to timeout")
-                    await self._process_batch()
-                
-            except Exception as e:
-                logger.error("Error in batch timer", error=str(e))
-    
     async def _handle_cache_invalidation(self, data: Dict[str, Any]):
         """Handle cache invalidation requests."""
         try:
@@ -478,8 +383,8 @@ class AuditWorker:
             # Perform basic health checks
             health_status = {
                 "worker_status": "healthy" if self.running else "unhealthy",
-                "batch_buffer_size": len(self.batch_buffer),
-                "last_batch_time": self.last_batch_time.isoformat(),
+                "buffered_events": self.batcher.buffered,
+                "seconds_since_flush": round(time.monotonic() - self.batcher.last_flush, 3),
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
             
@@ -495,15 +400,17 @@ class AuditWorker:
             logger.error("Failed to handle health check", error=str(e))
 
 
-async def main():
+async def main(heartbeat: Optional[Any] = None, process_index: Optional[int] = None):
     """Main entry point for the worker."""
     # Setup logging
     setup_logging(settings.logging)
+    if process_index is not None:
+        structlog.contextvars.bind_contextvars(worker_process=process_index)
     
     logger.info("Starting audit log background worker")
     
     # Create and start worker
-    worker = AuditWorker()
+    worker = AuditWorker(heartbeat=heartbeat)
     
     try:
         await worker.start()
@@ -516,5 +423,32 @@ async def main():
         await worker.stop()
 
 
+def run(argv: Optional[List[str]] = None):
+    """Command line entry point: one worker, or a supervised pool of them."""
+    parser = argparse.ArgumentParser(description="Audit log background worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.worker.processes,
+        help="Number of worker processes (default: WORKER_PROCESSES or 1)",
+    )
+    args = parser.parse_args(argv)
+    if args.processes < 1:
+        parser.error("--processes must be at least 1")
+    
+    if args.processes == 1:
+        asyncio.run(main())
+        return
+    
+    from app.worker_pool import WorkerPool
+    
+    # Children read their settings from the environment; they size the
+    # consumers' ack limits by the number of processes
+    os.environ["WORKER_PROCESSES"] = str(args.processes)
+    settings.worker.processes = args.processes
+    setup_logging(settings.logging)
+    sys.exit(WorkerPool(settings.worker, args.processes).run())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Multi-process supervisor for the audit log worker.
+
+``python -m app.worker --processes N`` runs N AuditWorker processes under
+one supervisor. Children are started with the spawn method, so each one
+builds its own event loop, database pool and NATS connection instead of
+inheriting the parent's. They subscribe with the same durable consumers,
+so NATS hands every message to exactly one of them.
+
+Each child stamps a shared heartbeat from its event loop. The supervisor
+restarts children that exit or whose heartbeat goes stale, doubling the
+delay while a child keeps failing soon after it was started. On SIGTERM
+or SIGINT it sends SIGTERM to every child, which makes the child stop
+fetching, process and ack what it has buffered and close its connections,
+and kills the ones still running after ``drain_timeout_seconds``.
+"""
+
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import structlog
+
+from app.config import WorkerSettings
+
+logger = structlog.get_logger(__name__)
+
+# How often the supervisor checks on its children
+MONITOR_INTERVAL_SECONDS = 1.0
+
+
+def run_worker_process(index: int, heartbeat: Any) -> None:
+    """Entry point of a child process."""
+    import asyncio
+    
+    from app.worker import main
+    
+    asyncio.run(main(heartbeat=heartbeat, process_index=index))
+
+
+@dataclass
+class WorkerProcess:
+    """One supervised worker slot and the process currently filling it."""
+    index: int
+    process: Any = None
+    heartbeat: Any = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: float = 0.0
+
+
+class WorkerPool:
+    """Run and supervise a fixed number of worker processes."""
+    
+    def __init__(
+        self,
+        settings: WorkerSettings,
+        processes: int,
+        target: Callable[[int, Any], None] = run_worker_process,
+        context: Optional[Any] = None,
+    ):
+        self.settings = settings
+        self.target = target
+        self.context = context or multiprocessing.get_context("spawn")
+        self.workers: List[WorkerProcess] = [WorkerProcess(index) for index in range(processes)]
+        self.restarts = 0
+        self._stopping = False
+    
+    def run(self) -> int:
+        """Start the children and supervise them until a shutdown signal."""
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        
+        logger.info("Starting worker pool", processes=len(self.workers))
+        for worker in self.workers:
+            self._spawn(worker)
+        
+        while not self._stopping:
+            self.check()
+            time.sleep(MONITOR_INTERVAL_SECONDS)
+        
+        self.shutdown()
+        return 0
+    
+    def stop(self) -> None:
+        """Make :meth:`run` shut the pool down."""
+        self._stopping = True
+    
+    def check(self, now: Optional[float] = None) -> None:
+        """Restart children that exited or stalled, once their backoff has passed."""
+        now = time.monotonic() if now is None else now
+        for worker in self.workers:
+            if self._stopping:
+                return
+            
+            process = worker.process
+            if process is None:
+                if now >= worker.restart_at:
+                    self._spawn(worker)
+            elif not process.is_alive():
+                self._failed(worker, now, f"exited with code {process.exitcode}")
+            elif now - worker.heartbeat.value > self.settings.heartbeat_timeout_seconds:
+                process.kill()
+                process.join(MONITOR_INTERVAL_SECONDS)
+                self._failed(worker, now, "stopped sending heartbeats")
+    
+    def shutdown(self) -> None:
+        """Let every child drain, killing the ones that overrun the drain timeout."""
+        running = [worker.process for worker in self.workers if worker.process is not None and worker.process.is_alive()]
+        logger.info("Draining worker processes", processes=len(running))
+        for process in running:
+            process.terminate()
+        
+        deadline = time.monotonic() + self.settings.drain_timeout_seconds
+        for process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+        
+        for process in running:
+            if process.is_alive():
+                logger.warning("Worker process did not drain in time, killing it", pid=process.pid)
+                process.kill()
+                process.join()
+        
+        for worker in self.workers:
+            worker.process = None
+        logger.info("Worker pool stopped")
+    
+    def _spawn(self, worker: WorkerProcess) -> None:
+        now = time.monotonic()
+        # Start the heartbeat at spawn time, so a child gets a full timeout to start up
+        worker.heartbeat = self.context.Value("d", now, lock=False)
+        worker.process = self.context.Process(
+            target=self.target,
+            args=(worker.index, worker.heartbeat),
+            name=f"audit-worker-{worker.index}",
+        )
+        worker.process.start()
+        worker.started_at = now
+        logger.info("Started worker process", index=worker.index, pid=worker.process.pid)
+    
+    def _failed(self, worker: WorkerProcess, now: float, reason: str) -> None:
+        # A child that stayed up for a while before failing starts the backoff over
+        if now - worker.started_at >= self.settings.max_restart_backoff_seconds:
+            worker.failures = 0
+        worker.failures += 1
+        delay = min(
+            self.settings.restart_backoff_seconds * 2 ** (worker.failures - 1),
+            self.settings.max_restart_backoff_seconds,
+        )
+        logger.error(
+            "Worker process failed, restarting",
+            index=worker.index,
+            pid=worker.process.pid,
+            reason=reason,
+            restart_in=delay,
+        )
+        worker.process = None
+        worker.restart_at = now + delay
+        self.restarts += 1
+    
+    def _on_signal(self, signum, frame) -> None:
+        logger.info("Received shutdown signal", signal=signum)
+        self.stop()
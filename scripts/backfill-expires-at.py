@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Backfill audit_logs.expires_at for rows written before it was maintained.
+
+Rows are updated in chunks (RETENTION_DELETE_CHUNK_SIZE) with the same
+pause between chunks as retention deletes, until no row is left without
+an expiry. Safe to interrupt and re-run.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.config import get_settings
+from app.db.database import DatabaseManager
+from app.services.retention_deleter import ChunkedRetentionDeleter
+
+settings = get_settings()
+
+
+async def main():
+    """Run the expires_at backfill to completion."""
+    db_manager = DatabaseManager(settings.database)
+    await db_manager.initialize()
+    
+    try:
+        retention_settings = settings.retention.copy(update={"delete_time_budget_seconds": 0})
+        deleter = ChunkedRetentionDeleter(retention_settings, db_manager=db_manager)
+        result = await deleter.backfill_expires_at()
+        print(f"Backfilled expires_at for {result.rows} rows in {result.duration:.1f}s")
+    finally:
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,7 +9,7 @@ import asyncio
 import json
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 from urllib.parse import urlencode, urljoin
 
 import httpx
@@ -27,7 +27,6 @@ from .models import (
     AuditLogEventCreate,
     AuditLogQuery,
     AuditLogSummary,
-    AuditLogExport,
     PaginatedAuditLogs,
     BatchAuditLogCreate,
     LoginRequest,
@@ -109,9 +108,8 @@ class BaseClient:
             for key, value in params.items():
                 if value is not None:
                     if isinstance(value, list):
-                        # Handle list parameters (e.g., event_types)
-                        for item in value:
-                            clean_params[key] = str(item)
+                        # List parameters (e.g., event_types) repeat the key
+                        clean_params[key] = [str(item) for item in value]
                     else:
                         clean_params[key] = str(value)
             
@@ -292,9 +290,19 @@ class AuditLogClient(BaseClient):
         query: Optional[AuditLogQuery] = None,
         page: int = 1,
         size: int = 50,
+        cursor: Optional[str] = None,
+        count: str = "exact",
     ) -> PaginatedAuditLogs:
-        """Query audit log events with filtering and pagination."""
-        params = {"page": page, "size": size}
+        """
+        Query audit log events with filtering and pagination.
+        
+        Pass the previous page's ``next_cursor`` as ``cursor`` to page by
+        keyset instead of offset. ``count`` selects how the total is computed:
+        ``"exact"``, ``"estimated"`` (planner estimate) or ``"none"``.
+        """
+        params = {"page": page, "size": size, "count": count}
+        if cursor:
+            params["cursor"] = cursor
         
         if query:
             query_dict = to_dict(query)
@@ -303,11 +311,40 @@ class AuditLogClient(BaseClient):
         response = self._request("GET", "/api/v1/audit/events", params=params)
         return from_dict(response.json(), PaginatedAuditLogs)
     
-    def get_summary(self, query: Optional[AuditLogQuery] = None) -> AuditLogSummary:
-        """Get audit log summary statistics."""
+    def iter_events(
+        self,
+        query: Optional[AuditLogQuery] = None,
+        size: int = 100,
+    ) -> Iterator[AuditLogEvent]:
+        """Iterate over all matching events, following keyset cursors."""
+        cursor = None
+        while True:
+            result = self.query_events(query, size=size, cursor=cursor, count="none")
+            for event in result.items:
+                yield event
+            if not result.next_cursor:
+                break
+            cursor = result.next_cursor
+    
+    def get_summary(
+        self,
+        query: Optional[AuditLogQuery] = None,
+        facets: Optional[List[str]] = None,
+        top: Optional[int] = None,
+    ) -> AuditLogSummary:
+        """
+        Get audit log summary statistics.
+        
+        ``facets`` selects the columns to summarize and ``top`` the number
+        of values returned per facet; both default to the server settings.
+        """
         params = {}
         if query:
             params = to_dict(query)
+        if facets:
+            params["facets"] = facets
+        if top:
+            params["top"] = top
         
         response = self._request("GET", "/api/v1/audit/summary", params=params)
         return from_dict(response.json(), AuditLogSummary)
@@ -315,16 +352,43 @@ class AuditLogClient(BaseClient):
     def export_events(
         self,
         query: Optional[AuditLogQuery] = None,
-        format: str = "json",
-    ) -> AuditLogExport:
-        """Export audit log events."""
+        format: str = "ndjson",
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """
+        Stream an export of audit log events.
+        
+        The server streams the export as it is produced, as a JSON array,
+        NDJSON, CSV or Parquet; the raw bytes are yielded as they arrive so
+        large exports can be written to a file without being held in
+        memory. The request is sent when iteration starts.
+        """
         params = {"format": format}
         if query:
             query_dict = to_dict(query)
             params.update(query_dict)
         
-        response = self._request("GET", "/api/v1/audit/events/export", params=params)
-        return from_dict(response.json(), AuditLogExport)
+        url = self._build_url("/api/v1/audit/events/export", params)
+        try:
+            with self._client.stream("GET", url, headers=self._get_headers()) as response:
+                if not response.is_success:
+                    response.read()
+                    self._handle_response_error(response)
+                yield from response.iter_bytes(chunk_size)
+        except httpx.RequestError as e:
+            raise NetworkError(message=f"Network error: {str(e)}", original_error=e)
+    
+    def iter_export_records(self, query: Optional[AuditLogQuery] = None) -> Iterator[Dict[str, Any]]:
+        """Stream an NDJSON export and yield one record per event."""
+        pending = b""
+        for chunk in self.export_events(query, format="ndjson"):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if pending.strip():
+            yield json.loads(pending)
     
     # User management methods
     def create_user(self, user: UserCreate) -> UserResponse:
@@ -514,9 +578,19 @@ class AsyncAuditLogClient(BaseClient):
         query: Optional[AuditLogQuery] = None,
         page: int = 1,
         size: int = 50,
+        cursor: Optional[str] = None,
+        count: str = "exact",
     ) -> PaginatedAuditLogs:
-        """Query audit log events with filtering and pagination."""
-        params = {"page": page, "size": size}
+        """
+        Query audit log events with filtering and pagination.
+        
+        Pass the previous page's ``next_cursor`` as ``cursor`` to page by
+        keyset instead of offset. ``count`` selects how the total is computed:
+        ``"exact"``, ``"estimated"`` (planner estimate) or ``"none"``.
+        """
+        params = {"page": page, "size": size, "count": count}
+        if cursor:
+            params["cursor"] = cursor
         
         if query:
             query_dict = to_dict(query)
@@ -525,11 +599,40 @@ class AsyncAuditLogClient(BaseClient):
         response = await self._request("GET", "/api/v1/audit/events", params=params)
         return from_dict(response.json(), PaginatedAuditLogs)
     
-    async def get_summary(self, query: Optional[AuditLogQuery] = None) -> AuditLogSummary:
-        """Get audit log summary statistics."""
+    async def iter_events(
+        self,
+        query: Optional[AuditLogQuery] = None,
+        size: int = 100,
+    ) -> AsyncIterator[AuditLogEvent]:
+        """Iterate over all matching events, following keyset cursors."""
+        cursor = None
+        while True:
+            result = await self.query_events(query, size=size, cursor=cursor, count="none")
+            for event in result.items:
+                yield event
+            if not result.next_cursor:
+                break
+            cursor = result.next_cursor
+    
+    async def get_summary(
+        self,
+        query: Optional[AuditLogQuery] = None,
+        facets: Optional[List[str]] = None,
+        top: Optional[int] = None,
+    ) -> AuditLogSummary:
+        """
+        Get audit log summary statistics.
+        
+        ``facets`` selects the columns to summarize and ``top`` the number
+        of values returned per facet; both default to the server settings.
+        """
         params = {}
         if query:
             params = to_dict(query)
+        if facets:
+            params["facets"] = facets
+        if top:
+            params["top"] = top
         
         response = await self._request("GET", "/api/v1/audit/summary", params=params)
         return from_dict(response.json(), AuditLogSummary)
@@ -537,16 +640,44 @@ class AsyncAuditLogClient(BaseClient):
     async def export_events(
         self,
         query: Optional[AuditLogQuery] = None,
-        format: str = "json",
-    ) -> AuditLogExport:
-        """Export audit log events."""
+        format: str = "ndjson",
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream an export of audit log events.
+        
+        The server streams the export as it is produced, as a JSON array,
+        NDJSON, CSV or Parquet; the raw bytes are yielded as they arrive so
+        large exports can be written to a file without being held in
+        memory. The request is sent when iteration starts.
+        """
         params = {"format": format}
         if query:
             query_dict = to_dict(query)
             params.update(query_dict)
         
-        response = await self._request("GET", "/api/v1/audit/events/export", params=params)
-        return from_dict(response.json(), AuditLogExport)
+        url = self._build_url("/api/v1/audit/events/export", params)
+        try:
+            async with self._client.stream("GET", url, headers=self._get_headers()) as response:
+                if not response.is_success:
+                    await response.aread()
+                    self._handle_response_error(response)
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+        except httpx.RequestError as e:
+            raise NetworkError(message=f"Network error: {str(e)}", original_error=e)
+    
+    async def iter_export_records(self, query: Optional[AuditLogQuery] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an NDJSON export and yield one record per event."""
+        pending = b""
+        async for chunk in self.export_events(query, format="ndjson"):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if pending.strip():
+            yield json.loads(pending)
     
     # User management methods (async versions)
     async def create_user(self, user: UserCreate) -> UserResponse:
@@ -9,7 +9,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass, field
-from dataclasses_json import dataclass_json
+from dataclasses_json import config, dataclass_json
 
 
 class EventType(str, Enum):
@@ -107,10 +107,31 @@ class AuditLogQuery:
 class PaginatedAuditLogs:
     """Paginated audit logs response."""
     items: List[AuditLogEvent]
-    total: int
     page: int
-    size: int
-    pages: int
+    size: int = field(metadata=config(field_name="page_size"))
+    total: Optional[int] = field(default=None, metadata=config(field_name="total_count"))
+    pages: Optional[int] = field(default=None, metadata=config(field_name="total_pages"))
+    has_next: bool = False
+    has_previous: bool = False
+    total_is_estimate: bool = field(default=False, metadata=config(field_name="total_count_is_estimate"))
+    next_cursor: Optional[str] = None
+
+
+@dataclass_json
+@dataclass
+class FacetBucket:
+    """Event count of a single facet value."""
+    value: Optional[str]
+    count: int
+
+
+@dataclass_json
+@dataclass
+class FacetDistribution:
+    """Top-N value distribution of a summary facet."""
+    buckets: List[FacetBucket] = field(default_factory=list)
+    distinct_count: int = 0
+    other_count: int = 0
 
 
 @dataclass_json
@@ -118,10 +139,15 @@ class PaginatedAuditLogs:
 class AuditLogSummary:
     """Audit log summary statistics."""
     total_count: int
-    event_types: Dict[str, int]
-    severities: Dict[str, int]
-    resource_types: Dict[str, int]
-    date_range: Dict[str, Optional[str]]
+    facets: Dict[str, FacetDistribution] = field(default_factory=dict)
+    date_range: Dict[str, Optional[str]] = field(default_factory=dict)
+    
+    def counts(self, facet: str) -> Dict[Optional[str], int]:
+        """Top values of a facet mapped to their event counts."""
+        distribution = self.facets.get(facet)
+        if distribution is None:
+            return {}
+        return {bucket.value: bucket.count for bucket in distribution.buckets}
 
 
 @dataclass_json
@@ -101,12 +101,11 @@ async def async_example():
             results = await client.query_events(query)
             print(f"✓ Found {results.total} API call events")
             
-            # Export events
-            export_result = await client.export_events(
-                query=query,
-                format="json"
-            )
-            print(f"✓ Exported {export_result.count} events")
+            # Export events, streamed as NDJSON records
+            exported = 0
+            async for record in client.iter_export_records(query=query):
+                exported += 1
+            print(f"✓ Exported {exported} events")
             
         except Exception as e:
             print(f"✗ Error: {e}")
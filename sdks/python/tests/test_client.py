@@ -0,0 +1,39 @@
+"""
+Unit tests for the synchronous SDK client.
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from audit_log_sdk import AuditLogClient
+
+
+def _client(requests):
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"total_count": 3, "facets": {}, "date_range": {}})
+
+    client = AuditLogClient("http://audit.test", api_key="key", tenant_id="tenant-a")
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_list_parameters_repeat_the_key():
+    client = AuditLogClient("http://audit.test")
+
+    url = client._build_url("/api/v1/audit/events", {"event_types": ["a", "b"], "limit": 10, "user_id": None})
+
+    assert parse_qs(urlparse(url).query) == {"event_types": ["a", "b"], "limit": ["10"]}
+
+
+def test_get_summary_sends_every_facet():
+    requests = []
+
+    with _client(requests) as client:
+        summary = client.get_summary(facets=["event_type", "status"], top=5)
+
+    query = parse_qs(requests[0].url.query.decode())
+    assert query["facets"] == ["event_type", "status"]
+    assert query["top"] == ["5"]
+    assert summary.total_count == 3
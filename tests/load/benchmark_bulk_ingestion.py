@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark for audit log batch ingestion paths.
+
+Compares the legacy ORM path (add_all + one refresh per row) against the
+bulk ingestion engine (COPY and multi-row INSERT) and reports rows/sec for
+batch sizes from 10 to 10k.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python tests/load/benchmark_bulk_ingestion.py
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import delete  # noqa: E402
+
+from app.config import DatabaseSettings  # noqa: E402
+from app.db.database import DatabaseManager  # noqa: E402
+from app.db.schemas import AuditLog  # noqa: E402
+from app.models.audit import AuditEventCreate  # noqa: E402
+from app.services.ingestion_service import BulkAuditWriter, build_audit_rows  # noqa: E402
+
+DEFAULT_BATCH_SIZES = [10, 100, 1000, 10000]
+
+
+def make_events(count: int, tenant_id: str):
+    """Generate synthetic audit events."""
+    return [
+        AuditEventCreate(
+            event_type="api.access",
+            action="read",
+            resource_type="document",
+            resource_id=f"doc-{i}",
+            tenant_id=tenant_id,
+            service_name="benchmark",
+            ip_address="10.0.0.1",
+            metadata={"index": i, "source": "benchmark"},
+        )
+        for i in range(count)
+    ]
+
+
+async def run_legacy(db: DatabaseManager, events, tenant_id: str) -> float:
+    """Legacy path: ORM add_all followed by one refresh per row."""
+    rows = build_audit_rows(events, tenant_id)
+    start = time.perf_counter()
+    async with db.get_session() as session:
+        audit_logs = [AuditLog(**row) for row in rows]
+        session.add_all(audit_logs)
+        await session.commit()
+        for audit_log in audit_logs:
+            await session.refresh(audit_log)
+    return time.perf_counter() - start
+
+
+async def run_bulk(db: DatabaseManager, events, tenant_id: str, use_copy: bool) -> float:
+    """Bulk path: client-side rows written in a single statement."""
+    writer = BulkAuditWriter(use_copy=use_copy)
+    start = time.perf_counter()
+    rows = build_audit_rows(events, tenant_id)
+    async with db.get_session() as session:
+        await writer.write(session, rows)
+        await session.commit()
+    return time.perf_counter() - start
+
+
+async def cleanup(db: DatabaseManager, tenant_id: str) -> None:
+    """Remove benchmark rows."""
+    async with db.get_session() as session:
+        await session.execute(delete(AuditLog).where(AuditLog.tenant_id == tenant_id))
+        await session.commit()
+
+
+async def main(batch_sizes, repeats: int, skip_legacy: bool) -> None:
+    settings = DatabaseSettings(url=os.environ.get("DATABASE_URL", DatabaseSettings().url))
+    db = DatabaseManager(settings)
+    await db.initialize()
+
+    tenant_id = f"bench-{uuid4().hex[:8]}"
+    strategies = [("copy", True), ("insert", False)]
+
+    print(f"{'batch':>8} {'strategy':>10} {'seconds':>10} {'rows/sec':>12}")
+    try:
+        for size in batch_sizes:
+            events = make_events(size, tenant_id)
+
+            if not skip_legacy:
+                elapsed = min([await run_legacy(db, events, tenant_id) for _ in range(repeats)])
+                print(f"{size:>8} {'legacy':>10} {elapsed:>10.4f} {size / elapsed:>12.0f}")
+
+            for name, use_copy in strategies:
+                elapsed = min(
+                    [await run_bulk(db, events, tenant_id, use_copy) for _ in range(repeats)]
+                )
+                print(f"{size:>8} {name:>10} {elapsed:>10.4f} {size / elapsed:>12.0f}")
+
+            await cleanup(db, tenant_id)
+    finally:
+        await cleanup(db, tenant_id)
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the slow ORM path")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.repeats, args.skip_legacy))
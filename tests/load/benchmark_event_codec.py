@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bus message encoding.
+
+Compares the JSON path the bus used before (json.dumps with default=str,
+json.loads of the decoded text) with the msgpack envelope, for single
+events and for batches with and without zstd, and reports size and
+encode/decode throughput.
+
+Usage:
+    python tests/load/benchmark_event_codec.py
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.services.event_codec import decode_envelope, encode_envelope  # noqa: E402
+
+DEFAULT_BATCH_SIZES = [1, 100, 1000]
+
+
+def make_event(index: int) -> dict:
+    """Generate a synthetic audit event as the publisher sees it."""
+    return {
+        "id": uuid4(),
+        "tenant_id": f"tenant-{index % 10}",
+        "event_type": "api.access",
+        "resource_type": "document",
+        "resource_id": f"doc-{index}",
+        "action": "read",
+        "status": "success",
+        "timestamp": datetime.now(timezone.utc),
+        "metadata": {"index": index, "source": "benchmark"},
+    }
+
+
+def make_message(size: int) -> dict:
+    """A single event, or a batch message of ``size`` events."""
+    if size == 1:
+        return make_event(0)
+    return {"batch_id": str(uuid4()), "tenant_id": "tenant-0", "count": size,
+            "events": [make_event(index) for index in range(size)]}
+
+
+def measure(encode, decode, message, repeats: int):
+    """Best encode and decode time per message over ``repeats`` runs."""
+    encoded = encode(message)
+    encode_time = min(_time(lambda: encode(message)) for _ in range(repeats))
+    decode_time = min(_time(lambda: decode(encoded)) for _ in range(repeats))
+    return len(encoded), encode_time, decode_time
+
+
+def _time(call) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def main(batch_sizes, repeats: int) -> None:
+    strategies = [
+        ("json", lambda m: json.dumps(m, default=str).encode(), lambda d: json.loads(d.decode())),
+        ("envelope", encode_envelope, decode_envelope),
+        ("envelope+zstd", lambda m: encode_envelope(m, compress=True), decode_envelope),
+    ]
+
+    print(f"{'events':>8} {'codec':>14} {'bytes':>10} {'encode/s':>12} {'decode/s':>12}")
+    for size in batch_sizes:
+        message = make_message(size)
+        for name, encode, decode in strategies:
+            size_bytes, encode_time, decode_time = measure(encode, decode, message, repeats)
+            print(
+                f"{size:>8} {name:>14} {size_bytes:>10} "
+                f"{size / encode_time:>12.0f} {size / decode_time:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.sizes, args.repeats)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark for JetStream publish throughput.
+
+Publishes audit-sized messages through NATSService with different
+in-flight windows. A window of 1 waits for every ack before the next
+publish; larger windows pipeline the acks. Reports messages/sec and MB/sec
+for each window.
+
+Usage:
+    NATS_URL=nats://localhost:4222 python tests/load/benchmark_nats_publish.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.config import NATSSettings  # noqa: E402
+from app.services.nats_service import NATSService  # noqa: E402
+
+DEFAULT_WINDOWS = [1, 16, 128, 512]
+STREAM = "AUDIT_BENCH"
+SUBJECT_PREFIX = "bench.audit"
+
+
+def make_event(index: int) -> bytes:
+    """Generate a synthetic audit event payload."""
+    return json.dumps({
+        "id": str(uuid4()),
+        "tenant_id": f"tenant-{index % 10}",
+        "event_type": "api.access",
+        "resource_type": "document",
+        "resource_id": f"doc-{index}",
+        "action": "read",
+        "status": "success",
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "metadata": {"index": index, "source": "benchmark"},
+    }).encode()
+
+
+async def run_window(url: str, window: int, payloads) -> float:
+    """Publish every payload with ``window`` acks in flight; returns seconds."""
+    service = NATSService(NATSSettings(
+        url=url,
+        stream_name=STREAM,
+        stream_subjects=[f"{SUBJECT_PREFIX}.>"],
+        max_in_flight=window,
+    ))
+    await service.initialize()
+    try:
+        start = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            await service.publish(f"{SUBJECT_PREFIX}.tenant-{index % 10}", payload)
+        await service.flush()
+        return time.perf_counter() - start
+    finally:
+        await service._js.purge_stream(STREAM)
+        await service.close()
+
+
+async def main(messages: int, windows) -> None:
+    url = os.environ.get("NATS_URL", NATSSettings().url)
+    payloads = [make_event(index) for index in range(messages)]
+    total_bytes = sum(len(payload) for payload in payloads)
+
+    print(f"{'window':>8} {'seconds':>10} {'msgs/sec':>12} {'MB/sec':>8}")
+    for window in windows:
+        elapsed = await run_window(url, window, payloads)
+        print(f"{window:>8} {elapsed:>10.3f} {messages / elapsed:>12.0f} {total_bytes / elapsed / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--windows", type=int, nargs="+", default=DEFAULT_WINDOWS)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.messages, args.windows))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for audit log summary aggregation.
+
+Compares the legacy summary (a count plus one GROUP BY scan per facet)
+against the single-pass GROUPING SETS statement on a seeded tenant and
+reports the median latency of each.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python tests/load/benchmark_summary.py --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.config import DatabaseSettings  # noqa: E402
+from app.db.database import DatabaseManager  # noqa: E402
+from app.db.schemas import AuditLog  # noqa: E402
+from app.models.audit import AuditEventCreate  # noqa: E402
+from app.services.ingestion_service import BulkAuditWriter, build_audit_rows  # noqa: E402
+from app.services.summary_service import (  # noqa: E402
+    SUMMARY_FACETS,
+    build_summary_statement,
+    fold_summary_rows,
+)
+
+DEFAULT_FACETS = ["event_type", "status", "resource_type"]
+SEED_BATCH_SIZE = 10000
+
+
+def make_events(count: int, tenant_id: str):
+    """Generate synthetic audit events with skewed facet values."""
+    rng = random.Random(42)
+    return [
+        AuditEventCreate(
+            event_type=f"event.{min(int(rng.expovariate(0.3)), 49)}",
+            action=rng.choice(["create", "read", "update", "delete"]),
+            status=rng.choices(["success", "error", "warning"], weights=[90, 8, 2])[0],
+            resource_type=rng.choice(["document", "user", "project", None]),
+            tenant_id=tenant_id,
+            service_name="benchmark",
+            user_id=f"user-{rng.randrange(1000)}",
+        )
+        for _ in range(count)
+    ]
+
+
+async def seed(db: DatabaseManager, count: int, tenant_id: str) -> None:
+    """Insert benchmark rows in bulk."""
+    writer = BulkAuditWriter(use_copy=True)
+    for offset in range(0, count, SEED_BATCH_SIZE):
+        events = make_events(min(SEED_BATCH_SIZE, count - offset), tenant_id)
+        async with db.get_session() as session:
+            await writer.write(session, build_audit_rows(events, tenant_id))
+            await session.commit()
+
+
+async def run_legacy(db: DatabaseManager, tenant_id: str, facets) -> float:
+    """Legacy path: a count followed by one GROUP BY scan per facet."""
+    filtered = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
+    start = time.perf_counter()
+    async with db.get_session() as session:
+        await session.execute(select(func.count()).select_from(filtered.subquery()))
+        for facet in facets:
+            column = SUMMARY_FACETS[facet]
+            await session.execute(
+                filtered.with_only_columns(column, func.count()).group_by(column)
+            )
+    return time.perf_counter() - start
+
+
+async def run_single_pass(db: DatabaseManager, tenant_id: str, facets, top_n: int) -> float:
+    """Single-pass path: one GROUPING SETS statement for every facet."""
+    filtered = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
+    start = time.perf_counter()
+    async with db.get_session() as session:
+        result = await session.execute(build_summary_statement(filtered, facets, top_n))
+        fold_summary_rows(result.all(), facets)
+    return time.perf_counter() - start
+
+
+async def cleanup(db: DatabaseManager, tenant_id: str) -> None:
+    """Remove benchmark rows."""
+    async with db.get_session() as session:
+        await session.execute(delete(AuditLog).where(AuditLog.tenant_id == tenant_id))
+        await session.commit()
+
+
+async def main(rows: int, repeats: int, facets, top_n: int) -> None:
+    settings = DatabaseSettings(url=os.environ.get("DATABASE_URL", DatabaseSettings().url))
+    db = DatabaseManager(settings)
+    await db.initialize()
+
+    tenant_id = f"bench-{uuid4().hex[:8]}"
+
+    try:
+        await seed(db, rows, tenant_id)
+        # Warm the buffer cache so both paths read from memory
+        await run_single_pass(db, tenant_id, facets, top_n)
+
+        legacy = [await run_legacy(db, tenant_id, facets) for _ in range(repeats)]
+        single = [await run_single_pass(db, tenant_id, facets, top_n) for _ in range(repeats)]
+
+        print(f"{rows} rows, facets={','.join(facets)}, top_n={top_n}")
+        print(f"{'strategy':>12} {'median ms':>10} {'min ms':>10}")
+        for name, timings in (("legacy", legacy), ("single-pass", single)):
+            print(
+                f"{name:>12} {statistics.median(timings) * 1000:>10.1f} "
+                f"{min(timings) * 1000:>10.1f}"
+            )
+        print(f"speedup: {statistics.median(legacy) / statistics.median(single):.2f}x")
+    finally:
+        await cleanup(db, tenant_id)
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--facets", nargs="+", default=DEFAULT_FACETS, choices=sorted(SUMMARY_FACETS))
+    parser.add_argument("--top-n", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.repeats, args.facets, args.top_n))
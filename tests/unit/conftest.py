@@ -10,11 +10,13 @@ import os
 import pytest
 import pytest_asyncio
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from typing import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -137,6 +139,78 @@ async def async_client(test_async_db_session):
     app.dependency_overrides.clear()
 
 
+class FakeSession:
+    """
+    Async session double for services that build their own SQL.
+    
+    Every statement is compiled for PostgreSQL and recorded. ``respond`` is
+    called with the SQL, the statement and a MagicMock result to fill in;
+    raising from it simulates a database error.
+    """
+    
+    def __init__(self, respond=None, statements=None):
+        self.respond = respond
+        self.statements = statements if statements is not None else []
+        self.params = []
+        self.commits = 0
+        self.rollbacks = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def get_bind(self):
+        return SimpleNamespace(dialect=postgresql.dialect())
+    
+    async def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        self.statements.append(sql)
+        self.params.append(compiled.params)
+        result = MagicMock()
+        if self.respond is not None:
+            self.respond(sql, stmt, result)
+        return result
+    
+    async def commit(self):
+        self.commits += 1
+    
+    async def rollback(self):
+        self.rollbacks += 1
+    
+    def executed(self, fragment):
+        """SQL of the statements containing ``fragment``."""
+        return [sql for sql in self.statements if fragment in sql]
+    
+    def executed_with_params(self, fragment):
+        """``(sql, params)`` of the statements containing ``fragment``."""
+        return [
+            (sql, params) for sql, params in zip(self.statements, self.params) if fragment in sql
+        ]
+
+
+@pytest.fixture(scope="function")
+def fake_session():
+    """Fake async session recording compiled SQL; set ``respond`` to script results."""
+    return FakeSession()
+
+
+@pytest.fixture(scope="function")
+def make_fake_session():
+    """Factory for further fake sessions, e.g. one per pooled connection."""
+    return FakeSession
+
+
+@pytest.fixture(scope="function")
+def fake_db_manager(fake_session):
+    """Database manager whose get_session() yields ``fake_session``."""
+    db_manager = MagicMock()
+    db_manager.get_session.return_value = fake_session
+    return db_manager
+
+
 @pytest.fixture(scope="function")
 def mock_redis():
     """Mock Redis client."""
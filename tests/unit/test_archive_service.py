@@ -0,0 +1,203 @@
+"""
+Unit tests for audit log archival.
+
+This module tests keyset paging, tenant/day segment layout, segment size
+bounds, the manifest and checksums, both segment formats, the progress
+recorded in archive_progress and runs stopped by their deadline.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.config import ArchiveSettings
+from app.core.exceptions import ExportError
+from app.models.audit import AuditEventCreate
+from app.services import archive_service
+from app.services.archive_service import MANIFEST_NAME, AuditArchiver, verify_segment
+from app.services.ingestion_service import build_audit_rows
+
+DAY = datetime(2025, 3, 4, 12, 0, tzinfo=timezone.utc)
+START = DAY - timedelta(days=2)
+END = DAY + timedelta(days=1)
+
+
+def _rows(count, tenant_id, timestamp):
+    events = [
+        AuditEventCreate(event_type="user.login", action="login", tenant_id=tenant_id, service_name="auth")
+        for _ in range(count)
+    ]
+    return build_audit_rows(events, tenant_id, now=timestamp)
+
+
+def _ordered(*groups):
+    rows = [row for group in groups for row in group]
+    return sorted(rows, key=lambda row: (row["partition_date"], row["tenant_id"], str(row["audit_id"])))
+
+
+def _pages(session, pages, fail=False, archived_until=None, on_page=None):
+    """Serve ``pages`` of rows, one per SELECT of audit_logs."""
+    pages = list(pages)
+
+    def respond(sql, stmt, result):
+        if sql.startswith("SELECT archive_progress"):
+            result.scalar.return_value = archived_until
+            return
+        if not sql.startswith("SELECT audit_logs"):
+            return
+        if fail:
+            raise RuntimeError("connection lost")
+        result.mappings.return_value.all.return_value = pages.pop(0) if pages else []
+        if on_page:
+            on_page()
+
+    session.respond = respond
+
+
+def _archiver(tmp_path, db_manager, **settings):
+    return AuditArchiver(ArchiveSettings(directory=str(tmp_path), **settings), db_manager=db_manager)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ndjson_segments_are_split_by_tenant_and_day(tmp_path, fake_session, fake_db_manager):
+    rows = _ordered(
+        _rows(3, "tenant-a", DAY - timedelta(days=1)),
+        _rows(2, "tenant-b", DAY - timedelta(days=1)),
+        _rows(4, "tenant-a", DAY),
+    )
+    _pages(fake_session, [rows[:5], rows[5:]])
+
+    manifest = await _archiver(tmp_path, fake_db_manager, format="ndjson", fetch_size=5).archive("default", START, END)
+
+    run_dir = tmp_path / manifest.run_id
+    assert manifest.total_rows == 9
+    assert [(s.tenant_id, s.date, s.rows) for s in manifest.segments] == [
+        ("tenant-a", "2025-03-03", 3),
+        ("tenant-b", "2025-03-03", 2),
+        ("tenant-a", "2025-03-04", 4),
+    ]
+    assert manifest.segments[0].path == "tenant=tenant-a/date=2025-03-03/part-00000.ndjson.zst"
+    assert all(verify_segment(run_dir, segment) for segment in manifest.segments)
+
+    data = (run_dir / manifest.segments[2].path).read_bytes()
+    lines = pa.CompressedInputStream(pa.BufferReader(data), "zstd").read().splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[0])["tenant_id"] == "tenant-a"
+
+    saved = json.loads((run_dir / MANIFEST_NAME).read_text())
+    assert saved["total_rows"] == 9 and saved["compression"] == "zstd"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_pages_are_read_by_keyset_not_offset(tmp_path, fake_session, fake_db_manager):
+    rows = _ordered(_rows(4, "tenant-a", DAY))
+    _pages(fake_session, [rows[:2], rows[2:]])
+
+    await _archiver(tmp_path, fake_db_manager, format="ndjson", fetch_size=2).archive("default", START, END)
+
+    selects = fake_session.executed("SELECT audit_logs")
+    assert len(selects) == 3
+    assert "OFFSET" not in selects[1]
+    assert "(audit_logs.partition_date, audit_logs.tenant_id, audit_logs.audit_id) > " in selects[1]
+    assert "ORDER BY audit_logs.partition_date, audit_logs.tenant_id, audit_logs.audit_id" in selects[1]
+    assert "audit_logs.partition_date >= " in selects[0]
+    # The window is on created_at, like the retention deletes it precedes
+    assert "audit_logs.created_at >= " in selects[0]
+    assert "audit_logs.timestamp >= " not in selects[0]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_parquet_segments_roll_over_at_the_size_bound(tmp_path, fake_session, fake_db_manager):
+    rows = _ordered(_rows(6, "tenant-a", DAY))
+    _pages(fake_session, [rows[:3], rows[3:]])
+
+    manifest = await _archiver(
+        tmp_path, fake_db_manager, format="parquet", fetch_size=3, segment_max_bytes=1
+    ).archive("default", START, END)
+
+    run_dir = tmp_path / manifest.run_id
+    assert [segment.path.rsplit("/", 1)[1] for segment in manifest.segments] == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+    ]
+    table = pq.read_table(run_dir / manifest.segments[1].path)
+    assert table.num_rows == 3
+    metadata = pq.ParquetFile(run_dir / manifest.segments[1].path).metadata
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_run_leaves_no_files(tmp_path, fake_session, fake_db_manager):
+    _pages(fake_session, [], fail=True)
+    archiver = _archiver(tmp_path, fake_db_manager)
+
+    with pytest.raises(ExportError):
+        await archiver.archive("default", START, END)
+
+    assert list(tmp_path.iterdir()) == []
+    assert not fake_session.executed("INSERT INTO archive_progress")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_progress_is_recorded_in_the_database(tmp_path, fake_session, fake_db_manager):
+    rows = _ordered(_rows(2, "tenant-a", DAY))
+    _pages(fake_session, [rows], archived_until=END)
+    archiver = _archiver(tmp_path, fake_db_manager)
+
+    manifest = await archiver.archive("default", START, END)
+
+    [(sql, params)] = fake_session.executed_with_params("INSERT INTO archive_progress")
+    assert params["name"] == "default" and params["archived_until"] == END
+    assert params["last_run_id"] == manifest.run_id and params["archived_count"] == 2
+    assert "greatest(archive_progress.archived_until, excluded.archived_until)" in sql
+    assert fake_session.commits == 1
+    assert await archiver.archived_until("default") == END
+    assert [m.total_rows for m in archiver.list_manifests("default")] == [2]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_past_its_deadline_stops_at_the_day_it_reached(tmp_path, fake_session, fake_db_manager, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(archive_service, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    rows = _ordered(_rows(3, "tenant-a", DAY - timedelta(days=1)), _rows(3, "tenant-a", DAY))
+
+    def spend_budget():
+        clock[0] = 100.0
+
+    _pages(fake_session, [rows[:4], rows[4:]], on_page=spend_budget)
+    archiver = _archiver(tmp_path, fake_db_manager, format="ndjson", fetch_size=4)
+
+    manifest = await archiver.archive("default", START, END, deadline=10.0)
+
+    midnight = DAY.replace(hour=0)
+    run_dir = tmp_path / manifest.run_id
+    assert len(fake_session.executed("SELECT audit_logs")) == 1
+    # The day it was part way through is left for the next run
+    assert [(s.date, s.rows) for s in manifest.segments] == [("2025-03-03", 3)]
+    assert not list(run_dir.glob("*/date=2025-03-04"))
+    assert manifest.window_end == midnight.isoformat()
+    [(_, params)] = fake_session.executed_with_params("INSERT INTO archive_progress")
+    assert params["archived_until"] == midnight and params["archived_count"] == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_that_finishes_no_day_before_its_deadline_fails(tmp_path, fake_session, fake_db_manager, monkeypatch):
+    monkeypatch.setattr(archive_service, "time", SimpleNamespace(monotonic=lambda: 100.0))
+    _pages(fake_session, [_ordered(_rows(2, "tenant-a", DAY))])
+
+    with pytest.raises(ExportError, match="time budget"):
+        await _archiver(tmp_path, fake_db_manager).archive("default", START, END, deadline=10.0)
+
+    assert list(tmp_path.iterdir()) == []
+    assert not fake_session.executed("INSERT INTO archive_progress")
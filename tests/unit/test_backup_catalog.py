@@ -0,0 +1,118 @@
+"""
+Unit tests for the backup catalog.
+
+This module tests catalog upserts, chain resolution and which backups
+retention may delete without breaking a chain.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.schemas import BackupCatalogEntry
+from app.services.backup_catalog import BackupCatalog, BackupMetadata
+
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _entry(backup_id, parent_id=None, depth=0, age_days=0, backup_type="incremental"):
+    return BackupCatalogEntry(
+        backup_id=backup_id,
+        config_name="hourly",
+        backup_type=backup_type,
+        status="completed",
+        parent_id=parent_id,
+        chain_depth=depth,
+        start_time=NOW - timedelta(days=age_days),
+        watermark=NOW - timedelta(days=age_days, minutes=1),
+        parts=[],
+    )
+
+
+class _FakeSession:
+    def __init__(self, entries):
+        self.entries = entries
+        self.statements = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = self.entries
+        result.scalars.return_value.first.return_value = self.entries[0] if self.entries else None
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _catalog(entries=()):
+    session = _FakeSession(list(entries))
+    return BackupCatalog(db_manager=SimpleNamespace(get_session=lambda: session)), session
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_save_upserts_every_column():
+    catalog, session = _catalog()
+    metadata = BackupMetadata("b-1", "hourly", "full", NOW, watermark=NOW, parts=[{"path": "part-00000.ndjson.gz"}])
+
+    await catalog.save(metadata)
+
+    sql = session.statements[0]
+    assert sql.startswith("INSERT INTO backup_catalog")
+    assert "ON CONFLICT (backup_id) DO UPDATE SET" in sql
+    assert "watermark = excluded.watermark" in sql and "parts = excluded.parts" in sql
+    assert session.commits == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_chain_is_resolved_with_one_recursive_query():
+    entries = [_entry("full", backup_type="full"), _entry("inc-1", "full", 1), _entry("inc-2", "inc-1", 2)]
+    catalog, session = _catalog(entries)
+
+    chain = await catalog.chain("inc-2")
+
+    assert [backup.backup_id for backup in chain] == ["full", "inc-1", "inc-2"]
+    assert chain[1].watermark == entries[1].watermark
+    sql = session.statements[0]
+    assert len(session.statements) == 1
+    assert sql.startswith("WITH RECURSIVE chain")
+    assert "ORDER BY backup_catalog.chain_depth" in sql
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_expired_keeps_backups_a_retained_chain_needs():
+    entries = [
+        _entry("inc-b2", "inc-b1", 2, age_days=1),
+        _entry("inc-b1", "full-b", 1, age_days=20),
+        _entry("full-b", backup_type="full", age_days=21),
+        _entry("inc-a1", "full-a", 1, age_days=40),
+        _entry("full-a", backup_type="full", age_days=41),
+    ]
+    catalog, _ = _catalog(entries)
+
+    expired = await catalog.expired("hourly", NOW - timedelta(days=7))
+
+    assert [backup.backup_id for backup in expired] == ["inc-a1", "full-a"]
+
+
+@pytest.mark.unit
+def test_metadata_round_trips_from_catalog_entry():
+    metadata = BackupMetadata.from_entry(_entry("inc-1", "full", 1))
+
+    data = metadata.to_dict()
+    assert data["parent_id"] == "full"
+    assert data["chain_depth"] == 1
+    assert data["watermark"] == (NOW - timedelta(minutes=1)).isoformat()
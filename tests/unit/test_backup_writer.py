@@ -0,0 +1,284 @@
+"""
+Unit tests for the parallel backup writer.
+
+This module tests shard planning, keyset paging per shard, part files
+encoded in a process pool, the manifest and reading a backup back.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList
+
+from app.config import BackupSettings
+from app.models.audit import AuditEventCreate
+from app.services.backup_writer import (
+    MANIFEST_NAME,
+    ParallelBackupWriter,
+    file_sha256,
+    iter_backup_records,
+    plan_shards,
+    verify_backup,
+)
+from app.services.ingestion_service import build_audit_rows
+
+DAY = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _rows(days, per_day):
+    rows = []
+    for offset in range(days):
+        events = [
+            AuditEventCreate(event_type="user.login", action="login", tenant_id="tenant-1", service_name="auth")
+            for _ in range(per_day)
+        ]
+        rows += build_audit_rows(events, "tenant-1", now=DAY + timedelta(days=offset))
+    return sorted(rows, key=lambda row: (row["partition_date"], row["audit_id"]))
+
+
+def _conditions(clause):
+    if isinstance(clause, BooleanClauseList):
+        for child in clause.clauses:
+            yield from _conditions(child)
+    elif isinstance(clause, BinaryExpression) and hasattr(clause.left, "name"):
+        yield clause.left.name, clause.operator, clause.right.value
+
+
+def _matches(stmt, row):
+    # The keyset condition is left out; pages advance by position instead
+    return all(op(row[column], value) for column, op, value in _conditions(stmt.whereclause))
+
+
+def _rows_at(now):
+    event = AuditEventCreate(event_type="user.login", action="login", tenant_id="tenant-1", service_name="auth")
+    return build_audit_rows([event], "tenant-1", now=now)
+
+
+@pytest.fixture
+def serve(fake_db_manager, make_fake_session):
+    """Serve rows as audit_logs through ``fake_db_manager``, one session per shard."""
+
+    def serve(rows, fail=False):
+        store = SimpleNamespace(rows=rows, statements=[], db_manager=fake_db_manager)
+
+        def open_session():
+            position = 0
+
+            def respond(sql, stmt, result):
+                nonlocal position
+                if "min(audit_logs.partition_date)" in sql:
+                    days = [row["partition_date"] for row in store.rows if _matches(stmt, row)]
+                    result.one.return_value = (min(days), max(days)) if days else (None, None)
+                    return
+                if fail:
+                    raise RuntimeError("connection lost")
+
+                shard = [row for row in store.rows if _matches(stmt, row)]
+                page = shard[position:position + stmt._limit]
+                position += len(page)
+                result.mappings.return_value.all.return_value = page
+
+            return make_fake_session(respond, statements=store.statements)
+
+        fake_db_manager.get_session.side_effect = open_session
+        return store
+
+    return serve
+
+
+def _writer(tmp_path, db_manager, **settings):
+    settings.setdefault("directory", str(tmp_path))
+    return ParallelBackupWriter(BackupSettings(**settings), db_manager=db_manager)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.mark.unit
+def test_shards_split_days_evenly():
+    shards = plan_shards(date(2025, 1, 1), date(2025, 1, 10), 3)
+
+    assert shards == [
+        (date(2025, 1, 1), date(2025, 1, 5)),
+        (date(2025, 1, 5), date(2025, 1, 8)),
+        (date(2025, 1, 8), date(2025, 1, 11)),
+    ]
+    assert len(plan_shards(date(2025, 1, 1), date(2025, 1, 2), 8)) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_backup_round_trips_through_part_files(tmp_path, executor, serve):
+    rows = _rows(days=4, per_day=5)
+    store = serve(rows)
+
+    result = await _writer(tmp_path, store.db_manager, shards=2, connections=2, fetch_size=3).write(
+        "backup-1", executor=executor
+    )
+
+    assert [part.path for part in result.parts] == ["part-00000.ndjson.gz", "part-00001.ndjson.gz"]
+    assert [part.rows for part in result.parts] == [10, 10]
+    for part in result.parts:
+        data = (result.backup_dir / part.path).read_bytes()
+        assert hashlib.sha256(data).hexdigest() == part.sha256
+        assert len(data) == part.bytes
+
+    assert result.watermark <= datetime.now(timezone.utc) - timedelta(seconds=BackupSettings().consistency_lag_seconds)
+
+    manifest = json.loads((result.backup_dir / MANIFEST_NAME).read_text())
+    assert manifest["data_range"]["total_records"] == 20
+    assert manifest["data_range"]["watermark"] == result.watermark.isoformat()
+
+    restored = list(iter_backup_records(result.manifest_path))
+    assert [record["audit_id"] for record in restored] == [row["audit_id"] for row in rows]
+    assert restored[0]["timestamp"] == rows[0]["timestamp"]
+    assert restored[0]["partition_date"] == rows[0]["partition_date"]
+    assert restored[0]["event_metadata"] == rows[0]["event_metadata"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shards_are_paged_by_keyset_within_the_window(tmp_path, executor, serve):
+    store = serve(_rows(days=1, per_day=4))
+
+    await _writer(tmp_path, store.db_manager, shards=1, fetch_size=2).write(
+        "backup-1", start=DAY - timedelta(hours=1), end=DAY + timedelta(hours=1), compress=False, executor=executor
+    )
+
+    pages = [sql for sql in store.statements if "LIMIT" in sql]
+    assert len(pages) == 3
+    assert all("OFFSET" not in sql for sql in pages)
+    assert "(audit_logs.partition_date, audit_logs.audit_id) > " in pages[1]
+    assert "ORDER BY audit_logs.partition_date, audit_logs.audit_id" in pages[1]
+    assert "audit_logs.created_at >= " in pages[0] and "audit_logs.created_at <= " in pages[0]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_incremental_backup_filters_on_the_watermark(tmp_path, executor, serve):
+    store = serve(_rows(days=1, per_day=1))
+
+    await _writer(tmp_path, store.db_manager).write("backup-1", after=DAY, compress=False, executor=executor)
+
+    assert "audit_logs.created_at > " in [sql for sql in store.statements if "LIMIT" in sql][0]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shards_cover_only_the_days_in_the_window(tmp_path, executor, serve):
+    store = serve(_rows(days=10, per_day=1))
+
+    result = await _writer(tmp_path, store.db_manager, shards=4).write(
+        "backup-1", after=DAY + timedelta(days=7, hours=-1), compress=False, executor=executor
+    )
+
+    assert [(part.shard_start, part.shard_end) for part in result.parts] == [
+        ("2025-03-08", "2025-03-09"),
+        ("2025-03-09", "2025-03-10"),
+        ("2025-03-10", "2025-03-11"),
+    ]
+    assert result.rows == 3
+    key_range = next(sql for sql in store.statements if "min(audit_logs.partition_date)" in sql)
+    assert "audit_logs.partition_date >= " in key_range and "audit_logs.partition_date <= " in key_range
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_row_committed_after_a_backup_lands_in_the_next_one(tmp_path, executor, serve):
+    now = datetime.now(timezone.utc)
+    settled = _rows_at(now - timedelta(minutes=10))
+    visible = _rows_at(now - timedelta(seconds=1))
+    # Stamped before the visible row, but still in the ingestion buffer
+    # while the first backup reads its shard
+    late = _rows_at(now - timedelta(seconds=2))
+    store = serve(settled + visible)
+    writer = _writer(tmp_path, store.db_manager, consistency_lag_seconds=30)
+
+    first = await writer.write("backup-1", compress=False, executor=executor)
+    store.rows = sorted(store.rows + late, key=lambda row: (row["partition_date"], row["audit_id"]))
+    writer.settings.consistency_lag_seconds = 0
+    second = await writer.write("backup-2", after=first.watermark, compress=False, executor=executor)
+
+    def ids(result):
+        return {record["audit_id"] for record in iter_backup_records(result.manifest_path)}
+
+    assert ids(first) == {row["audit_id"] for row in settled}
+    assert first.watermark < late[0]["created_at"]
+    assert ids(second) == {row["audit_id"] for row in visible + late}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_empty_table_writes_an_empty_manifest(tmp_path, executor, serve):
+    store = serve([])
+
+    result = await _writer(tmp_path, store.db_manager).write("backup-1", executor=executor)
+
+    assert result.parts == []
+    assert read_total(result.manifest_path) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_checksums_are_computed_while_writing_and_verified_in_parallel(tmp_path, executor, serve):
+    store = serve(_rows(days=3, per_day=2))
+
+    result = await _writer(tmp_path, store.db_manager, shards=3).write("backup-1", executor=executor)
+
+    assert result.checksum == hashlib.sha256(result.manifest_path.read_bytes()).hexdigest()
+    assert result.checksum == file_sha256(result.manifest_path)
+    assert await verify_backup(result.manifest_path, workers=2) == {part.path: True for part in result.parts}
+
+    corrupted = result.backup_dir / result.parts[1].path
+    data = bytearray(corrupted.read_bytes())
+    data[-1] ^= 0xFF
+    corrupted.write_bytes(bytes(data))
+    (result.backup_dir / result.parts[2].path).unlink()
+
+    assert await verify_backup(result.manifest_path, workers=2) == {
+        result.parts[0].path: True,
+        result.parts[1].path: False,
+        result.parts[2].path: False,
+    }
+
+
+@pytest.mark.unit
+def test_file_sha256_of_an_empty_file(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+
+    assert file_sha256(path) == hashlib.sha256(b"").hexdigest()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_backup_leaves_no_files(tmp_path, executor, serve):
+    store = serve(_rows(days=2, per_day=1), fail=True)
+
+    with pytest.raises(RuntimeError):
+        await _writer(tmp_path, store.db_manager, shards=2).write("backup-1", executor=executor)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_backup_past_its_deadline_fails_and_leaves_no_files(tmp_path, executor, serve):
+    store = serve(_rows(days=2, per_day=1))
+
+    with pytest.raises(TimeoutError):
+        await _writer(tmp_path, store.db_manager, shards=2).write("backup-1", executor=executor, deadline=0)
+
+    assert list(tmp_path.iterdir()) == []
+    assert not [sql for sql in store.statements if "LIMIT" in sql]
+
+
+def read_total(manifest_path):
+    return json.loads(manifest_path.read_text())["data_range"]["total_records"]
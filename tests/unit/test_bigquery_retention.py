@@ -0,0 +1,137 @@
+"""
+Unit tests for BigQuery retention.
+
+This module tests the partition layout sync, whole-partition deletes and
+the parameterized DML used for condition-based policies, against a mocked
+BigQuery client.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import bigquery_retention
+from app.services.bigquery_retention import (
+    BigQueryRetentionManager,
+    RetentionRule,
+    condition_sql,
+)
+
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+TABLE = "project.audit.events"
+DAY_MS = 24 * 60 * 60 * 1000
+
+DEFAULT = RetentionRule("default", 365)
+HIGH_VOLUME = RetentionRule("high_volume", 90, {"event_type": ["page_view", "click"]})
+SECURITY = RetentionRule("security", 2555, {"event_type": ["login", "security_alert"]})
+
+
+@pytest.fixture(autouse=True)
+def query_config(monkeypatch):
+    # The BigQuery library is only needed to build QueryJobConfig objects
+    monkeypatch.setattr(
+        bigquery_retention,
+        "_query_config",
+        lambda parameters, dry_run=False: SimpleNamespace(parameters=list(parameters), dry_run=dry_run),
+    )
+
+
+def _client(partitions=(), kept=(), clustering=("tenant_id", "event_type"), expiration_days=2555):
+    table = SimpleNamespace(
+        time_partitioning=SimpleNamespace(field="created_at", expiration_ms=expiration_days * DAY_MS),
+        clustering_fields=list(clustering),
+    )
+    client = MagicMock()
+    client.get_table.return_value = table
+    client.list_partitions.return_value = list(partitions)
+
+    def query(sql, job_config):
+        job = MagicMock()
+        job.result.return_value = [{"partition_id": partition} for partition in kept] if sql.startswith("SELECT") else []
+        job.num_dml_affected_rows = 0 if sql.startswith("SELECT") else 5
+        job.total_bytes_processed = 1000
+        return job
+
+    client.query.side_effect = query
+    return client, table
+
+
+def _queries(client):
+    return [(call.args[0], call.kwargs["job_config"]) for call in client.query.call_args_list]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_layout_tracks_longest_retention_and_clustering():
+    client, table = _client(clustering=["tenant_id"], expiration_days=90)
+
+    result = await BigQueryRetentionManager(client, TABLE).apply([RetentionRule("default", 400)], now=NOW)
+
+    assert result.expiration_days == 400
+    assert table.time_partitioning.expiration_ms == 400 * DAY_MS
+    assert table.clustering_fields == ["tenant_id", "event_type"]
+    client.update_table.assert_called_once_with(table, ["time_partitioning", "clustering_fields"])
+    # Expiration alone enforces a single unconditioned policy
+    client.query.assert_not_called()
+    client.delete_table.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_default_policy_deletes_whole_partitions_not_holding_longer_retained_rows():
+    client, _ = _client(partitions=["20240101", "20240102", "20250301", "__NULL__"], kept=["20240102"])
+
+    result = await BigQueryRetentionManager(client, TABLE).apply([DEFAULT, SECURITY], now=NOW)
+
+    assert result.partitions_deleted == ["20240101"]
+    client.delete_table.assert_called_once_with(f"{TABLE}$20240101", not_found_ok=True)
+
+    (keep_sql, keep_config), (delete_sql, delete_config) = _queries(client)
+    assert keep_sql.startswith("SELECT DISTINCT FORMAT_DATE('%Y%m%d', DATE(created_at))")
+    assert "created_at < @cutoff AND ((event_type IN UNNEST(@k0_0)))" in keep_sql
+    assert delete_sql == (
+        f"DELETE FROM `{TABLE}` WHERE created_at < @cutoff AND NOT ((event_type IN UNNEST(@k0_0)))"
+    )
+    assert ("k0_0", "STRING", ["login", "security_alert"], True) in delete_config.parameters
+    assert delete_config.parameters[0] == ("cutoff", "TIMESTAMP", datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc), False)
+    assert result.rows_deleted == 5
+    assert result.dml_policies == ["default"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_only_condition_based_policies_use_dml():
+    client, _ = _client(partitions=["20240101"])
+
+    result = await BigQueryRetentionManager(client, TABLE).apply([HIGH_VOLUME, SECURITY], now=NOW)
+
+    assert result.expiration_days == 2555
+    assert [sql for sql, _ in _queries(client)] == [
+        f"DELETE FROM `{TABLE}` WHERE created_at < @cutoff AND event_type IN UNNEST(@p0)"
+    ]
+    client.delete_table.assert_not_called()
+    assert result.dml_policies == ["high_volume"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_dry_run_changes_nothing():
+    client, table = _client(partitions=["20240101"], expiration_days=90)
+
+    result = await BigQueryRetentionManager(client, TABLE).apply([DEFAULT, SECURITY, HIGH_VOLUME], dry_run=True, now=NOW)
+
+    client.update_table.assert_not_called()
+    client.delete_table.assert_not_called()
+    assert result.partitions_deleted == ["20240101"]
+    assert all(config.dry_run for sql, config in _queries(client) if sql.startswith("DELETE"))
+    assert result.bytes_processed == 1000
+
+
+@pytest.mark.unit
+def test_conditions_on_unknown_columns_are_rejected():
+    assert condition_sql({"tenant_id": "t-1"}, "p") == ("tenant_id = @p0", [("p0", "STRING", "t-1", False)])
+
+    with pytest.raises(ValueError):
+        condition_sql({"severity": "high"}, "p")
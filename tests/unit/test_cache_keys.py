@@ -0,0 +1,149 @@
+"""
+Unit tests for deterministic cache keys.
+
+This module tests query canonicalization, key versioning and that
+identical queries produce identical keys in separate processes.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.models.audit import AuditEventQuery, DynamicFilter, DynamicFilterGroup
+from app.models.base import CountMode, PaginationParams
+from app.services.audit_service import AuditService
+from app.utils.cache_keys import (
+    CACHE_SCHEMA_VERSION,
+    PAGINATION_FIELDS,
+    SORT_FIELDS,
+    build_cache_key,
+    query_fingerprint,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+_KEY_SCRIPT = """
+from datetime import datetime, timezone
+from app.models.audit import AuditEventQuery, DynamicFilter
+from app.utils.cache_keys import build_cache_key
+
+query = AuditEventQuery(
+    start_time=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    event_type="user.login",
+    dynamic_filters=[
+        DynamicFilter(field="status", operator="in", value=["failure", "success"]),
+        DynamicFilter(field="action", operator="eq", value="login"),
+    ],
+)
+print(build_cache_key("query", "tenant-1", query, page=2))
+"""
+
+
+def _filter(field, operator, value):
+    return DynamicFilter(field=field, operator=operator, value=value)
+
+
+@pytest.mark.unit
+def test_key_is_versioned_and_tenant_scoped():
+    query = AuditEventQuery(event_type="user.login")
+
+    key = build_cache_key("query", "tenant-1", query)
+
+    assert key.startswith(f"audit:v{CACHE_SCHEMA_VERSION}:query:tenant-1:")
+    assert len(key.rsplit(":", 1)[1]) == 64
+    assert key != build_cache_key("query", "tenant-2", query)
+    assert key != build_cache_key("summary", "tenant-1", query)
+
+
+@pytest.mark.unit
+def test_filter_order_does_not_change_fingerprint():
+    first = AuditEventQuery(
+        dynamic_filters=[
+            _filter("status", "in", ["success", "failure"]),
+            _filter("action", "eq", "login"),
+        ],
+        filter_groups=[
+            DynamicFilterGroup(filters=[_filter("a", "eq", "1"), _filter("b", "eq", "2")]),
+            DynamicFilterGroup(filters=[_filter("c", "eq", "3")], operator="OR"),
+        ],
+    )
+    second = AuditEventQuery(
+        dynamic_filters=[
+            _filter("action", "eq", "login"),
+            _filter("status", "in", ["failure", "success"]),
+        ],
+        filter_groups=[
+            DynamicFilterGroup(filters=[_filter("c", "eq", "3")], operator="OR"),
+            DynamicFilterGroup(filters=[_filter("b", "eq", "2"), _filter("a", "eq", "1")]),
+        ],
+    )
+
+    assert query_fingerprint(first) == query_fingerprint(second)
+
+
+@pytest.mark.unit
+def test_equivalent_timestamps_share_fingerprint():
+    utc = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    offset = utc.astimezone(timezone(timedelta(hours=5)))
+
+    assert query_fingerprint(AuditEventQuery(start_time=utc)) == query_fingerprint(
+        AuditEventQuery(start_time=offset)
+    )
+
+
+@pytest.mark.unit
+def test_distinct_filters_produce_distinct_fingerprints():
+    assert query_fingerprint(AuditEventQuery(event_type="a")) != query_fingerprint(
+        AuditEventQuery(event_type="b")
+    )
+    assert query_fingerprint(
+        AuditEventQuery(dynamic_filters=[_filter("action", "eq", "1")])
+    ) != query_fingerprint(AuditEventQuery(dynamic_filters=[_filter("action", "eq", 1)]))
+
+
+@pytest.mark.unit
+def test_count_key_ignores_paging_and_sorting():
+    exclude = PAGINATION_FIELDS | SORT_FIELDS
+
+    assert build_cache_key(
+        "count", "t", AuditEventQuery(page=1, sort_order="asc"), exclude=exclude
+    ) == build_cache_key("count", "t", AuditEventQuery(page=9, sort_order="desc"), exclude=exclude)
+
+
+@pytest.mark.unit
+def test_service_keys_separate_pages_and_count_modes():
+    service = AuditService.__new__(AuditService)
+    query = AuditEventQuery(event_type="user.login")
+
+    page_1 = service._build_cache_key(query, "t", PaginationParams(page=1))
+    page_2 = service._build_cache_key(query, "t", PaginationParams(page=2))
+    estimated = service._build_cache_key(
+        query, "t", PaginationParams(page=1, count_mode=CountMode.ESTIMATED)
+    )
+
+    assert len({page_1, page_2, estimated}) == 3
+    assert service._build_count_cache_key(query, "t") == service._build_count_cache_key(
+        AuditEventQuery(event_type="user.login", page=5), "t"
+    )
+
+
+@pytest.mark.unit
+def test_keys_match_across_processes():
+    keys = set()
+    for seed in ("1", "2", "random"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        result = subprocess.run(
+            [sys.executable, "-c", _KEY_SCRIPT],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        keys.add(result.stdout.strip().splitlines()[-1])
+
+    assert len(keys) == 1
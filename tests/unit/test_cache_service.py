@@ -0,0 +1,96 @@
+"""
+Unit tests for the Redis cache service.
+
+This module tests serialization, pipelined bulk operations, pattern
+deletion and generation-based invalidation against fakeredis.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.config import RedisSettings
+from app.services.cache_service import CacheService
+
+
+@pytest_asyncio.fixture
+async def cache():
+    service = CacheService(RedisSettings(), client=fakeredis.FakeAsyncRedis())
+    await service.initialize()
+    yield service
+    await service.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_set_and_get_round_trips_values(cache):
+    audit_id = uuid4()
+    timestamp = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    await cache.set("key", {"audit_id": audit_id, "timestamp": timestamp, "items": [1, 2]})
+
+    assert await cache.get("key") == {
+        "audit_id": str(audit_id),
+        "timestamp": timestamp.isoformat(),
+        "items": [1, 2],
+    }
+    assert await cache.get("missing") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_set_applies_default_and_explicit_ttl(cache):
+    await cache.set("default", 1)
+    await cache.set("explicit", 1, ttl=30)
+
+    assert 0 < await cache.client.ttl("default") <= RedisSettings().cache_ttl
+    assert 0 < await cache.client.ttl("explicit") <= 30
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_mset_and_mget_use_one_round_trip(cache):
+    await cache.mset({"a": 1, "b": {"x": "y"}}, ttl=60)
+
+    assert await cache.mget(["a", "missing", "b"]) == [1, None, {"x": "y"}]
+    assert 0 < await cache.client.ttl("b") <= 60
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_pattern_removes_matching_keys(cache):
+    await cache.mset({f"recent_events:t1:{i}": i for i in range(25)})
+    await cache.set("recent_events:t2:0", 0)
+
+    deleted = await cache.delete_pattern("recent_events:t1:*", batch_size=10)
+
+    assert deleted == 25
+    assert await cache.get("recent_events:t2:0") == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bump_generation_only_affects_its_namespace(cache):
+    assert await cache.get_generation("audit_logs:t1") == 0
+
+    await cache.bump_generation("audit_logs:t1")
+    await cache.bump_generation("audit_logs:t1")
+
+    assert await cache.get_generation("audit_logs:t1") == 2
+    assert await cache.get_generation("audit_logs:t2") == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redis_errors_are_treated_as_misses(cache):
+    cache.client.get = AsyncMock(side_effect=RedisConnectionError("down"))
+    cache.client.set = AsyncMock(side_effect=RedisConnectionError("down"))
+
+    await cache.set("key", 1)
+    assert await cache.get("key") is None
+    assert await cache.get_generation("audit_logs:t1") == 0
@@ -0,0 +1,281 @@
+"""
+Unit tests for the per-tenant event batcher.
+"""
+
+import asyncio
+
+import pytest
+
+from app.config import NATSSettings, WorkerSettings
+from app.services.event_batcher import TenantBatcher, max_ack_pending
+from app.services.nats_service import NATSService
+
+
+class _FakeMessage:
+    def __init__(self, name):
+        self.name = name
+        self.acked = False
+        self.naked = False
+
+    async def ack(self):
+        self.acked = True
+
+    async def nak(self):
+        self.naked = True
+
+
+class _LimitedConsumer:
+    """Pull consumer that stops handing out messages at max_ack_pending, like JetStream."""
+
+    def __init__(self, messages, limit):
+        self.messages = list(messages)
+        self.limit = limit
+        self.unacked = 0
+
+    async def fetch(self, batch, timeout=None):
+        room = min(batch, self.limit - self.unacked, len(self.messages))
+        if room <= 0:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        fetched, self.messages = self.messages[:room], self.messages[room:]
+        self.unacked += len(fetched)
+        return fetched
+
+
+class _ConsumerMessage(_FakeMessage):
+    def __init__(self, consumer, tenant_id, n):
+        super().__init__(n)
+        self.consumer = consumer
+        self.tenant_id = tenant_id
+
+    async def ack(self):
+        await super().ack()
+        self.consumer.unacked -= 1
+
+
+class _Recorder:
+    def __init__(self, fail_tenants=(), gate=None):
+        self.batches = []
+        self.fail_tenants = set(fail_tenants)
+        self.gate = gate
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, tenant_id, events):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            else:
+                await asyncio.sleep(0)
+            self.batches.append((tenant_id, [event["n"] for event in events]))
+            if tenant_id in self.fail_tenants:
+                raise RuntimeError("processing failed")
+        finally:
+            self.active -= 1
+
+
+def _settings(**overrides):
+    values = dict(
+        batch_size=2,
+        batch_timeout_seconds=60,
+        concurrency=4,
+        tenant_buffer_size=10,
+        max_buffered_events=100,
+    )
+    values.update(overrides)
+    return WorkerSettings(**values)
+
+
+@pytest.mark.asyncio
+async def test_messages_are_acked_only_after_processing():
+    gate = asyncio.Event()
+    recorder = _Recorder(gate=gate)
+    batcher = TenantBatcher(_settings(), recorder)
+    first, second = _FakeMessage("a"), _FakeMessage("b")
+
+    await batcher.add(first, [("t1", {"n": 1})])
+    await batcher.add(second, [("t1", {"n": 2})])
+    await asyncio.sleep(0)
+    assert not first.acked and not second.acked
+    assert batcher.buffered == 2
+
+    gate.set()
+    await batcher.flush()
+
+    assert first.acked and second.acked
+    assert recorder.batches == [("t1", [1, 2])]
+    assert batcher.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_naks_its_messages_and_frees_the_buffer():
+    recorder = _Recorder(fail_tenants={"bad"})
+    batcher = TenantBatcher(_settings(), recorder)
+    good, bad = _FakeMessage("good"), _FakeMessage("bad")
+
+    await batcher.add(good, [("ok", {"n": 1})])
+    await batcher.add(bad, [("bad", {"n": 2})])
+    await batcher.flush()
+
+    assert good.acked and not good.naked
+    assert bad.naked and not bad.acked
+    assert batcher.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_message_with_events_for_several_tenants_is_settled_once():
+    recorder = _Recorder(fail_tenants={"t2"})
+    batcher = TenantBatcher(_settings(), recorder)
+    mixed, empty = _FakeMessage("mixed"), _FakeMessage("empty")
+
+    await batcher.add(mixed, [("t1", {"n": 1}), ("t2", {"n": 2}), ("t1", {"n": 3})])
+    await batcher.add(empty, [])
+    await batcher.flush()
+
+    # One failed event is enough to redeliver the whole message
+    assert mixed.naked and not mixed.acked
+    assert empty.acked
+    assert sorted(recorder.batches) == [("t1", [1, 3]), ("t2", [2])]
+
+
+@pytest.mark.asyncio
+async def test_full_tenant_buffer_blocks_until_flushed():
+    gate = asyncio.Event()
+    recorder = _Recorder(gate=gate)
+    batcher = TenantBatcher(_settings(batch_size=2, tenant_buffer_size=2), recorder)
+
+    # The first batch is taken out for processing, the next one queues up
+    for n in range(1, 5):
+        await batcher.add(_FakeMessage(str(n)), [("t1", {"n": n})])
+        await asyncio.sleep(0)
+    # Another tenant still has room
+    await batcher.add(_FakeMessage("other"), [("t2", {"n": 0})])
+
+    blocked = asyncio.create_task(batcher.add(_FakeMessage("5"), [("t1", {"n": 5})]))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    gate.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await batcher.flush()
+
+    assert [n for tenant, batch in recorder.batches if tenant == "t1" for n in batch] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_global_limit_blocks_every_tenant():
+    gate = asyncio.Event()
+    recorder = _Recorder(gate=gate)
+    batcher = TenantBatcher(_settings(batch_size=1, max_buffered_events=2), recorder)
+
+    await batcher.add(_FakeMessage("1"), [("t1", {"n": 1})])
+    await batcher.add(_FakeMessage("2"), [("t2", {"n": 2})])
+
+    blocked = asyncio.create_task(batcher.add(_FakeMessage("3"), [("t3", {"n": 3})]))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    gate.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await batcher.flush()
+    assert batcher.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_processed_concurrently_up_to_the_limit():
+    gate = asyncio.Event()
+    recorder = _Recorder(gate=gate)
+    batcher = TenantBatcher(_settings(batch_size=1, concurrency=2), recorder)
+
+    for tenant in ("t1", "t2", "t3", "t4"):
+        await batcher.add(_FakeMessage(tenant), [(tenant, {"n": tenant})])
+    await asyncio.sleep(0.01)
+    assert recorder.active == 2
+
+    gate.set()
+    await batcher.flush()
+    assert recorder.max_active == 2
+    assert len(recorder.batches) == 4
+
+
+@pytest.mark.asyncio
+async def test_batches_of_one_tenant_keep_their_order():
+    recorder = _Recorder()
+    batcher = TenantBatcher(_settings(batch_size=2, tenant_buffer_size=100), recorder)
+
+    for n in range(7):
+        await batcher.add(_FakeMessage(str(n)), [("t1", {"n": n})])
+    await batcher.flush()
+
+    assert recorder.batches == [("t1", [0, 1]), ("t1", [2, 3]), ("t1", [4, 5]), ("t1", [6])]
+
+
+@pytest.mark.asyncio
+async def test_timer_flushes_partial_batches():
+    recorder = _Recorder()
+    settings = _settings(batch_size=10)
+    settings.batch_timeout_seconds = 0.01
+    batcher = TenantBatcher(settings, recorder)
+    message = _FakeMessage("partial")
+
+    await batcher.start()
+    try:
+        await batcher.add(message, [("t1", {"n": 1})])
+        for _ in range(100):
+            if message.acked:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await batcher.close()
+
+    assert message.acked
+    assert recorder.batches == [("t1", [1])]
+
+
+async def _drain_through_consumer(settings, limit, tenants, per_tenant, seconds):
+    consumer = _LimitedConsumer([], limit)
+    consumer.messages = [
+        _ConsumerMessage(consumer, f"t{tenant}", n) for n in range(per_tenant) for tenant in range(tenants)
+    ]
+    batcher = TenantBatcher(settings, _Recorder())
+    service = NATSService(NATSSettings(fetch_batch_size=100, fetch_timeout_seconds=0.01))
+
+    async def handle(message):
+        await batcher.add(message, [(message.tenant_id, {"n": message.name})])
+
+    await batcher.start()
+    task = asyncio.create_task(service._consume("audit.events.*", consumer, handle))
+    deadline = asyncio.get_running_loop().time() + seconds
+    while consumer.messages or consumer.unacked:
+        if asyncio.get_running_loop().time() > deadline:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    processed = tenants * per_tenant - len(consumer.messages) - consumer.unacked
+    await batcher.close()
+    return processed
+
+
+@pytest.mark.asyncio
+async def test_many_tenants_do_not_stall_on_the_consumer_ack_limit():
+    # Ten tenants, each filling one full batch; nothing relies on the timer
+    settings = _settings(batch_size=1000, batch_timeout_seconds=60, tenant_buffer_size=1000, max_buffered_events=20000)
+
+    processed = await _drain_through_consumer(
+        settings, max_ack_pending(settings, 100), tenants=10, per_tenant=1000, seconds=5
+    )
+    assert processed == 10_000
+
+    # The old fixed limit of ten fetches stalls before any tenant batch fills
+    stalled = await _drain_through_consumer(settings, 1000, tenants=10, per_tenant=1000, seconds=0.3)
+    assert stalled == 0
+
+
+def test_ack_limit_scales_with_buffer_and_processes():
+    settings = _settings(max_buffered_events=50000)
+    settings.processes = 4
+
+    assert max_ack_pending(settings, 100) == 4 * 50100
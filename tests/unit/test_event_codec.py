@@ -0,0 +1,88 @@
+"""
+Unit tests for the message envelope codec.
+
+This module tests type round-trips, batch compression, version handling
+and the JSON fallback for messages from older publishers.
+"""
+
+import json
+from datetime import datetime, timezone
+from enum import Enum
+from ipaddress import ip_address
+from uuid import uuid4
+
+import msgpack
+import pytest
+
+from app.core.exceptions import MessageQueueError
+from app.services.event_codec import FLAG_ZSTD, MAGIC, VERSION, decode_envelope, encode_envelope, is_envelope
+
+
+class _Severity(Enum):
+    HIGH = "high"
+
+
+def _event(index=0):
+    return {
+        "id": uuid4(),
+        "tenant_id": "tenant-1",
+        "event_type": "api.access",
+        "severity": _Severity.HIGH,
+        "timestamp": datetime(2025, 3, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+        "ip_address": ip_address("10.0.0.1"),
+        "metadata": {"index": index, "tags": ["a", "b"]},
+    }
+
+
+@pytest.mark.unit
+def test_events_round_trip_with_their_types():
+    event = _event()
+    encoded = encode_envelope(event)
+
+    assert encoded[:3] == bytes([MAGIC, VERSION, 0])
+    decoded = decode_envelope(encoded)
+    assert decoded["id"] == event["id"]
+    assert decoded["timestamp"] == event["timestamp"]
+    assert decoded["severity"] == "high"
+    assert decoded["ip_address"] == "10.0.0.1"
+    assert decoded["metadata"] == event["metadata"]
+    assert len(encoded) < len(json.dumps(event, default=str))
+
+
+@pytest.mark.unit
+def test_naive_datetimes_are_treated_as_utc():
+    decoded = decode_envelope(encode_envelope({"at": datetime(2025, 3, 1, 12, 0)}))
+
+    assert decoded["at"] == datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+def test_only_large_bodies_are_compressed():
+    batch = {"batch_id": str(uuid4()), "events": [_event(index) for index in range(200)]}
+
+    small = encode_envelope(_event(), compress=True)
+    large = encode_envelope(batch, compress=True)
+
+    assert small[2] == 0
+    assert large[2] == FLAG_ZSTD
+    assert len(large) < len(encode_envelope(batch)) / 2
+    # Decoding works from any buffer, including the bytearray NATS hands out
+    assert decode_envelope(bytearray(large))["events"][199]["metadata"]["index"] == 199
+
+
+@pytest.mark.unit
+def test_legacy_json_messages_still_decode():
+    payload = json.dumps({"type": "cache_invalidate", "namespaces": ["metrics:t1"]}).encode()
+
+    assert not is_envelope(payload)
+    assert decode_envelope(payload) == {"type": "cache_invalidate", "namespaces": ["metrics:t1"]}
+
+
+@pytest.mark.unit
+def test_newer_or_malformed_envelopes_are_rejected():
+    body = msgpack.packb({"id": 1})
+
+    with pytest.raises(MessageQueueError):
+        decode_envelope(bytes([MAGIC, VERSION + 1, 0]) + body)
+    with pytest.raises(MessageQueueError):
+        decode_envelope(bytes([MAGIC, VERSION, 0]) + body + b"\xc1")
@@ -0,0 +1,153 @@
+"""
+Unit tests for streaming exports.
+
+This module tests the incremental export encoders, gzip streaming and the
+chunked export stream produced by the audit service.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pyarrow.parquet as pq
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.models.audit import AuditEventQuery
+from app.services.audit_service import AuditService
+from app.services.export_service import (
+    EXPORT_COLUMNS,
+    get_export_encoder,
+    gzip_stream,
+    row_to_export_record,
+)
+
+
+def _make_rows(count, start=0):
+    now = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    return [
+        {
+            "audit_id": uuid4(),
+            "timestamp": now,
+            "event_type": "user.login",
+            "action": "login",
+            "status": "success",
+            "tenant_id": "tenant-1",
+            "service_name": "auth",
+            "user_id": f"user-{i}",
+            "session_id": None,
+            "ip_address": "10.0.0.1",
+            "user_agent": "pytest",
+            "resource_type": "session",
+            "resource_id": None,
+            "correlation_id": None,
+            "request_data": {"path": "/login"},
+            "response_data": None,
+            "event_metadata": {"index": i},
+            "retention_period_days": 90,
+            "partition_date": date(2025, 1, 2),
+            "created_at": now,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _encode(export_format, chunks):
+    encoder = get_export_encoder(export_format)
+    parts = [encoder.header()]
+    for rows in chunks:
+        parts.append(encoder.encode([row_to_export_record(row) for row in rows]))
+    parts.append(encoder.footer())
+    return b"".join(parts)
+
+
+@pytest.mark.unit
+def test_ndjson_emits_one_object_per_line():
+    output = _encode("ndjson", [_make_rows(2), _make_rows(1, start=2)])
+    
+    lines = [json.loads(line) for line in output.splitlines()]
+    assert [line["metadata"]["index"] for line in lines] == [0, 1, 2]
+    assert set(lines[0]) == set(EXPORT_COLUMNS)
+
+
+@pytest.mark.unit
+def test_json_array_is_valid_across_chunks():
+    output = _encode("json", [_make_rows(2), [], _make_rows(2, start=2)])
+    
+    assert len(json.loads(output)) == 4
+    assert json.loads(_encode("json", [])) == []
+
+
+@pytest.mark.unit
+def test_csv_has_header_and_json_columns():
+    output = _encode("csv", [_make_rows(2)])
+    
+    rows = list(csv.DictReader(io.StringIO(output.decode())))
+    assert len(rows) == 2
+    assert json.loads(rows[1]["metadata"]) == {"index": 1}
+    assert rows[0]["session_id"] == ""
+    assert rows[0]["timestamp"] == "2025-01-02T03:04:05+00:00"
+
+
+@pytest.mark.unit
+def test_parquet_writes_one_row_group_per_chunk():
+    output = _encode("parquet", [_make_rows(3), _make_rows(2, start=3)])
+    
+    parquet_file = pq.ParquetFile(io.BytesIO(output))
+    assert parquet_file.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.num_rows == 5
+    assert json.loads(table.column("metadata")[4].as_py()) == {"index": 4}
+
+
+@pytest.mark.unit
+def test_unsupported_format_is_rejected():
+    with pytest.raises(ValidationError):
+        get_export_encoder("xml")
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_gzip_stream_round_trips():
+    chunks = [b"a" * 1000, b"", b"b" * 1000]
+    
+    compressed = b"".join([chunk async for chunk in gzip_stream(_aiter(chunks))])
+    
+    assert gzip.decompress(compressed) == b"".join(chunks)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_export_streams_each_cursor_partition():
+    partitions = [_make_rows(3), _make_rows(3, start=3), _make_rows(1, start=6)]
+    result = MagicMock()
+    result.mappings.return_value.partitions.return_value = _aiter(partitions)
+    session = MagicMock()
+    session.stream = AsyncMock(return_value=result)
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    
+    service = AuditService.__new__(AuditService)
+    service.db_manager = MagicMock()
+    service.db_manager.get_session.return_value = session
+    
+    encoder, body = await service.export_audit_logs(
+        AuditEventQuery(), "tenant-1", "user-1", export_format="ndjson"
+    )
+    chunks = [chunk async for chunk in body]
+    
+    assert encoder.media_type == "application/x-ndjson"
+    assert len([chunk for chunk in chunks if chunk]) == 3
+    assert len(b"".join(chunks).splitlines()) == 7
+    stmt = session.stream.call_args[0][0]
+    assert stmt.get_execution_options()["yield_per"] > 0
+    assert stmt._limit_clause is None
@@ -0,0 +1,293 @@
+"""
+Unit tests for the bulk ingestion engine.
+
+This module tests client-side row building, response conversion, the
+single-statement write strategies of the BulkAuditWriter and group
+commits in the IngestionBuffer, including its retries and shutdown.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import IngestionSettings
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+from app.models.audit import AuditEventCreate
+from app.services.ingestion_service import (
+    AUDIT_LOG_COLUMNS,
+    BulkAuditWriter,
+    IngestionBuffer,
+    build_audit_rows,
+    row_to_response,
+)
+
+
+def _make_events(count):
+    return [
+        AuditEventCreate(
+            event_type="user.login",
+            action="login",
+            tenant_id="tenant-1",
+            service_name="auth",
+            ip_address="192.168.1.1",
+            metadata={"index": i},
+        )
+        for i in range(count)
+    ]
+
+
+def _make_session(dialect_name, driver):
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = dialect_name
+    session.get_bind.return_value.dialect.driver = driver
+    session.execute = AsyncMock()
+    return session
+
+
+@pytest.mark.unit
+def test_build_audit_rows_populates_every_column():
+    now = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    rows = build_audit_rows(_make_events(3), "tenant-1", "user-1", now=now)
+
+    assert len(rows) == 3
+    assert len({row["audit_id"] for row in rows}) == 3
+    for row in rows:
+        assert set(row) == set(AUDIT_LOG_COLUMNS)
+        assert row["timestamp"] == now
+        assert row["partition_date"] == now.date()
+        assert row["expires_at"] == now + timedelta(days=row["retention_period_days"])
+        assert row["status"] == "success"
+        assert row["user_id"] == "user-1"
+
+
+@pytest.mark.unit
+def test_row_to_response_round_trips_input():
+    row = build_audit_rows(_make_events(1), "tenant-1")[0]
+    response = row_to_response(row)
+
+    assert response.audit_id == row["audit_id"]
+    assert response.tenant_id == "tenant-1"
+    assert response.metadata == {"index": 0}
+    assert response.partition_date == row["partition_date"]
+
+
+@pytest.mark.unit
+def test_copy_record_serializes_json_columns():
+    row = build_audit_rows(_make_events(1), "tenant-1")[0]
+    record = BulkAuditWriter._to_copy_record(row)
+
+    assert len(record) == len(AUDIT_LOG_COLUMNS)
+    metadata = record[AUDIT_LOG_COLUMNS.index("event_metadata")]
+    assert json.loads(metadata) == {"index": 0}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_falls_back_to_single_insert_statement():
+    session = _make_session("sqlite", "aiosqlite")
+    rows = build_audit_rows(_make_events(5), "tenant-1")
+
+    written = await BulkAuditWriter().write(session, rows)
+
+    assert written == 5
+    session.execute.assert_awaited_once()
+    assert session.execute.call_args[0][1] == rows
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_uses_copy_for_asyncpg():
+    session = _make_session("postgresql", "asyncpg")
+    driver_connection = MagicMock()
+    driver_connection.copy_records_to_table = AsyncMock()
+    raw_connection = MagicMock(driver_connection=driver_connection)
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+    session.connection = AsyncMock(return_value=connection)
+    rows = build_audit_rows(_make_events(4), "tenant-1")
+
+    written = await BulkAuditWriter().write(session, rows)
+
+    assert written == 4
+    session.execute.assert_not_called()
+    kwargs = driver_connection.copy_records_to_table.call_args.kwargs
+    assert kwargs["columns"] == AUDIT_LOG_COLUMNS
+    assert len(kwargs["records"]) == 4
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_empty_batch_is_noop():
+    session = _make_session("postgresql", "asyncpg")
+    assert await BulkAuditWriter().write(session, []) == 0
+    session.execute.assert_not_called()
+
+
+class _RecordingWriter:
+    """Writer double that records the size of every flushed group."""
+
+    def __init__(self, delay=0.0, error=None, bad_rows=()):
+        self.batches = []
+        self.delay = delay
+        self.error = error
+        self.bad_rows = {row["audit_id"] for row in bad_rows}
+
+    async def write(self, session, rows):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        if any(row["audit_id"] in self.bad_rows for row in rows):
+            raise ValueError("invalid row")
+        self.batches.append(len(rows))
+        return len(rows)
+
+    def committed(self, rows):
+        pass
+
+
+def _make_db_manager():
+    session = MagicMock()
+    session.commit = AsyncMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    db_manager = MagicMock()
+    db_manager.get_session.return_value = session
+    return db_manager
+
+
+def _make_buffer(writer, **overrides):
+    settings = IngestionSettings(**{"max_batch_size": 50, "max_latency_ms": 20, **overrides})
+    return IngestionBuffer(settings, _make_db_manager(), writer=writer)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_buffer_coalesces_concurrent_submits_into_group_commit():
+    writer = _RecordingWriter()
+    buffer = _make_buffer(writer)
+    await buffer.start()
+
+    rows = build_audit_rows(_make_events(20), "tenant-1")
+    await asyncio.gather(*(buffer.submit(row) for row in rows))
+    await buffer.stop()
+
+    assert sum(writer.batches) == 20
+    assert len(writer.batches) < 20
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_size_limit():
+    writer = _RecordingWriter()
+    buffer = _make_buffer(writer, max_batch_size=5, max_latency_ms=1000)
+    await buffer.start()
+
+    rows = build_audit_rows(_make_events(10), "tenant-1")
+    await asyncio.wait_for(asyncio.gather(*(buffer.submit(row) for row in rows)), 0.5)
+    await buffer.stop()
+
+    assert writer.batches == [5, 5]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_buffer_propagates_commit_failure_to_every_caller():
+    buffer = _make_buffer(_RecordingWriter(error=RuntimeError("db down")))
+    await buffer.start()
+
+    rows = build_audit_rows(_make_events(3), "tenant-1")
+    results = await asyncio.gather(
+        *(buffer.submit(row) for row in rows), return_exceptions=True
+    )
+    await buffer.stop()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_buffer_rejects_when_queue_stays_full():
+    writer = _RecordingWriter(delay=0.2)
+    buffer = _make_buffer(
+        writer, max_batch_size=1, queue_size=1, enqueue_timeout_seconds=0.01
+    )
+    await buffer.start()
+
+    rows = build_audit_rows(_make_events(4), "tenant-1")
+    results = await asyncio.gather(
+        *(buffer.submit(row) for row in rows), return_exceptions=True
+    )
+    await buffer.stop()
+
+    assert any(isinstance(result, RateLimitError) for result in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_group_commit_failure_only_fails_the_bad_row():
+    rows = build_audit_rows(_make_events(8), "tenant-1")
+    writer = _RecordingWriter(bad_rows=[rows[5]])
+    buffer = _make_buffer(writer, max_batch_size=8, max_latency_ms=1000)
+    await buffer.start()
+
+    results = await asyncio.gather(
+        *(buffer.submit(row) for row in rows), return_exceptions=True
+    )
+    await buffer.stop()
+
+    assert isinstance(results[5], ValueError)
+    assert all(result is None for index, result in enumerate(results) if index != 5)
+    assert sum(writer.batches) == 7
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_connection_failure_fails_the_group_without_splitting():
+    writer = _RecordingWriter(error=ConnectionRefusedError("database down"))
+    writer.write = AsyncMock(side_effect=writer.write)
+    buffer = _make_buffer(writer, max_batch_size=4, max_latency_ms=1000)
+    await buffer.start()
+
+    rows = build_audit_rows(_make_events(4), "tenant-1")
+    results = await asyncio.gather(
+        *(buffer.submit(row) for row in rows), return_exceptions=True
+    )
+    await buffer.stop()
+
+    assert all(isinstance(result, ConnectionRefusedError) for result in results)
+    assert writer.write.await_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_submit_is_refused_when_the_buffer_is_not_running():
+    buffer = _make_buffer(_RecordingWriter())
+    row = build_audit_rows(_make_events(1), "tenant-1")[0]
+
+    with pytest.raises(ServiceUnavailableError):
+        await buffer.submit(row)
+
+    await buffer.start()
+    await buffer.stop()
+    with pytest.raises(ServiceUnavailableError):
+        await buffer.submit(row)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stop_fails_rows_queued_behind_the_stop_marker():
+    writer = _RecordingWriter()
+    buffer = _make_buffer(writer)
+    await buffer.start()
+
+    row = build_audit_rows(_make_events(1), "tenant-1")[0]
+    future = asyncio.get_running_loop().create_future()
+    buffer._queue.put_nowait(None)
+    buffer._queue.put_nowait((row, future, 0.0))
+    await asyncio.wait_for(buffer.stop(), 1)
+
+    assert isinstance(future.exception(), ServiceUnavailableError)
+    assert writer.batches == []
@@ -0,0 +1,295 @@
+"""
+Unit tests for the NATS service.
+
+This module tests JetStream publishing with pipelined acks and a bounded
+in-flight window, core NATS publishing and batched pull consumers against
+an in-process fake of the nats-py client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from app.config import NATSSettings, RedisSettings
+from app.core.exceptions import MessageQueueError
+from app.services import nats_service
+from app.services.event_codec import decode_envelope
+from app.services.nats_service import NATSService, subject_matches
+from app.services.tiered_cache import CACHE_INVALIDATE_SUBJECT, TieredCache
+
+
+class _FakeMessage:
+    def __init__(self, subject, data):
+        self.subject = subject
+        self.data = data
+        self.acked = False
+        self.naked = False
+
+    async def ack(self):
+        self.acked = True
+
+    async def nak(self):
+        self.naked = True
+
+
+class _FakePullSubscription:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.fetches = []
+
+    async def fetch(self, batch, timeout=None):
+        self.fetches.append(batch)
+        if not self.batches:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        return self.batches.pop(0)
+
+
+class _FakeJetStream:
+    def __init__(self, ack_delay=0.0, fail_subjects=()):
+        self.ack_delay = ack_delay
+        self.fail_subjects = set(fail_subjects)
+        self.streams = {}
+        self.published = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.pull_subscriptions = []
+        self.batches = []
+        self.consumers = {}
+        self.consumer_updates = []
+
+    async def stream_info(self, name):
+        if name not in self.streams:
+            raise nats_service.NotFoundError()
+        return SimpleNamespace(config=SimpleNamespace(subjects=self.streams[name]))
+
+    async def add_stream(self, name, subjects):
+        self.streams[name] = subjects
+
+    async def publish(self, subject, payload, timeout=None, stream=None, headers=None):
+        self.published.append((subject, payload))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.ack_delay)
+        finally:
+            self.in_flight -= 1
+        if subject in self.fail_subjects:
+            raise nats_service.NATSTimeoutError()
+        return SimpleNamespace(stream=stream, seq=len(self.published))
+
+    async def consumer_info(self, stream, durable):
+        if durable not in self.consumers:
+            raise nats_service.NotFoundError()
+        return SimpleNamespace(config=self.consumers[durable])
+
+    async def add_consumer(self, stream, config=None):
+        self.consumer_updates.append(config)
+
+    async def pull_subscribe(self, subject, durable=None, stream=None, config=None):
+        subscription = _FakePullSubscription(self.batches)
+        self.pull_subscriptions.append((subject, durable, config, subscription))
+        return subscription
+
+
+class _FakeClient:
+    def __init__(self, js):
+        self.js = js
+        self.is_connected = True
+        self.is_closed = False
+        self.published = []
+        self.subscriptions = []
+        self.drained = False
+        self._server_info = {"server_id": "NFAKE", "server_name": "fake", "version": "2.10.0", "max_payload": 1048576}
+
+    def jetstream(self, timeout=None):
+        return self.js
+
+    async def publish(self, subject, payload, headers=None):
+        self.published.append((subject, payload))
+
+    async def subscribe(self, subject, queue="", cb=None):
+        self.subscriptions.append((subject, queue, cb))
+
+    async def flush(self):
+        pass
+
+    async def drain(self):
+        self.drained = True
+        self.is_closed = True
+
+
+@pytest.fixture
+def fake_nats(monkeypatch):
+    js = _FakeJetStream()
+    client = _FakeClient(js)
+    connections = []
+
+    async def connect(**kwargs):
+        connections.append(kwargs)
+        return client
+
+    monkeypatch.setattr(nats_service.nats, "connect", connect)
+    return SimpleNamespace(js=js, client=client, connections=connections)
+
+
+async def _service(**settings):
+    service = NATSService(NATSSettings(**settings))
+    await service.initialize()
+    return service
+
+
+@pytest.mark.unit
+def test_subject_matches_wildcards():
+    assert subject_matches("audit.>", "audit.events.tenant-1")
+    assert not subject_matches("audit.>", "audit")
+    assert subject_matches("audit.*.x", "audit.events.x")
+    assert not subject_matches("audit.*", "audit.events.tenant-1")
+    assert not subject_matches("audit.>", "cache.invalidate")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_initialize_connects_once_and_creates_the_stream(fake_nats):
+    await _service(reconnect_buffer_bytes=1024)
+
+    assert fake_nats.connections[0]["pending_size"] == 1024
+    assert fake_nats.js.streams == {"AUDIT": ["audit.events.>", "audit.batch.>"]}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stream_publishes_pipeline_acks_within_the_window(fake_nats):
+    fake_nats.js.ack_delay = 0.01
+    service = await _service(max_in_flight=8)
+
+    tasks = [await service.publish(f"audit.events.t{i % 3}", {"index": i}) for i in range(40)]
+    assert service.in_flight > 0
+    await service.flush()
+
+    assert fake_nats.js.peak_in_flight == 8
+    assert service.in_flight == 0
+    assert [decode_envelope(payload)["index"] for _, payload in fake_nats.js.published] == list(range(40))
+    assert all(task.result().seq for task in tasks)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_core_subjects_bypass_jetstream(fake_nats):
+    service = await _service()
+
+    result = await service.publish("cache.invalidate", {"id": UUID(int=1)})
+
+    assert result is None
+    assert fake_nats.js.published == []
+    ((subject, payload),) = fake_nats.client.published
+    assert subject == "cache.invalidate"
+    assert decode_envelope(payload) == {"id": UUID(int=1)}
+    assert service.get_server_info()["server_id"] == "NFAKE"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publish_batch_reports_unacknowledged_messages(fake_nats):
+    fake_nats.js.fail_subjects = {"audit.events.bad"}
+    service = await _service()
+
+    acks = await service.publish_batch([("audit.events.a", b"1"), ("health.check", b"2")])
+    assert acks[0].seq == 1 and acks[1] is None
+
+    with pytest.raises(MessageQueueError):
+        await service.publish_batch([("audit.events.a", b"1"), ("audit.events.bad", b"2")])
+    assert service.in_flight == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stream_subscriptions_fetch_batches_from_a_durable_pull_consumer(fake_nats):
+    first = [_FakeMessage("audit.events.t1", b"1"), _FakeMessage("audit.events.t1", b"2")]
+    second = [_FakeMessage("audit.events.t2", b"boom")]
+    fake_nats.js.batches = [first, second]
+    service = await _service(fetch_batch_size=2, fetch_timeout_seconds=0.01)
+    handled = []
+
+    async def handle(message):
+        if message.data == b"boom":
+            raise ValueError("bad message")
+        handled.append(message.data)
+        await message.ack()
+
+    await service.subscribe("audit.events.*", handle, queue="audit-workers")
+    await service.subscribe("cache.invalidate", handle)
+    await asyncio.sleep(0.05)
+    await service.close()
+
+    subject, durable, config, subscription = fake_nats.js.pull_subscriptions[0]
+    assert (subject, durable, config.ack_wait) == ("audit.events.*", "audit-workers", 30)
+    assert subscription.fetches[:2] == [2, 2]
+    assert handled == [b"1", b"2"] and all(message.acked for message in first)
+    assert second[0].naked
+    assert fake_nats.client.subscriptions[0][:2] == ("cache.invalidate", "")
+    assert fake_nats.client.drained
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stream_subjects_need_a_durable_consumer_name(fake_nats):
+    service = await _service()
+
+    async def handle(message):
+        pass
+
+    with pytest.raises(MessageQueueError):
+        await service.subscribe("audit.events.*", handle)
+    assert fake_nats.js.pull_subscriptions == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cache_invalidations_fan_out_over_core_nats(fake_nats):
+    service = await _service()
+    settings = RedisSettings(invalidation_coalesce_ms=0)
+    pods = [TieredCache(MagicMock(), settings, service) for _ in range(2)]
+    for pod in pods:
+        await pod.start()
+
+    # Every pod has its own plain subscription; nothing goes through the stream
+    assert not service.is_stream_subject(CACHE_INVALIDATE_SUBJECT)
+    assert fake_nats.js.pull_subscriptions == []
+    assert [(subject, queue) for subject, queue, _ in fake_nats.client.subscriptions] == [
+        (CACHE_INVALIDATE_SUBJECT, ""),
+        (CACHE_INVALIDATE_SUBJECT, ""),
+    ]
+
+    pods[1].local.set("key", "stale", "tenant-1")
+    await pods[0]._broadcast("tenant-1")
+    assert fake_nats.js.published == []
+    ((subject, payload),) = fake_nats.client.published
+    for _, _, callback in fake_nats.client.subscriptions:
+        await callback(_FakeMessage(subject, payload))
+
+    assert len(pods[1].local) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_changed_limits_are_applied_to_existing_consumers(fake_nats):
+    fake_nats.js.consumers["audit-workers"] = nats_service.ConsumerConfig(
+        durable_name="audit-workers", ack_wait=30, max_deliver=5, max_ack_pending=1000
+    )
+    service = await _service(fetch_timeout_seconds=0.01)
+
+    async def handle(message):
+        await message.ack()
+
+    await service.subscribe("audit.events.*", handle, queue="audit-workers", max_ack_pending=50100)
+    await service.subscribe("audit.batch.*", handle, queue="audit-batch-workers")
+    await service.close()
+
+    (updated,) = fake_nats.js.consumer_updates
+    assert (updated.durable_name, updated.max_ack_pending) == ("audit-workers", 50100)
+    assert fake_nats.js.pull_subscriptions[0][2].max_ack_pending == 50100
+    assert fake_nats.js.pull_subscriptions[1][2].max_ack_pending == 1000
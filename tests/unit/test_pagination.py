@@ -0,0 +1,93 @@
+"""
+Unit tests for keyset pagination.
+
+This module tests cursor encoding, the keyset predicate applied by the
+audit service and planner-based row count estimates.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationError
+from app.db.database import Explain, estimate_row_count
+from app.db.schemas import AuditLog
+from app.models.base import SortOrder
+from app.services.audit_service import AuditService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+def test_cursor_round_trips():
+    timestamp = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    audit_id = uuid4()
+
+    cursor = encode_cursor(timestamp, audit_id, "asc")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "asc") == (timestamp, audit_id)
+
+
+@pytest.mark.unit
+def test_cursor_rejects_other_sort_order():
+    cursor = encode_cursor(datetime.now(timezone.utc), uuid4(), "desc")
+
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, "asc")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "e30"])
+def test_cursor_rejects_malformed_input(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.unit
+def test_keyset_predicate_orders_by_timestamp_and_audit_id():
+    service = AuditService.__new__(AuditService)
+    cursor = encode_cursor(datetime.now(timezone.utc), uuid4(), "desc")
+
+    stmt = select(AuditLog).where(AuditLog.tenant_id == "tenant-1")
+    stmt = service._apply_sorting(stmt, "timestamp", SortOrder.DESC)
+    stmt = service._apply_keyset(stmt, cursor, SortOrder.DESC)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "OFFSET" not in sql
+    assert "(audit_logs.timestamp, audit_logs.audit_id) <" in sql
+    assert "ORDER BY audit_logs.timestamp DESC, audit_logs.audit_id DESC" in sql
+
+
+@pytest.mark.unit
+def test_explain_wraps_statement():
+    stmt = select(AuditLog).where(AuditLog.tenant_id == "tenant-1")
+    sql = str(Explain(stmt).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_estimate_row_count_reads_plan_rows():
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    result = MagicMock()
+    result.scalar.return_value = '[{"Plan": {"Plan Rows": 1234}}]'
+    session.execute = AsyncMock(return_value=result)
+
+    assert await estimate_row_count(session, select(AuditLog)) == 1234
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_estimate_row_count_skips_other_databases():
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "sqlite"
+    session.execute = AsyncMock()
+
+    assert await estimate_row_count(session, select(AuditLog)) is None
+    session.execute.assert_not_called()
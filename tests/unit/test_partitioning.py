@@ -0,0 +1,221 @@
+"""
+Unit tests for audit_logs range partitioning.
+
+This module tests partition range arithmetic, bound parsing, creation of
+upcoming partitions, partition drops and partition pruning predicates.
+"""
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.config import PartitionSettings
+from app.db.partitioning import (
+    DAILY,
+    MONTHLY,
+    PartitionManager,
+    next_partition_start,
+    parse_partition_bound,
+    partition_name,
+    partition_start,
+)
+from app.db.schemas import AuditLog
+from app.models.audit import AuditEventQuery
+from app.services.audit_service import AuditService
+
+
+def _catalog(session, partitions, partitioned=True, has_rows=False):
+    """Answer the catalog queries with ``partitions`` as (name, bound) pairs."""
+
+    def respond(sql, stmt, result):
+        if "relkind" in sql:
+            result.scalar.return_value = partitioned
+        elif "pg_inherits" in sql:
+            result.__iter__.return_value = iter([
+                SimpleNamespace(name=name, bound=bound) for name, bound in partitions
+            ])
+        else:
+            result.first.return_value = (1,) if has_rows else None
+
+    session.respond = respond
+
+
+def _manager(db_manager, **settings):
+    return PartitionManager(PartitionSettings(**settings), db_manager=db_manager)
+
+
+@pytest.mark.unit
+def test_partition_ranges_and_names():
+    assert partition_start(date(2025, 8, 17), MONTHLY) == date(2025, 8, 1)
+    assert next_partition_start(date(2025, 12, 1), MONTHLY) == date(2026, 1, 1)
+    assert next_partition_start(date(2025, 2, 28), DAILY) == date(2025, 3, 1)
+    assert partition_name(date(2025, 8, 1), MONTHLY) == "audit_logs_2025_08"
+    assert partition_name(date(2025, 8, 17), DAILY) == "audit_logs_2025_08_17"
+
+
+@pytest.mark.unit
+def test_partition_bounds_are_parsed():
+    monthly = parse_partition_bound(
+        "audit_logs_2025_08", "FOR VALUES FROM ('2025-08-01') TO ('2025-09-01')"
+    )
+    legacy = parse_partition_bound("audit_logs_legacy", "FOR VALUES FROM (MINVALUE) TO ('2025-08-01')")
+    default = parse_partition_bound("audit_logs_default", "DEFAULT")
+
+    assert (monthly.start, monthly.end) == (date(2025, 8, 1), date(2025, 9, 1))
+    assert legacy.start is None and legacy.end == date(2025, 8, 1)
+    assert default.is_default and not default.overlaps(date(2025, 1, 1), date(2026, 1, 1))
+    assert legacy.overlaps(date(2025, 7, 31), date(2025, 8, 1))
+    assert not legacy.overlaps(date(2025, 8, 1), date(2025, 8, 2))
+
+
+@pytest.mark.unit
+def test_planned_ranges_cover_current_and_upcoming():
+    manager = PartitionManager(PartitionSettings(granularity="daily", premake=2))
+
+    ranges = manager.planned_ranges(date(2025, 12, 31))
+
+    assert [r.name for r in ranges] == ["audit_logs_2025_12_31", "audit_logs_2026_01_01", "audit_logs_2026_01_02"]
+
+
+@pytest.mark.unit
+def test_invalid_granularity_is_rejected():
+    with pytest.raises(ValueError):
+        PartitionSettings(granularity="weekly")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ensure_creates_missing_partitions_and_default(fake_session, fake_db_manager):
+    _catalog(fake_session, [
+        ("audit_logs_2025_08", "FOR VALUES FROM ('2025-08-01') TO ('2025-09-01')"),
+    ])
+    manager = _manager(fake_db_manager, premake=2)
+
+    created = await manager.ensure_partitions(today=date(2025, 8, 20))
+
+    assert created == ["audit_logs_2025_09", "audit_logs_2025_10", "audit_logs_default"]
+    assert fake_session.executed("PARTITION OF audit_logs FOR VALUES FROM ('2025-09-01') TO ('2025-10-01')")
+    assert len(fake_session.executed("INSERT INTO audit_log_partitions")) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ensure_moves_default_partition_rows_into_the_new_partition(fake_session, fake_db_manager):
+    _catalog(
+        fake_session,
+        [
+            ("audit_logs_2025_08", "FOR VALUES FROM ('2025-08-01') TO ('2025-09-01')"),
+            ("audit_logs_default", "DEFAULT"),
+        ],
+        has_rows=True,
+    )
+
+    created = await _manager(fake_db_manager, premake=1).ensure_partitions(today=date(2025, 8, 20))
+
+    assert created == ["audit_logs_2025_09"]
+    probe = fake_session.executed("SELECT 1 FROM audit_logs_default")[0]
+    assert "partition_date >= '2025-09-01' AND partition_date < '2025-10-01'" in probe
+    steps = [
+        "DETACH PARTITION audit_logs_default",
+        "CREATE TABLE audit_logs_2025_09 PARTITION OF audit_logs",
+        "INSERT INTO audit_logs_2025_09 SELECT * FROM audit_logs_default",
+        "DELETE FROM audit_logs_default",
+        "ATTACH PARTITION audit_logs_default DEFAULT",
+    ]
+    positions = [
+        next(i for i, sql in enumerate(fake_session.statements) if step in sql) for step in steps
+    ]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ensure_creates_directly_when_the_default_partition_has_no_rows_in_range(
+    fake_session, fake_db_manager
+):
+    _catalog(fake_session, [("audit_logs_default", "DEFAULT")])
+
+    created = await _manager(fake_db_manager, premake=0).ensure_partitions(today=date(2025, 8, 20))
+
+    assert created == ["audit_logs_2025_08"]
+    assert fake_session.executed("CREATE TABLE IF NOT EXISTS audit_logs_2025_08 PARTITION OF audit_logs")
+    assert not fake_session.executed("DETACH PARTITION")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ensure_skips_ranges_covered_by_other_granularity(fake_session, fake_db_manager):
+    _catalog(fake_session, [
+        ("audit_logs_2025_08", "FOR VALUES FROM ('2025-08-01') TO ('2025-09-01')"),
+        ("audit_logs_default", "DEFAULT"),
+    ])
+    manager = _manager(fake_db_manager, granularity="daily", premake=1)
+
+    assert await manager.ensure_partitions(today=date(2025, 8, 20)) == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ensure_is_a_no_op_on_unpartitioned_tables(fake_session, fake_db_manager):
+    _catalog(fake_session, [], partitioned=False)
+
+    assert await _manager(fake_db_manager).ensure_partitions(today=date(2025, 8, 20)) == []
+    assert not fake_session.executed("CREATE TABLE")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_drop_detaches_only_expired_partitions(fake_session, fake_db_manager):
+    _catalog(fake_session, [
+        ("audit_logs_legacy", "FOR VALUES FROM (MINVALUE) TO ('2025-06-01')"),
+        ("audit_logs_2025_06", "FOR VALUES FROM ('2025-06-01') TO ('2025-07-01')"),
+        ("audit_logs_2025_07", "FOR VALUES FROM ('2025-07-01') TO ('2025-08-01')"),
+        ("audit_logs_default", "DEFAULT"),
+    ])
+
+    dropped = await _manager(fake_db_manager).drop_partitions_before(date(2025, 7, 15))
+
+    assert dropped == ["audit_logs_legacy", "audit_logs_2025_06"]
+    assert fake_session.executed("DETACH PARTITION audit_logs_2025_06")
+    assert fake_session.executed("DROP TABLE audit_logs_legacy")
+    assert not fake_session.executed("audit_logs_2025_07")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_drop_keeps_partitions_with_retained_rows(fake_session, fake_db_manager):
+    _catalog(
+        fake_session,
+        [("audit_logs_2025_06", "FOR VALUES FROM ('2025-06-01') TO ('2025-07-01')")],
+        has_rows=True,
+    )
+
+    dropped = await _manager(fake_db_manager).drop_partitions_before(
+        date(2025, 8, 1), keep_if=AuditLog.event_type.in_(["login"])
+    )
+
+    assert dropped == []
+    assert not fake_session.executed("DROP TABLE")
+    probe = fake_session.executed("FROM audit_logs")[-1]
+    assert "audit_logs.partition_date >= " in probe and "audit_logs.partition_date < " in probe
+
+
+@pytest.mark.unit
+def test_time_filters_prune_by_partition_date():
+    service = AuditService.__new__(AuditService)
+    query = AuditEventQuery(
+        start_time=datetime(2025, 8, 1, 23, 30, tzinfo=timezone.utc),
+        end_time=datetime(2025, 8, 3, 1, 0, tzinfo=timezone.utc),
+    )
+
+    stmt = service._apply_filters(select(AuditLog), query)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+
+    sql = str(compiled)
+    assert "audit_logs.partition_date >= " in sql
+    assert "audit_logs.partition_date <= " in sql
+    assert date(2025, 8, 1) in compiled.params.values()
+    assert date(2025, 8, 3) in compiled.params.values()
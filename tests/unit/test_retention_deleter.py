@@ -0,0 +1,184 @@
+"""
+Unit tests for chunked retention deletes.
+
+This module tests key-ordered chunking, checkpointing and resumption, the
+time budget, per-row expiry and its backfill, and the retention cleanup
+metrics.
+"""
+
+import uuid
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import RetentionSettings
+from app.db.schemas import AuditLog
+from app.services.retention_deleter import ChunkedRetentionDeleter, expired_condition
+from app.utils.metrics import audit_metrics
+
+CUTOFF = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _keys(count, day=date(2024, 12, 1)):
+    return sorted((day, uuid.uuid4()) for _ in range(count))
+
+
+def _script(session, chunks, checkpoint=None):
+    """Serve ``chunks`` of keys, one per key SELECT, and a saved checkpoint."""
+    chunks = list(chunks)
+    current = []
+
+    def respond(sql, stmt, result):
+        nonlocal current
+        if sql.startswith("SELECT retention_checkpoints"):
+            result.first.return_value = checkpoint
+        elif sql.startswith("SELECT audit_logs.partition_date"):
+            current = chunks.pop(0) if chunks else []
+            result.all.return_value = current
+        elif sql.startswith(("DELETE FROM audit_logs", "UPDATE audit_logs")):
+            result.rowcount = len(current)
+
+    session.respond = respond
+
+
+def _deleter(db_manager, **settings):
+    settings.setdefault("delete_chunk_sleep_ms", 0)
+    return ChunkedRetentionDeleter(RetentionSettings(**settings), db_manager=db_manager)
+
+
+@pytest.mark.unit
+def test_expired_condition_bounds_partition_date():
+    sql = str(expired_condition(CUTOFF, [AuditLog.event_type.in_(["login"])]).compile(
+        dialect=postgresql.dialect()
+    ))
+
+    assert "audit_logs.partition_date <= " in sql
+    assert "audit_logs.created_at < " in sql
+    assert "audit_logs.event_type IN" in sql
+
+
+@pytest.mark.unit
+def test_chunk_order_is_served_by_an_index():
+    indexed = [tuple(column.name for column in index.columns) for index in AuditLog.__table__.indexes]
+
+    assert ("partition_date", "audit_id") in indexed
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_deletes_in_key_ordered_chunks_with_checkpoints(fake_session, fake_db_manager):
+    first, second, last = _keys(3), _keys(3), _keys(1)
+    _script(fake_session, [first, second, last])
+
+    result = await _deleter(fake_db_manager, delete_chunk_size=3).delete_expired("default", CUTOFF)
+
+    assert (result.rows, result.chunks, result.completed) == (7, 3, True)
+    assert fake_session.commits == 3
+
+    select_sql, select_params = fake_session.executed_with_params("SELECT audit_logs.partition_date")[1]
+    assert "ORDER BY audit_logs.partition_date, audit_logs.audit_id" in select_sql
+    assert "LIMIT" in select_sql and 3 in select_params.values()
+    assert "(audit_logs.partition_date, audit_logs.audit_id) > " in select_sql
+    assert first[-1][1] in select_params.values()
+
+    delete_sql, delete_params = fake_session.executed_with_params("DELETE FROM audit_logs")[1]
+    assert "(audit_logs.partition_date, audit_logs.audit_id) <= " in delete_sql
+    assert second[-1][1] in delete_params.values()
+
+    saved = fake_session.executed("INSERT INTO retention_checkpoints")
+    assert len(saved) == 2
+    assert "ON CONFLICT (policy_name) DO UPDATE" in saved[0]
+    assert len(fake_session.executed("DELETE FROM retention_checkpoints")) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_resumes_after_the_checkpointed_key(fake_session, fake_db_manager):
+    checkpoint = (date(2024, 11, 30), uuid.uuid4())
+    _script(fake_session, [_keys(2)], checkpoint=checkpoint)
+
+    result = await _deleter(fake_db_manager, delete_chunk_size=5).delete_expired("default", CUTOFF)
+
+    select_sql, select_params = fake_session.executed_with_params("SELECT audit_logs.partition_date")[0]
+    assert "(audit_logs.partition_date, audit_logs.audit_id) > " in select_sql
+    assert checkpoint[1] in select_params.values()
+    assert result.rows == 2
+    assert fake_session.executed("DELETE FROM retention_checkpoints")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_time_budget_pauses_and_keeps_the_checkpoint(fake_session, fake_db_manager):
+    _script(fake_session, [_keys(2), _keys(2), _keys(2)])
+    deleter = _deleter(
+        fake_db_manager, delete_chunk_size=2, delete_chunk_sleep_ms=5, delete_time_budget_seconds=0.001
+    )
+
+    result = await deleter.delete_expired("default", CUTOFF)
+
+    assert (result.rows, result.chunks, result.completed) == (2, 1, False)
+    assert fake_session.executed("INSERT INTO retention_checkpoints")
+    assert not fake_session.executed("DELETE FROM retention_checkpoints")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_nothing_expired_commits_no_deletes(fake_session, fake_db_manager):
+    _script(fake_session, [])
+
+    result = await _deleter(fake_db_manager).delete_expired("default", CUTOFF)
+
+    assert (result.rows, result.chunks, result.completed) == (0, 0, True)
+    assert not fake_session.executed("DELETE FROM audit_logs")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_row_expiry_reads_chunks_from_the_expires_at_index(fake_session, fake_db_manager):
+    _script(fake_session, [_keys(2), _keys(1)])
+
+    result = await _deleter(fake_db_manager, delete_chunk_size=2).delete_past_expiry(now=CUTOFF)
+
+    assert (result.rows, result.chunks, result.completed) == (3, 2, True)
+    select_sql, select_params = fake_session.executed_with_params("SELECT audit_logs.partition_date")[0]
+    assert "WHERE audit_logs.expires_at <= " in select_sql
+    assert "ORDER BY audit_logs.expires_at" in select_sql
+    delete_sql = fake_session.executed("DELETE FROM audit_logs")[0]
+    assert "(audit_logs.partition_date, audit_logs.audit_id) IN " in delete_sql
+    assert not fake_session.executed("INSERT INTO retention_checkpoints")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_backfill_fills_missing_expiry_in_key_ranges(fake_session, fake_db_manager):
+    first = _keys(2)
+    _script(fake_session, [first, _keys(1)])
+
+    result = await _deleter(fake_db_manager, delete_chunk_size=2).backfill_expires_at()
+
+    assert (result.rows, result.chunks, result.completed) == (3, 2, True)
+    select_sql = fake_session.executed("SELECT audit_logs.partition_date")[0]
+    assert "audit_logs.expires_at IS NULL" in select_sql
+    update_sql, update_params = fake_session.executed_with_params("UPDATE audit_logs")[1]
+    assert "expires_at=(audit_logs.timestamp + make_interval(" in update_sql
+    assert "audit_logs.expires_at IS NULL" in update_sql
+    assert first[-1][1] in update_params.values()
+    assert not fake_session.executed("DELETE FROM audit_logs")
+
+
+@pytest.mark.unit
+def test_orm_inserts_default_expires_at_from_retention_period():
+    timestamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    context = MagicMock()
+    context.get_current_parameters.return_value = {"timestamp": timestamp, "retention_period_days": 30}
+
+    assert AuditLog.__table__.c.expires_at.default.arg(context) == datetime(2025, 1, 31, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+def test_cleanup_run_reports_delete_throughput():
+    audit_metrics.record_cleanup_run(deleted=1000, archived=0, duration=4.0, errors=0)
+
+    assert audit_metrics.retention_delete_rate._value.get() == 250.0
@@ -0,0 +1,166 @@
+"""
+Unit tests for the retention estimator.
+
+This module tests the sampling error bounds, the single TABLESAMPLE pass
+over all conditions and the cached background exact counts.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import RetentionSettings
+from app.db.schemas import AuditLog
+from app.services.retention_estimator import (
+    Estimate,
+    RetentionEstimator,
+    TableStats,
+    estimate_from_sample,
+    sample_percent,
+    wilson_interval,
+)
+
+CUTOFF = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+CONDITIONS = {
+    "old": AuditLog.created_at < CUTOFF,
+    "logins": AuditLog.event_type == "user.login",
+}
+
+
+class _Page(tuple):
+    @property
+    def rows(self):
+        return self[2]
+
+
+def _estimator(session, db_manager, rows, **settings):
+    """Estimator whose queries all return ``rows``."""
+
+    def respond(sql, stmt, result):
+        result.all.return_value = rows
+        result.one.return_value = rows[0] if rows else None
+
+    session.respond = respond
+    return RetentionEstimator(RetentionSettings(**settings), db_manager=db_manager)
+
+
+@pytest.mark.unit
+def test_wilson_interval_bounds_rare_events():
+    low, high = wilson_interval(0, 1000)
+    assert low == 0.0
+    assert 0 < high < 0.01
+
+    low, high = wilson_interval(500, 1000)
+    assert low < 0.5 < high
+    assert high - 0.5 == pytest.approx(0.5 - low)
+
+
+@pytest.mark.unit
+def test_clustered_matches_widen_the_interval():
+    # 20% of the sample matches either spread over every page or packed
+    # into a fifth of the pages
+    spread = estimate_from_sample([(100, 20)] * 50, total=1_000_000, total_error=0)
+    packed = estimate_from_sample([(100, 100)] * 10 + [(100, 0)] * 40, total=1_000_000, total_error=0)
+
+    assert spread.value == packed.value == 200_000
+    assert spread.lower < spread.value < spread.upper
+    assert packed.upper - packed.lower > 3 * (spread.upper - spread.lower)
+
+
+@pytest.mark.unit
+def test_table_size_error_widens_the_bounds():
+    exact_size = estimate_from_sample([(100, 20)] * 50, total=1_000_000, total_error=0)
+    drifted = estimate_from_sample([(100, 20)] * 50, total=1_000_000, total_error=100_000)
+
+    assert drifted.value == exact_size.value
+    assert drifted.lower < exact_size.lower and drifted.upper > exact_size.upper
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_large_tables_are_estimated_from_one_sample_pass(fake_session, fake_db_manager):
+    # (relid, block, rows, rows matching "old", rows matching "logins")
+    pages = [_Page((1, block, 100, 50, 10)) for block in range(40)]
+    estimator = _estimator(fake_session, fake_db_manager, pages, estimate_sample_rows=4000)
+
+    estimates = await estimator.estimate(CONDITIONS, TableStats(rows=1_000_000, drift=0, bytes=0))
+
+    assert len(fake_session.statements) == 1
+    sql = fake_session.statements[0]
+    assert "FROM audit_logs AS sample TABLESAMPLE system(" in sql and "REPEATABLE (0)" in sql
+    assert "count(*) FILTER (WHERE sample.created_at < " in sql
+    assert "GROUP BY sample.tableoid, (sample.ctid::text::point)[0]" in sql
+    assert estimates["old"].value == 500_000 and estimates["old"].source == "tablesample"
+    assert estimates["logins"].value == 100_000
+    assert estimates["logins"].lower < 100_000 < estimates["logins"].upper
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_small_tables_are_counted_exactly(fake_session, fake_db_manager):
+    estimator = _estimator(fake_session, fake_db_manager, [(7, 3)], estimate_sample_rows=1000)
+
+    estimates = await estimator.estimate(CONDITIONS, TableStats(rows=900, drift=50, bytes=0))
+
+    assert "TABLESAMPLE" not in fake_session.statements[0]
+    assert (estimates["old"].value, estimates["old"].lower, estimates["old"].upper) == (7, 7, 7)
+    assert estimates["logins"].source == "exact"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_never_analyzed_tables_are_sampled_by_their_live_tuples(fake_session, fake_db_manager):
+    pages = [_Page((1, block, 100, 50, 10)) for block in range(40)]
+    estimator = _estimator(fake_session, fake_db_manager, pages, estimate_sample_rows=4000)
+
+    # reltuples is -1 (clamped to 0) until the first ANALYZE
+    estimates = await estimator.estimate(
+        CONDITIONS, TableStats(rows=0, drift=5000, bytes=8192, live=1_000_000)
+    )
+
+    assert "TABLESAMPLE system(" in fake_session.statements[0]
+    assert estimates["old"].value == 500_000 and estimates["old"].source == "tablesample"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tables_without_statistics_are_not_scanned(fake_session, fake_db_manager):
+    estimator = _estimator(fake_session, fake_db_manager, [(7, 3)], estimate_sample_rows=1000)
+
+    estimates = await estimator.estimate(CONDITIONS, TableStats(rows=0, drift=0, bytes=8192))
+
+    assert fake_session.statements == []
+    assert estimates["old"] == Estimate(0, 0, None, "unbounded")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sample_percentage_stays_within_bounds(fake_session, fake_db_manager):
+    assert sample_percent(4000, TableStats(rows=3000, drift=2000, bytes=0)) == 80.0
+    assert sample_percent(4000, TableStats(rows=1000, drift=0, bytes=0)) == 100.0
+
+    pages = [_Page((1, block, 100, 50, 10)) for block in range(30)]
+    estimator = _estimator(fake_session, fake_db_manager, pages, estimate_sample_rows=4000)
+    estimates = await estimator.estimate(CONDITIONS, TableStats(rows=3000, drift=2000, bytes=0))
+
+    assert "TABLESAMPLE system(" in fake_session.statements[0]
+    assert estimates["old"].source == "tablesample"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_exact_counts_run_in_the_background_and_expire(fake_session, fake_db_manager):
+    estimator = _estimator(fake_session, fake_db_manager, [(11, 2)], exact_stats_ttl_seconds=60)
+
+    assert estimator.cached_exact("impact") is None
+    assert estimator.start_exact_job("impact", CONDITIONS)
+    assert not estimator.start_exact_job("impact", CONDITIONS)
+    await estimator._jobs["impact"]
+
+    cached = estimator.cached_exact("impact")
+    assert cached.counts == {"old": 11, "logins": 2}
+    assert "TABLESAMPLE" not in fake_session.statements[0]
+
+    cached.computed_at -= timedelta(seconds=61)
+    assert estimator.cached_exact("impact") is None
@@ -0,0 +1,214 @@
+"""
+Unit tests for the retention cleanup run.
+
+This module tests that every policy is archived before any row is deleted,
+the precedence between per-row expiry and policy retention and that a run
+stops at its time budget.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList, Grouping, UnaryExpression
+
+from app.db.schemas import AuditLog
+from app.services import retention_service
+from app.services.retention_deleter import ChunkRunResult
+from app.services.retention_estimator import TableStats
+from app.services.retention_service import RetentionPolicy, RetentionService
+
+NOW = datetime.now(timezone.utc)
+
+_COMPARISONS = {
+    operators.lt: lambda left, right: left < right,
+    operators.le: lambda left, right: left <= right,
+    operators.gt: lambda left, right: left > right,
+    operators.ge: lambda left, right: left >= right,
+    operators.eq: lambda left, right: left == right,
+    operators.in_op: lambda left, right: left in right,
+    operators.not_in_op: lambda left, right: left not in right,
+}
+
+
+def _evaluate(clause, row):
+    """Evaluate a retention condition against a row given as a dict."""
+    if isinstance(clause, Grouping):
+        return _evaluate(clause.element, row)
+    if isinstance(clause, BooleanClauseList):
+        values = [_evaluate(child, row) for child in clause.clauses]
+        return all(values) if clause.operator is operators.and_ else any(values)
+    if isinstance(clause, UnaryExpression) and clause.operator is operators.inv:
+        return not _evaluate(clause.element, row)
+    assert isinstance(clause, BinaryExpression), clause
+    left = row[clause.left.name]
+    if clause.operator is operators.is_:
+        return left is None
+    if left is None:
+        return None
+    return _COMPARISONS[clause.operator](left, clause.right.value)
+
+
+def _row(age_days, event_type="user.login", retention_period_days=90):
+    created_at = NOW - timedelta(days=age_days)
+    return {
+        "created_at": created_at,
+        "event_type": event_type,
+        "expires_at": created_at + timedelta(days=retention_period_days),
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    calls = []
+    service = RetentionService.__new__(RetentionService)
+    service.policies = [
+        RetentionPolicy("default", retention_days=365, archive_days=90),
+        RetentionPolicy("security", retention_days=2555, archive_days=365, conditions={"event_type": ["login"]}),
+    ]
+    service._cleanup_stats = {'last_run': None, 'total_deleted': 0, 'total_archived': 0, 'errors': 0}
+    service.bigquery_service = SimpleNamespace(is_available=lambda: False)
+    service.archived = {}
+    service.deadlines = []
+
+    async def archive(policy_name, start, end, conditions=(), deadline=None):
+        calls.append(("archive", policy_name))
+        service.deadlines.append(deadline)
+        service.archived[policy_name] = (start, end)
+        return SimpleNamespace(total_rows=1, run_id=f"{policy_name}-run")
+
+    service.archiver = MagicMock()
+    service.archiver.archive.side_effect = archive
+    service.archiver.archived_until = AsyncMock(
+        side_effect=lambda policy_name: service.archived.get(policy_name, (None, None))[1]
+    )
+
+    def recorded(name, result):
+        async def run(*args, **kwargs):
+            calls.append((name, args, kwargs))
+            return result
+        return run
+
+    service.deleter = MagicMock()
+    service.deleter.backfill_expires_at.side_effect = recorded("backfill", ChunkRunResult())
+    service.deleter.delete_past_expiry.side_effect = recorded("delete_past_expiry", ChunkRunResult())
+    service.deleter.delete_expired.side_effect = recorded("delete_expired", ChunkRunResult())
+
+    partitions = MagicMock()
+    partitions.drop_partitions_before.side_effect = recorded("drop_partitions", [])
+    monkeypatch.setattr(retention_service, "get_partition_manager", lambda: partitions)
+    rollups = MagicMock()
+    rollups.prune.side_effect = recorded("prune", 0)
+    monkeypatch.setattr(retention_service, "get_rollup_service", lambda: rollups)
+
+    service.calls = calls
+    return service
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_default_policy_row_is_archived_before_it_is_deleted(service):
+    row = _row(age_days=100)
+
+    result = await service.run_cleanup()
+
+    names = [call[0] for call in service.calls]
+    first_delete = min(names.index(name) for name in ("drop_partitions", "delete_past_expiry", "delete_expired"))
+    assert names[:2] == ["archive", "archive"]
+    assert max(i for i, name in enumerate(names) if name == "archive") < first_delete
+
+    start, end = service.archived["default"]
+    assert start <= row["created_at"] < end
+    assert result['policy_results']['default']['archived_count'] == 1
+
+    # Its own 90 days have passed, but the default policy keeps it for 365
+    _, (now, (deletable,)), _ = next(call for call in service.calls if call[0] == "delete_past_expiry")
+    assert row["expires_at"] <= now
+    assert not _evaluate(deletable, row)
+    retained = next(call for call in service.calls if call[0] == "drop_partitions")[2]["keep_if"]
+    assert _evaluate(retained, row)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rows_are_deleted_at_the_later_of_their_expiry_and_policy_retention(service):
+    await service.run_cleanup()
+    _, (now, (deletable,)), _ = next(call for call in service.calls if call[0] == "delete_past_expiry")
+
+    # Past the default retention and archived
+    assert _evaluate(deletable, _row(age_days=400))
+    # A security event is kept for the security policy's seven years
+    assert not _evaluate(deletable, _row(age_days=400, event_type="login"))
+    # A row asking for longer than its policies is kept until its own expiry
+    assert not _evaluate(deletable, _row(age_days=400, retention_period_days=1000))
+    # Rows without a backfilled expiry are kept
+    assert not _evaluate(deletable, dict(_row(age_days=400), expires_at=None))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_archival_resumes_where_it_stopped(service):
+    stopped = NOW - timedelta(days=500)
+    service.archived["default"] = (None, stopped)
+
+    await service.run_cleanup()
+
+    # Not at the retention cutoff, which would skip 135 days of rows
+    assert service.archived["default"][0] == stopped
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unarchived_rows_are_held_back_from_deletion(service):
+    stopped = NOW - timedelta(days=500)
+    service.archived["default"] = (None, stopped)
+    service.archiver.archive.side_effect = RuntimeError("archive storage unavailable")
+
+    result = await service.run_cleanup()
+
+    assert result['policy_results']['default']['errors']
+    delete = next(call for call in service.calls if call[0] == "delete_expired" and call[1][0] == "default")
+    assert delete[1][1] == stopped
+    _, (now, (deletable,)), _ = next(call for call in service.calls if call[0] == "delete_past_expiry")
+    assert not _evaluate(deletable, _row(age_days=450))
+    assert _evaluate(deletable, _row(age_days=600))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_missing_statistics_start_the_exact_count_in_the_background(service):
+    service.estimator = MagicMock()
+    service.estimator.cached_exact.return_value = None
+    service.estimator.estimate = AsyncMock(return_value={})
+    conditions = {"old": AuditLog.created_at < NOW}
+
+    _, estimation = await service._estimate_counts(
+        "cleanup_impact", conditions, TableStats(rows=0, drift=0, bytes=8192), exact=False
+    )
+
+    service.estimator.start_exact_job.assert_called_once_with("cleanup_impact", conditions)
+    assert estimation['exact_job'] == 'running'
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cleanup_stops_between_steps_once_its_budget_is_spent(service, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(retention_service, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    archive = service.archiver.archive.side_effect
+
+    async def slow_archive(*args, **kwargs):
+        clock[0] += 100.0
+        return await archive(*args, **kwargs)
+
+    service.archiver.archive.side_effect = slow_archive
+
+    result = await service.run_cleanup(time_budget=60.0)
+
+    assert [call[0] for call in service.calls] == ["archive"]
+    assert service.deadlines == [60.0]
+    assert result['stopped_before'] == "archive:security"
+    assert not result['errors']
+    assert service.deleter.deadline is None
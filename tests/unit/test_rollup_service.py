@@ -0,0 +1,218 @@
+"""
+Unit tests for metric rollups.
+
+This module tests bucketing, incremental upserts against an in-memory
+SQLite database, the background flush of ingested counts and the
+rollup-backed metric reads.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.config import RollupSettings
+from app.db.schemas import AuditEventRollup
+from app.models.audit import AuditEventCreate
+from app.services.audit_service import AuditService
+from app.services.ingestion_service import BulkAuditWriter, build_audit_rows
+from app.services.rollup_service import RollupService, truncate
+
+NOW = datetime(2025, 3, 4, 10, 30, 45, tzinfo=timezone.utc)
+
+
+def _rows(count, timestamp, event_type="user.login", tenant_id="tenant-1"):
+    events = [
+        AuditEventCreate(
+            event_type=event_type,
+            action="login",
+            tenant_id=tenant_id,
+            service_name="auth",
+        )
+        for _ in range(count)
+    ]
+    return build_audit_rows(events, tenant_id, now=timestamp)
+
+
+@pytest_asyncio.fixture
+async def db_manager():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(AuditEventRollup.__table__.create)
+    yield SimpleNamespace(get_session=async_sessionmaker(engine, expire_on_commit=False))
+    await engine.dispose()
+
+
+@pytest.fixture
+def rollups(db_manager):
+    return RollupService(RollupSettings(), db_manager=db_manager)
+
+
+async def _ingest(rollups, rows):
+    rollups.add(rows)
+    await rollups.flush()
+
+
+@pytest.mark.unit
+def test_truncate_floors_to_interval():
+    assert truncate(NOW, timedelta(minutes=1)) == datetime(2025, 3, 4, 10, 30, tzinfo=timezone.utc)
+    assert truncate(NOW, timedelta(minutes=15)) == datetime(2025, 3, 4, 10, 30, tzinfo=timezone.utc)
+    assert truncate(NOW, timedelta(days=1)) == datetime(2025, 3, 4, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rows_aggregate_per_granularity(db_manager, rollups):
+    await _ingest(rollups, _rows(3, NOW) + _rows(2, NOW + timedelta(minutes=1)))
+
+    async with db_manager.get_session() as session:
+        rollup_rows = (await session.execute(
+            select(AuditEventRollup.granularity, AuditEventRollup.event_count)
+            .order_by(AuditEventRollup.granularity, AuditEventRollup.bucket_start)
+        )).all()
+
+    assert [count for granularity, count in rollup_rows if granularity == "minute"] == [3, 2]
+    assert [count for granularity, count in rollup_rows if granularity == "hour"] == [5]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_increments_existing_buckets(db_manager, rollups):
+    await _ingest(rollups, _rows(3, NOW))
+    await _ingest(rollups, _rows(4, NOW + timedelta(seconds=5)))
+
+    async with db_manager.get_session() as session:
+        count = await session.scalar(select(func.count()).select_from(AuditEventRollup))
+        hour_total = await session.scalar(
+            select(AuditEventRollup.event_count).where(AuditEventRollup.granularity == "hour")
+        )
+
+    assert count == 2
+    assert hour_total == 7
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bulk_writer_leaves_rollups_out_of_the_ingest_transaction(db_manager, rollups):
+    writer = BulkAuditWriter(use_copy=False, rollups=rollups)
+    session = MagicMock()
+    executed = []
+
+    async def execute(stmt, params=None):
+        executed.append(stmt)
+
+    session.execute = execute
+    rows = _rows(2, NOW)
+
+    await writer.write(session, rows)
+    assert len(executed) == 1
+    assert rollups.pending == 0
+
+    writer.committed(rows)
+    assert rollups.pending == 2
+    assert await rollups.flush() == 2
+    assert rollups.pending == 0
+    assert (await rollups.get_totals("tenant-1", now=NOW))["total"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_merges_deltas_into_one_upsert(db_manager, rollups):
+    rollups.add(_rows(3, NOW))
+    rollups.add(_rows(4, NOW + timedelta(seconds=5)))
+
+    assert await rollups.flush() == 2
+    assert await rollups.flush() == 0
+    assert (await rollups.get_totals("tenant-1", now=NOW))["last_hour"] == 7
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_the_delta(db_manager, rollups):
+    rollups.add(_rows(3, NOW))
+    working = rollups._db_manager
+    rollups._db_manager = SimpleNamespace(get_session=MagicMock(side_effect=RuntimeError("database down")))
+
+    assert await rollups.flush() == 0
+    assert rollups.pending == 2
+
+    rollups._db_manager = working
+    rollups.add(_rows(1, NOW))
+    await rollups.stop()
+    assert rollups.pending == 0
+    assert (await rollups.get_totals("tenant-1", now=NOW))["total"] == 4
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_totals_cover_all_time_today_and_last_hour(db_manager, rollups):
+    await _ingest(rollups, _rows(5, NOW - timedelta(days=2)))
+    await _ingest(rollups, _rows(3, NOW - timedelta(hours=3)))
+    await _ingest(rollups, _rows(2, NOW - timedelta(minutes=10)))
+
+    totals = await rollups.get_totals("tenant-1", now=NOW)
+
+    assert totals == {"total": 10, "today": 5, "last_hour": 2}
+    assert await rollups.get_totals("tenant-2", now=NOW) == {"total": 0, "today": 0, "last_hour": 0}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_series_fills_empty_intervals(db_manager, rollups):
+    await _ingest(rollups, _rows(2, NOW - timedelta(minutes=20)))
+    await _ingest(rollups, _rows(1, NOW - timedelta(minutes=18)))
+    await _ingest(rollups, _rows(4, NOW - timedelta(minutes=1)))
+
+    series = await rollups.get_series("tenant-1", NOW - timedelta(hours=1), NOW, timedelta(minutes=15))
+
+    assert [count for _, count in series] == [0, 0, 3, 4, 0]
+    assert series[0][0] == datetime(2025, 3, 4, 9, 30, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_hourly_series_reads_hour_buckets(db_manager, rollups):
+    await _ingest(rollups, _rows(2, NOW - timedelta(hours=5)))
+    await _ingest(rollups, _rows(1, NOW))
+
+    series = await rollups.get_series("tenant-1", NOW - timedelta(hours=6), NOW, timedelta(hours=1))
+
+    assert len(series) == 7
+    assert sum(count for _, count in series) == 3
+    assert series[-1][1] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_top_event_types_report_percentages(db_manager, rollups):
+    await _ingest(rollups, _rows(6, NOW, event_type="user.login"))
+    await _ingest(rollups, _rows(3, NOW, event_type="data.read"))
+    await _ingest(rollups, _rows(1, NOW, event_type="data.write"))
+
+    service = AuditService.__new__(AuditService)
+    service.rollups = rollups
+    top = await service.get_top_event_types(limit=2, tenant_id="tenant-1")
+
+    assert [(item.event_type, item.count) for item in top] == [("user.login", 6), ("data.read", 3)]
+    assert top[0].percentage == pytest.approx(60.0)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prune_drops_expired_minute_buckets(db_manager, rollups):
+    await _ingest(rollups, _rows(2, NOW - timedelta(hours=72)))
+    await _ingest(rollups, _rows(1, NOW))
+
+    deleted = await rollups.prune(now=NOW)
+
+    assert deleted == 1
+    assert (await rollups.get_totals("tenant-1", now=NOW))["total"] == 3
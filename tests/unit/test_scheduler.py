@@ -0,0 +1,248 @@
+"""
+Unit tests for the background job scheduler.
+
+This module tests cron schedules, off-peak windows, the advisory lock
+leader lease, its check while a job runs and the persisted job history.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import SchedulerSettings
+from app.services.scheduler import CronSchedule, JobScheduler, ScheduledJob, TimeWindow
+
+NOW = datetime(2025, 3, 1, 2, 0, tzinfo=timezone.utc)  # a Saturday
+
+
+class _FakeSession:
+    def __init__(self, last_runs=()):
+        self.last_runs = list(last_runs)
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.statements.append((str(compiled), compiled.params))
+        result = MagicMock()
+        result.all.return_value = self.last_runs
+        return result
+
+    async def commit(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, acquired=True):
+        self.acquired = acquired
+        self.closed = False
+        self.broken = False
+        self.options = {}
+
+    async def execution_options(self, **options):
+        self.options.update(options)
+        return self
+
+    async def execute(self, stmt, params=None):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+        result = MagicMock()
+        result.scalar.return_value = self.acquired
+        return result
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeEngine:
+    def __init__(self, *acquired):
+        self.acquired = list(acquired)
+        self.connections = []
+
+    async def connect(self):
+        connection = _FakeConnection(self.acquired.pop(0) if self.acquired else True)
+        self.connections.append(connection)
+        return connection
+
+
+def _scheduler(jobs, engine=None, session=None):
+    session = session or _FakeSession()
+    engine = engine or _FakeEngine()
+    db_manager = SimpleNamespace(get_session=lambda: session, engine=engine)
+    return JobScheduler(SchedulerSettings(), db_manager, jobs), session, engine
+
+
+def _job(name, schedule="0 * * * *", window=None, result=None, error=None):
+    calls = []
+
+    async def run(budget):
+        calls.append(budget)
+        if error:
+            raise error
+        return result
+
+    job = ScheduledJob(name, CronSchedule.parse(schedule), run, TimeWindow.parse(window) if window else None)
+    return job, calls
+
+
+@pytest.mark.unit
+def test_cron_schedule_next_after():
+    assert CronSchedule.parse("0 2 * * *").next_after(NOW) == NOW + timedelta(days=1)
+    assert CronSchedule.parse("*/15 * * * *").next_after(NOW + timedelta(minutes=7)) == NOW + timedelta(minutes=15)
+    # Sunday at 01:00, written as both 0 and 7
+    assert CronSchedule.parse("0 1 * * 0").next_after(NOW) == datetime(2025, 3, 2, 1, 0, tzinfo=timezone.utc)
+    assert CronSchedule.parse("0 1 * * 7").weekdays == frozenset({0})
+    assert CronSchedule.parse("0 0 1 * *").next_after(NOW) == datetime(2025, 4, 1, tzinfo=timezone.utc)
+    assert CronSchedule.parse("30 9-17/4 * * 1-5").next_after(NOW) == datetime(2025, 3, 3, 9, 30, tzinfo=timezone.utc)
+
+    with pytest.raises(ValueError):
+        CronSchedule.parse("61 * * * *")
+    with pytest.raises(ValueError):
+        CronSchedule.parse("0 0 30 2 *").next_after(NOW)
+
+
+@pytest.mark.unit
+def test_time_window_wraps_midnight():
+    window = TimeWindow.parse("22:00-04:00")
+
+    assert window.contains(NOW)
+    assert not window.contains(NOW.replace(hour=12))
+    assert window.remaining(NOW) == 2 * 3600
+    assert window.remaining(NOW.replace(hour=23)) == 5 * 3600
+    assert TimeWindow.parse("") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_only_the_lease_holder_runs_jobs():
+    job, calls = _job("hourly")
+    scheduler, session, engine = _scheduler([job], engine=_FakeEngine(False))
+
+    assert await scheduler.tick(NOW) == []
+    assert not scheduler.is_leader
+    assert engine.connections[0].closed
+    assert calls == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_new_leader_resumes_from_history_and_records_runs():
+    job, calls = _job("hourly", result={"deleted": 3, "when": NOW})
+    # The last recorded run was three hours ago, so one run is overdue
+    session = _FakeSession(last_runs=[("hourly", NOW - timedelta(hours=3))])
+    scheduler, session, engine = _scheduler([job], session=session)
+
+    assert await scheduler.tick(NOW) == ["hourly"]
+    assert scheduler.is_leader
+    assert engine.connections[0].options == {"isolation_level": "AUTOCOMMIT"}
+    assert calls == [None]
+    assert job.next_run == NOW + timedelta(hours=1)
+
+    (_, _), (insert_sql, insert_params), (update_sql, update_params) = session.statements
+    assert insert_sql.startswith("INSERT INTO scheduled_job_runs")
+    assert insert_params["status"] == "running"
+    assert insert_params["scheduled_for"] == NOW - timedelta(hours=2)
+    assert update_sql.startswith("UPDATE scheduled_job_runs")
+    assert update_params["status"] == "completed"
+    assert update_params["result"] == {"deleted": 3, "when": str(NOW)}
+    assert update_params["duration_seconds"] >= 0
+
+    # Not due again within the hour
+    assert await scheduler.tick(NOW + timedelta(minutes=30)) == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_jobs_wait_for_their_window_and_get_its_remainder_as_budget():
+    windowed, windowed_calls = _job("nightly", window="03:00-05:00")
+    failing, _ = _job("failing", error=RuntimeError("disk full"))
+    session = _FakeSession(last_runs=[("nightly", NOW - timedelta(hours=1)), ("failing", NOW - timedelta(hours=1))])
+    scheduler, session, _ = _scheduler([windowed, failing], session=session)
+
+    assert await scheduler.tick(NOW) == ["failing"]
+    assert windowed_calls == []
+    assert session.statements[-1][1]["status"] == "failed"
+    assert session.statements[-1][1]["error_message"] == "disk full"
+
+    assert await scheduler.tick(NOW.replace(hour=3, minute=30)) == ["nightly", "failing"]
+    assert windowed_calls == [1.5 * 3600]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_lost_lease_is_released_and_retaken():
+    job, _ = _job("hourly")
+    scheduler, _, engine = _scheduler([job], engine=_FakeEngine(True, False))
+
+    await scheduler.tick(NOW)
+    engine.connections[0].broken = True
+
+    assert await scheduler.tick(NOW) == []
+    assert engine.connections[0].closed
+    assert not scheduler.is_leader
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_job_interrupted_by_stop_is_recorded_as_cancelled():
+    started = asyncio.Event()
+
+    async def run(budget):
+        started.set()
+        await asyncio.Event().wait()
+
+    job = ScheduledJob("backup:hourly", CronSchedule.parse("0 * * * *"), run)
+    session = _FakeSession(last_runs=[("backup:hourly", datetime.now(timezone.utc) - timedelta(hours=2))])
+    scheduler, session, engine = _scheduler([job], session=session)
+
+    await scheduler.start()
+    await asyncio.wait_for(started.wait(), 1)
+    await scheduler.stop()
+
+    update_sql, update_params = session.statements[-1]
+    assert update_sql.startswith("UPDATE scheduled_job_runs")
+    assert update_params["status"] == "cancelled"
+    assert update_params["finished_at"] is not None
+    assert engine.connections[0].closed
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_job_is_cancelled_when_the_lease_is_lost_during_it():
+    started = asyncio.Event()
+    job_cancelled = asyncio.Event()
+
+    async def run(budget):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            job_cancelled.set()
+            raise
+
+    job = ScheduledJob("retention_cleanup", CronSchedule.parse("0 * * * *"), run)
+    session = _FakeSession(last_runs=[("retention_cleanup", NOW - timedelta(hours=2))])
+    scheduler, session, engine = _scheduler([job], engine=_FakeEngine(True, False), session=session)
+    scheduler.settings = SchedulerSettings(tick_seconds=0)
+
+    tick = asyncio.create_task(scheduler.tick(NOW))
+    await asyncio.wait_for(started.wait(), 1)
+    engine.connections[0].broken = True
+
+    assert await asyncio.wait_for(tick, 1) == ["retention_cleanup"]
+    assert job_cancelled.is_set()
+    update_sql, update_params = session.statements[-1]
+    assert update_sql.startswith("UPDATE scheduled_job_runs")
+    assert update_params["status"] == "cancelled"
+    assert update_params["error_message"] == "Scheduler lost its leader lease during the run"
+    assert engine.connections[0].closed
+    assert not scheduler.is_leader
@@ -0,0 +1,126 @@
+"""
+Unit tests for single-pass summary aggregation.
+
+This module tests the GROUPING SETS statement, folding its rows into a
+summary response and facet validation.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationError
+from app.db.schemas import AuditLog
+from app.models.audit import AuditEventQuery
+from app.services.audit_service import AuditService
+from app.services.summary_service import (
+    _grouping_id,
+    build_summary_statement,
+    fold_summary_rows,
+    validate_facets,
+)
+
+FACETS = ["event_type", "status", "resource_type"]
+
+
+def _row(grouping_id, event_count, distinct_count=1, **values):
+    return SimpleNamespace(
+        grouping_id=grouping_id,
+        event_count=event_count,
+        distinct_count=distinct_count,
+        event_type=values.get("event_type"),
+        status=values.get("status"),
+        resource_type=values.get("resource_type"),
+    )
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.unit
+def test_statement_scans_once_with_grouping_sets():
+    filtered = select(AuditLog).where(AuditLog.tenant_id == "tenant-1")
+
+    sql = _compile(build_summary_statement(filtered, FACETS, top_n=5))
+
+    assert sql.count("FROM audit_logs") == 1
+    assert "GROUPING SETS((audit_logs.event_type), (audit_logs.status), (audit_logs.resource_type), ())" in sql
+    assert "row_number() OVER (PARTITION BY summary_groups.grouping_id" in sql
+    assert "audit_logs.tenant_id = " in sql
+
+
+@pytest.mark.unit
+def test_grouping_ids_match_postgres_bit_order():
+    # GROUPING(a, b, c) for grouping set (a) leaves b and c aggregated: 0b011
+    assert [_grouping_id(index, 3) for index in range(3)] == [0b011, 0b101, 0b110]
+
+
+@pytest.mark.unit
+def test_rows_fold_into_top_n_distributions():
+    rows = [
+        _row(0b011, 6, distinct_count=3, event_type="user.login"),
+        _row(0b011, 3, distinct_count=3, event_type="data.read"),
+        _row(0b101, 9, distinct_count=1, status="success"),
+        _row(0b110, 7, distinct_count=2, resource_type=None),
+        _row(0b110, 2, distinct_count=2, resource_type="document"),
+        _row(0b111, 10),
+    ]
+
+    summary = fold_summary_rows(rows, FACETS)
+
+    assert summary.total_count == 10
+    event_types = summary.facets["event_type"]
+    assert [(bucket.value, bucket.count) for bucket in event_types.buckets] == [
+        ("user.login", 6),
+        ("data.read", 3),
+    ]
+    assert event_types.distinct_count == 3
+    assert event_types.other_count == 1
+    assert summary.facets["resource_type"].buckets[0].value is None
+    assert summary.facets["status"].other_count == 1
+
+
+@pytest.mark.unit
+def test_empty_result_has_empty_facets():
+    summary = fold_summary_rows([_row(0b111, 0)], FACETS)
+
+    assert summary.total_count == 0
+    assert all(not distribution.buckets for distribution in summary.facets.values())
+
+
+@pytest.mark.unit
+def test_facets_are_validated():
+    assert validate_facets(["status", "event_type", "status"]) == ["status", "event_type"]
+    with pytest.raises(ValidationError):
+        validate_facets(["severity"])
+    with pytest.raises(ValidationError):
+        validate_facets([])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_service_runs_a_single_statement():
+    result = MagicMock()
+    result.all.return_value = [
+        SimpleNamespace(grouping_id=0, event_count=4, distinct_count=2, status="success"),
+        SimpleNamespace(grouping_id=0, event_count=1, distinct_count=2, status="failure"),
+        SimpleNamespace(grouping_id=1, event_count=5, distinct_count=1, status=None),
+    ]
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+
+    service = AuditService.__new__(AuditService)
+    service.db_manager = MagicMock()
+    service.db_manager.get_session.return_value = session
+
+    summary = await service._load_audit_summary(AuditEventQuery(), "tenant-1", ["status"], 10)
+
+    session.execute.assert_awaited_once()
+    assert summary.total_count == 5
+    assert [bucket.count for bucket in summary.facets["status"].buckets] == [4, 1]
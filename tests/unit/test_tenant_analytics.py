@@ -0,0 +1,133 @@
+"""
+Unit tests for incremental tenant analytics.
+
+This module tests that hourly counters, distinct-value estimates and
+recent-event lists merge across batches and concurrent writers, against
+fakeredis.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.config import RedisSettings
+from app.services import tenant_analytics
+from app.services.cache_service import CacheService
+from app.services.tenant_analytics import TenantAnalytics, event_hour
+
+HOUR = datetime(2025, 3, 4, 10, 15, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def analytics():
+    cache = CacheService(RedisSettings(), client=fakeredis.FakeAsyncRedis())
+    await cache.initialize()
+    yield TenantAnalytics(cache)
+    await cache.close()
+
+
+def _event(n, timestamp=HOUR, event_type="login", severity="info", user="u1", ip="10.0.0.1"):
+    return {
+        "data": {
+            "id": f"e{n}",
+            "event_type": event_type,
+            "severity": severity,
+            "timestamp": timestamp.isoformat(),
+            "user_id": user,
+            "ip_address": ip,
+        },
+        "received_at": HOUR,
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_batches_add_up_instead_of_overwriting(analytics):
+    await analytics.record("t1", [_event(1), _event(2, severity="error")])
+    await analytics.record("t1", [_event(3, event_type="logout", user="u2", ip="10.0.0.2")])
+
+    stats = await analytics.hourly("t1", HOUR)
+
+    assert stats["total_events"] == 3
+    assert stats["event_counts"] == {"login": 2, "logout": 1}
+    assert stats["severity_counts"] == {"info": 2, "error": 1}
+    assert stats["unique_users"] == 2
+    assert stats["unique_ips"] == 2
+    assert stats["updated_at"] is not None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_writers_do_not_lose_updates(analytics):
+    batches = [[_event(worker * 100 + n, user=f"u{worker}") for n in range(50)] for worker in range(8)]
+
+    await asyncio.gather(*(analytics.record("t1", batch) for batch in batches))
+
+    stats = await analytics.hourly("t1", HOUR)
+    assert stats["total_events"] == 400
+    assert stats["unique_users"] == 8
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_events_are_bucketed_by_their_own_hour(analytics):
+    earlier = datetime(2025, 3, 4, 9, 59, tzinfo=timezone.utc)
+
+    await analytics.record("t1", [_event(1), _event(2, timestamp=earlier)])
+
+    assert (await analytics.hourly("t1", HOUR))["total_events"] == 1
+    assert (await analytics.hourly("t1", earlier))["total_events"] == 1
+    assert (await analytics.hourly("t2", HOUR))["total_events"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_recent_events_are_capped_newest_first(analytics, monkeypatch):
+    monkeypatch.setattr(tenant_analytics, "RECENT_EVENTS_LIMIT", 5)
+
+    await analytics.record("t1", [_event(n) for n in range(4)])
+    await analytics.record("t1", [_event(n) for n in range(4, 8)])
+
+    recent = await analytics.recent_events("t1", limit=10)
+    assert [event["id"] for event in recent] == ["e7", "e6", "e5", "e4", "e3"]
+    assert 0 < await analytics.cache_service.client.ttl("recent_events:t1:list") <= 1800
+
+
+@pytest.mark.unit
+def test_event_hour_accepts_strings_datetimes_and_falls_back():
+    assert event_hour("2025-03-04T10:15:00Z") == "2025030410"
+    assert event_hour(datetime(2025, 3, 4, 10, 15)) == "2025030410"
+    assert event_hour("not a timestamp", fallback=HOUR) == "2025030410"
+    assert event_hour(None, fallback=HOUR) == "2025030410"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redis_failures_are_logged_not_raised(analytics):
+    client = analytics.cache_service.client
+    client.pipeline = lambda transaction=True: _FailingPipeline()
+    client.lrange = AsyncMock(side_effect=RedisConnectionError("down"))
+
+    await analytics.record("t1", [_event(1)])
+
+    assert (await analytics.hourly("t1", HOUR))["total_events"] == 0
+    assert await analytics.recent_events("t1") == []
+
+
+class _FailingPipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        raise RedisConnectionError("down")
@@ -0,0 +1,204 @@
+"""
+Unit tests for the two-tier cache.
+
+This module tests the in-process LRU, single-flight loading through
+fakeredis and cross-pod invalidation over a fake NATS connection.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import fakeredis
+import pytest
+
+from app.config import RedisSettings
+from app.models.base import SortOrder, SortParams
+from app.services.cache_service import CacheService
+from app.services.tiered_cache import CACHE_INVALIDATE_SUBJECT, LocalCache, TieredCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeNATS:
+    """Delivers published messages to every subscriber, like a NATS subject."""
+
+    def __init__(self):
+        self.subscribers = []
+        self.published = []
+
+    async def subscribe(self, subject, callback, queue=None):
+        self.subscribers.append(callback)
+
+    async def publish(self, subject, data):
+        self.published.append((subject, data))
+        msg = MagicMock(subject=subject, data=json.dumps(data).encode())
+        for callback in self.subscribers:
+            await callback(msg)
+
+
+def _make_cache(redis=None, nats=None, **overrides):
+    settings = RedisSettings(**{"invalidation_coalesce_ms": 0, **overrides})
+    cache_service = CacheService(settings, client=redis or fakeredis.FakeAsyncRedis())
+    return TieredCache(cache_service, settings, nats)
+
+
+def _counting_loader(value, delay=0.0):
+    loader = AsyncMock()
+
+    async def load():
+        await asyncio.sleep(delay)
+        return value
+
+    loader.side_effect = load
+    return loader
+
+
+@pytest.mark.unit
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", 1, "ns")
+    cache.set("b", 2, "ns")
+    cache.get("a")
+    cache.set("c", 3, "ns")
+
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.invalidate_namespace("ns") == 2
+
+
+@pytest.mark.unit
+def test_local_cache_expires_entries():
+    clock = _FakeClock()
+    cache = LocalCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1, "ns")
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert len(cache) == 1
+    cache.get("a")
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+def test_local_cache_invalidates_only_its_namespace():
+    cache = LocalCache(max_entries=10, ttl_seconds=10)
+    cache.set("a", 1, "tenant-1")
+    cache.set("b", 2, "tenant-2")
+
+    cache.invalidate_namespace("tenant-1")
+
+    assert len(cache) == 1
+    assert cache.get("b") == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once():
+    cache = _make_cache()
+    loader = _counting_loader({"rows": 3}, delay=0.01)
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("tenant-1", "page-1", loader) for _ in range(20))
+    )
+
+    assert loader.await_count == 1
+    assert all(result == {"rows": 3} for result in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_loader_failure_reaches_every_waiter():
+    cache = _make_cache()
+    loader = AsyncMock(side_effect=RuntimeError("db down"))
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("tenant-1", "page-1", loader) for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    assert loader.await_count == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_waiters():
+    cache = _make_cache()
+    started = asyncio.Event()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            started.set()
+            await asyncio.sleep(10)
+        return {"rows": calls}
+
+    leader = asyncio.create_task(cache.get_or_load("tenant-1", "page-1", load))
+    await started.wait()
+    followers = [asyncio.create_task(cache.get_or_load("tenant-1", "page-1", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    assert results == [{"rows": 2}] * 3
+    assert calls == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_second_pod_reads_redis_and_decodes_model():
+    redis = fakeredis.FakeAsyncRedis()
+    pod_a, pod_b = _make_cache(redis), _make_cache(redis)
+    value = SortParams(sort_by="timestamp", sort_order=SortOrder.ASC)
+
+    await pod_a.get_or_load("tenant-1", "sort", _counting_loader(value), model=SortParams)
+    loader = _counting_loader(None)
+    result = await pod_b.get_or_load("tenant-1", "sort", loader, model=SortParams)
+
+    loader.assert_not_awaited()
+    assert result == value
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_pods():
+    redis, nats = fakeredis.FakeAsyncRedis(), _FakeNATS()
+    pod_a, pod_b = _make_cache(redis, nats), _make_cache(redis, nats)
+    await pod_a.start()
+    await pod_b.start()
+
+    await pod_a.get_or_load("tenant-1", "page-1", _counting_loader("old"))
+    await pod_b.get_or_load("tenant-1", "page-1", _counting_loader("old"))
+
+    await pod_a.invalidate("tenant-1")
+    await pod_a.stop()
+
+    assert nats.published[0][0] == CACHE_INVALIDATE_SUBJECT
+    assert len(pod_b.local) == 0
+    assert await pod_b.get_or_load("tenant-1", "page-1", _counting_loader("new")) == "new"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_cached_locally():
+    cache = _make_cache()
+
+    async def load():
+        cache.invalidate_local("tenant-1")
+        return "stale"
+
+    assert await cache.get_or_load("tenant-1", "page-1", load) == "stale"
+    assert len(cache.local) == 0
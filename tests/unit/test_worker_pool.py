@@ -0,0 +1,210 @@
+"""
+Unit tests for the worker process supervisor and worker shutdown.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import WorkerSettings
+from app.worker_pool import WorkerPool
+
+
+class _FakeValue:
+    def __init__(self, value):
+        self.value = value
+
+
+class _FakeProcess:
+    pids = iter(range(1000, 100000))
+
+    def __init__(self, target, args, name):
+        self.args = args
+        self.name = name
+        self.pid = None
+        self.exitcode = None
+        self.alive = False
+        self.killed = False
+        self.terminated = False
+
+    def start(self):
+        self.pid = next(self.pids)
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def kill(self):
+        self.killed = True
+        self.alive = False
+        self.exitcode = -9
+
+    def terminate(self):
+        self.terminated = True
+        self.alive = False
+        self.exitcode = 0
+
+    def join(self, timeout=None):
+        pass
+
+
+class _FakeContext:
+    def __init__(self):
+        self.processes = []
+
+    def Value(self, typecode, value, lock=True):
+        return _FakeValue(value)
+
+    def Process(self, target, args, name):
+        process = _FakeProcess(target, args, name)
+        self.processes.append(process)
+        return process
+
+
+def _settings(**overrides):
+    values = dict(
+        heartbeat_timeout_seconds=30,
+        drain_timeout_seconds=5,
+        restart_backoff_seconds=1,
+        max_restart_backoff_seconds=60,
+    )
+    values.update(overrides)
+    return WorkerSettings(**values)
+
+
+def _start(pool):
+    for worker in pool.workers:
+        pool._spawn(worker)
+    return time.monotonic()
+
+
+def test_exited_worker_is_restarted_after_backoff():
+    context = _FakeContext()
+    pool = WorkerPool(_settings(), 2, context=context)
+    now = _start(pool)
+    crashed = pool.workers[0].process
+    crashed.alive, crashed.exitcode = False, 1
+
+    pool.check(now)
+    assert pool.workers[0].process is None
+    assert pool.workers[1].process is context.processes[1]
+
+    pool.check(now + 0.5)
+    assert pool.workers[0].process is None
+
+    pool.check(now + 1)
+    assert pool.workers[0].process is context.processes[2]
+    assert pool.restarts == 1
+
+
+def test_repeated_failures_back_off_exponentially():
+    context = _FakeContext()
+    pool = WorkerPool(_settings(restart_backoff_seconds=1, max_restart_backoff_seconds=5), 1, context=context)
+    _start(pool)
+    worker = pool.workers[0]
+
+    delays = []
+    for _ in range(5):
+        worker.process.alive = False
+        failed_at = worker.started_at
+        pool.check(failed_at)
+        delays.append(worker.restart_at - failed_at)
+        pool.check(worker.restart_at)
+
+    assert delays == [1, 2, 4, 5, 5]
+
+
+def test_long_running_worker_resets_backoff():
+    context = _FakeContext()
+    pool = WorkerPool(_settings(restart_backoff_seconds=1, max_restart_backoff_seconds=5), 1, context=context)
+    now = _start(pool)
+    worker = pool.workers[0]
+    worker.failures = 3
+
+    worker.process.alive = False
+    pool.check(now + 10)
+
+    assert worker.failures == 1
+    assert worker.restart_at == now + 11
+
+
+def test_stalled_worker_is_killed_and_restarted():
+    context = _FakeContext()
+    pool = WorkerPool(_settings(heartbeat_timeout_seconds=30), 2, context=context)
+    now = _start(pool)
+    pool.workers[1].heartbeat.value = now + 25
+
+    pool.check(now + 31)
+
+    assert context.processes[0].killed
+    assert not context.processes[1].killed
+    assert pool.workers[0].process is None
+    assert pool.restarts == 1
+
+
+def test_shutdown_terminates_children_and_skips_restarts():
+    context = _FakeContext()
+    pool = WorkerPool(_settings(), 3, context=context)
+    now = _start(pool)
+
+    pool.stop()
+    pool.check(now + 100)
+    pool.shutdown()
+
+    assert all(process.terminated and not process.killed for process in context.processes)
+    assert len(context.processes) == 3
+    assert all(worker.process is None for worker in pool.workers)
+
+
+def _drain_on_sigterm(index, heartbeat):
+    drained = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: drained.append(signum))
+    while not drained:
+        heartbeat.value = time.monotonic()
+        time.sleep(0.01)
+    os._exit(0)
+
+
+def _ignore_sigterm(index, heartbeat):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.01)
+
+
+def test_real_children_drain_or_are_killed():
+    context = multiprocessing.get_context("fork")
+    draining = WorkerPool(_settings(drain_timeout_seconds=5), 2, target=_drain_on_sigterm, context=context)
+    _start(draining)
+    processes = [worker.process for worker in draining.workers]
+    time.sleep(0.1)
+    draining.shutdown()
+    assert [process.exitcode for process in processes] == [0, 0]
+
+    stuck = WorkerPool(_settings(drain_timeout_seconds=0.2), 1, target=_ignore_sigterm, context=context)
+    _start(stuck)
+    process = stuck.workers[0].process
+    time.sleep(0.1)
+    stuck.shutdown()
+    assert process.exitcode == -signal.SIGKILL
+
+
+@pytest.mark.asyncio
+async def test_worker_stop_drains_before_closing_and_runs_once():
+    from app.worker import AuditWorker
+
+    calls = []
+    worker = AuditWorker()
+    worker.nats_service = MagicMock()
+    worker.nats_service.stop_consumers = AsyncMock(side_effect=lambda: calls.append("stop_consumers"))
+    worker.nats_service.close = AsyncMock(side_effect=lambda: calls.append("nats_close"))
+    worker.batcher = MagicMock()
+    worker.batcher.close = AsyncMock(side_effect=lambda: calls.append("batcher_close"))
+
+    await worker.stop()
+    await worker.stop()
+
+    assert calls == ["stop_consumers", "batcher_close", "nats_close"]